@@ -0,0 +1,6 @@
+# agency_kit – shared runtime pieces for the example stacks
+# (add `examples/` to sys.path, then `from agency_kit import ...`)
+
+from agency_kit.registry import Lazy, LazyRegistry, resolve_all
+
+__all__ = ["Lazy", "LazyRegistry", "resolve_all"]
@@ -0,0 +1,99 @@
+# agency_kit/agno_compat.py
+# ======================================================================
+# Stand-ins for the older agno API some stacks are written against
+# (benchmarks with fake_model.py / fake_tools.py, on agno 1.5)
+#  • agno.memory.FileMemory / VectorFileMemory: flat-file placeholders,
+#    only built when EVENT_BACKEND=file / VECTOR_BACKEND=flat
+#  • Agent(..., session_memory=…) and Agent / Team(memory=<store>): the
+#    stores the stacks pass (EventLog, AnnVectorMemory …) are kept as
+#    attributes instead of reaching agno, which expects its own Memory
+#  • Agent(name, role, model, **kw) / Team(name, mode, model, members,
+#    **kw): the positional order those stacks use, mapped to keywords
+#    (agno 1.5: Agent is keyword-only, Team(members, mode, model, name))
+#  • install() patches the agno modules in place – call it before
+#    importing a stack; stacks on the current API are unaffected
+# ======================================================================
+
+import json, pathlib
+from typing import Any, Dict, List, Optional
+
+
+class FileMemory:
+    """Flat JSONL event store: add / search by session, no index."""
+
+    def __init__(self, path: str, **kwargs):
+        self.path = pathlib.Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.file = self.path / "events.jsonl"
+
+    def add(self, session: str, event: Any) -> None:
+        with self.file.open("a", encoding="utf-8") as f:
+            f.write(
+                json.dumps({"session": session, "event": event}, default=str) + "\n"
+            )
+
+    def search(self, session: str, limit: Optional[int] = None) -> List[Any]:
+        if not self.file.exists():
+            return []
+        with self.file.open(encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        events = [r["event"] for r in rows if r["session"] == session]
+        return events[-limit:] if limit else events
+
+
+class VectorFileMemory(FileMemory):
+    """Flat vector store placeholder: same file layout, recency for search."""
+
+
+def _agno_memory(memory: Any) -> bool:
+    from agno.memory import AgentMemory, Memory, TeamMemory
+
+    return isinstance(memory, (AgentMemory, Memory, TeamMemory))
+
+
+def _split_memory(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Pop the stores agno 1.5 can't take; returns them for the instance."""
+    stores = {"session_memory": kwargs.pop("session_memory", None)}
+    if "memory" in kwargs and not _agno_memory(kwargs["memory"]):
+        stores["store_memory"] = kwargs.pop("memory")
+    return stores
+
+
+def _keep(obj: Any, stores: Dict[str, Any]) -> None:
+    for name, store in stores.items():
+        object.__setattr__(obj, name, store)
+
+
+def install() -> None:
+    """Patch agno.memory / agno.agent / agno.team for the older API."""
+    import agno.agent, agno.memory, agno.team
+
+    if getattr(agno.agent.Agent, "compat", False):
+        return
+    base_agent, base_team = agno.agent.Agent, agno.team.Team
+
+    class Agent(base_agent):
+        compat = True
+
+        def __init__(self, *args, **kwargs):
+            kwargs.update(zip(("name", "role", "model"), args))
+            stores = _split_memory(kwargs)
+            super().__init__(**kwargs)
+            _keep(self, stores)
+
+    class Team(base_team):
+        compat = True
+
+        def __init__(self, *args, **kwargs):
+            if args and isinstance(args[0], str):
+                kwargs.update(zip(("name", "mode", "model", "members"), args))
+                args = ()
+            stores = _split_memory(kwargs)
+            super().__init__(*args, **kwargs)
+            _keep(self, stores)
+
+    for cls, base in ((Agent, base_agent), (Team, base_team)):
+        cls.__name__ = cls.__qualname__ = base.__name__
+        cls.__module__ = base.__module__
+    agno.agent.Agent, agno.team.Team = Agent, Team
+    agno.memory.FileMemory, agno.memory.VectorFileMemory = FileMemory, VectorFileMemory
@@ -0,0 +1,322 @@
+# agency_kit/batching.py
+# ======================================================================
+# Batched multi-item calls for per-item pipeline agents
+#  • items arriving at a stage are packed into one request: the agent gets
+#    a JSON array of {"_id", …item} and returns one object per item, so the
+#    instructions are sent once per batch instead of once per item
+#  • a batch closes when it holds max_items, when the next item would push
+#    the estimated prompt + completion tokens past token_budget, or after
+#    linger_s – a lone item never waits longer than that
+#  • completion tokens per item are estimated from the answers seen so far,
+#    so the batch size follows the budget as answers get longer or shorter
+#  • every answer is checked for its item's keys; only the items that fail
+#    are split in halves and sent again (retries times), then they fail
+#    alone as stage errors – valid items of the same batch go on at once
+#  • batch_stage(name, agent, keys, …) is a drop-in for agent_stage()
+#    (threads via fn, event loop via afn); batch_stats() for the API
+# ======================================================================
+
+import asyncio, contextvars, json, threading, weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from agency_kit.pipeline import AgentSlots, Stage, arun_json, run_json
+from agency_kit.tokens import count_tokens
+
+BATCH_PROMPT = (
+    "Apply your instructions to each of the {n} items below on its own. "
+    "Return ONLY a JSON array of {n} objects in the same order; each object "
+    'has the item\'s "_id" and the fields you add ({keys}).\nITEMS:\n{items}'
+)
+
+
+@dataclass
+class _Batch:
+    entries: List[Tuple[Dict[str, Any], Any]] = field(default_factory=list)
+    tokens: int = 0
+    context: contextvars.Context = field(default_factory=contextvars.copy_context)
+
+
+def _instructions(agent: Any) -> str:
+    instr = getattr(agent, "instructions", None) or ""
+    return instr if isinstance(instr, str) else "\n".join(map(str, instr))
+
+
+class Batcher:
+    """Packs items for one agent into array requests; one Future per item."""
+
+    def __init__(
+        self,
+        name: str,
+        agent: Any,
+        keys: Sequence[str],
+        max_items: int = 10,
+        token_budget: int = 6000,
+        linger_s: float = 0.05,
+        concurrency: int = 4,
+        retries: int = 2,
+        out_tokens: int = 150,
+    ):
+        self.name = name
+        self.keys = tuple(keys)
+        self.max_items = max(1, max_items)
+        self.token_budget = token_budget
+        self.linger_s = linger_s
+        self.concurrency = concurrency
+        self.retries = retries
+        self.out_tokens = float(out_tokens)  # running estimate per item
+        self._slots = AgentSlots(agent, concurrency)
+        self._base_tokens: Optional[int] = None  # _base(): agent may be a Lazy
+        self._lock = threading.Lock()
+        self._state = {"open": _Batch()}  # the thread path's open batch
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # event loop → {"open": _Batch, "sem": Semaphore, "tasks": set}
+        self._loops: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self.counters = dict.fromkeys(
+            "items calls batched_items retried failed splits".split(), 0
+        )
+        self.closed_by = dict.fromkeys(("size", "tokens", "linger"), 0)
+
+    # ---------- packing ------------------------------------------------
+    def _base(self) -> int:
+        """Instruction + prompt tokens, counted on first use (builds the agent)."""
+        if self._base_tokens is None:
+            prompt = BATCH_PROMPT.format(
+                n=self.max_items, keys=", ".join(self.keys), items=""
+            )
+            self._base_tokens = count_tokens(
+                _instructions(self._slots.agent)
+            ) + count_tokens(prompt)
+        return self._base_tokens
+
+    def _cost(self, item: Dict[str, Any]) -> int:
+        return count_tokens(json.dumps(item, default=str)) + int(self.out_tokens)
+
+    def _offer(self, state: Dict[str, Any], entry, cost: int):
+        """Add entry to the open batch → (closed batches, batch to time or None)."""
+        closed, batch = [], state["open"]
+        base = self._base()
+        with self._lock:
+            self.counters["items"] += 1
+            if batch.entries and base + batch.tokens + cost > self.token_budget:
+                closed.append(batch)
+                self.closed_by["tokens"] += 1
+                batch = state["open"] = _Batch()
+            batch.entries.append(entry)
+            batch.tokens += cost
+            started = batch if len(batch.entries) == 1 else None
+            if len(batch.entries) >= self.max_items:
+                closed.append(batch)
+                self.closed_by["size"] += 1
+                state["open"] = _Batch()
+                started = None
+        return closed, started
+
+    def _expire(self, state: Dict[str, Any], batch: _Batch) -> bool:
+        with self._lock:
+            if state["open"] is not batch:
+                return False
+            state["open"] = _Batch()
+            self.closed_by["linger"] += 1
+            return True
+
+    # ---------- request / answer ---------------------------------------
+    def _message(self, items: List[Dict[str, Any]]) -> str:
+        rows = [{"_id": i, **item} for i, item in enumerate(items)]
+        return BATCH_PROMPT.format(
+            n=len(rows),
+            keys=", ".join(self.keys),
+            items=json.dumps(rows, default=str),
+        )
+
+    def _check(self, entries, out: Any):
+        """→ ([(entry, patch)] that have every key, [entry] to retry)."""
+        if isinstance(out, dict):
+            out = next((v for v in out.values() if isinstance(v, list)), [out])
+        if not isinstance(out, list):
+            out = []
+        by_id: Dict[int, Dict[str, Any]] = {}
+        for pos, row in enumerate(out):
+            if not isinstance(row, dict):
+                continue
+            rid = row.get("_id", pos if len(out) == len(entries) else None)
+            if isinstance(rid, int) and 0 <= rid < len(entries):
+                by_id.setdefault(rid, row)
+        good, bad = [], []
+        for i, entry in enumerate(entries):
+            row = by_id.get(i)
+            if row is not None and all(row.get(k) not in (None, "") for k in self.keys):
+                good.append((entry, {k: v for k, v in row.items() if k != "_id"}))
+            else:
+                bad.append(entry)
+        if good:
+            seen = sum(count_tokens(json.dumps(p, default=str)) for _, p in good)
+            with self._lock:
+                self.out_tokens = 0.8 * self.out_tokens + 0.2 * seen / len(good)
+        return good, bad
+
+    def _after(self, entries, bad, tries: int):
+        """Count the call; → parts to send again (failed items split in two)."""
+        with self._lock:
+            self.counters["calls"] += 1
+            if len(entries) > 1:
+                self.counters["batched_items"] += len(entries)
+            if not bad:
+                return []
+            if tries >= self.retries:
+                self.counters["failed"] += len(bad)
+                return None
+            self.counters["retried"] += len(bad)
+            if len(bad) > 1:
+                self.counters["splits"] += 1
+                mid = (len(bad) + 1) // 2
+                return [bad[:mid], bad[mid:]]
+            return [bad]
+
+    def _give_up(self, error: Optional[BaseException]) -> BaseException:
+        keys = ", ".join(self.keys)
+        return error or ValueError(
+            f"{self.name}: no valid {keys} after {self.retries + 1} tries"
+        )
+
+    # ---------- threads --------------------------------------------------
+    def submit(self, item: Dict[str, Any]) -> Future:
+        fut: Future = Future()
+        closed, started = self._offer(self._state, (item, fut), self._cost(item))
+        for batch in closed:
+            self._dispatch(batch)
+        if started is not None:
+            timer = threading.Timer(self.linger_s, self._linger, (started,))
+            timer.daemon = True
+            timer.start()
+        return fut
+
+    def _linger(self, batch: _Batch) -> None:
+        if self._expire(self._state, batch):
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: _Batch) -> None:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        self.concurrency, thread_name_prefix=f"{self.name}-batch"
+                    )
+        self._pool.submit(batch.context.run, self._solve, batch.entries, 0)
+
+    def _solve(self, entries, tries: int) -> None:
+        good, bad, error = [], entries, None
+        try:
+            with self._slots.borrow() as a:
+                out = run_json(a, self._message([item for item, _ in entries]))
+            good, bad = self._check(entries, out)
+        except Exception as e:
+            error = e
+        for (_, fut), patch in good:
+            fut.set_result(patch)
+        parts = self._after(entries, bad, tries)
+        if parts is None:
+            for _, fut in bad:
+                fut.set_exception(self._give_up(error))
+        for part in parts or ():
+            self._solve(part, tries + 1)
+
+    # ---------- event loop ---------------------------------------------
+    def _loop_state(self) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._loops:
+                self._loops[loop] = {
+                    "open": _Batch(),
+                    "sem": asyncio.Semaphore(self.concurrency),
+                    "tasks": set(),
+                }
+            return self._loops[loop]
+
+    def _alaunch(self, state: Dict[str, Any], entries, tries: int = 0) -> None:
+        task = asyncio.ensure_future(self._asolve(state, entries, tries))
+        state["tasks"].add(task)
+        task.add_done_callback(state["tasks"].discard)
+
+    async def asubmit(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        state = self._loop_state()
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        closed, started = self._offer(state, (item, fut), self._cost(item))
+        for batch in closed:
+            self._alaunch(state, batch.entries)
+        if started is not None:
+
+            def linger(batch=started):
+                if self._expire(state, batch):
+                    self._alaunch(state, batch.entries)
+
+            loop.call_later(self.linger_s, linger)
+        return await fut
+
+    async def _asolve(self, state: Dict[str, Any], entries, tries: int) -> None:
+        good, bad, error = [], entries, None
+        try:
+            async with state["sem"]:
+                with self._slots.borrow() as a:
+                    out = await arun_json(
+                        a, self._message([item for item, _ in entries])
+                    )
+            good, bad = self._check(entries, out)
+        except Exception as e:
+            error = e
+        for (_, fut), patch in good:
+            if not fut.done():
+                fut.set_result(patch)
+        parts = self._after(entries, bad, tries)
+        if parts is None:
+            for _, fut in bad:
+                if not fut.done():
+                    fut.set_exception(self._give_up(error))
+        await asyncio.gather(*(self._asolve(state, p, tries + 1) for p in parts or ()))
+
+    # ---------- report ---------------------------------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            c = dict(self.counters)
+            return {
+                **c,
+                "items_per_call": (
+                    round(c["items"] / c["calls"], 2) if c["calls"] else 0
+                ),
+                "closed_by": dict(self.closed_by),
+                "max_items": self.max_items,
+                "token_budget": self.token_budget,
+                "out_tokens_per_item": round(self.out_tokens, 1),
+            }
+
+
+BATCHERS: Dict[str, Batcher] = {}
+
+
+def batch_stage(
+    name: str,
+    agent: Any,
+    keys: Sequence[str],
+    after: Tuple[str, ...] = (),
+    concurrency: int = 4,
+    **batching,
+) -> Stage:
+    """agent_stage() that batches: `concurrency` calls of up to max_items items."""
+    batcher = BATCHERS[name] = Batcher(
+        name, agent, keys, concurrency=concurrency, **batching
+    )
+
+    def fn(item: Dict[str, Any]) -> Dict[str, Any]:
+        return batcher.submit(item).result()
+
+    async def afn(item: Dict[str, Any]) -> Dict[str, Any]:
+        return await batcher.asubmit(item)
+
+    # items wait in the batcher, so the stage must admit a full batch per call
+    return Stage(name, fn, tuple(after), concurrency * batcher.max_items, afn)
+
+
+def batch_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: b.stats() for name, b in BATCHERS.items()}
@@ -0,0 +1,461 @@
+# agency_kit/cascade.py
+# ======================================================================
+# Confidence-based model cascade: gpt-4o-mini first, gpt-4o when needed
+#  • an httpx transport under OpenAIChat: every chat request goes to the
+#    cheap model first (non-streamed, so the whole answer can be checked)
+#  • cheap checks on the answer, in order:
+#      truncated (finish_reason=length) · tool calls name a known tool with
+#      JSON args, required params and a member id from <team_members> ·
+#      too short / pattern mismatch · JSON the instructions or
+#      response_format ask for (parses, has the {keys}) · self-reported
+#      "confidence: x" below the agent's threshold (asked for, then cut)
+#  • any failed check → the original request goes to the strong model,
+#    streamed as asked; a passing answer is returned (as SSE if streamed)
+#  • CascadePolicy per agent (CASCADE_POLICIES env JSON overrides);
+#    every escalation is logged with its reason, the latency it added and
+#    the cheap call it wasted; cascade_stats() has cost vs all-strong
+# ======================================================================
+
+import asyncio, json, logging, os, re, threading, time, weakref
+from collections import Counter, deque
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from agency_kit.metrics import cost
+from agency_kit.model_pool import (
+    POOL,
+    ModelPool,
+    _pooled_chat_class,
+    _ReleasingAsyncStream,
+    _ReleasingStream,
+    _Tail,
+)
+from agency_kit.stub_openai import sse_body
+
+log = logging.getLogger("agency.cascade")
+
+CONFIDENCE_ASK = (
+    "End your answer with one last line `confidence: <0.0-1.0>`: how sure you "
+    "are that it is complete and correct."
+)
+_CONFIDENCE = re.compile(
+    r"\n?[ \t*_]*confidence[*_]*:?[ \t*_]*([01](?:\.\d+)?)[ \t*_.]*$", re.I
+)
+_JSON_LINE = re.compile(r"\bJSON\b")
+_KEYS = re.compile(r"\{([^{}\n]{1,300})\}")
+_DROP_HEADERS = {"content-length", "host", "accept-encoding", "transfer-encoding"}
+
+
+@dataclass(frozen=True)
+class CascadePolicy:
+    cheap: str = "gpt-4o-mini"
+    strong: str = "gpt-4o"
+    enabled: bool = True  # False: straight to the strong model
+    confidence: Optional[float] = 0.6  # None: don't ask for a confidence line
+    json: bool = True  # check JSON the instructions / response_format ask for
+    tool_calls: bool = True  # check tool names, args, member ids
+    min_chars: int = 1
+    pattern: Optional[str] = None  # the answer must match this regex
+
+
+def _env_policies() -> Dict[str, Dict[str, Any]]:
+    raw = os.getenv("CASCADE_POLICIES")
+    return json.loads(raw) if raw else {}
+
+
+DEFAULT_POLICY = CascadePolicy(
+    cheap=os.getenv("CASCADE_CHEAP", "gpt-4o-mini"),
+    strong=os.getenv("CASCADE_STRONG", "gpt-4o"),
+    confidence=float(os.getenv("CASCADE_CONFIDENCE", "0.6")) or None,
+)
+POLICIES: Dict[str, Dict[str, Any]] = _env_policies()  # agent name → overrides
+
+
+def policy_for(name: str, **overrides) -> CascadePolicy:
+    known = {f.name for f in fields(CascadePolicy)}
+    merged = {**overrides, **POLICIES.get(name, {})}
+    return replace(DEFAULT_POLICY, **{k: v for k, v in merged.items() if k in known})
+
+
+def _system(body: dict) -> str:
+    return "\n".join(
+        m["content"]
+        for m in body.get("messages") or []
+        if m.get("role") in ("system", "developer")
+        and isinstance(m.get("content"), str)
+    )
+
+
+def _expected_json(body: dict) -> Tuple[bool, list]:
+    """(JSON wanted?, keys it must have) from response_format / instructions."""
+    fmt = body.get("response_format") or {}
+    if fmt.get("type") == "json_schema":
+        return True, list(
+            fmt.get("json_schema", {}).get("schema", {}).get("required", [])
+        )
+    if fmt.get("type") == "json_object":
+        return True, []
+    for line in _system(body).splitlines():
+        if _JSON_LINE.search(line):
+            m = _KEYS.search(line)
+            keys = (
+                [
+                    re.sub(r"\W+", "_", k.strip(" '\"….")).strip("_")
+                    for k in m.group(1).split(",")
+                ]
+                if m
+                else []
+            )
+            return True, [k for k in keys if k]
+    return False, []
+
+
+def _parse_json(text: str) -> Any:
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        raise ValueError("no JSON")
+    return json.JSONDecoder().raw_decode(text[start:])[0]
+
+
+def check(policy: CascadePolicy, body: dict, completion: dict) -> Optional[str]:
+    """Why the cheap answer isn't good enough, or None. Cuts the confidence line."""
+    choice = (completion.get("choices") or [{}])[0]
+    message = choice.get("message") or {}
+    if choice.get("finish_reason") == "length":
+        return "truncated"
+    calls = message.get("tool_calls") or []
+    if calls:
+        if not policy.tool_calls:
+            return None
+        tools = {t["function"]["name"]: t["function"] for t in body.get("tools") or []}
+        system = _system(body)
+        for call in calls:
+            fn = tools.get(call["function"]["name"])
+            if fn is None:
+                return "unknown tool"
+            try:
+                args = json.loads(call["function"].get("arguments") or "{}")
+            except ValueError:
+                return "tool args not JSON"
+            required = (fn.get("parameters") or {}).get("required") or []
+            if any(k not in args for k in required):
+                return "missing tool args"
+            member = args.get("member_id")
+            if (
+                member
+                and "<team_members>" in system
+                and f"- ID: {member}\n" not in system
+            ):
+                return "unknown member"
+        return None
+    text = message.get("content") or ""
+    confidence = None
+    m = _CONFIDENCE.search(text)
+    if m:
+        confidence = float(m.group(1))
+        text = message["content"] = text[: m.start()].rstrip()
+    if len(text.strip()) < policy.min_chars:
+        return "too short"
+    if policy.pattern and not re.search(policy.pattern, text):
+        return "format"
+    wanted, keys = _expected_json(body) if policy.json else (False, [])
+    if wanted:
+        try:
+            data = _parse_json(text)
+        except ValueError:
+            return "invalid JSON"
+        rows = data if isinstance(data, list) else [data]
+        if keys and any(
+            not isinstance(r, dict) or any(k not in r for k in keys) for r in rows
+        ):
+            return "missing JSON keys"
+    if (
+        policy.confidence is not None
+        and confidence is not None
+        and confidence < policy.confidence
+    ):
+        return "low confidence"
+    return None
+
+
+class Cascade:
+    """One agent's cascade: policy, counters, sync + async httpx transports."""
+
+    def __init__(
+        self,
+        name: str,
+        policy: CascadePolicy,
+        pool: ModelPool = POOL,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+    ):
+        self.name = name
+        self.policy = policy
+        self.pool = pool
+        self.api_key = api_key
+        self.base_url = base_url
+        self._lock = threading.Lock()
+        self._async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self.reasons: Counter = Counter()
+        self.recent: deque = deque(maxlen=20)
+        self.counters = dict.fromkeys("calls cheap_ok escalated direct".split(), 0)
+        self.counters.update(
+            dict.fromkeys(
+                "cheap_s strong_s escalation_s cost cost_all_strong escalation_cost".split(),
+                0.0,
+            )
+        )
+
+    # ---------- request plumbing ----------------------------------------
+    def _cheap_body(self, body: dict) -> dict:
+        cheap = {k: v for k, v in body.items() if k not in ("stream", "stream_options")}
+        cheap["model"] = self.policy.cheap
+        if self.policy.confidence is not None and not _expected_json(body)[0]:
+            messages = list(cheap.get("messages") or [])
+            for i, m in enumerate(messages):
+                if m.get("role") in ("system", "developer") and isinstance(
+                    m.get("content"), str
+                ):
+                    messages[i] = {
+                        **m,
+                        "content": f"{m['content']}\n\n{CONFIDENCE_ASK}",
+                    }
+                    break
+            else:
+                messages.insert(0, {"role": "system", "content": CONFIDENCE_ASK})
+            cheap["messages"] = messages
+        return cheap
+
+    def _strong_request(
+        self, client, request: httpx.Request, body: dict
+    ) -> httpx.Request:
+        headers = {
+            k: v for k, v in request.headers.items() if k.lower() not in _DROP_HEADERS
+        }
+        return client.build_request(
+            "POST",
+            request.url,
+            headers=headers,
+            json={**body, "model": self.policy.strong},
+        )
+
+    def _cheap_request(
+        self, client, request: httpx.Request, body: dict
+    ) -> httpx.Request:
+        headers = {
+            k: v for k, v in request.headers.items() if k.lower() not in _DROP_HEADERS
+        }
+        return client.build_request(
+            "POST", request.url, headers=headers, json=self._cheap_body(body)
+        )
+
+    def _judge(
+        self, body: dict, response: httpx.Response, seconds: float
+    ) -> Optional[dict]:
+        """The cheap completion if it passes; else None (and the escalation logged)."""
+        completion, reason = None, f"http {response.status_code}"
+        if response.status_code == 200:
+            try:
+                completion = response.json()
+                reason = check(self.policy, body, completion)
+            except ValueError:
+                reason = "unreadable"
+        usage = (completion or {}).get("usage") or {}
+        p, c = usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+        cheap_cost = cost(self.policy.cheap, p, c)
+        with self._lock:
+            k = self.counters
+            k["calls"] += 1
+            k["cheap_s"] += seconds
+            k["cost"] += cheap_cost
+            if reason is None:
+                k["cheap_ok"] += 1
+                k["cost_all_strong"] += cost(self.policy.strong, p, c)
+            else:
+                k["escalated"] += 1
+                k["escalation_s"] += seconds
+                k["escalation_cost"] += cheap_cost
+                self.reasons[reason] += 1
+                self.recent.append(
+                    {
+                        "ts": time.time(),
+                        "reason": reason,
+                        "added_ms": round(1000 * seconds, 1),
+                        "wasted_usd": round(cheap_cost, 6),
+                    }
+                )
+        if reason is not None:
+            log.info(
+                "cascade %s: %s → %s (%s), +%.0f ms, +$%.5f",
+                self.name,
+                self.policy.cheap,
+                self.policy.strong,
+                reason,
+                1000 * seconds,
+                cheap_cost,
+            )
+            return None
+        return completion
+
+    def _strong_done(self, t0: float, tail: _Tail, direct: bool) -> None:
+        usage = tail.usage()
+        c = cost(
+            self.policy.strong,
+            usage.get("prompt_tokens", 0),
+            usage.get("completion_tokens", 0),
+        )
+        with self._lock:
+            k = self.counters
+            if direct:
+                k["calls"] += 1
+                k["direct"] += 1
+            k["strong_s"] += time.perf_counter() - t0
+            k["cost"] += c
+            k["cost_all_strong"] += c
+
+    @staticmethod
+    def _respond(
+        request: httpx.Request, completion: dict, stream: bool
+    ) -> httpx.Response:
+        if stream:
+            return httpx.Response(
+                200,
+                headers={"content-type": "text/event-stream"},
+                content=sse_body(completion),
+                request=request,
+            )
+        return httpx.Response(200, json=completion, request=request)
+
+    # ---------- sync / async ----------------------------------------------
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.read())
+        stream = bool(body.get("stream"))
+        if self.policy.enabled:
+            client = self.pool.client(self.policy.cheap, self.api_key, self.base_url)
+            t0 = time.perf_counter()
+            response = client.send(self._cheap_request(client, request, body))
+            completion = self._judge(body, response, time.perf_counter() - t0)
+            if completion is not None:
+                return self._respond(request, completion, stream)
+        client = self.pool.client(self.policy.strong, self.api_key, self.base_url)
+        t0, tail = time.perf_counter(), _Tail()
+        response = client.send(self._strong_request(client, request, body), stream=True)
+        done = lambda: self._strong_done(t0, tail, not self.policy.enabled)
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, done, tail),
+            request=request,
+        )
+
+    async def ahandle(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(await request.aread())
+        stream = bool(body.get("stream"))
+        if self.policy.enabled:
+            client = self.pool.async_client(
+                self.policy.cheap, self.api_key, self.base_url
+            )
+            t0 = time.perf_counter()
+            response = await client.send(self._cheap_request(client, request, body))
+            completion = self._judge(body, response, time.perf_counter() - t0)
+            if completion is not None:
+                return self._respond(request, completion, stream)
+        client = self.pool.async_client(self.policy.strong, self.api_key, self.base_url)
+        t0, tail = time.perf_counter(), _Tail()
+        response = await client.send(
+            self._strong_request(client, request, body), stream=True
+        )
+        done = lambda: self._strong_done(t0, tail, not self.policy.enabled)
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_ReleasingAsyncStream(response.stream, done, tail),
+            request=request,
+        )
+
+    # ---------- clients / model -----------------------------------------
+    def client(self) -> httpx.Client:
+        return httpx.Client(transport=_Transport(self), timeout=self.pool.timeout)
+
+    def async_client(self, *_key) -> httpx.AsyncClient:
+        """Per event loop, like ModelPool.async_client (PooledOpenAIChat calls it)."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._async_clients:
+                self._async_clients[loop] = httpx.AsyncClient(
+                    transport=_AsyncTransport(self), timeout=self.pool.timeout
+                )
+            return self._async_clients[loop]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            k = dict(self.counters)
+            reasons, recent = dict(self.reasons), list(self.recent)
+        calls = max(k["calls"], 1)
+        return {
+            "cheap": self.policy.cheap,
+            "strong": self.policy.strong,
+            "enabled": self.policy.enabled,
+            "calls": k["calls"],
+            "escalation_rate": round(k["escalated"] / calls, 3),
+            **{n: k[n] for n in ("cheap_ok", "escalated", "direct")},
+            "reasons": reasons,
+            "cost_usd": round(k["cost"], 6),
+            "cost_all_strong_usd": round(k["cost_all_strong"], 6),
+            "saved_usd": round(k["cost_all_strong"] - k["cost"], 6),
+            "escalation_cost_usd": round(k["escalation_cost"], 6),
+            "escalation_added_ms": round(1000 * k["escalation_s"], 1),
+            "recent_escalations": recent,
+        }
+
+
+class _Transport(httpx.BaseTransport):
+    def __init__(self, cascade: Cascade):
+        self.cascade = cascade
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self.cascade.handle(request)
+
+
+class _AsyncTransport(httpx.AsyncBaseTransport):
+    def __init__(self, cascade: Cascade):
+        self.cascade = cascade
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.cascade.ahandle(request)
+
+
+CASCADES: Dict[str, Cascade] = {}
+
+
+def cascade_chat(
+    name: str,
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None,
+    pool: ModelPool = POOL,
+    **policy,
+):
+    """OpenAIChat for agent `name` that answers through a Cascade."""
+    c = Cascade(name, policy_for(name, **policy), pool, api_key, base_url)
+    CASCADES[name] = c
+    return _pooled_chat_class()(
+        c.policy.strong,
+        api_key=api_key,
+        base_url=base_url,
+        http_client=c.client(),
+        pool=c,  # get_async_client() → c.async_client()
+    )
+
+
+def cascade_stats() -> Dict[str, Any]:
+    per_agent = {name: c.stats() for name, c in CASCADES.items()}
+    spent = sum(s["cost_usd"] for s in per_agent.values())
+    strong = sum(s["cost_all_strong_usd"] for s in per_agent.values())
+    return {
+        "cost_usd": round(spent, 6),
+        "cost_all_strong_usd": round(strong, 6),
+        "saved_usd": round(strong - spent, 6),
+        "agents": per_agent,
+    }
@@ -0,0 +1,302 @@
+# agency_kit/cassette.py
+# ======================================================================
+# Record / replay cassettes for model and tool calls
+#  • model calls: an OpenAI-compatible proxy (StubOpenAI) that stacks reach
+#    through OPENAI_BASE_URL – record forwards upstream, replay answers
+#    from the cassette; streamed requests are replayed as SSE chunks
+#  • tool calls: agno tool hooks (delegation / reasoning tools pass
+#    through, so replays still exercise the whole team tree)
+#  • requests are keyed by a hash of their content (timestamps masked);
+#    identical requests replay in recorded order
+#  • one gzip JSON file: the call sequence (kind, name, key, ms, blob) plus
+#    responses stored once per content hash
+#  • replay timing: recorded ms × time_scale (1 = original, 0 = no waits);
+#    every replayed call is checked against the recorded sequence –
+#    misses and order changes are counted, the first divergence kept
+#
+#   CASSETTE=bluerail.cassette.gz CASSETTE_MODE=record python consulting_ai_agency.py
+# ======================================================================
+
+import asyncio, atexit, gzip, hashlib, json, logging, os, re, threading, time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+from agency_kit.hooks import add_tool_hooks
+from agency_kit.stub_openai import StubOpenAI
+
+log = logging.getLogger("agency.cassette")
+
+# run locally even on replay: delegation re-enters the team tree
+PASS_THROUGH = {
+    "transfer_task_to_member",
+    "forward_task_to_member",
+    "run_member_agents",
+    "delegate_in_parallel",
+    "get_member_information",
+    "think",
+    "analyze",
+}
+# request fields that decide the answer (stream / stream_options don't)
+REQUEST_FIELDS = ("model", "messages", "tools", "tool_choice", "response_format")
+_CLOCK = re.compile(r"\d{4}-\d\d-\d\d[ T]\d\d:\d\d:\d\d(?:\.\d+)?")
+
+
+def _hash(value: Any) -> str:
+    data = json.dumps(value, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.blake2b(
+        _CLOCK.sub("<now>", data).encode(), digest_size=10
+    ).hexdigest()
+
+
+class Cassette:
+    """Ordered calls + content-addressed responses, in record or replay mode."""
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = "replay",
+        time_scale: float = 1.0,
+        upstream: Optional[str] = None,
+        api_key: Optional[str] = None,
+        strict: bool = True,
+    ):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"mode must be record or replay, not {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.time_scale = time_scale
+        self.upstream = upstream or "https://api.openai.com/v1"
+        self.api_key = api_key
+        self.strict = strict
+        self.calls: List[Tuple[str, str, str, float, str]] = []
+        self.blobs: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._queues: Dict[Tuple[str, str], Deque[int]] = defaultdict(deque)
+        self._position = 0
+        self.counters = dict.fromkeys(
+            "recorded replayed misses order_changes live".split(), 0
+        )
+        self.first_divergence: Optional[Dict[str, Any]] = None
+        self._client: Optional[httpx.Client] = None
+        self._server: Optional[StubOpenAI] = None
+        if mode == "replay":
+            self.load()
+
+    # ---------- file ---------------------------------------------------
+    def load(self) -> "Cassette":
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        self.calls = [tuple(c) for c in data["calls"]]
+        self.blobs = data["blobs"]
+        for i, (kind, _, key, _, _) in enumerate(self.calls):
+            self._queues[kind, key].append(i)
+        return self
+
+    def save(self) -> None:
+        if self.mode != "record":
+            return
+        with self._lock:
+            data = {"version": 1, "calls": list(self.calls), "blobs": dict(self.blobs)}
+        tmp = f"{self.path}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    # ---------- core ---------------------------------------------------
+    def _record(self, kind: str, name: str, key: str, ms: float, out: Any) -> None:
+        blob = _hash(out)
+        with self._lock:
+            self.blobs.setdefault(blob, out)
+            self.calls.append((kind, name, key, round(ms, 1), blob))
+            self.counters["recorded"] += 1
+
+    def _take(self, kind: str, name: str, key: str) -> Optional[Tuple[Any, float]]:
+        """Next recorded answer for this request; checks the call order."""
+        with self._lock:
+            pos = self._position
+            self._position += 1
+            expected = self.calls[pos] if pos < len(self.calls) else None
+            if expected is None or expected[2] != key:
+                self.counters["order_changes"] += 1
+                if self.first_divergence is None:
+                    self.first_divergence = {
+                        "position": pos,
+                        "expected": expected[:3] if expected else None,
+                        "got": (kind, name, key),
+                    }
+            queue = self._queues.get((kind, key))
+            if not queue:
+                self.counters["misses"] += 1
+                return None
+            _, _, _, ms, blob = self.calls[queue.popleft()]
+            self.counters["replayed"] += 1
+            return self.blobs[blob], ms
+
+    def _wait(self, ms: float) -> None:
+        if self.time_scale > 0 and ms > 0:
+            time.sleep(ms * self.time_scale / 1000)
+
+    # ---------- model calls -------------------------------------------
+    def _upstream(self, request: dict) -> dict:
+        if self._client is None:
+            headers = (
+                {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+            )
+            self._client = httpx.Client(
+                base_url=self.upstream, headers=headers, timeout=120
+            )
+        r = self._client.post("/chat/completions", json=request)
+        r.raise_for_status()
+        return r.json()
+
+    def model_reply(self, body: dict) -> dict:
+        """StubOpenAI reply: the completion for `body` (never streamed)."""
+        request = {
+            k: v for k, v in body.items() if k not in ("stream", "stream_options")
+        }
+        key = _hash({k: request.get(k) for k in REQUEST_FIELDS})
+        model = str(request.get("model", ""))
+        if self.mode == "replay":
+            hit = self._take("model", model, key)
+            if hit is not None:
+                self._wait(hit[1])
+                return hit[0]
+            if self.strict:
+                raise LookupError(f"no recorded {model} call for request {key}")
+            with self._lock:
+                self.counters["live"] += 1
+            return self._upstream(request)
+        t0 = time.perf_counter()
+        out = self._upstream(request)
+        self._record("model", model, key, 1000 * (time.perf_counter() - t0), out)
+        return out
+
+    def serve(self) -> StubOpenAI:
+        """Start the proxy; its base_url goes into OPENAI_BASE_URL."""
+        if self._server is None:
+            self._server = StubOpenAI(reply=self.model_reply).start()
+        return self._server
+
+    # ---------- tool calls ----------------------------------------------
+    def tool_hook(self, function_name: str, function_call, arguments: Dict[str, Any]):
+        if function_name in PASS_THROUGH:
+            return function_call(**arguments)
+        key = _hash([function_name, arguments])
+        if self.mode == "replay":
+            hit = self._take("tool", function_name, key)
+            if hit is not None:
+                self._wait(hit[1])
+                return hit[0]
+            if self.strict:
+                raise LookupError(f"no recorded {function_name} call for {key}")
+            with self._lock:
+                self.counters["live"] += 1
+            return function_call(**arguments)
+        t0 = time.perf_counter()
+        result = function_call(**arguments)
+        if isinstance(result, (str, int, float, bool, list, dict, type(None))):
+            self._record(
+                "tool", function_name, key, 1000 * (time.perf_counter() - t0), result
+            )
+        return result
+
+    async def atool_hook(
+        self, function_name: str, function_call, arguments: Dict[str, Any]
+    ):
+        if function_name in PASS_THROUGH:
+            return await function_call(**arguments)
+        key = _hash([function_name, arguments])
+        if self.mode == "replay":
+            hit = self._take("tool", function_name, key)
+            if hit is not None:
+                if self.time_scale > 0:
+                    await asyncio.sleep(hit[1] * self.time_scale / 1000)
+                return hit[0]
+            if self.strict:
+                raise LookupError(f"no recorded {function_name} call for {key}")
+            with self._lock:
+                self.counters["live"] += 1
+            return await function_call(**arguments)
+        t0 = time.perf_counter()
+        result = await function_call(**arguments)
+        if isinstance(result, (str, int, float, bool, list, dict, type(None))):
+            self._record(
+                "tool", function_name, key, 1000 * (time.perf_counter() - t0), result
+            )
+        return result
+
+    # ---------- report ---------------------------------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            c = dict(self.counters)
+            unplayed = sum(len(q) for q in self._queues.values())
+            return {
+                "path": self.path,
+                "mode": self.mode,
+                "time_scale": self.time_scale,
+                "calls": len(self.calls),
+                "unique_responses": len(self.blobs),
+                "recorded_ms": round(sum(c[3] for c in self.calls), 1),
+                **c,
+                "unplayed": unplayed if self.mode == "replay" else 0,
+                "first_divergence": self.first_divergence,
+            }
+
+
+def instrument(obj, cassette: Cassette):
+    """Record / replay obj's tool calls (idempotent)."""
+    if getattr(obj, "_cassette", None) is cassette:
+        return obj
+    object.__setattr__(obj, "_cassette", cassette)
+    return add_tool_hooks(obj, cassette.tool_hook, cassette.atool_hook)
+
+
+def instrument_tree(root, cassette: Cassette):
+    """instrument() a team and every member below it."""
+    instrument(root, cassette)
+    for member in getattr(root, "members", None) or []:
+        instrument_tree(member, cassette)
+    return root
+
+
+def recorded(factory, cassette: Cassette):
+    """Factory wrapper: recorded(Agent, cassette)(...) builds, then instruments."""
+
+    def build(*args, **kwargs):
+        return instrument(factory(*args, **kwargs), cassette)
+
+    return build
+
+
+CASSETTES: Dict[str, Cassette] = {}
+
+
+def use(
+    path: Optional[str], mode: Optional[str] = None, time_scale: float = 1.0
+) -> Optional[Cassette]:
+    """Process-wide cassette: proxy started, OPENAI_BASE_URL pointed at it.
+
+    Call before any model client is built. mode defaults to replay when the
+    file exists, else record; recordings are saved at exit.
+    """
+    if not path:
+        return None
+    mode = mode or ("replay" if os.path.exists(path) else "record")
+    cassette = Cassette(
+        path,
+        mode,
+        time_scale,
+        upstream=os.getenv("OPENAI_BASE_URL"),
+        api_key=os.getenv("OPENAI_API_KEY"),
+    )
+    os.environ["OPENAI_BASE_URL"] = cassette.serve().base_url
+    atexit.register(cassette.save)
+    CASSETTES[path] = cassette
+    log.info("cassette %s: %s via %s", path, mode, os.environ["OPENAI_BASE_URL"])
+    return cassette
+
+
+def cassette_stats() -> Dict[str, Dict[str, Any]]:
+    return {path: c.stats() for path, c in CASSETTES.items()}
@@ -0,0 +1,304 @@
+# agency_kit/context.py
+# ======================================================================
+# Token-budgeted context assembly for agent / team prompts
+#  • wraps get_run_messages(): once agno has built the system message and
+#    history, the prompt is cut into pieces and re-assembled ≤ budget
+#      required : description, role, instructions, expected output, team /
+#                 transfer blocks, the user message, tool schemas
+#      ranked   : tool instructions (<reasoning_instructions> …), additional
+#                 information / context paragraphs, vector-memory hits
+#                 (recall=), history turns
+#  • score = relevance (hashing-embedding cosine to the user message),
+#    history turns also decay with age; greedy by (score, position)
+#  • kept pieces go back in their original order → same inputs, same prompt
+#  • every drop is recorded (kind, tokens, score) – context_stats()
+# ======================================================================
+
+import json, re, threading, time
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agency_kit.embedding import HashingEmbedder, cosine
+from agency_kit.hooks import wrap_method
+from agency_kit.tokens import count_tokens
+
+# system-message blocks that may be dropped; every other block is required
+RANKED_TAGS = {
+    "additional_information",
+    "additional_context",
+    "reasoning_instructions",
+    "memories_from_previous_interactions",
+    "summary_of_previous_interactions",
+}
+HISTORY_WEIGHT = 0.5  # history score = w·recency + (1-w)·relevance
+HISTORY_HALF_LIFE = 2  # turns
+RELEVANCE_CHARS = 1500  # relevance is judged on the head of a piece
+_BLOCK = re.compile(r"<([a-z_]+)>.*?</\1>", re.S)
+_EMBED = HashingEmbedder()
+
+
+# system blocks and history turns repeat call after call: score them once
+@lru_cache(maxsize=4096)
+def _vector(text: str) -> Tuple[float, ...]:
+    return tuple(_EMBED(text[:RELEVANCE_CHARS]))
+
+
+@lru_cache(maxsize=8192)
+def _tokens(text: str) -> int:
+    return count_tokens(text)
+
+
+@dataclass
+class Piece:
+    kind: str
+    text: str
+    order: int
+    required: bool = False
+    score: float = 0.0
+    tokens: int = 0
+    messages: List[Any] = field(default_factory=list)  # history turn
+
+
+@dataclass
+class Assembly:
+    system: str
+    kept: List[Piece]
+    dropped: List[Piece]
+    tokens: int
+    candidate_tokens: int
+
+
+def split_system(content: str, description: Optional[str] = None) -> List[Piece]:
+    """Tagged blocks + untagged paragraphs, in prompt order."""
+    pieces, pos = [], 0
+
+    def loose(text: str) -> None:
+        for para in re.split(r"\n\s*\n", text):
+            if para.strip():
+                required = bool(description) and para.strip() == description.strip()
+                pieces.append(Piece("text", para.strip(), len(pieces), required))
+
+    for m in _BLOCK.finditer(content):
+        loose(content[pos : m.start()])
+        tag = m.group(1)
+        pieces.append(Piece(tag, m.group(0), len(pieces), tag not in RANKED_TAGS))
+        pos = m.end()
+    loose(content[pos:])
+    return pieces
+
+
+def history_turns(messages: List[Any]) -> List[List[Any]]:
+    """from_history messages grouped into turns (a user message starts one)."""
+    turns: List[List[Any]] = []
+    for m in messages:
+        if not getattr(m, "from_history", False):
+            continue
+        if m.role == "user" or not turns:
+            turns.append([])
+        turns[-1].append(m)
+    return turns
+
+
+def _content(message: Any) -> str:
+    content = getattr(message, "content", None)
+    if content is None:
+        calls = getattr(message, "tool_calls", None)
+        return json.dumps(calls, default=str) if calls else ""
+    return content if isinstance(content, str) else json.dumps(content, default=str)
+
+
+def _hits(recall: Optional[Callable], query: str) -> List[Tuple[str, float]]:
+    if recall is None or not query:
+        return []
+    out = []
+    for hit in recall(query) or []:
+        if isinstance(hit, dict):
+            out.append((str(hit.get("text", "")), float(hit.get("score", 0.0))))
+        elif isinstance(hit, (tuple, list)):
+            out.append((str(hit[0]), float(hit[1])))
+        else:
+            out.append((str(hit), 0.0))
+    return [(t, s) for t, s in out if t]
+
+
+class ContextAssembler:
+    """Per-agent budget + counters; assemble() is pure given its inputs."""
+
+    def __init__(self, name: str, budget: int, recall: Optional[Callable] = None):
+        self.name = name
+        self.budget = budget
+        self.recall = recall
+        self._lock = threading.Lock()
+        self.counters = {
+            "calls": 0,
+            "candidate_tokens": 0,
+            "prompt_tokens": 0,
+            "dropped_pieces": 0,
+            "dropped_tokens": 0,
+            "over_budget": 0,
+            "assembly_ms": 0.0,
+        }
+        self.recent_drops: deque = deque(maxlen=20)
+
+    def assemble(
+        self,
+        system: str,
+        query: str,
+        history: List[List[Any]],
+        fixed_tokens: int = 0,
+        description: Optional[str] = None,
+    ) -> Assembly:
+        pieces = split_system(system, description)
+        for text, score in _hits(self.recall, query):
+            pieces.append(Piece("memory", text, len(pieces), score=score))
+        for age, turn in enumerate(reversed(history)):
+            text = "\n".join(_content(m) for m in turn)
+            recency = 0.5 ** (age / HISTORY_HALF_LIFE)
+            # the most recent turn carries the thread: never dropped
+            pieces.append(
+                Piece("history", text, -1 - age, age == 0, recency, messages=turn)
+            )
+        q = _vector(query) if query else None
+        for p in pieces:
+            p.tokens = _tokens(p.text)
+            if p.required or q is None or p.kind == "memory":
+                continue
+            relevance = max(cosine(q, _vector(p.text)), 0.0)
+            if p.kind == "history":
+                p.score = HISTORY_WEIGHT * p.score + (1 - HISTORY_WEIGHT) * relevance
+            else:
+                p.score = relevance
+
+        spent = fixed_tokens + sum(p.tokens for p in pieces if p.required)
+        kept = [p for p in pieces if p.required]
+        dropped = []
+        for p in sorted(
+            (p for p in pieces if not p.required), key=lambda p: (-p.score, p.order)
+        ):
+            if spent + p.tokens <= self.budget:
+                kept.append(p)
+                spent += p.tokens
+            else:
+                dropped.append(p)
+
+        in_system = sorted(
+            (p for p in kept if p.kind not in ("history", "memory")),
+            key=lambda p: p.order,
+        )
+        text = "\n\n".join(p.text for p in in_system)
+        memories = sorted(
+            (p for p in kept if p.kind == "memory"), key=lambda p: p.order
+        )
+        if memories:
+            text += "\n\n<relevant_memories>\n"
+            text += "\n".join(f"- {p.text}" for p in memories)
+            text += "\n</relevant_memories>"
+        return Assembly(
+            text,
+            kept,
+            dropped,
+            spent,
+            fixed_tokens + sum(p.tokens for p in pieces),
+        )
+
+    def apply(self, obj: Any, run_messages: Any) -> Assembly:
+        """Trim a RunMessages in place (system content + history messages)."""
+        t0 = time.perf_counter()
+        system = run_messages.system_message
+        user = run_messages.user_message
+        query = _content(user) if user is not None else ""
+        history = history_turns(run_messages.messages)
+        schemas = getattr(obj, "_tools_for_model", None)
+        fixed = count_tokens(query) + (
+            count_tokens(json.dumps(schemas, default=str)) if schemas else 0
+        )
+        result = self.assemble(
+            (
+                system.content
+                if system is not None and isinstance(system.content, str)
+                else ""
+            ),
+            query,
+            history,
+            fixed,
+            getattr(obj, "description", None),
+        )
+        if system is not None and isinstance(system.content, str):
+            system.content = result.system
+        gone = {
+            id(m) for p in result.dropped if p.kind == "history" for m in p.messages
+        }
+        if gone:
+            run_messages.messages[:] = [
+                m for m in run_messages.messages if id(m) not in gone
+            ]
+        self._record(result, time.perf_counter() - t0)
+        return result
+
+    def _record(self, result: Assembly, seconds: float) -> None:
+        with self._lock:
+            c = self.counters
+            c["calls"] += 1
+            c["candidate_tokens"] += result.candidate_tokens
+            c["prompt_tokens"] += result.tokens
+            c["dropped_pieces"] += len(result.dropped)
+            c["dropped_tokens"] += sum(p.tokens for p in result.dropped)
+            c["over_budget"] += result.tokens > self.budget
+            c["assembly_ms"] += seconds * 1000
+            for p in result.dropped:
+                self.recent_drops.append(
+                    {
+                        "kind": p.kind,
+                        "tokens": p.tokens,
+                        "score": round(p.score, 3),
+                        "preview": p.text[:80],
+                    }
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            c = dict(self.counters)
+            drops = list(self.recent_drops)
+        calls = max(c["calls"], 1)
+        return {
+            "budget": self.budget,
+            **c,
+            "assembly_ms": round(c["assembly_ms"], 2),
+            "avg_prompt_tokens": round(c["prompt_tokens"] / calls, 1),
+            "avg_candidate_tokens": round(c["candidate_tokens"] / calls, 1),
+            "recent_drops": drops,
+        }
+
+
+ASSEMBLERS: Dict[str, ContextAssembler] = {}
+
+
+def attach_context_budget(obj, budget: int, recall: Optional[Callable] = None):
+    """Run every get_run_messages() result through a ContextAssembler."""
+    assembler = ContextAssembler(obj.name, budget, recall)
+    ASSEMBLERS[obj.name] = assembler
+
+    def make(get_run_messages):
+        def budgeted_run_messages(*args, **kwargs):
+            run_messages = get_run_messages(*args, **kwargs)
+            assembler.apply(obj, run_messages)
+            return run_messages
+
+        return budgeted_run_messages
+
+    return wrap_method(obj, "get_run_messages", make)
+
+
+def budgeted(factory, budget: int, recall: Optional[Callable] = None):
+    """Factory wrapper: budgeted(Agent, 6000)(...) builds, then attaches."""
+
+    def build(*args, **kwargs):
+        return attach_context_budget(factory(*args, **kwargs), budget, recall)
+
+    return build
+
+
+def context_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: a.stats() for name, a in ASSEMBLERS.items()}
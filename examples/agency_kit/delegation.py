@@ -0,0 +1,165 @@
+# agency_kit/delegation.py
+# ======================================================================
+# Parallel delegation for coordinate-mode Teams
+#  • gives the coordinator one tool: delegate_in_parallel([{member, task}])
+#  • independent member tasks run concurrently (bounded thread pool)
+#  • arun()/atool: same fan-out on the event loop via member.arun()
+#  • results come back in the order the tasks were given, never by finish time
+#  • run()/arun() report each task's seconds; the tool's JSON leaves them
+#    out, so the coordinator's prompt doesn't change with timing
+#  • two tasks for the same member queue on that member (agno runs keep
+#    per-instance state), different members overlap
+# ======================================================================
+
+import asyncio, contextvars, json, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Sequence
+
+PARALLEL_HINT = (
+    "When sub-tasks for different members don't depend on each other, send them "
+    "together in ONE delegate_in_parallel call; delegate dependent steps afterwards."
+)
+
+
+def _content(result: Any) -> str:
+    content = getattr(result, "content", result)
+    if isinstance(content, str):
+        return content
+    return json.dumps(content, default=str)
+
+
+def _for_model(results: List[Dict[str, Any]]) -> str:
+    return json.dumps(
+        [{k: v for k, v in r.items() if k != "seconds"} for r in results],
+        ensure_ascii=False,
+    )
+
+
+class ParallelDelegation:
+    """Concurrent fan-out over a team's members, keyed by member name."""
+
+    def __init__(self, members: Sequence[Any], max_concurrency: int = 4):
+        self.members = {m.name: m for m in members}
+        self._busy = {name: threading.Lock() for name in self.members}
+        self._abusy: Dict[str, asyncio.Lock] = {}
+        self.max_concurrency = max(1, max_concurrency)
+
+    def _unknown(self, member_name: str) -> Dict[str, Any]:
+        return {
+            "member": member_name,
+            "ok": False,
+            "error": f"unknown member; choose from {sorted(self.members)}",
+            "seconds": 0.0,
+        }
+
+    @staticmethod
+    def _result(member_name: str, t0: float, out=None, error=None) -> Dict[str, Any]:
+        seconds = round(time.perf_counter() - t0, 3)
+        if error is not None:
+            return {
+                "member": member_name,
+                "ok": False,
+                "error": f"{type(error).__name__}: {error}",
+                "seconds": seconds,
+            }
+        return {
+            "member": member_name,
+            "ok": True,
+            "content": _content(out),
+            "seconds": seconds,
+        }
+
+    def _run_one(self, member_name: str, task: str) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        member = self.members.get(member_name)
+        if member is None:
+            return self._unknown(member_name)
+        try:
+            with self._busy[member_name]:
+                out = member.run(task, stream=False)
+            return self._result(member_name, t0, out)
+        except Exception as e:  # one failed branch must not sink the others
+            return self._result(member_name, t0, error=e)
+
+    async def _arun_one(
+        self, member_name: str, task: str, slots: asyncio.Semaphore
+    ) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        member = self.members.get(member_name)
+        if member is None:
+            return self._unknown(member_name)
+        busy = self._abusy.setdefault(member_name, asyncio.Lock())
+        try:
+            async with slots, busy:
+                out = await member.arun(task, stream=False)
+            return self._result(member_name, t0, out)
+        except Exception as e:
+            return self._result(member_name, t0, error=e)
+
+    def run(self, tasks: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """Run every {member, task}; output index i belongs to tasks[i]."""
+        if not tasks:
+            return []
+        workers = min(self.max_concurrency, len(tasks))
+        with ThreadPoolExecutor(workers, thread_name_prefix="delegate") as ex:
+            futures = [
+                ex.submit(
+                    contextvars.copy_context().run,
+                    self._run_one,
+                    t.get("member", ""),
+                    t.get("task", ""),
+                )
+                for t in tasks
+            ]
+            return [f.result() for f in futures]
+
+    async def arun(self, tasks: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """Async run(): no threads, members awaited via arun()."""
+        slots = asyncio.Semaphore(self.max_concurrency)
+        return list(
+            await asyncio.gather(
+                *(
+                    self._arun_one(t.get("member", ""), t.get("task", ""), slots)
+                    for t in tasks
+                )
+            )
+        )
+
+    @property
+    def tool(self):
+        delegation = self
+
+        def delegate_in_parallel(tasks: List[Dict[str, str]]) -> str:
+            """Send independent tasks to several team members at the same time.
+
+            Args:
+                tasks: list of {"member": <member name>, "task": <full task text>}.
+                    Only include tasks that don't need another member's output.
+
+            Returns:
+                JSON list of {"member", "ok", "content" | "error"} in the same
+                order as `tasks`.
+            """
+            return _for_model(delegation.run(tasks))
+
+        return delegate_in_parallel
+
+    @property
+    def atool(self):
+        """Coroutine version of `tool` for coordinators only driven via arun()."""
+        delegation = self
+
+        async def delegate_in_parallel(tasks: List[Dict[str, str]]) -> str:
+            """Send independent tasks to several team members at the same time.
+
+            Args:
+                tasks: list of {"member": <member name>, "task": <full task text>}.
+                    Only include tasks that don't need another member's output.
+
+            Returns:
+                JSON list of {"member", "ok", "content" | "error"} in the same
+                order as `tasks`.
+            """
+            return _for_model(await delegation.arun(tasks))
+
+        return delegate_in_parallel
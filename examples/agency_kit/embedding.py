@@ -0,0 +1,49 @@
+# agency_kit/embedding.py
+# ======================================================================
+# Tiny local text embedder (no model download, no network)
+#  • signed feature hashing of word unigrams + char trigrams
+#  • deterministic across processes (crc32, not hash())
+#  • good enough for routing / memory recall over short texts
+# ======================================================================
+
+import math, re, zlib
+from typing import List
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+
+def words(text: str) -> List[str]:
+    """Lower-cased word tokens with a naive plural strip ("leads" → "lead")."""
+    out = []
+    for w in _WORD.findall(text.lower()):
+        if len(w) > 3 and w.endswith("s") and not w.endswith("ss"):
+            w = w[:-1]
+        out.append(w)
+    return out
+
+
+class HashingEmbedder:
+    """text → L2-normalised dense vector of length `dim`."""
+
+    def __init__(self, dim: int = 256, trigram_weight: float = 0.5):
+        self.dim = dim
+        self.trigram_weight = trigram_weight
+
+    def _add(self, vec: List[float], feature: str, weight: float) -> None:
+        h = zlib.crc32(feature.encode())
+        vec[h % self.dim] += weight if (h >> 31) & 1 else -weight
+
+    def __call__(self, text: str) -> List[float]:
+        vec = [0.0] * self.dim
+        for w in words(text):
+            self._add(vec, "w:" + w, 1.0)
+            padded = f"^{w}$"
+            for i in range(len(padded) - 2):
+                self._add(vec, "c:" + padded[i : i + 3], self.trigram_weight)
+        norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+        return [x / norm for x in vec]
+
+
+def cosine(a: List[float], b: List[float]) -> float:
+    """Dot product – inputs from HashingEmbedder are already unit length."""
+    return sum(x * y for x, y in zip(a, b))
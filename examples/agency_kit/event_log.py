@@ -0,0 +1,327 @@
+# agency_kit/event_log.py
+# ======================================================================
+# Segmented append-only event log (drop-in for FileMemory(path=...))
+#  • records are JSON lines in seg-NNNNNN.log, rotated at `segment_bytes`
+#  • sparse index seg-NNNNNN.idx: one "offset length session" line per
+#    session per commit batch (a session's records in a batch are adjacent)
+#  • group commit: appenders queue records, one writer thread per process
+#    writes everything queued during the previous commit (+ optional
+#    `group_ms` linger) with one fsync, under an flock → safe across
+#    threads and processes
+#  • read(session) = index lookup + pread of just those byte ranges; other
+#    processes' appends are picked up by tailing the .idx files
+#  • a torn write (crash mid-batch) is never indexed, so it is skipped
+#  • prune(max_age_s, max_bytes) drops whole segments, oldest first
+#  • event_memory(path, flat_cls): EVENT_BACKEND=log (default) | file
+# ======================================================================
+
+import fcntl, json, logging, os, queue, re, threading, time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+log = logging.getLogger("agency.event_log")
+
+_SEG = re.compile(r"seg-(\d{6})\.log$")
+_STOP = object()
+
+
+class _Pending:
+    __slots__ = ("records", "done", "error")
+
+    def __init__(self, records: List[Tuple[str, Any, float]]):
+        self.records = records
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+
+class EventLog:
+    """Per-session event history in size-rotated, indexed segment files."""
+
+    def __init__(
+        self,
+        path: str,
+        segment_bytes: int = 16 * 2**20,
+        group_ms: float = 0.0,
+        max_batch: int = 1024,
+        fsync: bool = True,
+    ):
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.group_s = group_ms / 1000
+        self.max_batch = max_batch
+        self.fsync = fsync
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()  # index + read fds
+        self._index: Dict[str, List[Tuple[int, int, int]]] = {}
+        self._idx_pos: Dict[int, int] = {}
+        self._fds: Dict[int, int] = {}
+        self._queue: "queue.Queue" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._pid = 0
+        self._lock_fd: Optional[int] = None
+        self._wseg: Optional[int] = None
+        self._wfds: Tuple[int, ...] = ()
+        self.counters = {"events": 0, "batches": 0, "fsyncs": 0, "pruned_segments": 0}
+
+    # ---------- files --------------------------------------------------
+    def _file(self, seg: int, ext: str) -> str:
+        return os.path.join(self.path, f"seg-{seg:06d}.{ext}")
+
+    def _segments(self) -> List[int]:
+        return sorted(
+            int(m.group(1)) for m in map(_SEG.match, os.listdir(self.path)) if m
+        )
+
+    # ---------- append -------------------------------------------------
+    def append(self, session: str, event: Any, wait: bool = True) -> None:
+        self.append_many([(session, event)], wait)
+
+    def append_many(self, records: Iterable[Tuple[str, Any]], wait: bool = True):
+        """Queue records for the next commit; wait=True blocks until durable."""
+        pending = _Pending([(s, e, time.time()) for s, e in records])
+        self._ensure_writer()
+        self._queue.put(pending)
+        if wait:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+
+    def _ensure_writer(self) -> None:
+        if self._writer is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._writer is None or self._pid != os.getpid():
+                self._pid = os.getpid()  # fork: the parent's thread is gone
+                self._queue = queue.Queue()
+                # an inherited flock fd would share the parent's lock
+                self._lock_fd, self._wseg, self._wfds = None, None, ()
+                self._writer = threading.Thread(
+                    target=self._write_loop, name="event-log", daemon=True
+                )
+                self._writer.start()
+
+    def _write_loop(self) -> None:
+        q = self._queue
+        while True:
+            first = q.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            n = len(first.records)
+            deadline = time.monotonic() + self.group_s
+            while n < self.max_batch:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = q.get(timeout=timeout) if timeout > 0 else q.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    q.put(_STOP)
+                    break
+                batch.append(item)
+                n += len(item.records)
+            try:
+                self._commit([r for p in batch for r in p.records])
+            except BaseException as e:  # surface to every waiting appender
+                log.exception("event log commit failed")
+                for p in batch:
+                    p.error = e
+            for p in batch:
+                p.done.set()
+
+    def _commit(self, records: List[Tuple[str, Any, float]]) -> None:
+        # group by session so each session gets one contiguous byte range
+        by_session: Dict[str, List[bytes]] = {}
+        for session, event, ts in records:
+            line = json.dumps({"s": session, "t": ts, "e": event}, default=str)
+            by_session.setdefault(session, []).append(line.encode() + b"\n")
+        blobs = [(s, b"".join(lines)) for s, lines in by_session.items()]
+        if self._lock_fd is None:
+            self._lock_fd = os.open(
+                os.path.join(self.path, "LOCK"), os.O_RDWR | os.O_CREAT
+            )
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            data_fd, idx_fd = self._active()
+            offset = os.fstat(data_fd).st_size  # torn tail of a crash: skip it
+            entries = []
+            for session, blob in blobs:
+                entries.append(f"{offset} {len(blob)} {json.dumps(session)}\n")
+                offset += len(blob)
+            os.write(data_fd, b"".join(blob for _, blob in blobs))
+            if self.fsync:
+                os.fsync(data_fd)
+            os.write(idx_fd, "".join(entries).encode())
+            if self.fsync:
+                os.fsync(idx_fd)
+                self.counters["fsyncs"] += 2
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+        self.counters["events"] += len(records)
+        self.counters["batches"] += 1
+
+    def _active(self) -> Tuple[int, int]:
+        """(data fd, idx fd) of the newest segment; rotates when it is full.
+
+        Called under the flock, so the listdir only happens when this
+        process or another one has moved to a new segment.
+        """
+        seg = self._wseg
+        if seg is not None:
+            full = os.fstat(self._wfds[0]).st_size >= self.segment_bytes
+            if full or os.path.exists(self._file(seg + 1, "log")):
+                for fd in self._wfds:
+                    os.close(fd)
+                seg = None
+        if seg is None:
+            segs = self._segments()
+            seg = segs[-1] if segs else 1
+            name = self._file(seg, "log")
+            if os.path.exists(name) and os.path.getsize(name) >= self.segment_bytes:
+                seg += 1
+            flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND
+            self._wfds = (
+                os.open(self._file(seg, "log"), flags),
+                os.open(self._file(seg, "idx"), flags),
+            )
+            self._wseg = seg
+        return self._wfds
+
+    # ---------- read ---------------------------------------------------
+    def _refresh(self) -> None:
+        """Tail every .idx file past what this process has already indexed."""
+        segs = self._segments()
+        gone = set(self._idx_pos) - set(segs)
+        if gone:  # pruned, possibly by another process
+            self._forget(gone)
+        for seg in segs:
+            name = self._file(seg, "idx")
+            pos = self._idx_pos.get(seg, 0)
+            try:
+                if os.path.getsize(name) <= pos:
+                    continue
+                with open(name, "rb") as f:
+                    f.seek(pos)
+                    chunk = f.read()
+            except FileNotFoundError:
+                continue
+            end = chunk.rfind(b"\n") + 1  # ignore a half-written last line
+            for line in chunk[:end].decode().splitlines():
+                offset, length, session = line.split(" ", 2)
+                self._index.setdefault(json.loads(session), []).append(
+                    (seg, int(offset), int(length))
+                )
+            self._idx_pos[seg] = pos + end
+
+    def _fd(self, seg: int) -> int:
+        fd = self._fds.get(seg)
+        if fd is None:
+            fd = self._fds[seg] = os.open(self._file(seg, "log"), os.O_RDONLY)
+        return fd
+
+    def _forget(self, segs) -> None:
+        for seg in segs:
+            self._idx_pos.pop(seg, None)
+            fd = self._fds.pop(seg, None)
+            if fd is not None:
+                os.close(fd)
+        for session in list(self._index):
+            kept = [r for r in self._index[session] if r[0] not in segs]
+            if kept:
+                self._index[session] = kept
+            else:
+                del self._index[session]
+
+    def read(
+        self, session: str, limit: Optional[int] = None, with_ts: bool = False
+    ) -> List[Any]:
+        """Events of `session`, oldest first (the last `limit` if given).
+
+        with_ts=True returns (append time, event) pairs.
+        """
+        with self._lock:
+            self._refresh()
+            ranges = list(self._index.get(session, ()))
+            if limit is not None:
+                # ranges hold ≥1 event each: the tail never needs more than limit
+                ranges = ranges[-limit:]
+            events = []
+            for seg, offset, length in ranges:
+                blob = os.pread(self._fd(seg), length, offset)
+                records = map(json.loads, blob.splitlines())
+                events.extend((r["t"], r["e"]) if with_ts else r["e"] for r in records)
+        return events[-limit:] if limit is not None else events
+
+    def sessions(self) -> List[str]:
+        with self._lock:
+            self._refresh()
+            return list(self._index)
+
+    # ---------- retention ----------------------------------------------
+    def prune(
+        self, max_age_s: Optional[float] = None, max_bytes: Optional[int] = None
+    ) -> int:
+        """Delete whole segments, oldest first, last written more than
+        `max_age_s` ago or beyond `max_bytes` in total. The newest segment
+        always stays. Returns the number of segments removed."""
+        # own fd: a second flock on the writer's fd would not exclude it
+        lock_fd = os.open(os.path.join(self.path, "LOCK"), os.O_RDWR | os.O_CREAT)
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+            segs = self._segments()
+            sizes = {s: os.path.getsize(self._file(s, "log")) for s in segs}
+            total, now, drop = sum(sizes.values()), time.time(), []
+            for seg in segs[:-1]:
+                old = max_age_s is not None and (
+                    now - os.path.getmtime(self._file(seg, "log")) > max_age_s
+                )
+                if not old and (max_bytes is None or total <= max_bytes):
+                    break
+                drop.append(seg)
+                total -= sizes[seg]
+            for seg in drop:
+                for ext in ("log", "idx"):
+                    try:
+                        os.remove(self._file(seg, ext))
+                    except FileNotFoundError:
+                        pass
+        finally:
+            os.close(lock_fd)
+        if drop:
+            with self._lock:
+                self._forget(set(drop))
+            self.counters["pruned_segments"] += len(drop)
+        return len(drop)
+
+    # ---------- lifecycle ----------------------------------------------
+    def close(self) -> None:
+        if self._writer is not None and self._pid == os.getpid():
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+            for fd in (*self._wfds, self._lock_fd):
+                if fd is not None:
+                    os.close(fd)
+            self._lock_fd, self._wseg, self._wfds = None, None, ()
+        with self._lock:
+            for fd in self._fds.values():
+                os.close(fd)
+            self._fds.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        segs = self._segments()
+        return {
+            **self.counters,
+            "events_per_batch": round(
+                self.counters["events"] / max(self.counters["batches"], 1), 1
+            ),
+            "segments": len(segs),
+            "disk_mb": round(
+                sum(os.path.getsize(self._file(s, "log")) for s in segs) / 2**20, 1
+            ),
+        }
+
+
+def event_memory(path: str, flat_cls: Any, backend: Optional[str] = None):
+    """EVENT_BACKEND=log → EventLog, file → flat_cls(path=path)."""
+    backend = (backend or os.getenv("EVENT_BACKEND", "log")).lower()
+    return EventLog(path) if backend == "log" else flat_cls(path=path)
@@ -0,0 +1,387 @@
+# agency_kit/fake_model.py
+# ======================================================================
+# Deterministic stand-in for OpenAI chat completions (offline benchmarks)
+#  • FakeModel(body) -> completion dict; seeded by seed + request hash, so
+#    the same request always gets the same answer, whatever the call order
+#    (timestamps in the prompt are masked first)
+#  • team leaders: reads the <team_members> block agno writes, picks
+#    members by keyword overlap with the task (seeded tie-break) and calls
+#    delegate_in_parallel / transfer_task_to_member / forward_task_to_member
+#    / run_member_agents – whichever the team exposes
+#  • agents with tools: one tool call per turn (a tool the instructions
+#    name first), arguments generated from the JSON schema
+#  • answers take the shape the instructions ask for: "Return JSON {a, b}",
+#    "[{…}]", "Add x & y" (input JSON echoed + keys), response_format
+#    json_schema; otherwise short seeded markdown
+#  • latency: lognormal time-to-first-token + tokens / tokens-per-second,
+#    per model, × time_scale (0 → no sleeping); script={regex: reply}
+#  • serve(): StubOpenAI answering with the fake (streaming included) –
+#    point OPENAI_BASE_URL at it and every OpenAIChat / POOL.chat follows
+# ======================================================================
+
+import hashlib, json, math, random, re, threading, time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Union
+
+from agency_kit.stub_openai import StubOpenAI
+
+REASONING = {"think", "analyze"}
+DELEGATION = (
+    "delegate_in_parallel",
+    "transfer_task_to_member",
+    "forward_task_to_member",
+    "run_member_agents",
+)
+VOCAB = (
+    "demand capacity risk margin pipeline forecast supplier cohort churn "
+    "latency backlog region segment baseline uplift channel budget signal "
+    "priority outage route schedule yield conversion retention inventory"
+).split()
+_MEMBER = re.compile(r"^( *)- (?:Team: (.*)|Agent \d+:)\s*$")
+_FIELD = re.compile(r"^ *- (ID|Name|Role): (.*)$")
+_KEYS = re.compile(r"(\[\s*)?\{([^{}\n]{1,300})\}")
+_ADD = re.compile(r"^[\s-]*Add ([a-z][a-z0-9_]*(?:\s*[,&]\s*[a-z][a-z0-9_]*)*)\s*$")
+_WORD = re.compile(r"[a-z]{3,}")
+# add_datetime_to_instructions: the clock must not change the seed
+_CLOCK = re.compile(r"\d{4}-\d\d-\d\d[ T]\d\d:\d\d:\d\d(?:\.\d+)?")
+
+
+@dataclass(frozen=True)
+class Latency:
+    ttft_s: float = 0.45  # median time to first token
+    sigma: float = 0.35  # lognormal spread of the ttft (0 → constant)
+    tokens_per_s: float = 90.0
+
+    def sample(self, rng: random.Random, tokens: int = 0) -> float:
+        ttft = self.ttft_s * math.exp(rng.gauss(0.0, self.sigma))
+        return ttft + (tokens / self.tokens_per_s if self.tokens_per_s else 0.0)
+
+
+LATENCY = {
+    "gpt-4o-mini": Latency(0.35, 0.35, 110.0),
+    "gpt-4o": Latency(0.6, 0.4, 70.0),
+}
+
+
+def _text(content: Any) -> str:
+    if content is None:
+        return ""
+    if isinstance(content, list):  # multi-part user message
+        return " ".join(p.get("text", "") for p in content if isinstance(p, dict))
+    return content if isinstance(content, str) else json.dumps(content)
+
+
+def _words(text: str) -> set:
+    return set(_WORD.findall(text.lower()))
+
+
+def team_members(system: str) -> List[Dict[str, str]]:
+    """Direct members (id, name, role) from agno's <team_members> block."""
+    if "<team_members>" not in system:
+        return []
+    block = system.split("<team_members>", 1)[1].split("</team_members>", 1)[0]
+    entries: List[Dict[str, Any]] = []
+    for line in block.splitlines():
+        m = _MEMBER.match(line)
+        if m:
+            entries.append({"indent": len(m.group(1)), "name": (m.group(2) or "")})
+        elif entries and (f := _FIELD.match(line)):
+            key = f.group(1).lower()
+            entries[-1][key] = entries[-1].get(key) or f.group(2).strip()
+    top = min((e["indent"] for e in entries), default=0)
+    return [e for e in entries if e["indent"] == top and e.get("id")]
+
+
+def answer_shape(system: str) -> Optional[tuple]:
+    """("add" | "object" | "list", keys) from the instructions, if any."""
+    for line in system.splitlines():
+        if m := _ADD.match(line):
+            return "add", [k.strip() for k in re.split(r"[,&]", m.group(1))]
+        if "{" in line and re.search(r"json|return|output", line, re.I):
+            if m := _KEYS.search(line):
+                keys = [
+                    re.sub(r"\W+", "_", k.strip(" '\"….")).strip("_")
+                    for k in m.group(2).split(",")
+                ]
+                keys = [k for k in keys if k]
+                if keys:
+                    return ("list" if m.group(1) else "object"), keys
+    return None
+
+
+def fake_value(key: str, rng: random.Random, schema: Optional[dict] = None) -> Any:
+    """A plausible value for `key`, by JSON-schema type, else by key name."""
+    schema = schema or {}
+    kind = schema.get("type")
+    if "enum" in schema:
+        return schema["enum"][0]
+    if kind == "array":
+        return [fake_value(key, rng, schema.get("items"))]
+    if kind == "object" and schema.get("properties"):
+        return {k: fake_value(k, rng, s) for k, s in schema["properties"].items()}
+    if kind == "boolean":
+        return True
+    k = key.lower()
+    if kind == "integer" or (kind is None and re.search(r"count|rows|sent|_hr$", k)):
+        return rng.randint(1, 20)
+    if k in ("lat", "latitude"):
+        return round(rng.uniform(51.3, 51.7), 4)
+    if k in ("lon", "lng", "longitude"):
+        return round(rng.uniform(-0.4, 0.2), 4)
+    if kind == "number" or re.search(r"score|prob|risk|delay|eta", k):
+        return round(rng.random(), 3) if "prob" in k else rng.randint(0, 100)
+    if "email" in k and "outreach" not in k:
+        return f"{rng.choice(VOCAB)}@example.com"
+    if "url" in k or k == "website":
+        return f"https://example.com/{rng.choice(VOCAB)}"
+    if k.endswith("_id") or k == "id":
+        return f"{k.split('_')[0][:3].upper()}-{rng.randint(100, 999)}"
+    if k == "deliverable":
+        return True
+    return " ".join(rng.choice(VOCAB) for _ in range(rng.randint(2, 5)))
+
+
+class FakeModel:
+    """`reply` for StubOpenAI: request body → chat.completion dict."""
+
+    def __init__(
+        self,
+        seed: int = 0,
+        latency: Union[Latency, Mapping[str, Latency], None] = None,
+        time_scale: float = 1.0,
+        script: Optional[Dict[str, Union[str, dict, Callable[[dict], Any]]]] = None,
+        max_members: int = 3,
+        max_tool_rounds: int = 1,
+        words: int = 60,
+    ):
+        self.seed = seed
+        self.latency = LATENCY if latency is None else latency
+        self.time_scale = time_scale
+        self.script = [(re.compile(p, re.I), r) for p, r in (script or {}).items()]
+        self.max_members = max_members
+        self.max_tool_rounds = max_tool_rounds
+        self.words = words
+        self._lock = threading.Lock()
+        self.counters = dict.fromkeys(
+            "calls tool_calls delegations json_answers prompt_tokens "
+            "completion_tokens".split(),
+            0,
+        )
+        self.counters["latency_s"] = 0.0
+
+    def _latency(self, model: str) -> Latency:
+        if isinstance(self.latency, Latency):
+            return self.latency
+        match = max(
+            (k for k in self.latency if model.startswith(k)), key=len, default=None
+        )
+        return self.latency[match] if match else Latency()
+
+    def __call__(self, body: dict) -> dict:
+        key = json.dumps(body.get("messages", []), sort_keys=True, default=str)
+        key = _CLOCK.sub("<now>", key)
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        rng = random.Random(self.seed ^ int.from_bytes(digest, "big"))
+        message = self.respond(body, rng)
+        out = message.get("content") or json.dumps(message.get("tool_calls", []))
+        prompt = (len(key) + len(json.dumps(body.get("tools", [])))) // 4
+        completion = max(len(out) // 4, 1)
+        model = body.get("model", "fake")
+        delay = self._latency(model).sample(rng, completion) * self.time_scale
+        with self._lock:
+            c = self.counters
+            c["calls"] += 1
+            c["tool_calls"] += len(message.get("tool_calls") or [])
+            c["prompt_tokens"] += prompt
+            c["completion_tokens"] += completion
+            c["latency_s"] += delay
+        if delay > 0:
+            time.sleep(delay)
+        return {
+            "id": f"chatcmpl-fake-{digest.hex()}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": message,
+                    "finish_reason": (
+                        "tool_calls" if message.get("tool_calls") else "stop"
+                    ),
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt,
+                "completion_tokens": completion,
+                "total_tokens": prompt + completion,
+            },
+        }
+
+    def respond(self, body: dict, rng: random.Random) -> dict:
+        messages = body.get("messages") or []
+        system = "\n".join(
+            _text(m.get("content"))
+            for m in messages
+            if m.get("role") in ("system", "developer")
+        )
+        users = [i for i, m in enumerate(messages) if m.get("role") == "user"]
+        last = users[-1] if users else -1
+        query = _text(messages[last].get("content")) if users else ""
+        for pattern, reply in self.script:
+            if pattern.search(query) or pattern.search(system):
+                out = reply(body) if callable(reply) else reply
+                return (
+                    out
+                    if isinstance(out, dict)
+                    else {"role": "assistant", "content": str(out)}
+                )
+        turn = messages[last + 1 :]
+        rounds = sum(
+            1 for m in turn if m.get("role") == "assistant" and m.get("tool_calls")
+        )
+        tools = {
+            t["function"]["name"]: t["function"]
+            for t in body.get("tools") or []
+            if t.get("type") == "function"
+        }
+        if tools and rounds < self.max_tool_rounds:
+            calls = self.tool_calls(tools, system, query, rng)
+            if calls:
+                return {"role": "assistant", "content": None, "tool_calls": calls}
+        results = [_text(m.get("content")) for m in turn if m.get("role") == "tool"]
+        return {
+            "role": "assistant",
+            "content": self.answer(body, system, query, results, rng),
+        }
+
+    def tool_calls(
+        self, tools: dict, system: str, query: str, rng: random.Random
+    ) -> list:
+        def call(name: str, args: dict) -> dict:
+            return {
+                "id": f"call_{rng.getrandbits(48):012x}",
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps(args)},
+            }
+
+        members = team_members(system)
+        if members:
+            q = _words(query)
+            ranked = sorted(
+                members,
+                key=lambda m: (
+                    -len(q & _words(f"{m['name']} {m.get('role', '')}")),
+                    rng.random(),
+                ),
+            )
+            hits = [m for m in ranked if q & _words(f"{m['name']} {m.get('role', '')}")]
+            picked = (hits or ranked[:1])[: self.max_members]
+            expected = "A concise result for the team leader."
+            calls = []
+            if "delegate_in_parallel" in tools and len(picked) > 1:
+                tasks = [
+                    {"member": m["name"] or m["id"], "task": query} for m in picked
+                ]
+                calls = [call("delegate_in_parallel", {"tasks": tasks})]
+            elif "transfer_task_to_member" in tools:
+                calls = [
+                    call(
+                        "transfer_task_to_member",
+                        {
+                            "member_id": m["id"],
+                            "task_description": query,
+                            "expected_output": expected,
+                        },
+                    )
+                    for m in picked
+                ]
+            elif "forward_task_to_member" in tools:
+                calls = [
+                    call(
+                        "forward_task_to_member",
+                        {"member_id": picked[0]["id"], "expected_output": expected},
+                    )
+                ]
+            elif "run_member_agents" in tools:
+                calls = [
+                    call(
+                        "run_member_agents",
+                        {"task_description": query, "expected_output": expected},
+                    )
+                ]
+            if calls:
+                with self._lock:
+                    self.counters["delegations"] += len(calls)
+                return calls
+        work = sorted(n for n in tools if n not in REASONING and n not in DELEGATION)
+        if not work:
+            return []
+        named = [n for n in work if n in system]
+        name = named[0] if named else rng.choice(work)
+        params = tools[name].get("parameters") or {}
+        props = params.get("properties") or {}
+        args = {
+            k: (
+                query[:200]
+                if re.search(r"query|task|message|text|prompt", k)
+                else fake_value(k, rng, s)
+            )
+            for k, s in props.items()
+            if k in (params.get("required") or props)
+        }
+        return [call(name, args)]
+
+    def answer(
+        self,
+        body: dict,
+        system: str,
+        query: str,
+        results: List[str],
+        rng: random.Random,
+    ) -> str:
+        fmt = body.get("response_format") or {}
+        if fmt.get("type") == "json_schema":
+            schema = fmt.get("json_schema", {}).get("schema", {})
+            return self._json(fake_value("result", rng, {**schema, "type": "object"}))
+        if fmt.get("type") == "json_object":
+            return self._json({"result": fake_value("result", rng)})
+        shape = answer_shape(system)
+        if shape is not None:
+            kind, keys = shape
+            row = lambda: {k: fake_value(k, rng) for k in keys}
+            if kind == "add":
+                try:
+                    data = json.loads(query)
+                except ValueError:
+                    data = {}
+                if isinstance(data, list):
+                    return self._json(
+                        [{**d, **row()} if isinstance(d, dict) else d for d in data]
+                    )
+                return self._json(
+                    {**data, **row()} if isinstance(data, dict) else row()
+                )
+            return self._json([row() for _ in range(3)] if kind == "list" else row())
+        head = query.strip().splitlines()[0][:60] if query.strip() else "Result"
+        lines = [f"## {head}", ""]
+        for r in results[:4]:
+            lines.append(f"- {r[:120]}")
+        for _ in range(max(self.words // 12, 1)):
+            lines.append("- " + " ".join(rng.choice(VOCAB) for _ in range(12)))
+        return "\n".join(lines)
+
+    def _json(self, value: Any) -> str:
+        with self._lock:
+            self.counters["json_answers"] += 1
+        return json.dumps(value)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            c = dict(self.counters)
+        return {**c, "latency_s": round(c["latency_s"], 3)}
+
+
+def serve(model: Optional[FakeModel] = None, **kwargs) -> StubOpenAI:
+    """Stub server answering with `model` (not started: use as a context)."""
+    return StubOpenAI(reply=model or FakeModel(**kwargs))
@@ -0,0 +1,202 @@
+# agency_kit/fake_tools.py
+# ======================================================================
+# Offline stand-ins for agno toolkits (benchmarks with fake_model.py)
+#  • install(): every `agno.tools.<module>.<X>Tools` and every
+#    `from agno.tools import XTools` resolves to a fake Toolkit – including
+#    the toolkits agno doesn't ship that some stacks import (SnowflakeTools…)
+#  • functions per toolkit from SPECS (the ones the stacks name), else one
+#    generic `<toolkit>_query(query)`; real signatures, so agno builds the
+#    same kind of JSON schema it would for the real toolkit
+#  • results are canned JSON seeded by (function, args) → deterministic;
+#    latency from a Latency distribution × time_scale; per-function counts
+#  • REAL toolkits (reasoning, calculator, thinking) stay real
+# ======================================================================
+
+import hashlib, importlib.abc, importlib.util, inspect, json, random, re, sys
+import threading, time
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from agency_kit.fake_model import Latency, fake_value
+
+REAL = {
+    "reasoning": "ReasoningTools",
+    "calculator": "CalculatorTools",
+    "thinking": "ThinkingTools",
+}
+KEEP = {
+    "toolkit",
+    "function",
+    "decorator",
+    "knowledge",
+    "user_control_flow",
+    "models",
+    "mcp",
+    *REAL,
+}
+TOOL_LATENCY = Latency(ttft_s=0.12, sigma=0.6, tokens_per_s=0.0)
+SPECS = {
+    "SlackTools": "send_message(channel, text) list_channels() get_channel_history(channel, limit:int)",
+    "GmailTools": "send_email(to, subject, body) create_draft_email(to, subject, body) get_latest_emails(count:int)",
+    "TwilioTools": "send_sms(to, body) send_whatsapp(to, body)",
+    "XTools": "create_post(text) get_timeline(max_results:int)",
+    "GoogleCalendarTools": "list_events(limit:int) create_event(start_datetime, end_datetime, title)",
+    "DuckDuckGoTools": "duckduckgo_search(query, max_results:int) duckduckgo_news(query, max_results:int)",
+    "GoogleSearchTools": "google_search(query, max_results:int)",
+    "GoogleMapsTools": "search_places(query) get_directions(origin, destination)",
+    "AzureMapsTools": "search_address(query) get_route(origin, destination)",
+    "WikipediaTools": "search_wikipedia(query)",
+    "YouTubeTools": "get_youtube_video_captions(url) get_youtube_video_data(url)",
+    "YFinanceTools": "get_current_stock_price(symbol) get_company_news(symbol, num_stories:int)",
+    "PandasTools": "run_dataframe_operation(dataframe_name, operation)",
+    "CsvTools": "list_csv_files() read_csv_file(csv_name, row_limit:int) query_csv_file(csv_name, sql_query)",
+    "FileTools": "save_file(contents, file_name) read_file(file_name) list_files()",
+    "GoogleSheetsTools": "read_sheet(spreadsheet_id, spreadsheet_range) update_sheet(spreadsheet_id, data)",
+    "GoogleDriveTools": "list_files(query) read_file(file_id)",
+    "NotionTools": "create_page(title, content) search_pages(query)",
+    "EmailTools": "email_user(subject, body)",
+    "ReplicateTools": "generate_media(prompt)",
+    "PythonTools": "run_python_code(code)",
+    "ShellTools": "run_shell_command(args)",
+    "ORTools": "solve(problem)",
+    "AzureCommTools": "send_sms(to, body) send_email(to, subject, body)",
+    "OutlookTools": "send_email(to, subject, body)",
+    "SnowflakeTools": "run_query(query)",
+}
+_STATE: Dict[str, Any] = {"seed": 0, "latency": TOOL_LATENCY, "time_scale": 1.0}
+_CLASSES: Dict[str, type] = {}
+_LOCK = threading.Lock()
+CALLS: Counter = Counter()
+
+
+def _snake(class_name: str) -> str:
+    base = class_name[:-5] if class_name.endswith("Tools") else class_name
+    return re.sub(r"(?<=[a-z0-9])(?=[A-Z])", "_", base).lower()
+
+
+def _specs(class_name: str) -> List[Tuple[str, List[Tuple[str, type]]]]:
+    spec = SPECS.get(class_name) or f"{_snake(class_name)}_query(query)"
+    return [
+        (
+            name,
+            [
+                (p.split(":")[0], int if p.endswith(":int") else str)
+                for p in re.split(r",\s*", args)
+                if p
+            ],
+        )
+        for name, args in re.findall(r"(\w+)\(([^)]*)\)", spec)
+    ]
+
+
+def _call(toolkit: str, name: str, args: Dict[str, Any]) -> str:
+    key = json.dumps([name, args], sort_keys=True, default=str).encode()
+    seed = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big")
+    rng = random.Random(_STATE["seed"] ^ seed)
+    delay = _STATE["latency"].sample(rng) * _STATE["time_scale"]
+    with _LOCK:
+        CALLS[f"{toolkit}.{name}"] += 1
+    if delay > 0:
+        time.sleep(delay)
+    items = [
+        {
+            "id": fake_value(f"{name}_id", rng),
+            "title": fake_value("title", rng),
+            "value": rng.randint(0, 100),
+        }
+        for _ in range(min(int(args.get("max_results") or 3), 5))
+    ]
+    return json.dumps({"tool": name, "ok": True, "items": items})
+
+
+def _function(toolkit: str, name: str, params: List[Tuple[str, type]]):
+    def fn(**kwargs) -> str:
+        return _call(toolkit, name, kwargs)
+
+    fn.__name__ = fn.__qualname__ = name
+    fn.__doc__ = (
+        f"{name.replace('_', ' ').capitalize()} ({toolkit}).\n\nArgs:\n"
+        + "".join(f"    {p}: {p.replace('_', ' ')}\n" for p, _ in params)
+    )
+    # keyword-only: agno / pydantic bind by keyword and read this signature
+    fn.__signature__ = inspect.Signature(
+        [
+            inspect.Parameter(
+                p,
+                inspect.Parameter.KEYWORD_ONLY,
+                annotation=t,
+                **({"default": 5} if t is int else {}),
+            )
+            for p, t in params
+        ],
+        return_annotation=str,
+    )
+    fn.__annotations__ = {**dict(params), "return": str}
+    return fn
+
+
+def fake_toolkit(class_name: str) -> type:
+    """Toolkit subclass named like the real one; accepts any constructor args."""
+    with _LOCK:
+        if class_name in _CLASSES:
+            return _CLASSES[class_name]
+    from agno.tools.toolkit import Toolkit
+
+    def __init__(self, *args, **kwargs):
+        Toolkit.__init__(
+            self,
+            name=_snake(class_name),
+            tools=[_function(class_name, n, p) for n, p in _specs(class_name)],
+        )
+
+    cls = type(
+        class_name,
+        (Toolkit,),
+        {"__init__": __init__, "__module__": __name__, "fake": True},
+    )
+    with _LOCK:
+        return _CLASSES.setdefault(class_name, cls)
+
+
+def _attr(name: str):
+    if name in REAL.values():
+        module = next(m for m, cls in REAL.items() if cls == name)
+        return getattr(importlib.import_module(f"agno.tools.{module}"), name)
+    if name.endswith("Tools"):
+        return fake_toolkit(name)
+    raise AttributeError(name)
+
+
+class _Finder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    def find_spec(self, fullname, path, target=None):
+        parts = fullname.split(".")
+        if parts[:2] == ["agno", "tools"] and len(parts) > 2 and parts[2] not in KEEP:
+            return importlib.util.spec_from_loader(fullname, self, is_package=True)
+        return None
+
+    def create_module(self, spec):
+        return None
+
+    def exec_module(self, module):
+        module.__getattr__ = _attr
+
+
+def install(
+    seed: int = 0, time_scale: float = 1.0, latency: Latency = TOOL_LATENCY
+) -> None:
+    """Route agno toolkit imports to fakes (call before importing a stack)."""
+    _STATE.update(seed=seed, time_scale=time_scale, latency=latency)
+    if not any(isinstance(f, _Finder) for f in sys.meta_path):
+        sys.meta_path.insert(0, _Finder())
+    for name in [m for m in sys.modules if m.startswith("agno.tools.")]:
+        if name.split(".")[2] not in KEEP:
+            del sys.modules[name]
+    import agno.tools
+
+    agno.tools.__getattr__ = _attr
+
+
+def tool_stats() -> Dict[str, Any]:
+    with _LOCK:
+        calls = dict(CALLS)
+    return {"calls": sum(calls.values()), "by_function": calls}
@@ -0,0 +1,131 @@
+# agency_kit/hooks.py
+# ======================================================================
+# Instance-level method wrapping for agno Agents / Teams
+#  • wrap_method(agent, "run", lambda run: ...) swaps only that instance
+#  • wrappers stack: each one receives the previous bound method
+#  • add_tool_hooks(agent, sync, async): agno tool hooks that stack too –
+#    run() gets the sync ones, arun() the async ones, chosen per call
+#    through a context variable, never by rewriting the instance
+# ======================================================================
+
+import contextvars, inspect
+from typing import Any, Callable
+
+
+def wrap_method(obj: Any, name: str, make_wrapper: Callable[[Callable], Callable]):
+    """Replace obj.<name> with make_wrapper(original bound method); returns obj."""
+    original = getattr(obj, name)
+    object.__setattr__(obj, name, make_wrapper(original))
+    return obj
+
+
+_ASYNC_HOOKS = contextvars.ContextVar("async_tool_hooks", default=False)
+
+
+class _ToolHooks(list):
+    """obj.tool_hooks: the base hooks, then each pair's sync or async half.
+
+    Which half is read from a context variable that run() / arun() set,
+    so overlapping calls on one instance each see their own set.
+    """
+
+    def __init__(self, base, pairs):
+        super().__init__(base)
+        self.pairs = pairs
+
+    def _hooks(self) -> list:
+        half = 1 if _ASYNC_HOOKS.get() else 0
+        return [*list.__iter__(self), *(pair[half] for pair in self.pairs)]
+
+    def __iter__(self):
+        return iter(self._hooks())
+
+    def __reversed__(self):
+        return reversed(self._hooks())
+
+    def __len__(self):
+        return len(self._hooks())
+
+    def __getitem__(self, i):
+        return self._hooks()[i]
+
+    def __copy__(self):  # agno copies agents; the hooks stay shared
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+# tools run while a stream is consumed, so each step gets the mode again
+def _sync_steps(chunks):
+    while True:
+        token = _ASYNC_HOOKS.set(False)
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            return
+        finally:
+            _ASYNC_HOOKS.reset(token)
+        yield chunk
+
+
+async def _async_steps(chunks):
+    while True:
+        token = _ASYNC_HOOKS.set(True)
+        try:
+            chunk = await chunks.__anext__()
+        except StopAsyncIteration:
+            return
+        finally:
+            _ASYNC_HOOKS.reset(token)
+        yield chunk
+
+
+def add_tool_hooks(obj: Any, sync_hook: Callable, async_hook: Callable):
+    """Add a tool-hook pair to obj (agno: hook(name, next_func, args)).
+
+    agno skips coroutine hooks in run() and doesn't await plain ones in
+    arun(), so obj.tool_hooks shows each call the matching half.
+    """
+    hooks = obj.tool_hooks
+    if not isinstance(hooks, _ToolHooks):
+        hooks = _ToolHooks(hooks or [], [])
+        obj.tool_hooks = hooks
+
+        def make(run):
+            def run_with_hooks(*args, **kwargs):
+                token = _ASYNC_HOOKS.set(False)
+                try:
+                    result = run(*args, **kwargs)
+                finally:
+                    _ASYNC_HOOKS.reset(token)
+                return _sync_steps(result) if inspect.isgenerator(result) else result
+
+            return run_with_hooks
+
+        def amake(arun):
+            async def arun_with_hooks(*args, **kwargs):
+                token = _ASYNC_HOOKS.set(True)
+                try:
+                    result = await arun(*args, **kwargs)
+                finally:
+                    _ASYNC_HOOKS.reset(token)
+                return _async_steps(result) if inspect.isasyncgen(result) else result
+
+            return arun_with_hooks
+
+        wrap_method(obj, "run", make)
+        wrap_method(obj, "arun", amake)
+    hooks.pairs.append((sync_hook, async_hook))
+    return obj
+
+
+def tool_names(tools) -> list:
+    """Stable description of an agent's tool set: class or function names."""
+    names = []
+    for t in tools or []:
+        if callable(t) and hasattr(t, "__name__"):
+            names.append(t.__name__)
+        else:
+            names.append(type(t).__name__)
+    return sorted(names)
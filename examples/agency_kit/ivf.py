@@ -0,0 +1,268 @@
+# agency_kit/ivf.py
+# ======================================================================
+# IVF (inverted-file) ANN index on NumPy memory-mapped files
+#  • vectors.f32 / assign.i32 grow in place (capacity doubling), only the
+#    rows a query touches are paged in
+#  • trains spherical k-means once `train_at` vectors exist; after that an
+#    insert = nearest centroid + append to that list (no rebuild)
+#  • a list that outgrows 2× target_list is split locally with 2-means
+#  • search probes the `nprobe` closest lists; recall_at_k() vs exact scan
+#  • flush() writes the dirty memmap pages + meta; centroids only when a
+#    train / split changed them, so a per-insert flush stays small
+#  • vectors are expected L2-normalised (score = dot = cosine)
+# ======================================================================
+
+import json, os, threading
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class IVFIndex:
+    """Append-only IVF index persisted under `path/`."""
+
+    def __init__(
+        self,
+        path: str,
+        dim: int,
+        nprobe: int = 8,
+        train_at: int = 4096,
+        target_list: int = 512,
+        seed: int = 0,
+    ):
+        self.path = path
+        self.nprobe = nprobe
+        self.train_at = train_at
+        self.target_list = target_list
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+        meta = self._file("meta.json")
+        if os.path.exists(meta):
+            with open(meta) as f:
+                m = json.load(f)
+            self.dim, self.count, self.capacity = m["dim"], m["count"], m["capacity"]
+            if self.dim != dim:
+                raise ValueError(f"{path} holds dim={self.dim} vectors, not {dim}")
+        else:
+            self.dim, self.count, self.capacity = dim, 0, 0
+        self._vectors = self._assign = None
+        self._reserve(max(self.capacity, 1024))
+        self.centroids = np.zeros((0, dim), np.float32)
+        self._centroids_dirty = False
+        if os.path.exists(self._file("centroids.npy")):
+            self.centroids = np.load(self._file("centroids.npy"))
+        self._rebuild_lists()
+
+    # ---------- storage ------------------------------------------------
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _map(self, name: str, dtype, shape) -> np.memmap:
+        fname = self._file(name)
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        with open(fname, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        return np.memmap(fname, dtype=dtype, mode="r+", shape=shape)
+
+    def _reserve(self, n: int) -> None:
+        if self._vectors is not None and n <= self.capacity:
+            return
+        cap = max(n, self.capacity * 2) if self._vectors is not None else n
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._assign.flush()
+        self._vectors = self._map("vectors.f32", np.float32, (cap, self.dim))
+        self._assign = self._map("assign.i32", np.int32, (cap,))
+        self.capacity = cap
+
+    def flush(self) -> None:
+        with self._lock:
+            self._vectors.flush()
+            self._assign.flush()
+            if self._centroids_dirty:
+                np.save(self._file("centroids.npy"), self.centroids)
+                self._centroids_dirty = False
+            tmp = self._file("meta.json.tmp")
+            with open(tmp, "w") as f:
+                json.dump(
+                    {"dim": self.dim, "count": self.count, "capacity": self.capacity}, f
+                )
+            os.replace(tmp, self._file("meta.json"))
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors[: self.count]
+
+    # ---------- inverted lists -----------------------------------------
+    def _rebuild_lists(self) -> None:
+        n_lists = len(self.centroids)
+        self._lists: List[np.ndarray] = []
+        self._sizes: List[int] = []
+        if not n_lists:
+            return
+        assign = np.asarray(self._assign[: self.count])
+        order = np.argsort(assign, kind="stable")
+        bounds = np.cumsum(np.bincount(assign, minlength=n_lists))
+        start = 0
+        for end in bounds:
+            ids = order[start:end].astype(np.int64)
+            self._lists.append(np.concatenate([ids, np.empty(len(ids), np.int64)]))
+            self._sizes.append(len(ids))
+            start = end
+
+    def _append(self, lst: int, ids: np.ndarray) -> None:
+        size = self._sizes[lst]
+        buf = self._lists[lst]
+        if size + len(ids) > len(buf):
+            grown = np.empty(max(2 * len(buf), size + len(ids), 16), np.int64)
+            grown[:size] = buf[:size]
+            self._lists[lst] = buf = grown
+        buf[size : size + len(ids)] = ids
+        self._sizes[lst] = size + len(ids)
+
+    def _members(self, lst: int) -> np.ndarray:
+        return self._lists[lst][: self._sizes[lst]]
+
+    # ---------- build / insert -----------------------------------------
+    def _kmeans(self, x: np.ndarray, k: int, iters: int = 10) -> np.ndarray:
+        c = x[self._rng.choice(len(x), k, replace=False)].copy()
+        for _ in range(iters):
+            labels = self._nearest(x, c)
+            sums = np.zeros_like(c)
+            np.add.at(sums, labels, x)
+            empty = np.bincount(labels, minlength=k) == 0
+            sums[empty] = x[self._rng.choice(len(x), int(empty.sum()))]
+            c = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+        return c.astype(np.float32)
+
+    @staticmethod
+    def _nearest(x: np.ndarray, c: np.ndarray, chunk: int = 16384) -> np.ndarray:
+        out = np.empty(len(x), np.int32)
+        for i in range(0, len(x), chunk):
+            out[i : i + chunk] = np.argmax(x[i : i + chunk] @ c.T, axis=1)
+        return out
+
+    def train(self) -> None:
+        """(Re)build centroids and lists from everything stored so far."""
+        with self._lock:
+            k = max(1, self.count // self.target_list)
+            sample = min(self.count, max(64 * k, 20000))
+            idx = np.sort(self._rng.choice(self.count, sample, replace=False))
+            self.centroids = self._kmeans(np.asarray(self.vectors[idx]), k)
+            self._centroids_dirty = True
+            for i in range(0, self.count, 65536):
+                block = np.asarray(self._vectors[i : min(i + 65536, self.count)])
+                self._assign[i : i + len(block)] = self._nearest(block, self.centroids)
+            self._rebuild_lists()
+            self._split_oversized(range(len(self.centroids)))
+
+    def _split(self, lst: int) -> None:
+        """2-means on one oversized list; the second half becomes a new list."""
+        ids = np.sort(self._members(lst))
+        x = np.asarray(self._vectors[ids])
+        two = self._kmeans(x, 2, iters=5)
+        side = self._nearest(x, two)
+        if side.all() or not side.any():
+            return  # duplicates: nothing to split on
+        new = len(self.centroids)
+        self.centroids = np.vstack([self.centroids, two[1:2]])
+        self.centroids[lst] = two[0]
+        self._centroids_dirty = True
+        self._assign[ids[side == 1]] = new
+        self._lists[lst] = np.concatenate([ids[side == 0], np.empty(16, np.int64)])
+        self._sizes[lst] = int((side == 0).sum())
+        self._lists.append(np.concatenate([ids[side == 1], np.empty(16, np.int64)]))
+        self._sizes.append(int((side == 1).sum()))
+
+    def _split_oversized(self, lists: Iterable[int]) -> None:
+        for lst in lists:
+            if self._sizes[lst] > 2 * self.target_list:
+                self._split(int(lst))
+
+    def add(self, vectors: np.ndarray) -> np.ndarray:
+        """Append rows; returns their ids (0..count-1, insertion order)."""
+        x = np.atleast_2d(np.asarray(vectors, np.float32))
+        with self._lock:
+            start = self.count
+            self._reserve(start + len(x))
+            self._vectors[start : start + len(x)] = x
+            self.count += len(x)
+            ids = np.arange(start, self.count, dtype=np.int64)
+            if not len(self.centroids):
+                if self.count >= self.train_at:
+                    self.train()
+                return ids
+            labels = self._nearest(x, self.centroids)
+            self._assign[start : self.count] = labels
+            order = np.argsort(labels, kind="stable")
+            touched, first = np.unique(labels[order], return_index=True)
+            for lst, group in zip(touched, np.split(ids[order], first[1:])):
+                self._append(int(lst), group)
+            self._split_oversized(touched)
+            return ids
+
+    # ---------- search -------------------------------------------------
+    def exact(self, q: np.ndarray, k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """Brute-force scan over the memmap (ground truth / small indexes)."""
+        q = np.asarray(q, np.float32)
+        best_ids, best = np.empty(0, np.int64), np.empty(0, np.float32)
+        for i in range(0, self.count, 65536):
+            s = np.asarray(self._vectors[i : min(i + 65536, self.count)]) @ q
+            ids = np.arange(i, i + len(s))
+            best_ids = np.concatenate([best_ids, ids])
+            best = np.concatenate([best, s])
+            if len(best) > k:
+                keep = np.argpartition(-best, k)[:k]
+                best_ids, best = best_ids[keep], best[keep]
+        order = np.argsort(-best)[:k]
+        return best_ids[order], best[order]
+
+    def search(
+        self, q: np.ndarray, k: int = 10, nprobe: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(ids, scores) of the ~k most similar vectors, best first."""
+        q = np.asarray(q, np.float32)
+        with self._lock:
+            if not len(self.centroids):
+                return self.exact(q, k)
+            probe = min(nprobe or self.nprobe, len(self.centroids))
+            lists = np.argpartition(-(self.centroids @ q), probe - 1)[:probe]
+            cand = np.concatenate([self._members(int(l)) for l in lists])
+        if not len(cand):
+            return cand, np.empty(0, np.float32)
+        cand.sort()  # sequential-ish page access on the memmap
+        scores = self._vectors[cand] @ q
+        top = np.argpartition(-scores, min(k, len(scores)) - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return cand[top], scores[top]
+
+    def recall_at_k(
+        self, queries: Sequence[np.ndarray], k: int = 10, nprobe: Optional[int] = None
+    ) -> float:
+        """Mean |ANN top-k ∩ exact top-k| / k over `queries`."""
+        hits = 0
+        for q in queries:
+            ann = set(self.search(q, k, nprobe)[0].tolist())
+            hits += len(ann & set(self.exact(q, k)[0].tolist()))
+        return hits / (k * max(len(queries), 1))
+
+    def stats(self) -> dict:
+        sizes = np.asarray(self._sizes) if self._sizes else np.zeros(1)
+        return {
+            "vectors": self.count,
+            "lists": len(self.centroids),
+            "avg_list": round(float(sizes.mean()), 1),
+            "max_list": int(sizes.max()),
+            "nprobe": self.nprobe,
+            "disk_mb": round(
+                sum(
+                    os.path.getsize(self._file(f))
+                    for f in os.listdir(self.path)
+                    if os.path.isfile(self._file(f))
+                )
+                / 2**20,
+                1,
+            ),
+        }
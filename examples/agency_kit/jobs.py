@@ -0,0 +1,274 @@
+# agency_kit/jobs.py
+# ======================================================================
+# Persistent job queue with single-flight de-duplication
+#  • submit(kind, payload) → job id; SQLite table survives restarts
+#  • same kind + normalised payload while queued/running → same job id
+#  • finished results are served again for `result_ttl_s` (then purged)
+#  • runner(payload) is an async iterator of (event, data) pairs – the
+#    job result is a final ("result", {"content": ...}) event if the runner
+#    sends one, else the concatenated `content` deltas
+#  • stream(job_id): replay of events so far, then live ones (SSE-ready)
+#  • workers run on the caller's event loop, started by submit/wait/stream
+# ======================================================================
+
+import asyncio, hashlib, json, logging, re, sqlite3, threading, time, uuid
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+log = logging.getLogger("agency.jobs")
+
+Event = Tuple[str, Dict[str, Any]]
+Runner = Callable[[Dict[str, Any]], AsyncIterator[Event]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id        TEXT PRIMARY KEY,
+    kind      TEXT NOT NULL,
+    key       TEXT NOT NULL,
+    payload   TEXT NOT NULL,
+    status    TEXT NOT NULL,          -- queued | running | done | error
+    result    TEXT,
+    error     TEXT,
+    requests  INTEGER NOT NULL DEFAULT 1,
+    created   REAL NOT NULL,
+    started   REAL,
+    finished  REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, status);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, created);
+"""
+
+
+def job_key(kind: str, payload: Dict[str, Any]) -> str:
+    """Case/whitespace-insensitive identity of a request."""
+
+    def norm(v):
+        if isinstance(v, str):
+            return re.sub(r"\s+", " ", v.strip().lower())
+        if isinstance(v, dict):
+            return {k: norm(x) for k, x in sorted(v.items())}
+        if isinstance(v, list):
+            return [norm(x) for x in v]
+        return v
+
+    blob = json.dumps([kind, norm(payload)], sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class _Live:
+    """Events of one running job: replay buffer + subscriber queues."""
+
+    def __init__(self):
+        self.events: List[Event] = []
+        self.subscribers: List[asyncio.Queue] = []
+
+    def publish(self, event: Optional[Event]) -> None:
+        if event is not None:
+            self.events.append(event)
+        for q in self.subscribers:
+            q.put_nowait(event)
+
+
+class JobQueue:
+    """SQLite-backed queue; asyncio workers start with the first submit()."""
+
+    def __init__(
+        self,
+        path: str,
+        runners: Dict[str, Runner],
+        workers: int = 2,
+        result_ttl_s: float = 900.0,
+    ):
+        self.runners = runners
+        self.workers = max(1, workers)
+        self.result_ttl_s = result_ttl_s
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._live: Dict[str, _Live] = {}
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self.counters = {"submitted": 0, "deduplicated": 0, "executed": 0}
+        # a crash mid-run leaves 'running' rows behind: run them again
+        with self._lock:
+            n = self._db.execute(
+                "UPDATE jobs SET status='queued', started=NULL WHERE status='running'"
+            ).rowcount
+        if n:
+            log.info("jobs: re-queued %d interrupted job(s)", n)
+
+    # ---------- submit / inspect ----------------------------------------
+    def submit(self, kind: str, payload: Dict[str, Any]) -> Tuple[str, bool]:
+        """(job id, deduplicated) – joins an identical queued/running/fresh job."""
+        if kind not in self.runners:
+            raise ValueError(f"unknown job kind {kind!r}")
+        key = job_key(kind, payload)
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._purge(now)
+                row = self._db.execute(
+                    "SELECT id FROM jobs WHERE key=? AND status IN "
+                    "('queued','running','done') ORDER BY created DESC LIMIT 1",
+                    (key,),
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE jobs SET requests=requests+1 WHERE id=?", (row["id"],)
+                    )
+                    job_id, dedup = row["id"], True
+                else:
+                    job_id, dedup = uuid.uuid4().hex, False
+                    self._db.execute(
+                        "INSERT INTO jobs (id, kind, key, payload, status, created) "
+                        "VALUES (?, ?, ?, ?, 'queued', ?)",
+                        (job_id, kind, key, json.dumps(payload), now),
+                    )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self.counters["submitted"] += 1
+            self.counters["deduplicated"] += dedup
+        self._start_workers()
+        if not dedup:
+            self._wake.set()
+        return job_id, dedup
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM jobs WHERE id=?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = {k: row[k] for k in row.keys() if k not in ("key", "payload")}
+        job["payload"] = json.loads(row["payload"])
+        return job
+
+    async def wait(self, job_id: str, poll_s: float = 0.25) -> Dict[str, Any]:
+        """Job dict once it is done or failed."""
+        self._start_workers()  # re-queued jobs from a previous process
+        while True:
+            job = self.get(job_id)
+            if job is None or job["status"] in ("done", "error"):
+                return job
+            await asyncio.sleep(poll_s)
+
+    async def stream(self, job_id: str, poll_s: float = 0.25) -> AsyncIterator[Event]:
+        """Events so far, then live ones; a queued job waits for its run."""
+        self._start_workers()
+        announced = False
+        while True:
+            job = self.get(job_id)
+            if job is None:
+                raise KeyError(job_id)
+            live = self._live.get(job_id)
+            if live is not None:
+                break
+            if job["status"] == "done":
+                yield "content", {"delta": job["result"], "member": None}
+                return
+            if job["status"] == "error":
+                raise RuntimeError(job["error"])
+            if not announced:
+                announced = True
+                yield "queued", {"job_id": job_id}
+            await asyncio.sleep(poll_s)
+        q: asyncio.Queue = asyncio.Queue()
+        for event in live.events:  # same loop → no event can slip in between
+            q.put_nowait(event)
+        live.subscribers.append(q)
+        try:
+            while (event := await q.get()) is not None:
+                yield event
+        finally:
+            live.subscribers.remove(q)
+        job = self.get(job_id)
+        if job and job["status"] == "error":
+            raise RuntimeError(job["error"])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT status, COUNT(*) n, SUM(requests) r FROM jobs GROUP BY status"
+            ).fetchall()
+        return {
+            **self.counters,
+            "jobs": {r["status"]: r["n"] for r in rows},
+            "requests": sum(r["r"] for r in rows),
+            "workers": self.workers,
+            "result_ttl_s": self.result_ttl_s,
+        }
+
+    def _purge(self, now: float) -> None:
+        self._db.execute(
+            "DELETE FROM jobs WHERE status IN ('done','error') AND finished < ?",
+            (now - self.result_ttl_s,),
+        )
+
+    # ---------- workers -------------------------------------------------
+    def _start_workers(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and not all(t.done() for t in self._tasks):
+            return
+        self._loop = loop
+        self._wake = asyncio.Event()
+        self._tasks = [
+            asyncio.ensure_future(self._worker()) for _ in range(self.workers)
+        ]
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            row = self._db.execute(
+                "SELECT * FROM jobs WHERE status='queued' ORDER BY created LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                self._db.execute(
+                    "UPDATE jobs SET status='running', started=? WHERE id=?",
+                    (time.time(), row["id"]),
+                )
+                self._live[row["id"]] = _Live()
+            self._db.execute("COMMIT")
+            return row
+
+    def _finish(self, job_id: str, result: Optional[str], error: Optional[str]):
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status=?, result=?, error=?, finished=? WHERE id=?",
+                ("error" if error else "done", result, error, time.time(), job_id),
+            )
+            self.counters["executed"] += 1
+            live = self._live.pop(job_id)
+        live.publish(None)  # wakes subscribers; they read the final row
+
+    async def _worker(self) -> None:
+        while True:
+            row = self._claim()
+            if row is None:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            live = self._live[row["id"]]
+            parts, result, error = [], None, None
+            try:
+                async for event, data in self.runners[row["kind"]](
+                    json.loads(row["payload"])
+                ):
+                    if event == "content" and isinstance(data.get("delta"), str):
+                        parts.append(data["delta"])
+                    elif event == "result":
+                        result = data.get("content")
+                    live.publish((event, data))
+            except Exception as e:  # a failed job must not kill the worker
+                log.exception("job %s failed", row["id"])
+                error = f"{type(e).__name__}: {e}"
+            if result is None:
+                result = "".join(parts)
+            elif not isinstance(result, str):
+                result = json.dumps(result, default=str)
+            self._finish(row["id"], result, error)
@@ -0,0 +1,346 @@
+# agency_kit/lead_scoring.py
+# ======================================================================
+# Local lead scoring: a weighted or logistic model over lead features
+#  • features per lead: company_size (log employees), sentiment_score,
+#    deliverable, role_match (title vs the role searched for) – parsed
+#    once per distinct value, then one NumPy matrix for the whole batch
+#  • sentiment_score is read on one fixed scale per scorer: "signed"
+#    (-1..1, the Sentiment agent's, default), "unit" (0..1), "percent"
+#  • LeadScorer(weights, bias, kind): "logistic" → 100·σ(X·w + b),
+#    "weighted" → 100·X·w / Σw; score() returns scores + per-feature
+#    contributions, so an LLM only has to explain them
+#  • train(leads): L2 logistic regression (IRLS) on past leads.json
+#    outputs – 0/1 outcomes (converted, replied, won) or the 0-100 scores
+#    the Scorer LLM gave; save()/load() as JSON
+#  • score_leads(leads_json, role) is the agno tool; scoring_stage() is
+#    the drop-in for the Scorer stage of the lead-gen DAG
+#
+#   python -m agency_kit.lead_scoring outputs/leads.json … [-o memory/lead_model.json]
+# ======================================================================
+
+import json, math, os, re, sys, threading, time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from agency_kit.pipeline import Stage
+
+FEATURES = ("company_size", "sentiment_score", "deliverable", "role_match")
+OUTCOMES = ("converted", "won", "replied", "meeting_booked")
+SENTIMENT_SCALES = {"signed": (-1.0, 1.0), "unit": (0.0, 1.0), "percent": (0.0, 100.0)}
+_SIZE = re.compile(r"(\d+(?:\.\d+)?)\s*([kKmM]?)")
+_WORD = re.compile(r"[a-z]+")
+# abbreviations that should match their spelled-out titles
+_ALIAS = {
+    "cfo": "chief financial officer",
+    "ceo": "chief executive officer",
+    "cto": "chief technology officer",
+    "coo": "chief operating officer",
+    "cmo": "chief marketing officer",
+    "vp": "vice president",
+}
+
+
+# ---------- feature parsing (one call per distinct value) -------------
+def _company_size(value: Any) -> float:
+    """Employees → log10 scaled to 0..1 (1 at 100k); ranges use their middle."""
+    if isinstance(value, bool) or value is None:
+        return 0.0
+    if isinstance(value, (int, float)):
+        n = float(value)
+    else:
+        nums = [
+            float(x) * {"k": 1e3, "m": 1e6}.get(unit.lower(), 1)
+            for x, unit in _SIZE.findall(str(value))
+        ]
+        if not nums:
+            return 0.0
+        n = sum(nums[:2]) / len(nums[:2])
+    return min(max(math.log10(n + 1) / 5, 0.0), 1.0)
+
+
+def _sentiment(value: Any, scale: str = "signed") -> float:
+    """`scale` → 0..1, clipped; missing is neutral."""
+    try:
+        x = float(value)
+    except (TypeError, ValueError):
+        return {"positive": 1.0, "negative": 0.0}.get(str(value).lower(), 0.5)
+    lo, hi = SENTIMENT_SCALES[scale]
+    return min(max((x - lo) / (hi - lo), 0.0), 1.0)
+
+
+def _deliverable(value: Any) -> float:
+    if isinstance(value, str):
+        return float(value.strip().lower() in ("true", "yes", "valid", "ok", "1"))
+    return float(bool(value))
+
+
+def _words(text: Any) -> frozenset:
+    words = _WORD.findall(str(text or "").lower())
+    return frozenset(w for word in words for w in _ALIAS.get(word, word).split())
+
+
+def _role_match(title: Any, role: Any) -> float:
+    """Share of the searched role's words found in the lead's title."""
+    want, have = _words(role), _words(title)
+    return len(want & have) / len(want) if want else 0.0
+
+
+def _column(values: List[Any], parse) -> np.ndarray:
+    try:
+        distinct = set(values)
+    except TypeError:  # dicts / lists as values
+        values = [v if isinstance(v, (str, int, float)) else str(v) for v in values]
+        distinct = set(values)
+    memo = {v: parse(v) for v in distinct}
+    return np.fromiter(map(memo.__getitem__, values), np.float32, len(values))
+
+
+def _title(lead: Dict[str, Any]) -> Any:
+    return (
+        lead.get("title")
+        or lead.get("job_title")
+        or lead.get("role")
+        or lead.get("position")
+        or lead.get("headline")
+    )
+
+
+def _query_role(lead: Dict[str, Any]) -> Any:
+    query = lead.get("query")
+    return query.get("role") if isinstance(query, dict) else None
+
+
+def features(
+    leads: Sequence[Dict[str, Any]],
+    role: Optional[str] = None,
+    sentiment_scale: str = "signed",
+) -> np.ndarray:
+    """(n, len(FEATURES)) float32 matrix; `role` overrides each lead's query."""
+    if role:
+        match = _column([_title(l) for l in leads], lambda t: _role_match(t, role))
+    else:
+        pairs = [(_title(l), _query_role(l)) for l in leads]
+        match = _column(pairs, lambda p: _role_match(*p))
+    return np.column_stack(
+        [
+            _column([l.get("company_size") for l in leads], _company_size),
+            _column(
+                [l.get("sentiment_score") for l in leads],
+                lambda v: _sentiment(v, sentiment_scale),
+            ),
+            _column([l.get("deliverable") for l in leads], _deliverable),
+            match,
+        ]
+    )
+
+
+# ---------- model ----------------------------------------------------
+class LeadScorer:
+    """Scores 0-100 from FEATURES; weights are per feature name."""
+
+    def __init__(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        bias: float = -2.5,
+        kind: str = "logistic",
+        sentiment_scale: str = "signed",
+    ):
+        if kind not in ("logistic", "weighted"):
+            raise ValueError(f"kind must be logistic or weighted, not {kind!r}")
+        if sentiment_scale not in SENTIMENT_SCALES:
+            raise ValueError(f"sentiment_scale must be one of {list(SENTIMENT_SCALES)}")
+        w = dict(company_size=2.0, sentiment_score=1.5, deliverable=1.0, role_match=2.5)
+        w.update(weights or {})
+        self.weights = np.array([w[f] for f in FEATURES], np.float32)
+        self.bias = float(bias)
+        self.kind = kind
+        self.sentiment_scale = sentiment_scale
+        self.trained_on = 0
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "leads": 0, "seconds": 0.0}
+
+    def score_matrix(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """→ (scores 0-100, contributions n × features in score points)."""
+        contrib = X * self.weights
+        if self.kind == "weighted":
+            scale = 100 / max(float(np.abs(self.weights).sum()), 1e-9)
+            return np.clip(contrib.sum(1) * scale, 0, 100), contrib * scale
+        z = contrib.sum(1) + self.bias
+        p = 1 / (1 + np.exp(-z))
+        # split score − score(at 0 features) across features by their share of z
+        base = 1 / (1 + math.exp(-self.bias))
+        share = np.divide(
+            contrib,
+            (z - self.bias)[:, None],
+            out=np.zeros_like(contrib),
+            where=np.abs(z - self.bias)[:, None] > 1e-9,
+        )
+        return 100 * p, share * (100 * (p - base))[:, None]
+
+    def score(
+        self, leads: Sequence[Dict[str, Any]], role: Optional[str] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        t0 = time.perf_counter()
+        out = self.score_matrix(features(leads, role, self.sentiment_scale))
+        with self._lock:
+            self.counters["calls"] += 1
+            self.counters["leads"] += len(leads)
+            self.counters["seconds"] += time.perf_counter() - t0
+        return out
+
+    def explain(self, contrib_row: np.ndarray, top: int = 2) -> Dict[str, float]:
+        order = np.argsort(-np.abs(contrib_row))[:top]
+        return {FEATURES[i]: round(float(contrib_row[i]), 1) for i in order}
+
+    # ---------- training ------------------------------------------------
+    def fit(
+        self, X: np.ndarray, y: np.ndarray, l2: float = 1.0, steps: int = 25
+    ) -> "LeadScorer":
+        """L2 logistic regression by IRLS; y in 0..1 (soft labels work)."""
+        A = np.column_stack([X, np.ones(len(X))]).astype(np.float64)
+        theta = np.zeros(A.shape[1])
+        reg = l2 * np.eye(A.shape[1])
+        reg[-1, -1] = 0.0  # don't shrink the bias
+        for _ in range(steps):
+            p = 1 / (1 + np.exp(-(A @ theta)))
+            grad = A.T @ (p - y) + reg @ theta
+            hess = (A * (p * (1 - p))[:, None]).T @ A + reg
+            step = np.linalg.solve(hess + 1e-9 * np.eye(len(theta)), grad)
+            theta -= step
+            if np.abs(step).max() < 1e-6:
+                break
+        self.weights = theta[:-1].astype(np.float32)
+        self.bias = float(theta[-1])
+        self.kind = "logistic"
+        self.trained_on = len(X)
+        return self
+
+    # ---------- persistence ---------------------------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "sentiment_scale": self.sentiment_scale,
+            "bias": round(self.bias, 6),
+            "weights": {f: round(float(w), 6) for f, w in zip(FEATURES, self.weights)},
+            "trained_on": self.trained_on,
+        }
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "LeadScorer":
+        with open(path) as f:
+            data = json.load(f)
+        scorer = cls(
+            data["weights"],
+            data["bias"],
+            data.get("kind", "logistic"),
+            data.get("sentiment_scale", "signed"),
+        )
+        scorer.trained_on = data.get("trained_on", 0)
+        return scorer
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            c = dict(self.counters)
+        c["seconds"] = round(c["seconds"], 4)
+        return {**self.to_dict(), **c}
+
+
+def labels(leads: Sequence[Dict[str, Any]]) -> Tuple[List[int], np.ndarray]:
+    """Rows with an outcome (0/1) or else an LLM score (0-100) → (rows, y)."""
+    rows, y = [], []
+    for i, lead in enumerate(leads):
+        value = next((lead[k] for k in OUTCOMES if lead.get(k) is not None), None)
+        if value is None and lead.get("score") is not None:
+            try:
+                value = float(lead["score"]) / 100
+            except (TypeError, ValueError):
+                continue
+        if value is not None:
+            rows.append(i)
+            x = _deliverable(value) if isinstance(value, str) else float(value)
+            y.append(min(max(x, 0.0), 1.0))
+    return rows, np.array(y)
+
+
+def train(
+    leads: Sequence[Dict[str, Any]], l2: float = 1.0, sentiment_scale: str = "signed"
+) -> LeadScorer:
+    rows, y = labels(leads)
+    if not rows:
+        raise ValueError("no leads with an outcome or a score to train on")
+    X = features([leads[i] for i in rows], sentiment_scale=sentiment_scale)
+    return LeadScorer(sentiment_scale=sentiment_scale).fit(X, y, l2)
+
+
+def load_leads(paths: Iterable[str]) -> List[Dict[str, Any]]:
+    leads: List[Dict[str, Any]] = []
+    for path in paths:
+        with open(path) as f:
+            data = json.load(f)
+        leads.extend(data if isinstance(data, list) else data.get("leads", []))
+    return leads
+
+
+# ---------- agno tool / pipeline stage ----------------------------------
+# trained weights from LEAD_SCORE_MODEL, else the hand-set defaults
+MODEL_PATH = os.getenv("LEAD_SCORE_MODEL", "./memory/lead_model.json")
+SCORER = LeadScorer.load(MODEL_PATH) if os.path.exists(MODEL_PATH) else LeadScorer()
+
+
+def score_leads(leads_json: str, role: str = "") -> str:
+    """Score leads 0-100 locally from company_size, sentiment_score,
+    deliverable and how well their title matches `role`. Returns the leads'
+    index, score and the features that moved it most – explain these, don't
+    re-score."""
+    leads = json.loads(leads_json)
+    if isinstance(leads, dict):
+        leads = leads.get("leads") or [leads]
+    scores, contrib = SCORER.score(leads, role or None)
+    return json.dumps(
+        [
+            {"index": i, "score": round(float(s), 1), "factors": SCORER.explain(c)}
+            for i, (s, c) in enumerate(zip(scores, contrib))
+        ]
+    )
+
+
+def scoring_stage(
+    name: str = "Scorer",
+    after: Tuple[str, ...] = (),
+    scorer: Optional[LeadScorer] = None,
+) -> Stage:
+    """Stage adding score + score_factors without a model call."""
+
+    def fn(item: Dict[str, Any]) -> Dict[str, Any]:
+        model = scorer or SCORER
+        scores, contrib = model.score([item])
+        return {
+            "score": round(float(scores[0]), 1),
+            "score_factors": model.explain(contrib[0]),
+        }
+
+    async def afn(item: Dict[str, Any]) -> Dict[str, Any]:
+        return fn(item)
+
+    return Stage(name, fn, tuple(after), 1, afn)
+
+
+def scoring_stats() -> Dict[str, Any]:
+    return SCORER.stats()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    out = args[args.index("-o") + 1] if "-o" in args else MODEL_PATH
+    files = [a for a in args if a not in ("-o", out)]
+    scorer = train(load_leads(files))
+    scorer.save(out)
+    print(json.dumps(scorer.to_dict(), indent=2))
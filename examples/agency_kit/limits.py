@@ -0,0 +1,64 @@
+# agency_kit/limits.py
+# ======================================================================
+# Per-endpoint concurrency limits for async FastAPI handlers
+#  • `async with LIMIT:` around the arun() call – excess requests queue
+#    on the event loop instead of parking a worker thread each
+#  • limit per endpoint from env (e.g. GENERATE_LEADS_CONCURRENCY=16)
+#  • stats(): active, waiting, peak, served, average queue wait
+# ======================================================================
+
+import asyncio, os, time
+from typing import Dict
+
+LIMITERS: Dict[str, "EndpointLimiter"] = {}
+
+
+class EndpointLimiter:
+    """asyncio.Semaphore with counters; one per endpoint."""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = max(1, limit)
+        self._slots = asyncio.Semaphore(self.limit)
+        self.active = 0
+        self.waiting = 0
+        self.peak = 0
+        self.served = 0
+        self.wait_s = 0.0
+
+    async def __aenter__(self) -> "EndpointLimiter":
+        t0 = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.wait_s += time.perf_counter() - t0
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.active -= 1
+        self.served += 1
+        self._slots.release()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "peak": self.peak,
+            "served": self.served,
+            "avg_wait_ms": 1000 * self.wait_s / max(self.served + self.active, 1),
+        }
+
+
+def endpoint_limit(name: str, env_var: str, default: int = 16) -> EndpointLimiter:
+    """Limiter for one endpoint, sized by env_var (falls back to default)."""
+    LIMITERS[name] = EndpointLimiter(name, int(os.getenv(env_var, str(default))))
+    return LIMITERS[name]
+
+
+def limiter_stats() -> Dict[str, Dict[str, float]]:
+    return {name: l.stats() for name, l in LIMITERS.items()}
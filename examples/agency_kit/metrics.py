@@ -0,0 +1,458 @@
+# agency_kit/metrics.py
+# ======================================================================
+# In-process token / latency / cost metrics for every model + tool call
+#  • model calls: ModelPool.observe() – usage comes from the response the
+#    pooled transport already reads, so nothing is re-tokenised
+#  • tool calls : an agno tool hook (sync one for run(), async for arun())
+#  • attribution: instrument(agent_or_team) keeps (agent, team, session) in
+#    a contextvar for the whole run – nested teams, delegate threads and
+#    streamed runs included
+#  • ring buffer of raw calls + running totals per agent / team / session /
+#    model / tool / day + fixed-bucket latency histograms: O(1) per call
+#  • rollup thread appends new calls to daily CSV (Parquet when pyarrow is
+#    installed) every `rollup_s`
+#  • summary() / report() are precomputed views – the spend sentinels read
+#    those instead of crunching raw data with an LLM
+# ======================================================================
+
+import bisect, contextvars, csv, json, logging, os, threading, time
+from collections import deque
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterator, List, NamedTuple, Optional
+
+from agency_kit.hooks import add_tool_hooks, wrap_method
+
+log = logging.getLogger("agency.metrics")
+
+# $ per 1M tokens (input, output); MODEL_PRICES='{"id": [in, out]}' overrides
+PRICES: Dict[str, tuple] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "o3-mini": (1.10, 4.40),
+}
+PRICES.update(
+    {k: tuple(v) for k, v in json.loads(os.getenv("MODEL_PRICES", "{}")).items()}
+)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+LATENCY_BUCKETS_MS += (10000, 30000, 60000)
+DIMENSIONS = ("agent", "team", "session", "model", "tool", "day")
+
+
+class Call(NamedTuple):
+    ts: float
+    kind: str  # "model" | "tool"
+    name: str  # model id or tool name
+    agent: str
+    team: str
+    session: str
+    prompt_tokens: int
+    completion_tokens: int
+    ms: float
+    cost: float
+    ok: bool
+
+
+@lru_cache(maxsize=256)
+def price(model: str) -> tuple:
+    """Longest price-table prefix, so dated ids (gpt-4o-2024-08-06) match."""
+    for key in sorted(PRICES, key=len, reverse=True):
+        if model.startswith(key):
+            return PRICES[key]
+    return (0.0, 0.0)
+
+
+def cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    p_in, p_out = price(model)
+    return (prompt_tokens * p_in + completion_tokens * p_out) / 1e6
+
+
+def _quantile(counts: List[int], q: float) -> Optional[float]:
+    """Upper bound of the bucket holding the q-quantile (None past the last)."""
+    total = sum(counts)
+    if not total:
+        return None
+    seen = 0
+    for i, n in enumerate(counts):
+        seen += n
+        if seen >= q * total:
+            return LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else None
+    return None
+
+
+# (agent, team, session) of the innermost instrumented run
+_SCOPE: contextvars.ContextVar = contextvars.ContextVar(
+    "agency_metrics_scope", default=("-", "-", "-")
+)
+
+
+class MetricsCollector:
+    """Ring buffer + running aggregates; every record() is a few dict updates."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        capacity: int = 50_000,
+        rollup_s: float = 300.0,
+        fmt: str = "auto",
+    ):
+        self.path = None
+        if path is not None:
+            self.rollup_to(path)
+        self.rollup_s = rollup_s
+        self.fmt = fmt
+        self.recent: deque = deque(maxlen=capacity)
+        self._pending: List[Call] = []
+        self._totals: Dict[tuple, List[float]] = {}
+        self._hist: Dict[tuple, List[int]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._seq = 0
+        self._summary: Optional[Dict[str, Any]] = None
+        self._summary_seq = -1
+        self.rollups = 0
+
+    # ---------- recording ----------------------------------------------
+    def record(
+        self,
+        kind: str,
+        name: str,
+        ms: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        ok: bool = True,
+    ) -> Call:
+        scope = _SCOPE.get()
+        agent, team, session = scope
+        ts = time.time()
+        dollars = (
+            cost(name, prompt_tokens, completion_tokens) if kind == "model" else 0.0
+        )
+        call = Call(
+            ts, kind, name, *scope, prompt_tokens, completion_tokens, ms, dollars, ok
+        )
+        keys = (
+            ("agent", agent),
+            ("team", team),
+            ("session", session),
+            (kind, name),
+            ("day", int(ts // 86400)),
+        )
+        bucket = bisect.bisect_left(LATENCY_BUCKETS_MS, ms)
+        with self._lock:
+            self._seq += 1
+            self.recent.append(call)
+            if self.path is not None:
+                self._pending.append(call)
+            for key in keys:
+                t = self._totals.get(key)
+                if t is None:
+                    t = self._totals[key] = [0, 0, 0, 0.0, 0, 0.0]
+                t[0] += 1
+                t[1] += prompt_tokens
+                t[2] += completion_tokens
+                t[3] += dollars
+                t[4] += not ok
+                t[5] += ms
+            for key in ((kind, agent), (kind, name)):
+                h = self._hist.get(key)
+                if h is None:
+                    h = self._hist[key] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+                h[bucket] += 1
+        if self.path is not None:
+            self._ensure_rollup()
+        return call
+
+    def on_model_call(
+        self, model: str, usage: Dict[str, int], seconds: float, status: int
+    ):
+        """ModelPool observer."""
+        self.record(
+            "model",
+            model,
+            seconds * 1000,
+            usage.get("prompt_tokens", 0),
+            usage.get("completion_tokens", 0),
+            200 <= status < 400,
+        )
+
+    def observe(self, pool) -> "MetricsCollector":
+        pool.observe(self.on_model_call)
+        return self
+
+    # ---------- tool hooks (agno tool_hooks signature) ------------------
+    def tool_hook(self, function_name: str, function_call, arguments: Dict[str, Any]):
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            result = function_call(**arguments)
+            ok = True
+            return result
+        finally:
+            self.record("tool", function_name, 1000 * (time.perf_counter() - t0), ok=ok)
+
+    async def atool_hook(
+        self, function_name: str, function_call, arguments: Dict[str, Any]
+    ):
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            result = await function_call(**arguments)
+            ok = True
+            return result
+        finally:
+            self.record("tool", function_name, 1000 * (time.perf_counter() - t0), ok=ok)
+
+    # ---------- rollups ------------------------------------------------
+    def rollup_to(self, path: str) -> "MetricsCollector":
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        return self
+
+    def _format(self) -> str:
+        if self.fmt != "auto":
+            return self.fmt
+        try:
+            import pyarrow  # noqa: F401
+
+            return "parquet"
+        except ImportError:
+            return "csv"
+
+    def rollup(self) -> int:
+        """Append calls recorded since the last rollup; returns how many."""
+        with self._lock:
+            calls, self._pending = self._pending, []
+        if not calls or self.path is None:
+            return 0
+        by_day: Dict[str, List[Call]] = {}
+        for c in calls:
+            by_day.setdefault(time.strftime("%Y-%m-%d", time.gmtime(c.ts)), []).append(
+                c
+            )
+        fmt = self._format()
+        for day, rows in by_day.items():
+            if fmt == "parquet":
+                import pyarrow as pa, pyarrow.parquet as pq
+
+                table = pa.Table.from_pylist([c._asdict() for c in rows])
+                name = f"calls-{day}-{int(rows[0].ts * 1000)}.parquet"
+                pq.write_table(table, os.path.join(self.path, name))
+            else:
+                file = os.path.join(self.path, f"calls-{day}.csv")
+                new = not os.path.exists(file)
+                with open(file, "a", newline="") as f:
+                    out = csv.writer(f)
+                    if new:
+                        out.writerow(Call._fields)
+                    out.writerows(rows)
+        with self._lock:
+            self.rollups += 1
+        return len(calls)
+
+    def _ensure_rollup(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._loop, name="metrics-rollup", daemon=True
+                )
+                self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            time.sleep(self.rollup_s)
+            try:
+                self.rollup()
+            except Exception:  # keep collecting; the next pass retries the I/O
+                log.exception("metrics rollup failed")
+
+    # ---------- precomputed views --------------------------------------
+    @staticmethod
+    def _row(t: List[float]) -> Dict[str, Any]:
+        return {
+            "calls": t[0],
+            "prompt_tokens": t[1],
+            "completion_tokens": t[2],
+            "cost_usd": round(t[3], 6),
+            "errors": t[4],
+            "avg_ms": round(t[5] / max(t[0], 1), 1),
+        }
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        """Totals, today, top-N per dimension by cost, latency p50/p95/p99."""
+        with self._lock:
+            if self._summary is not None and self._summary_seq == self._seq:
+                return self._summary
+            seq = self._seq
+            totals = {k: list(v) for k, v in self._totals.items()}
+            hist = {k: list(v) for k, v in self._hist.items()}
+        dims: Dict[str, Dict[str, Any]] = {d: {} for d in DIMENSIONS}
+        for (dim, key), t in totals.items():
+            dims[dim][key] = t
+        today = int(time.time() // 86400)
+        out: Dict[str, Any] = {
+            "all_time": self._row(
+                [sum(t[i] for t in dims["day"].values()) for i in range(6)]
+            ),
+            "today": self._row(dims["day"].get(today, [0, 0, 0, 0.0, 0, 0.0])),
+            "days": {
+                time.strftime("%Y-%m-%d", time.gmtime(d * 86400)): self._row(t)
+                for d, t in sorted(dims["day"].items())[-14:]
+            },
+        }
+        for dim in ("agent", "team", "session", "model", "tool"):
+            ranked = sorted(dims[dim].items(), key=lambda kv: (-kv[1][3], -kv[1][0]))
+            out[f"by_{dim}"] = {k: self._row(t) for k, t in ranked[:top]}
+        out["latency_ms"] = {
+            f"{kind}:{key}": {
+                "count": sum(h),
+                "p50": _quantile(h, 0.50),
+                "p95": _quantile(h, 0.95),
+                "p99": _quantile(h, 0.99),
+            }
+            for (kind, key), h in sorted(hist.items())
+        }
+        out["rollups"] = self.rollups
+        with self._lock:
+            self._summary, self._summary_seq = out, seq
+        return out
+
+    def report(self) -> str:
+        """Short plain-text digest of summary() for a sentinel / Slack post."""
+        s = self.summary(top=5)
+
+        def line(name: str, r: Dict[str, Any]) -> str:
+            return (
+                f"{name}: ${r['cost_usd']:.4f}, {r['calls']} calls, "
+                f"{r['prompt_tokens']}+{r['completion_tokens']} tok, "
+                f"avg {r['avg_ms']}ms, {r['errors']} errors"
+            )
+
+        parts = [line("Today", s["today"]), line("All time", s["all_time"])]
+        for dim in ("team", "agent", "model", "tool"):
+            if s[f"by_{dim}"]:
+                parts.append(f"Top {dim}s:")
+                parts += [f"  {line(k, r)}" for k, r in s[f"by_{dim}"].items()]
+        slow = sorted(
+            (
+                (v["p95"], k)
+                for k, v in s["latency_ms"].items()
+                if v["p95"] is not None
+                and k.startswith("model:")
+                and k[6:] in s["by_agent"]
+            ),
+            reverse=True,
+        )[:5]
+        if slow:
+            parts.append("Slowest p95: " + ", ".join(f"{k} ≤{p}ms" for p, k in slow))
+        return "\n".join(parts)
+
+
+# ---------- agno wiring ------------------------------------------------
+def _scoped_iter(chunks: Iterator, scope: tuple) -> Iterator:
+    """Stream with `scope` active while each chunk is produced."""
+    it = iter(chunks)
+    while True:
+        token = _SCOPE.set(scope)
+        try:
+            chunk = next(it)
+        except StopIteration:
+            return
+        finally:
+            _SCOPE.reset(token)
+        yield chunk
+
+
+async def _ascoped_iter(chunks: AsyncIterator, scope: tuple) -> AsyncIterator:
+    it = chunks.__aiter__()
+    while True:
+        token = _SCOPE.set(scope)
+        try:
+            chunk = await it.__anext__()
+        except StopAsyncIteration:
+            return
+        finally:
+            _SCOPE.reset(token)
+        yield chunk
+
+
+def instrument(obj, metrics: Optional[MetricsCollector] = None):
+    """Attribute obj's model + tool calls to it (idempotent)."""
+    metrics = metrics or METRICS
+    if getattr(obj, "_metered", False):
+        return obj
+    object.__setattr__(obj, "_metered", True)
+    is_team = hasattr(obj, "members")
+    add_tool_hooks(obj, metrics.tool_hook, metrics.atool_hook)
+
+    def scope(kwargs) -> tuple:
+        _, team, session = _SCOPE.get()
+        session = kwargs.get("session_id") or obj.session_id or session
+        return (obj.name, obj.name if is_team else team, session)
+
+    def make(run):
+        def metered_run(message=None, *, stream: bool = False, **kwargs):
+            s = scope(kwargs)
+            token = _SCOPE.set(s)
+            try:
+                result = run(message, stream=stream, **kwargs)
+            finally:
+                _SCOPE.reset(token)
+            return _scoped_iter(result, s) if stream else result
+
+        return metered_run
+
+    def amake(arun):
+        async def metered_arun(message=None, *, stream: bool = False, **kwargs):
+            s = scope(kwargs)
+            token = _SCOPE.set(s)
+            try:
+                result = await arun(message, stream=stream, **kwargs)
+            finally:
+                _SCOPE.reset(token)
+            return _ascoped_iter(result, s) if stream else result
+
+        return metered_arun
+
+    wrap_method(obj, "run", make)
+    return wrap_method(obj, "arun", amake)
+
+
+def instrument_tree(root, metrics: Optional[MetricsCollector] = None):
+    """instrument() a team and every member below it."""
+    instrument(root, metrics)
+    for member in getattr(root, "members", None) or []:
+        instrument_tree(member, metrics)
+    return root
+
+
+def metered(factory, metrics: Optional[MetricsCollector] = None):
+    """Factory wrapper: metered(Agent)(...) builds, then instruments."""
+
+    def build(*args, **kwargs):
+        return instrument(factory(*args, **kwargs), metrics)
+
+    return build
+
+
+# process-wide default; METRICS_DIR enables rollups, METRICS_ROLLUP_S sets the period
+METRICS = MetricsCollector(
+    os.getenv("METRICS_DIR") or None,
+    capacity=int(os.getenv("METRICS_CAPACITY", "50000")),
+    rollup_s=float(os.getenv("METRICS_ROLLUP_S", "300")),
+    fmt=os.getenv("METRICS_FORMAT", "auto"),
+)
+
+
+def spend_report() -> str:
+    """Precomputed token / latency / cost digest: today, all time, top teams,
+    agents, models and tools, slowest agents. Use this instead of raw data."""
+    return METRICS.report()
+
+
+def metrics_stats() -> Dict[str, Any]:
+    return METRICS.summary()
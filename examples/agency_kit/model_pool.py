@@ -0,0 +1,500 @@
+# agency_kit/model_pool.py
+# ======================================================================
+# Process-wide pool of model HTTP clients
+#  • one keep-alive httpx.Client per (model id, api key, base url)
+#  • every OpenAIChat handed out for that key shares the client
+#  • bounded in-flight requests per model (callers wait, never fail): one
+#    cap shared by the sync client and every event loop's async client
+#  • arun() gets a matching httpx.AsyncClient on the same counters
+#  • stats(): requests, new connections, reuse, waits, latency
+#  • observe(fn): fn(model, usage, seconds, status) after every call, with
+#    `usage` parsed from the tail of the body (streamed or not)
+#  • schedule(gate): every call is admitted by gate first (rate limits,
+#    see rate_limit.RateScheduler) and settled with its usage afterwards
+# ======================================================================
+
+import asyncio, logging, os, re, threading, time, weakref
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+PoolKey = Tuple[str, Optional[str], Optional[str]]
+# (model id, {"prompt_tokens": .., "completion_tokens": ..}, seconds, status)
+Observer = Callable[[str, Dict[str, int], float, int], None]
+
+log = logging.getLogger("agency.model_pool")
+TAIL_BYTES = 4096  # OpenAI puts `usage` last: in the body and in the final SSE chunk
+_USAGE = re.compile(rb'"(prompt_tokens|completion_tokens)"\s*:\s*(\d+)')
+
+
+class _Tail:
+    """Last TAIL_BYTES of a response body."""
+
+    __slots__ = ("data",)
+
+    def __init__(self):
+        self.data = b""
+
+    def feed(self, chunk: bytes) -> None:
+        self.data = (self.data + chunk)[-TAIL_BYTES:]
+
+    def usage(self) -> Dict[str, int]:
+        return {k.decode(): int(v) for k, v in _USAGE.findall(self.data)}
+
+
+def _body(request: httpx.Request) -> bytes:
+    try:
+        return request.content
+    except httpx.RequestNotRead:  # streamed upload: size unknown
+        return b""
+
+
+class _Slots:
+    """In-flight cap shared by threads and event loops; freed slots are
+    handed to waiters in arrival order. acquire()/aacquire() → waited."""
+
+    def __init__(self, cap: int):
+        self.cap = cap
+        self._free = cap
+        self._waiters: deque = deque()  # wake callbacks
+        self._lock = threading.Lock()
+
+    def _take(self) -> bool:
+        if self._free and not self._waiters:
+            self._free -= 1
+            return True
+        return False
+
+    def acquire(self) -> bool:
+        with self._lock:
+            if self._take():
+                return False
+            handed = threading.Event()
+            self._waiters.append(handed.set)
+        handed.wait()
+        return True
+
+    async def aacquire(self) -> bool:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._take():
+                return False
+            handed = loop.create_future()
+
+            def wake():
+                try:
+                    loop.call_soon_threadsafe(self._hand, handed)
+                except RuntimeError:  # loop closed: pass the slot on
+                    self.release()
+
+            self._waiters.append(wake)
+        try:
+            await handed
+        except asyncio.CancelledError:
+            with self._lock:
+                queued = wake in self._waiters
+                if queued:
+                    self._waiters.remove(wake)
+            if not queued and handed.done() and not handed.cancelled():
+                self.release()  # the slot arrived as we were cancelled
+            raise
+        return True
+
+    def _hand(self, handed: "asyncio.Future") -> None:
+        if handed.cancelled():
+            self.release()
+        else:
+            handed.set_result(None)
+
+    def release(self) -> None:
+        with self._lock:
+            if not self._waiters:
+                self._free += 1
+                return
+            wake = self._waiters.popleft()
+        wake()
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    """Give the in-flight slot back once the body is consumed (covers streaming)."""
+
+    def __init__(self, inner: httpx.SyncByteStream, release, tail=None):
+        self._inner = inner
+        self._release = release
+        self._tail = tail
+
+    def __iter__(self):
+        for chunk in self._inner:
+            if self._tail is not None:
+                self._tail.feed(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            self._inner.close()
+        finally:
+            self._release()
+
+
+class _ReleasingAsyncStream(httpx.AsyncByteStream):
+    def __init__(self, inner: httpx.AsyncByteStream, release, tail=None):
+        self._inner = inner
+        self._release = release
+        self._tail = tail
+
+    async def __aiter__(self):
+        async for chunk in self._inner:
+            if self._tail is not None:
+                self._tail.feed(chunk)
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._inner.aclose()
+        finally:
+            self._release()
+
+
+class PooledTransport(httpx.BaseTransport):
+    """HTTPTransport with an in-flight cap and connection/latency counters."""
+
+    def __init__(
+        self,
+        label: str,
+        max_in_flight: int,
+        limits: httpx.Limits,
+        observers: Optional[List[Observer]] = None,
+        gate=None,
+        slots: Optional[_Slots] = None,
+    ):
+        self.label = label
+        self.model = label.split("@", 1)[0]
+        self.observers = observers if observers is not None else []
+        self.gate = gate
+        self._inner = httpx.HTTPTransport(limits=limits)
+        self._slots = slots or _Slots(max_in_flight)
+        self._lock = threading.Lock()
+        self.max_in_flight = max_in_flight
+        self.requests = 0
+        self.connections = 0
+        self.waits = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.latency_s = 0.0
+        self.wait_s = 0.0
+
+    def _trace(self, event: str, info: dict) -> None:
+        if event == "connection.connect_tcp.complete":
+            with self._lock:
+                self.connections += 1
+
+    def _started(self, t0: float, waited: bool) -> None:
+        with self._lock:
+            if waited:
+                self.waits += 1
+                self.wait_s += time.perf_counter() - t0
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _finished(
+        self, t0: float, status: int = 0, tail=None, ticket=None, headers=None
+    ) -> None:
+        seconds = time.perf_counter() - t0
+        with self._lock:
+            self.in_flight -= 1
+            self.latency_s += seconds
+        usage = tail.usage() if tail is not None else {}
+        if ticket is not None:
+            self.gate.settle(ticket, usage, status, headers)
+        for fn in self.observers:
+            try:
+                fn(self.model, usage, seconds, status)
+            except Exception:  # metrics must never fail a model call
+                log.exception("model-call observer failed")
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        gate = self.gate
+        ticket = gate.acquire(self.model, _body(request)) if gate is not None else None
+        t0 = time.perf_counter()
+        waited = self._slots.acquire()
+        self._started(t0, waited)
+
+        released = threading.Event()
+        tail = _Tail() if self.observers or ticket else None
+        status, headers = 0, None
+
+        def release():
+            if not released.is_set():
+                released.set()
+                self._finished(t0, status, tail, ticket, headers)
+                self._slots.release()
+
+        request.extensions = {**request.extensions, "trace": self._trace}
+        try:
+            resp = self._inner.handle_request(request)
+        except BaseException:
+            release()
+            raise
+        status, headers = resp.status_code, resp.headers
+        return httpx.Response(
+            status_code=resp.status_code,
+            headers=resp.headers,
+            stream=_ReleasingStream(resp.stream, release, tail),
+            extensions=resp.extensions,
+        )
+
+    def close(self) -> None:
+        self._inner.close()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            done = max(self.requests - self.in_flight, 1)
+            return {
+                "requests": self.requests,
+                "connections": self.connections,
+                "reused": max(self.requests - self.connections, 0),
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "max_in_flight": self.max_in_flight,
+                "waits": self.waits,
+                "avg_wait_ms": 1000 * self.wait_s / max(self.waits, 1),
+                "avg_latency_ms": 1000 * self.latency_s / done,
+            }
+
+
+class AsyncPooledTransport(httpx.AsyncBaseTransport):
+    """Async twin of a PooledTransport: own connections, shared slots/counters.
+
+    httpcore's async pool rescans every connection for every queued request,
+    so it is split into shards of `shard_size` connections; each request goes
+    to the least busy shard.
+    """
+
+    def __init__(
+        self, sync: PooledTransport, limits: httpx.Limits, shard_size: int = 16
+    ):
+        self.sync = sync
+        cap = sync.max_in_flight
+        n = max(1, -(-cap // shard_size))
+        shard_limits = httpx.Limits(
+            max_connections=-(-cap // n),
+            max_keepalive_connections=-(
+                -(limits.max_keepalive_connections or cap) // n
+            ),
+            keepalive_expiry=limits.keepalive_expiry,
+        )
+        self._shards = [httpx.AsyncHTTPTransport(limits=shard_limits) for _ in range(n)]
+        self._busy = [0] * n
+
+    async def _trace(self, event: str, info: dict) -> None:
+        self.sync._trace(event, info)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        gate = self.sync.gate
+        ticket = (
+            await gate.aacquire(self.sync.model, _body(request))
+            if gate is not None
+            else None
+        )
+        t0 = time.perf_counter()
+        waited = await self.sync._slots.aacquire()
+        self.sync._started(t0, waited)
+
+        shard = min(range(len(self._shards)), key=self._busy.__getitem__)
+        self._busy[shard] += 1
+        released = False
+        tail = _Tail() if self.sync.observers or ticket else None
+        status, headers = 0, None
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self._busy[shard] -= 1
+                self.sync._finished(t0, status, tail, ticket, headers)
+                self.sync._slots.release()
+
+        request.extensions = {**request.extensions, "trace": self._trace}
+        try:
+            resp = await self._shards[shard].handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        status, headers = resp.status_code, resp.headers
+        return httpx.Response(
+            status_code=resp.status_code,
+            headers=resp.headers,
+            stream=_ReleasingAsyncStream(resp.stream, release, tail),
+            extensions=resp.extensions,
+        )
+
+    async def aclose(self) -> None:
+        for shard in self._shards:
+            await shard.aclose()
+
+
+_CHAT_CLASS = None
+
+
+def _pooled_chat_class():
+    """OpenAIChat whose async client comes from the pool (agno would hand the
+    sync http_client to AsyncOpenAI, which breaks arun())."""
+    global _CHAT_CLASS
+    if _CHAT_CLASS is None:
+        from dataclasses import dataclass
+        from typing import Any
+
+        from agno.models.openai import OpenAIChat
+        from openai import AsyncOpenAI
+
+        @dataclass
+        class PooledOpenAIChat(OpenAIChat):
+            pool: Optional[Any] = None
+
+            def get_async_client(self) -> AsyncOpenAI:
+                params = self._get_client_params()
+                params["http_client"] = self.pool.async_client(
+                    self.id, self.api_key, self.base_url
+                )
+                return AsyncOpenAI(**params)
+
+        _CHAT_CLASS = PooledOpenAIChat
+    return _CHAT_CLASS
+
+
+class ModelPool:
+    """Hands out OpenAIChat objects that share one pooled client per key."""
+
+    def __init__(
+        self,
+        max_in_flight: int = 8,
+        per_model: Optional[Dict[str, int]] = None,
+        max_keepalive: int = 16,
+        keepalive_expiry: float = 90.0,
+        timeout: float = 120.0,
+    ):
+        self.max_in_flight = max_in_flight
+        self.per_model = per_model or {}
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self._clients: Dict[PoolKey, httpx.Client] = {}
+        self._transports: Dict[PoolKey, PooledTransport] = {}
+        self._slots: Dict[str, _Slots] = {}  # model id → cap over every key
+        # event loop → {key: AsyncClient}; dies with the loop
+        self._async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._observers: List[Observer] = []  # shared by every transport
+        self.gate = None  # admits every call when set (schedule())
+
+    def _limits(self, cap: int) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=cap,
+            max_keepalive_connections=min(cap, self.max_keepalive),
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    @staticmethod
+    def key(
+        model_id: str, api_key: Optional[str] = None, base_url: Optional[str] = None
+    ) -> PoolKey:
+        return (model_id, api_key, base_url or os.getenv("OPENAI_BASE_URL"))
+
+    def client(
+        self,
+        model_id: str,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+    ) -> httpx.Client:
+        key = self.key(model_id, api_key, base_url)
+        with self._lock:
+            if key not in self._clients:
+                cap = self.per_model.get(model_id, self.max_in_flight)
+                slots = self._slots.setdefault(model_id, _Slots(cap))
+                transport = PooledTransport(
+                    f"{model_id}@{key[2] or 'default'}",
+                    cap,
+                    self._limits(cap),
+                    self._observers,
+                    self.gate,
+                    slots,
+                )
+                self._transports[key] = transport
+                self._clients[key] = httpx.Client(
+                    transport=transport, timeout=self.timeout
+                )
+            return self._clients[key]
+
+    def async_client(
+        self,
+        model_id: str,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+    ) -> httpx.AsyncClient:
+        """AsyncClient for the running event loop (async clients are loop-bound)."""
+        self.client(model_id, api_key, base_url)  # makes the shared counters
+        key = self.key(model_id, api_key, base_url)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            if key not in clients:
+                sync = self._transports[key]
+                clients[key] = httpx.AsyncClient(
+                    transport=AsyncPooledTransport(
+                        sync, self._limits(sync.max_in_flight)
+                    ),
+                    timeout=self.timeout,
+                )
+            return clients[key]
+
+    def chat(
+        self,
+        model_id: str,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        **kwargs,
+    ):
+        """OpenAIChat(model_id, ...) wired to the shared clients for its key."""
+        return _pooled_chat_class()(
+            model_id,
+            api_key=api_key,
+            base_url=base_url,
+            http_client=self.client(model_id, api_key, base_url),
+            pool=self,
+            **kwargs,
+        )
+
+    def observe(self, fn: Observer) -> None:
+        """Call fn(model, usage, seconds, status) after every model call."""
+        with self._lock:
+            if fn not in self._observers:
+                self._observers.append(fn)
+
+    def schedule(self, gate) -> None:
+        """Admit every model call through gate.acquire()/aacquire() and report
+        it back with gate.settle() (see rate_limit.RateScheduler)."""
+        with self._lock:
+            self.gate = gate
+            for t in self._transports.values():
+                t.gate = gate
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            transports = list(self._transports.values())
+        return {t.label: t.stats() for t in transports}
+
+    def close(self) -> None:
+        with self._lock:
+            for c in self._clients.values():
+                c.close()
+            self._clients.clear()
+            self._transports.clear()
+            self._slots.clear()
+            # async clients belong to their loops; drop them, the loop closes them
+            self._async_clients.clear()
+
+
+# process-wide default; MODEL_MAX_IN_FLIGHT caps concurrent calls per model
+POOL = ModelPool(max_in_flight=int(os.getenv("MODEL_MAX_IN_FLIGHT", "8")))
@@ -0,0 +1,250 @@
+# agency_kit/parallel_tools.py
+# ======================================================================
+# Concurrent execution of the tool calls a model emits in one turn
+#  • agno's run() executes a turn's tool calls one after another; this
+#    swaps the model's run_function_calls() (per instance) for one that
+#    runs consecutive concurrency-safe calls together on a bounded pool
+#  • a call that isn't declared safe runs alone, between those groups,
+#    so side effects keep their order
+#  • tool_call_started events go out at once, the results (and
+#    tool_call_completed events) in the original call order
+#  • safe = read-only lookups: SAFE_TOOLKITS / SAFE_FUNCTIONS, or declared
+#    with concurrency_safe(fn | Toolkit class) / `concurrency_safe = True`;
+#    safe tools must not start agent runs (the pool is shared and bounded)
+#  • arun(): agno already gathers a turn's calls; ToolPool bounds the safe
+#    ones and lets one model's unsafe calls run one at a time
+#  • turns needing confirmation / user input fall back to agno's own loop
+# ======================================================================
+
+import asyncio, contextvars, inspect, threading, time, weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from agency_kit.hooks import wrap_method
+
+# toolkits whose functions only read or compute: lookups, searches, routes
+SAFE_TOOLKITS = {
+    "ORTools",
+    "DuckDuckGoTools",
+    "GoogleSearchTools",
+    "WikipediaTools",
+    "YFinanceTools",
+    "GoogleMapsTools",
+    "ArxivTools",
+    "HackerNewsTools",
+    "NewspaperTools",
+    "OpenWeatherTools",
+    "ReasoningTools",
+}
+SAFE_FUNCTIONS = {"score_leads", "spend_report"}
+PAUSES = ("requires_confirmation", "requires_user_input", "external_execution")
+
+
+def concurrency_safe(obj: Any = None, safe: bool = True):
+    """Declare a tool function or Toolkit class safe to overlap (decorator)."""
+    if obj is None:
+        return lambda o: concurrency_safe(o, safe)
+    setattr(obj, "concurrency_safe", safe)
+    return obj
+
+
+def is_safe(function: Any) -> bool:
+    entry = getattr(function, "entrypoint", None)
+    target = inspect.unwrap(entry) if callable(entry) else entry
+    owner = getattr(target, "__self__", None)
+    for declared in (entry, target, owner):
+        flag = getattr(declared, "concurrency_safe", None)
+        if isinstance(flag, bool):
+            return flag
+    if owner is not None and type(owner).__name__ in SAFE_TOOLKITS:
+        return True
+    return getattr(function, "name", None) in SAFE_FUNCTIONS
+
+
+def _groups(calls: List[Any]) -> List[List[Any]]:
+    """Consecutive safe calls share a group; an unsafe call is its own."""
+    groups: List[List[Any]] = []
+    open_group = False  # the last group takes more safe calls
+    for fc in calls:
+        safe = is_safe(fc.function)
+        if safe and open_group:
+            groups[-1].append(fc)
+        else:
+            groups.append([fc])
+        open_group = safe
+    return groups
+
+
+class ToolPool:
+    """Bounded pool shared by every instrumented model; per-turn stats."""
+
+    def __init__(self, max_workers: int = 8):
+        self.max_workers = max(1, max_workers)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # event loop → Semaphore bounding safe calls
+        self._loops: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self.counters = dict(turns=0, parallel_turns=0, calls=0, parallel_calls=0)
+        self.tool_s = 0.0  # summed call time in parallel turns
+        self.wall_s = 0.0  # their wall time
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix="tool"
+                )
+            return self._pool
+
+    def _count(self, calls: int, parallel: int, tool_s=0.0, wall_s=0.0) -> None:
+        with self._lock:
+            self.counters["turns"] += 1
+            self.counters["calls"] += calls
+            if parallel:
+                self.counters["parallel_turns"] += 1
+                self.counters["parallel_calls"] += parallel
+                self.tool_s += tool_s
+                self.wall_s += wall_s
+
+    # ---------- run() ----------------------------------------------------
+    def run_function_calls(self, model, original):
+        def run_function_calls(
+            function_calls,
+            function_call_results,
+            additional_messages=None,
+            current_function_call_count: int = 0,
+            function_call_limit: Optional[int] = None,
+        ):
+            calls = list(function_calls)
+            if function_call_limit is not None:
+                calls = calls[
+                    : max(function_call_limit - current_function_call_count, 0)
+                ]
+            groups = _groups(calls)
+            parallel = sum(len(g) for g in groups if len(g) > 1)
+            if (
+                not parallel
+                or any(getattr(fc.function, p, False) for fc in calls for p in PAUSES)
+                or any(fc.function.name == "get_user_input" for fc in calls)
+            ):
+                self._count(len(calls), 0)
+                yield from original(
+                    function_calls,
+                    function_call_results,
+                    additional_messages,
+                    current_function_call_count,
+                    function_call_limit,
+                )
+                return
+            if additional_messages is None:
+                additional_messages = []
+            tool_s, wall_s = 0.0, 0.0
+            for group in groups:
+                if len(group) == 1:
+                    yield from model.run_function_call(
+                        group[0], function_call_results, additional_messages
+                    )
+                    continue
+                t0 = time.perf_counter()
+                outs = [[] for _ in group]
+                gens = [
+                    model.run_function_call(fc, out, additional_messages)
+                    for fc, out in zip(group, outs)
+                ]
+                for gen in gens:
+                    yield next(gen)  # tool_call_started, before the call runs
+                futures = [
+                    self._executor().submit(
+                        contextvars.copy_context().run, self._drain, gen
+                    )
+                    for gen in gens
+                ]
+                for fut, out in zip(futures, outs):
+                    events, seconds = fut.result()
+                    tool_s += seconds
+                    yield from events
+                    function_call_results.extend(out)
+                wall_s += time.perf_counter() - t0
+            self._count(len(calls), parallel, tool_s, wall_s)
+            for fc in function_calls[len(calls) :]:  # over the call limit
+                function_call_results.append(
+                    model.create_tool_call_limit_error_result(fc)
+                )
+            if additional_messages:
+                function_call_results.extend(additional_messages)
+
+        return run_function_calls
+
+    @staticmethod
+    def _drain(gen):
+        t0 = time.perf_counter()
+        events = list(gen)
+        return events, time.perf_counter() - t0
+
+    # ---------- arun() ---------------------------------------------------
+    def arun_function_call(self, original):
+        locks: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+        async def arun_function_call(function_call):
+            loop = asyncio.get_running_loop()
+            with self._lock:
+                if loop not in self._loops:
+                    self._loops[loop] = asyncio.Semaphore(self.max_workers)
+                sem = self._loops[loop]
+                unsafe = locks.setdefault(loop, asyncio.Lock())
+            if is_safe(function_call.function):
+                async with sem:
+                    return await original(function_call)
+            # one model's unsafe calls take turns; other models aren't held up
+            async with unsafe:
+                return await original(function_call)
+
+        return arun_function_call
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.counters,
+                "max_workers": self.max_workers,
+                "tool_s": round(self.tool_s, 3),
+                "wall_s": round(self.wall_s, 3),
+                "saved_s": round(self.tool_s - self.wall_s, 3),
+            }
+
+
+TOOL_POOL = ToolPool()
+
+
+def instrument(obj, pool: Optional[ToolPool] = None):
+    """Run obj's tool calls of one turn concurrently (idempotent)."""
+    pool = pool or TOOL_POOL
+    model = getattr(obj, "model", None)
+    if model is None or getattr(model, "_tool_pool", None) is not None:
+        return obj
+    object.__setattr__(model, "_tool_pool", pool)
+    wrap_method(
+        model, "run_function_calls", lambda m: pool.run_function_calls(model, m)
+    )
+    wrap_method(model, "arun_function_call", pool.arun_function_call)
+    return obj
+
+
+def instrument_tree(root, pool: Optional[ToolPool] = None):
+    """instrument() a team and every member below it."""
+    instrument(root, pool)
+    for member in getattr(root, "members", None) or []:
+        instrument_tree(member, pool)
+    return root
+
+
+def parallel_tools(factory, pool: Optional[ToolPool] = None):
+    """Factory wrapper: parallel_tools(Agent)(...) builds, then instruments."""
+
+    def build(*args, **kwargs):
+        return instrument(factory(*args, **kwargs), pool)
+
+    return build
+
+
+def tool_pool_stats() -> Dict[str, Any]:
+    return TOOL_POOL.stats()
@@ -0,0 +1,435 @@
+# agency_kit/pipeline.py
+# ======================================================================
+# Declarative per-item DAG pipelines (used by the Lead-Gen pipeline)
+#  • Stage(name, fn, after=(...), concurrency=n): fn(item) -> dict patch
+#  • every item walks the DAG on its own: no batch barrier between stages
+#  • stages whose deps are done fan out in parallel for that item
+#  • each stage has its own bounded pool → throughput = stage concurrency
+#  • DagPipeline = head (yields items as they appear) → DAG → reduce
+#  • arun()/asubmit(): same DAG on the event loop, stages via agent.arun()
+#  • astream(): arun() as (event, data) pairs for SSE endpoints – stage
+#    start/finish plus each stage agent's own stream (tool calls, partial
+#    content) through sse.team_events, tagged with the stage and item
+# ======================================================================
+
+import asyncio, contextvars, json, queue, re, threading, time, weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+from agency_kit.registry import rebuild
+from agency_kit.sse import team_events
+from agency_kit.tiered_memory import _FinalAnswer
+
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.M)
+# (emit, tags) while astream() runs: arun_json streams the agent into emit
+_EMIT: contextvars.ContextVar = contextvars.ContextVar("pipeline_emit", default=None)
+
+
+def parse_json(text: Any) -> Any:
+    """Best-effort JSON from an LLM answer (code fences / prose around it)."""
+    if not isinstance(text, str):
+        return text
+    cleaned = _FENCE.sub("", text.strip())
+    try:
+        return json.loads(cleaned)
+    except ValueError:
+        pass
+    for open_, close in (("{", "}"), ("[", "]")):
+        start, end = cleaned.find(open_), cleaned.rfind(close)
+        if start != -1 and end > start:
+            try:
+                return json.loads(cleaned[start : end + 1])
+            except ValueError:
+                continue
+    return {"raw": text}
+
+
+class AgentSlots:
+    """Up to n copies of one agent – agno runs keep per-instance state.
+
+    Copies are rebuilt through the agent's registered factory, so each one
+    is metered, traced and cached like the original.
+    """
+
+    def __init__(self, agent: Any, n: int):
+        self.agent = agent
+        self.n = n
+        self._free: "queue.LifoQueue" = queue.LifoQueue()
+        self._made = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def borrow(self):
+        try:
+            a = self._free.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                make = self._made < self.n
+                if make:
+                    self._made += 1
+                    first = self._made == 1
+            if make:
+                a = self.agent if first else rebuild(self.agent)
+            else:
+                a = self._free.get()
+        try:
+            yield a
+        finally:
+            self._free.put(a)
+
+
+def run_json(agent: Any, payload: Any) -> Any:
+    message = payload if isinstance(payload, str) else json.dumps(payload, default=str)
+    return parse_json(agent.run(message, stream=False).content)
+
+
+async def arun_json(agent: Any, payload: Any) -> Any:
+    message = payload if isinstance(payload, str) else json.dumps(payload, default=str)
+    live = _EMIT.get()
+    if live is None:
+        return parse_json((await agent.arun(message, stream=False)).content)
+    emit, tags = live
+    answer = _FinalAnswer()
+
+    async def seen(chunks):
+        async for chunk in chunks:
+            answer.see(chunk)
+            yield chunk
+
+    chunks = await agent.arun(message, stream=True, stream_intermediate_steps=True)
+    async for event, data in team_events(seen(chunks)):
+        data = {**tags, **data}
+        if data.get("member") is None:
+            data["member"] = tags.get("member") or agent.name
+        emit(event, data)
+    return parse_json(answer.content)
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+    after: Tuple[str, ...] = ()
+    concurrency: int = 4
+    # coroutine twin of fn for arun(); without it fn runs on the stage pool
+    afn: Optional[Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]] = (
+        None
+    )
+
+
+def agent_stage(
+    name: str, agent: Any, after: Tuple[str, ...] = (), concurrency: int = 4
+) -> Stage:
+    """Stage that sends the item as JSON to agent and merges the JSON it returns."""
+    slots = AgentSlots(agent, concurrency)
+
+    def patch(out: Any) -> Dict[str, Any]:
+        if isinstance(out, list):
+            out = out[0] if out else {}
+        return out if isinstance(out, dict) else {name.lower(): out}
+
+    def fn(item: Dict[str, Any]) -> Dict[str, Any]:
+        with slots.borrow() as a:
+            return patch(run_json(a, item))
+
+    async def afn(item: Dict[str, Any]) -> Dict[str, Any]:
+        # the stage semaphore admits at most `concurrency` → a slot is free
+        with slots.borrow() as a:
+            return patch(await arun_json(a, item))
+
+    return Stage(name, fn, tuple(after), concurrency, afn)
+
+
+@dataclass
+class _ItemRun:
+    item: Dict[str, Any]
+    waiting: Dict[str, int]
+    future: Future = field(default_factory=Future)
+    failed: set = field(default_factory=set)
+    left: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class ItemDag:
+    """Runs every submitted item through the stage DAG independently."""
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = {s.name: s for s in stages}
+        self.children: Dict[str, List[str]] = {s.name: [] for s in stages}
+        for s in stages:
+            for dep in s.after:
+                if dep not in self.stages:
+                    raise ValueError(f"stage {s.name!r} depends on unknown {dep!r}")
+                self.children[dep].append(s.name)
+        self._check_acyclic()
+        self._pools = {
+            s.name: ThreadPoolExecutor(s.concurrency, thread_name_prefix=s.name)
+            for s in stages
+        }
+        self._stats_lock = threading.Lock()
+        # event loop → {stage: Semaphore} for asubmit()
+        self._sems: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self.stats = {
+            s.name: {"runs": 0, "errors": 0, "skipped": 0, "busy_s": 0.0}
+            for s in stages
+        }
+
+    def _check_acyclic(self) -> None:
+        indeg = {n: len(s.after) for n, s in self.stages.items()}
+        ready = [n for n, d in indeg.items() if d == 0]
+        seen = 0
+        while ready:
+            n = ready.pop()
+            seen += 1
+            for c in self.children[n]:
+                indeg[c] -= 1
+                if indeg[c] == 0:
+                    ready.append(c)
+        if seen != len(self.stages):
+            raise ValueError("pipeline stages contain a cycle")
+
+    # ---------- execution ---------------------------------------------
+    def submit(self, item: Dict[str, Any]) -> Future:
+        run = _ItemRun(
+            item=dict(item),
+            waiting={n: len(s.after) for n, s in self.stages.items()},
+            left=len(self.stages),
+        )
+        for name, n in run.waiting.items():
+            if n == 0:
+                self._launch(run, name)
+        return run.future
+
+    def _launch(self, run: _ItemRun, name: str) -> None:
+        with run.lock:
+            snapshot = dict(run.item)
+        fut = self._pools[name].submit(
+            contextvars.copy_context().run, self._exec, name, snapshot
+        )
+        fut.add_done_callback(lambda f: self._done(run, name, f))
+
+    def _exec(self, name: str, item: Dict[str, Any]):
+        t0 = time.perf_counter()
+        try:
+            return self.stages[name].fn(item) or {}
+        finally:
+            with self._stats_lock:
+                self.stats[name]["runs"] += 1
+                self.stats[name]["busy_s"] += time.perf_counter() - t0
+
+    def _done(self, run: _ItemRun, name: str, fut: Future) -> None:
+        error = fut.exception()
+        if error is not None:
+            with self._stats_lock:
+                self.stats[name]["errors"] += 1
+        ready = self._settle(run, name, None if error else fut.result(), error)
+        for child in ready:
+            self._launch(run, child)
+
+    def _settle(self, run, name, patch, error) -> List[str]:
+        """Record a finished/failed stage; return children that may start now."""
+        ready, stack = [], [(name, patch, error)]
+        with run.lock:
+            while stack:
+                n, p, err = stack.pop()
+                run.left -= 1
+                if err is not None:
+                    run.failed.add(n)
+                    run.item.setdefault("_errors", {})[n] = str(err)
+                elif p:
+                    run.item.update(p)
+                for child in self.children[n]:
+                    run.waiting[child] -= 1
+                    if run.waiting[child]:
+                        continue
+                    if any(d in run.failed for d in self.stages[child].after):
+                        run.failed.add(child)  # skip: an input is missing
+                        with self._stats_lock:
+                            self.stats[child]["skipped"] += 1
+                        stack.append((child, None, None))
+                    else:
+                        ready.append(child)
+            finished = run.left == 0
+        if finished:
+            run.future.set_result(run.item)
+        return ready
+
+    # ---------- async execution ---------------------------------------
+    def _semaphores(self) -> Dict[str, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        with self._stats_lock:
+            if loop not in self._sems:
+                self._sems[loop] = {
+                    n: asyncio.Semaphore(s.concurrency) for n, s in self.stages.items()
+                }
+            return self._sems[loop]
+
+    async def _aexec(self, name: str, item: Dict[str, Any], emit, key):
+        stage = self.stages[name]
+        async with self._semaphores()[name]:
+            t0 = time.perf_counter()
+            if emit is not None:
+                emit("member_started", {"member": name, "item": key})
+                _EMIT.set((emit, {"member": name, "item": key}))
+            try:
+                if stage.afn is not None:
+                    return await stage.afn(item) or {}
+                loop = asyncio.get_running_loop()
+                return (
+                    await loop.run_in_executor(
+                        self._pools[name],
+                        contextvars.copy_context().run,
+                        stage.fn,
+                        item,
+                    )
+                    or {}
+                )
+            finally:
+                seconds = time.perf_counter() - t0
+                with self._stats_lock:
+                    self.stats[name]["runs"] += 1
+                    self.stats[name]["busy_s"] += seconds
+                if emit is not None:
+                    emit(
+                        "member_finished",
+                        {"member": name, "item": key, "seconds": round(seconds, 3)},
+                    )
+
+    async def asubmit(
+        self,
+        item: Dict[str, Any],
+        emit: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        key: Any = None,
+    ) -> Dict[str, Any]:
+        """Walk one item through the DAG on the event loop; returns the item.
+
+        emit(event, data) is called as stages start and finish (for SSE).
+        """
+        run = _ItemRun(
+            item=dict(item),
+            waiting={n: len(s.after) for n, s in self.stages.items()},
+            left=len(self.stages),
+        )
+        done = asyncio.Event()
+        pending: set = set()  # keep task refs alive until they finish
+
+        def launch(name: str) -> None:
+            task = asyncio.ensure_future(step(name))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        async def step(name: str) -> None:
+            with run.lock:
+                snapshot = dict(run.item)
+            patch, error = None, None
+            try:
+                patch = await self._aexec(name, snapshot, emit, key)
+            except Exception as e:
+                error = e
+                with self._stats_lock:
+                    self.stats[name]["errors"] += 1
+            for child in self._settle(run, name, patch, error):
+                launch(child)
+            if run.future.done():
+                done.set()
+
+        for name, n in run.waiting.items():
+            if n == 0:
+                launch(name)
+        await done.wait()
+        return run.future.result()
+
+    def shutdown(self) -> None:
+        for pool in self._pools.values():
+            pool.shutdown(wait=False)
+
+
+class DagPipeline:
+    """head(message) yields items → ItemDag per item → reduce(items)."""
+
+    def __init__(
+        self,
+        head: Callable[[str], Iterable[Dict[str, Any]]],
+        dag: ItemDag,
+        reduce: Callable[[List[Dict[str, Any]]], Any],
+        ahead: Optional[Callable[[str], AsyncIterable[Dict[str, Any]]]] = None,
+        areduce: Optional[Callable[[List[Dict[str, Any]]], Awaitable[Any]]] = None,
+    ):
+        self.head = head
+        self.dag = dag
+        self.reduce = reduce
+        self.ahead = ahead
+        self.areduce = areduce
+
+    def run(self, message: str) -> Any:
+        futures = [self.dag.submit(item) for item in self.head(message)]
+        return self.reduce([f.result() for f in futures])
+
+    async def arun(
+        self,
+        message: str,
+        emit: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    ) -> Any:
+        """run() on the event loop; missing ahead/areduce fall back to threads."""
+
+        async def walk(i: int, item: Dict[str, Any]) -> Dict[str, Any]:
+            done = await self.dag.asubmit(item, emit, i)
+            if emit is not None:
+                emit("item", {"index": i, "item": done})
+            return done
+
+        if self.ahead is not None:
+            tasks = []
+            async for item in self.ahead(message):
+                tasks.append(asyncio.ensure_future(walk(len(tasks), item)))
+        else:
+            items = await asyncio.to_thread(lambda: list(self.head(message)))
+            tasks = [asyncio.ensure_future(walk(i, it)) for i, it in enumerate(items)]
+        items = list(await asyncio.gather(*tasks))
+        if self.areduce is not None:
+            return await self.areduce(items)
+        return await asyncio.to_thread(self.reduce, items)
+
+    async def astream(self, message: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """arun() as events: member_started/finished per stage, item, content."""
+        events: "asyncio.Queue" = asyncio.Queue()
+        end = object()
+
+        def emit(event: str, data: Dict[str, Any]) -> None:
+            events.put_nowait((event, data))
+
+        async def drive() -> Any:
+            _EMIT.set((emit, {}))  # own task: the head's agents stream too
+            try:
+                return await self.arun(message, emit)
+            finally:
+                events.put_nowait(end)
+
+        task = asyncio.ensure_future(drive())
+        try:
+            while (event := await events.get()) is not end:
+                yield event
+            result = task.result()  # re-raises a failed run
+            yield "content", {
+                "delta": (
+                    result
+                    if isinstance(result, str)
+                    else json.dumps(result, default=str)
+                ),
+                "member": None,
+            }
+        finally:
+            task.cancel()
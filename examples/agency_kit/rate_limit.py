@@ -0,0 +1,477 @@
+# agency_kit/rate_limit.py
+# ======================================================================
+# Process-wide rate limiter + priority scheduler for model calls
+#  • token buckets per model for requests/min and tokens/min (OpenAI
+#    tier-1 figures for gpt-4o / gpt-4o-mini; MODEL_RATE_LIMITS overrides,
+#    "*" covers any other model)
+#  • sits in the model pool's transports (govern(POOL)): a call over budget
+#    waits for its turn – threads block, arun() awaits – instead of failing
+#  • priority classes interactive > executive > background, served strictly
+#    in that order; within a class sessions take turns (round robin), so
+#    one big request can't starve the others
+#  • class + session ride on a contextvar: priority(...), instrument(obj,
+#    cls) / prioritised(factory, cls), scoped(...) for streams; a nested
+#    run keeps the higher class of its caller
+#  • tokens charged up front (body bytes / 4 + max_tokens, else the model's
+#    recent completion size), topped up from `usage` if the reply was bigger
+#  • a 429 that still gets through (other processes on the key) pauses that
+#    model for Retry-After; the SDK's retry then queues like any other call
+#  • stats(): queue depth per class, waits p50/p95/max, bucket levels, 429s
+# ======================================================================
+
+import asyncio, contextlib, contextvars, json, os, re, threading, time
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Tuple
+
+from agency_kit.hooks import wrap_method
+
+PRIORITIES = ("interactive", "executive", "background")  # highest first
+DEFAULT_CLASS = "executive"  # calls made outside any priority scope
+# (requests, tokens) per minute – OpenAI usage tier 1
+DEFAULT_LIMITS: Dict[str, Tuple[int, int]] = {
+    "gpt-4o": (500, 30_000),
+    "gpt-4o-mini": (500, 200_000),
+}
+_MAX_OUT = re.compile(rb'"max(?:_completion)?_tokens"\s*:\s*(\d+)')
+
+# (class, session) of the innermost prioritised run; None = not set
+_SCOPE: contextvars.ContextVar = contextvars.ContextVar(
+    "agency_rate_scope", default=(None, None)
+)
+
+
+def _rank(cls: str) -> int:
+    if cls not in PRIORITIES:
+        raise ValueError(
+            f"unknown priority class {cls!r}, expected one of {PRIORITIES}"
+        )
+    return PRIORITIES.index(cls)
+
+
+def _merge(cls: str, session: Optional[str]) -> Tuple[str, Optional[str]]:
+    """Scope for a run in `cls` under the current one: the caller's higher
+    class and its session win."""
+    outer_cls, outer_session = _SCOPE.get()
+    if outer_cls is not None and _rank(outer_cls) < _rank(cls):
+        cls = outer_cls
+    return cls, outer_session or session
+
+
+def current() -> Tuple[str, str]:
+    cls, session = _SCOPE.get()
+    return cls or DEFAULT_CLASS, session or "-"
+
+
+@contextlib.contextmanager
+def priority(cls: str, session: Optional[str] = None):
+    """`with priority("background"):` – model calls inside queue in that class."""
+    token = _SCOPE.set(_merge(cls, session))
+    try:
+        yield
+    finally:
+        _SCOPE.reset(token)
+
+
+def _scoped_iter(chunks: Iterator, scope: tuple) -> Iterator:
+    it = iter(chunks)
+    while True:
+        token = _SCOPE.set(scope)
+        try:
+            chunk = next(it)
+        except StopIteration:
+            return
+        finally:
+            _SCOPE.reset(token)
+        yield chunk
+
+
+async def _ascoped_iter(chunks: AsyncIterator, scope: tuple) -> AsyncIterator:
+    it = chunks.__aiter__()
+    while True:
+        token = _SCOPE.set(scope)
+        try:
+            chunk = await it.__anext__()
+        except StopAsyncIteration:
+            return
+        finally:
+            _SCOPE.reset(token)
+        yield chunk
+
+
+def scoped(chunks, cls: str, session: Optional[str] = None):
+    """Stream (sync or async iterator) whose items are produced in `cls`."""
+    scope = _merge(cls, session)
+    if hasattr(chunks, "__aiter__"):
+        return _ascoped_iter(chunks, scope)
+    return _scoped_iter(chunks, scope)
+
+
+# ---------- scheduler --------------------------------------------------
+class _Bucket:
+    """Refilled at `rate`/s up to `capacity`; goes negative when a reply
+    costs more than was charged."""
+
+    __slots__ = ("capacity", "rate", "level", "stamp")
+
+    def __init__(self, capacity: float, rate: float, now: float):
+        self.capacity = float(capacity)
+        self.rate = rate
+        self.level = self.capacity
+        self.stamp = now
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def wait_s(self, amount: float) -> float:
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate)
+
+
+class _Ticket:
+    __slots__ = ("model", "cls", "session", "tokens", "t0", "granted", "wake")
+
+    def __init__(self, model, cls, session, tokens, wake):
+        self.model, self.cls, self.session = model, cls, session
+        self.tokens = tokens
+        self.t0 = time.monotonic()
+        self.granted = False
+        self.wake = wake
+
+
+class _Model:
+    """Buckets, per-class session queues and counters of one model."""
+
+    def __init__(
+        self, rpm: int, tpm: int, period_s: float, headroom: float, out_tokens
+    ):
+        now = time.monotonic()
+        self.rpm, self.tpm = rpm, tpm
+        # the provider counts a call when it arrives, later than we do, so its
+        # bucket can briefly be fuller than ours; headroom keeps bursts under it
+        self.requests = _Bucket(rpm * (1 - headroom), rpm / period_s, now)
+        self.tokens = _Bucket(tpm * (1 - headroom), tpm / period_s, now)
+        # class → session → tickets; sessions rotate after each admission
+        self.queues: Dict[str, "OrderedDict[str, deque]"] = {
+            cls: OrderedDict() for cls in PRIORITIES
+        }
+        self.waiting = 0
+        self.paused_until = 0.0
+        self.out_tokens = out_tokens  # running estimate of completion size
+        self.counters = dict(
+            admitted=0, cancelled=0, throttled_429=0, tokens_charged=0, tokens_used=0
+        )
+        self.by_class = {
+            cls: dict(admitted=0, waited=0, wait_s=0.0, max_wait_s=0.0)
+            for cls in PRIORITIES
+        }
+        self.recent = {cls: deque(maxlen=1024) for cls in PRIORITIES}
+
+    def head(self) -> Tuple[Optional[_Ticket], Any]:
+        for cls in PRIORITIES:
+            sessions = self.queues[cls]
+            if sessions:
+                return next(iter(sessions.values()))[0], sessions
+        return None, None
+
+    def remove(self, ticket: _Ticket, sessions=None) -> None:
+        sessions = sessions if sessions is not None else self.queues[ticket.cls]
+        queue = sessions[ticket.session]
+        queue.remove(ticket)
+        if queue:
+            sessions.move_to_end(ticket.session)  # next session's turn
+        else:
+            del sessions[ticket.session]
+        self.waiting -= 1
+
+
+class RateScheduler:
+    """Admits model calls per model budget, by class, fair across sessions."""
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Tuple[int, int]]] = None,
+        period_s: float = 60.0,
+        headroom: float = 0.05,
+        out_tokens: int = 256,
+    ):
+        self.limits = {
+            model: tuple(v)
+            for model, v in (DEFAULT_LIMITS if limits is None else limits).items()
+        }
+        self.period_s = period_s
+        self.headroom = headroom
+        self.out_tokens = out_tokens
+        self.unlimited = 0  # calls to models without a limit
+        self._models: Dict[str, _Model] = {}
+        self._cond = threading.Condition(threading.Lock())
+        self._wake_at: Optional[float] = None
+        self._timer: Optional[threading.Thread] = None
+
+    def govern(self, pool) -> "RateScheduler":
+        """Admit every call of a ModelPool through this scheduler."""
+        pool.schedule(self)
+        return self
+
+    def _model(self, model: str) -> Optional[_Model]:
+        m = self._models.get(model)
+        if m is None:
+            limit = self.limits.get(model) or self.limits.get("*")
+            if limit is None:
+                return None
+            m = self._models[model] = _Model(
+                *limit, self.period_s, self.headroom, self.out_tokens
+            )
+        return m
+
+    # ---------- admission ------------------------------------------------
+    def _enqueue(self, model: str, body: bytes, wake: Callable) -> Optional[_Ticket]:
+        cls, session = current()
+        out = _MAX_OUT.search(body or b"")
+        with self._cond:
+            m = self._model(model)
+            if m is None:
+                self.unlimited += 1
+                return None
+            tokens = len(body or b"") // 4
+            tokens += int(out.group(1)) if out else round(m.out_tokens)
+            ticket = _Ticket(model, cls, session, tokens, wake)
+            m.queues[cls].setdefault(session, deque()).append(ticket)
+            m.waiting += 1
+            self._pump(time.monotonic())
+            return ticket
+
+    def _pump(self, now: float) -> None:
+        """Admit queued calls that fit; arm the timer for the first that doesn't."""
+        wake_at = None
+        for m in self._models.values():
+            while m.waiting:
+                if m.paused_until > now:
+                    due = m.paused_until
+                    break
+                ticket, sessions = m.head()
+                m.requests.refill(now)
+                m.tokens.refill(now)
+                wait = max(m.requests.wait_s(1), m.tokens.wait_s(ticket.tokens))
+                if wait > 0:  # strict priority: nothing overtakes the head
+                    due = now + wait
+                    break
+                m.requests.level -= 1
+                m.tokens.level -= ticket.tokens
+                m.remove(ticket, sessions)
+                self._grant(m, ticket, now)
+            else:
+                continue
+            wake_at = due if wake_at is None else min(wake_at, due)
+        if wake_at is not None and (self._wake_at is None or wake_at < self._wake_at):
+            self._wake_at = wake_at
+            if self._timer is None:
+                self._timer = threading.Thread(
+                    target=self._run_timer, name="rate-scheduler", daemon=True
+                )
+                self._timer.start()
+            self._cond.notify()
+
+    def _grant(self, m: _Model, ticket: _Ticket, now: float) -> None:
+        waited = now - ticket.t0
+        c = m.by_class[ticket.cls]
+        c["admitted"] += 1
+        c["waited"] += waited > 1e-3
+        c["wait_s"] += waited
+        c["max_wait_s"] = max(c["max_wait_s"], waited)
+        m.recent[ticket.cls].append(waited)
+        m.counters["admitted"] += 1
+        m.counters["tokens_charged"] += ticket.tokens
+        ticket.granted = True
+        ticket.wake()
+
+    def _run_timer(self) -> None:
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._wake_at is not None and self._wake_at <= now:
+                    self._wake_at = None
+                    self._pump(now)
+                    continue
+                self._cond.wait(None if self._wake_at is None else self._wake_at - now)
+
+    def acquire(self, model: str, body: bytes = b"") -> Optional[_Ticket]:
+        """Block until a call to `model` fits; None if the model isn't limited."""
+        admitted = threading.Event()
+        ticket = self._enqueue(model, body, admitted.set)
+        if ticket is not None:
+            admitted.wait()
+        return ticket
+
+    async def aacquire(self, model: str, body: bytes = b"") -> Optional[_Ticket]:
+        loop = asyncio.get_running_loop()
+        admitted = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(
+                lambda: admitted.done() or admitted.set_result(None)
+            )
+
+        ticket = self._enqueue(model, body, wake)
+        if ticket is not None and not ticket.granted:
+            try:
+                await admitted
+            except BaseException:  # cancelled while queued
+                self.cancel(ticket)
+                raise
+        return ticket
+
+    def cancel(self, ticket: _Ticket) -> None:
+        """Drop a queued call, or hand back the budget of an admitted one."""
+        with self._cond:
+            m = self._models[ticket.model]
+            m.counters["cancelled"] += 1
+            if ticket.granted:
+                m.requests.level += 1
+                m.tokens.level += ticket.tokens
+            else:
+                m.remove(ticket)
+            self._pump(time.monotonic())
+
+    def settle(
+        self,
+        ticket: _Ticket,
+        usage: Dict[str, int],
+        status: int = 200,
+        headers: Optional[Any] = None,
+    ) -> None:
+        """After the call: charge what the reply cost beyond the estimate;
+        pause the model on a provider 429."""
+        with self._cond:
+            m = self._models[ticket.model]
+            now = time.monotonic()
+            completion = usage.get("completion_tokens")
+            if completion is not None:
+                m.out_tokens = 0.8 * m.out_tokens + 0.2 * completion
+            used = usage.get("prompt_tokens", 0) + (completion or 0)
+            m.counters["tokens_used"] += used
+            if used > ticket.tokens:
+                m.tokens.refill(now)
+                m.tokens.level -= used - ticket.tokens
+            if status == 429:
+                m.counters["throttled_429"] += 1
+                m.paused_until = max(m.paused_until, now + self._retry_after(headers))
+            self._pump(now)
+
+    def _retry_after(self, headers) -> float:
+        headers = headers or {}
+        for name, scale in (("retry-after-ms", 1e-3), ("retry-after", 1.0)):
+            try:
+                return float(headers.get(name)) * scale
+            except (TypeError, ValueError):
+                continue
+        return self.period_s / 60  # a second, at per-minute limits
+
+    # ---------- report ---------------------------------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            now = time.monotonic()
+            models = {}
+            for name, m in self._models.items():
+                m.requests.refill(now)
+                m.tokens.refill(now)
+                classes = {}
+                for cls in PRIORITIES:
+                    c, recent = m.by_class[cls], sorted(m.recent[cls])
+                    classes[cls] = {
+                        "queued": sum(len(q) for q in m.queues[cls].values()),
+                        "sessions": len(m.queues[cls]),
+                        "admitted": c["admitted"],
+                        "waited": c["waited"],
+                        "avg_wait_ms": round(
+                            1000 * c["wait_s"] / max(c["admitted"], 1), 1
+                        ),
+                        "p50_wait_ms": (
+                            round(1000 * recent[len(recent) // 2], 1) if recent else 0.0
+                        ),
+                        "p95_wait_ms": (
+                            round(1000 * recent[int(0.95 * (len(recent) - 1))], 1)
+                            if recent
+                            else 0.0
+                        ),
+                        "max_wait_ms": round(1000 * c["max_wait_s"], 1),
+                    }
+                models[name] = {
+                    "rpm": m.rpm,
+                    "tpm": m.tpm,
+                    "requests_left": round(m.requests.level, 1),
+                    "tokens_left": round(m.tokens.level),
+                    "queued": m.waiting,
+                    "paused_s": round(max(m.paused_until - now, 0.0), 3),
+                    "out_tokens_est": round(m.out_tokens),
+                    **m.counters,
+                    "classes": classes,
+                }
+            return {
+                "period_s": self.period_s,
+                "unlimited_calls": self.unlimited,
+                "models": models,
+            }
+
+
+# ---------- agno wiring ------------------------------------------------
+def instrument(obj, cls: str):
+    """Run obj – and everything it delegates to – in priority class `cls`."""
+    _rank(cls)
+    if getattr(obj, "_rate_class", None) is not None:
+        return obj
+    object.__setattr__(obj, "_rate_class", cls)
+
+    def scope(kwargs) -> tuple:
+        return _merge(cls, kwargs.get("session_id") or getattr(obj, "session_id", None))
+
+    def make(run):
+        def prioritised_run(message=None, *, stream: bool = False, **kwargs):
+            s = scope(kwargs)
+            token = _SCOPE.set(s)
+            try:
+                result = run(message, stream=stream, **kwargs)
+            finally:
+                _SCOPE.reset(token)
+            return _scoped_iter(result, s) if stream else result
+
+        return prioritised_run
+
+    def amake(arun):
+        async def prioritised_arun(message=None, *, stream: bool = False, **kwargs):
+            s = scope(kwargs)
+            token = _SCOPE.set(s)
+            try:
+                result = await arun(message, stream=stream, **kwargs)
+            finally:
+                _SCOPE.reset(token)
+            return _ascoped_iter(result, s) if stream else result
+
+        return prioritised_arun
+
+    wrap_method(obj, "run", make)
+    return wrap_method(obj, "arun", amake)
+
+
+def prioritised(factory, cls: str):
+    """Factory wrapper: prioritised(Agent, "background")(...) builds, then
+    instruments."""
+
+    def build(*args, **kwargs):
+        return instrument(factory(*args, **kwargs), cls)
+
+    return build
+
+
+def _env_limits() -> Dict[str, Tuple[int, int]]:
+    """DEFAULT_LIMITS + MODEL_RATE_LIMITS='{"gpt-4o": [rpm, tpm], "*": [..]}'."""
+    limits = dict(DEFAULT_LIMITS)
+    limits.update(json.loads(os.getenv("MODEL_RATE_LIMITS", "{}")))
+    return limits
+
+
+# process-wide default; attach with SCHEDULER.govern(POOL)
+SCHEDULER = RateScheduler(_env_limits())
+
+
+def rate_limit_stats() -> Dict[str, Any]:
+    return SCHEDULER.stats()
@@ -0,0 +1,176 @@
+# agency_kit/registry.py
+# ======================================================================
+# Lazy agent registry
+#  • agents, teams, toolkits and models are *described* at import time
+#  • each one is built the first time something touches it, then kept
+#  • AGENCY_LAZY=0 builds everything eagerly (old behaviour)
+#  • rebuild(obj): another instance through the same factory chain, so it
+#    carries the same wrappers (metrics, tracing, caches …); used for the
+#    extra per-stage copies of an agent
+#  • importable("pkg.mod:Name"): a factory that imports its module on the
+#    first build, so toolkit modules aren't imported by describing them
+# ======================================================================
+
+import importlib, threading
+from typing import Any, Callable, Dict, List, Optional
+
+_UNBUILT = object()
+
+
+def importable(path: str) -> Callable:
+    """'agno.tools.slack:SlackTools' → factory importing the module when called."""
+    module, _, name = path.partition(":")
+
+    def build(*args, **kwargs):
+        return getattr(importlib.import_module(module), name)(*args, **kwargs)
+
+    build.__name__ = build.__qualname__ = name
+    return build
+
+
+def resolve_all(value: Any) -> Any:
+    """Build every `Lazy` found in value (recursing into lists/tuples/dicts)."""
+    if isinstance(value, Lazy):
+        return value.resolve()
+    if isinstance(value, list):
+        return [resolve_all(v) for v in value]
+    if isinstance(value, tuple):
+        return tuple(resolve_all(v) for v in value)
+    if isinstance(value, dict):
+        return {k: resolve_all(v) for k, v in value.items()}
+    return value
+
+
+def fresh_all(value: Any) -> Any:
+    """resolve_all(), except anonymous `Lazy`s (toolkits, models) are built anew."""
+    if isinstance(value, Lazy):
+        return value.fresh() if value.key is None else value.resolve()
+    if isinstance(value, list):
+        return [fresh_all(v) for v in value]
+    if isinstance(value, tuple):
+        return tuple(fresh_all(v) for v in value)
+    if isinstance(value, dict):
+        return {k: fresh_all(v) for k, v in value.items()}
+    return value
+
+
+class Lazy:
+    """Deferred `factory(*args, **kwargs)`; attribute access builds and forwards."""
+
+    __slots__ = ("key", "_factory", "_args", "_kwargs", "_obj", "_lock", "_on_build")
+
+    def __init__(
+        self,
+        key: Optional[str],
+        factory: Callable,
+        args: tuple,
+        kwargs: dict,
+        on_build: Optional[Callable[["Lazy"], None]] = None,
+    ):
+        object.__setattr__(self, "key", key)
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_args", args)
+        object.__setattr__(self, "_kwargs", kwargs)
+        object.__setattr__(self, "_obj", _UNBUILT)
+        object.__setattr__(self, "_lock", threading.RLock())
+        object.__setattr__(self, "_on_build", on_build)
+
+    @property
+    def built(self) -> bool:
+        return self._obj is not _UNBUILT
+
+    @property
+    def name(self):
+        # routers/delegators look members up by name; don't build for that
+        return self.key if self.key is not None else self.resolve().name
+
+    def resolve(self) -> Any:
+        if self._obj is _UNBUILT:
+            with self._lock:
+                if self._obj is _UNBUILT:
+                    obj = self._factory(
+                        *resolve_all(self._args), **resolve_all(self._kwargs)
+                    )
+                    object.__setattr__(self, "_obj", obj)
+                    if self._on_build is not None:
+                        self._on_build(self)
+        return self._obj
+
+    def fresh(self) -> Any:
+        """A new, separate build from the same factory (not kept)."""
+        return self._factory(*fresh_all(self._args), **fresh_all(self._kwargs))
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self.resolve(), item)
+
+    def __setattr__(self, item: str, value: Any) -> None:
+        setattr(self.resolve(), item, value)
+
+    def __repr__(self) -> str:
+        state = "built" if self.built else "deferred"
+        return f"<Lazy {self.key or getattr(self._factory, '__name__', '?')} {state}>"
+
+
+class LazyRegistry:
+    """Named lazy objects (agents/teams) plus anonymous ones (toolkits/models)."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._named: Dict[str, Any] = {}
+        self._anon_total = 0
+        self._anon_built = 0
+        self._lock = threading.Lock()
+
+    # ---------- description -------------------------------------------
+    def add(self, key: str, factory: Callable, *args, **kwargs) -> Any:
+        """Register `factory(*args, **kwargs)` under key; returns a `Lazy` or the object."""
+        if key in self._named:
+            raise ValueError(f"'{key}' is already registered")
+        obj = Lazy(key, factory, args, kwargs)
+        if not self.enabled:
+            spec, obj = obj, obj.resolve()
+            object.__setattr__(obj, "_lazy_spec", spec)  # for rebuild()
+        self._named[key] = obj
+        return obj
+
+    def defer(self, factory: Callable, *args, **kwargs) -> Any:
+        """Anonymous lazy object, e.g. `defer(SlackTools)` inside a tools list."""
+        with self._lock:
+            self._anon_total += 1
+        if not self.enabled:
+            self._count_anon(None)
+            return factory(*resolve_all(args), **resolve_all(kwargs))
+        return Lazy(None, factory, args, kwargs, on_build=self._count_anon)
+
+    def _count_anon(self, _):
+        with self._lock:
+            self._anon_built += 1
+
+    # ---------- lookup ------------------------------------------------
+    def get(self, key: str) -> Any:
+        return resolve_all(self._named[key])
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._named
+
+    def names(self) -> List[str]:
+        return list(self._named)
+
+    def built(self) -> List[str]:
+        return [k for k, v in self._named.items() if not isinstance(v, Lazy) or v.built]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "registered": len(self._named),
+            "built": len(self.built()),
+            "deferred_objects": self._anon_total,
+            "deferred_built": self._anon_built,
+        }
+
+
+def rebuild(obj: Any) -> Any:
+    """Another instance built like obj: registered objects go through their
+    factory again (same wrappers); anything else falls back to agno's
+    deep_copy(), which keeps no instance-level wrappers."""
+    spec = obj if isinstance(obj, Lazy) else getattr(obj, "_lazy_spec", None)
+    return spec.fresh() if spec is not None else obj.deep_copy()
@@ -0,0 +1,269 @@
+# agency_kit/response_cache.py
+# ======================================================================
+# Content-addressed response cache for leaf worker agents
+#  • key = sha256(model id, role, instructions, tool set, input messages)
+#  • tier 1: in-memory LRU      tier 2: JSON files under <mem>/responses
+#  • TTL + entry/byte budgets, hit/miss counters
+#  • agents holding side-effecting toolkits are never cached
+#  • streamed runs store only the final answer (RunCompleted, else the
+#    RunResponse deltas) – tool results / event text never reach the cache
+# ======================================================================
+
+import hashlib, json, logging, os, pathlib, threading, time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+from agency_kit.hooks import tool_names, wrap_method
+from agency_kit.tiered_memory import _FinalAnswer
+
+log = logging.getLogger("agency.cache")
+
+# toolkits that post, send, write or execute – a cached answer would skip that
+SIDE_EFFECT_TOOLS = {
+    "SlackTools",
+    "GmailTools",
+    "TwilioTools",
+    "EmailTools",
+    "XTools",
+    "GoogleCalendarTools",
+    "NotionTools",
+    "GoogleDriveTools",
+    "FileTools",
+    "ShellTools",
+    "PythonTools",
+    "ReplicateTools",
+    "CsvTools",
+}
+
+
+def has_side_effects(tools) -> bool:
+    return any(name in SIDE_EFFECT_TOOLS for name in tool_names(tools))
+
+
+def cache_key(
+    model_id: str, role: Optional[str], instructions: Any, tools, messages: Any
+) -> str:
+    blob = json.dumps(
+        {
+            "model": model_id,
+            "role": role,
+            "instructions": instructions,
+            "tools": tool_names(tools),
+            "messages": messages,
+        },
+        sort_keys=True,
+        default=str,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier (LRU + disk) string cache with TTL and size eviction."""
+
+    def __init__(
+        self,
+        path: str,
+        ttl_s: float = 7 * 24 * 3600,
+        max_entries: int = 512,
+        max_disk_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.dir = pathlib.Path(path)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._mem: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = sum(f.stat().st_size for f in self.dir.glob("*/*.json"))
+        self.counters = dict(
+            hits_memory=0, hits_disk=0, misses=0, stores=0, evictions=0, excluded=0
+        )
+
+    def _file(self, key: str) -> pathlib.Path:
+        return self.dir / key[:2] / f"{key}.json"
+
+    # ---------- lookup / store ----------------------------------------
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None and hit[0] > now:
+                self._mem.move_to_end(key)
+                self.counters["hits_memory"] += 1
+                return hit[1]
+            self._mem.pop(key, None)
+
+        f = self._file(key)
+        try:
+            entry = json.loads(f.read_text())
+        except (OSError, ValueError):
+            entry = None
+        with self._lock:
+            if entry is None or entry["expires"] <= now:
+                if entry is not None:
+                    self._remove_file(f)
+                self.counters["misses"] += 1
+                return None
+            self._remember(key, entry["expires"], entry["content"])
+            self.counters["hits_disk"] += 1
+            return entry["content"]
+
+    def put(self, key: str, content: str) -> None:
+        expires = time.time() + self.ttl_s
+        data = json.dumps({"expires": expires, "content": content}, ensure_ascii=False)
+        f = self._file(key)
+        f.parent.mkdir(exist_ok=True)
+        tmp = f.with_suffix(".tmp")
+        tmp.write_text(data)
+        old = f.stat().st_size if f.exists() else 0
+        os.replace(tmp, f)
+        with self._lock:
+            self._remember(key, expires, content)
+            self._disk_bytes += len(data.encode()) - old
+            self.counters["stores"] += 1
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _remember(self, key: str, expires: float, content: str) -> None:
+        self._mem[key] = (expires, content)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def _remove_file(self, f: pathlib.Path) -> None:
+        try:
+            size = f.stat().st_size
+            f.unlink()
+            self._disk_bytes -= size
+        except OSError:
+            pass
+
+    def _evict_disk(self) -> None:
+        """Drop least-recently-written files until 90% of the byte budget."""
+        files = sorted(self.dir.glob("*/*.json"), key=lambda p: p.stat().st_mtime)
+        for f in files:
+            if self._disk_bytes <= 0.9 * self.max_disk_bytes:
+                break
+            self._remove_file(f)
+            self._mem.pop(f.stem, None)
+            self.counters["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = (
+                self.counters["hits_memory"]
+                + self.counters["hits_disk"]
+                + self.counters["misses"]
+            )
+            hits = self.counters["hits_memory"] + self.counters["hits_disk"]
+            return {
+                **self.counters,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._mem),
+                "disk_bytes": self._disk_bytes,
+            }
+
+
+# ---------- agent integration -----------------------------------------
+def _agent_key(agent, message, kwargs) -> Optional[str]:
+    if any(kwargs.get(k) for k in ("images", "videos", "audio", "files", "messages")):
+        return None  # media / raw message lists: not worth hashing
+    model_id = getattr(agent.model, "id", None)
+    return cache_key(model_id, agent.role, agent.instructions, agent.tools, message)
+
+
+def cache_agent(agent, cache: ResponseCache):
+    """Serve agent.run()/arun() from cache when possible; side-effect agents pass through."""
+    if has_side_effects(agent.tools):
+        with cache._lock:
+            cache.counters["excluded"] += 1
+        log.info("response cache: %s excluded (side-effect tools)", agent.name)
+        return agent
+
+    from agno.run.response import RunResponse
+
+    def lookup(message, kwargs):
+        key = _agent_key(agent, message, kwargs)
+        content = cache.get(key) if key else None
+        if content is None:
+            return key, None
+        response = RunResponse(
+            content=content,
+            agent_id=agent.agent_id,
+            model=getattr(agent.model, "id", None),
+        )
+        agent.run_response = response
+        return key, response
+
+    def make(run):
+        def cached_run(message=None, *, stream: bool = False, **kwargs):
+            key, hit = lookup(message, kwargs)
+            if hit is not None:
+                return iter([hit]) if stream else hit
+            result = run(message, stream=stream, **kwargs)
+            if key is None:
+                return result
+            if not stream:
+                if isinstance(result.content, str):
+                    cache.put(key, result.content)
+                return result
+            return _store_when_done(result, key, cache)
+
+        return cached_run
+
+    def amake(arun):
+        async def cached_arun(message=None, *, stream: bool = False, **kwargs):
+            key, hit = lookup(message, kwargs)
+            if hit is not None:
+                return _aiter_one(hit) if stream else hit
+            result = await arun(message, stream=stream, **kwargs)
+            if key is None:
+                return result
+            if not stream:
+                if isinstance(result.content, str):
+                    cache.put(key, result.content)
+                return result
+            return _astore_when_done(result, key, cache)
+
+        return cached_arun
+
+    wrap_method(agent, "run", make)
+    return wrap_method(agent, "arun", amake)
+
+
+def _store_when_done(chunks: Iterator, key: str, cache: ResponseCache) -> Iterator:
+    answer = _FinalAnswer()
+    for chunk in chunks:
+        answer.see(chunk)
+        yield chunk
+    _store(answer, key, cache)
+
+
+def _store(answer: _FinalAnswer, key: str, cache: ResponseCache) -> None:
+    if isinstance(answer.content, str) and answer.content:
+        cache.put(key, answer.content)
+
+
+async def _aiter_one(item) -> AsyncIterator:
+    yield item
+
+
+async def _astore_when_done(
+    chunks: AsyncIterator, key: str, cache: ResponseCache
+) -> AsyncIterator:
+    answer = _FinalAnswer()
+    async for chunk in chunks:
+        answer.see(chunk)
+        yield chunk
+    _store(answer, key, cache)
+
+
+def cached(factory, cache: ResponseCache):
+    """Factory wrapper: cached(Agent, cache)(**agent_kwargs)."""
+
+    def build(*args, **kwargs):
+        return cache_agent(factory(*args, **kwargs), cache)
+
+    return build
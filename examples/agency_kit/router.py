@@ -0,0 +1,270 @@
+# agency_kit/router.py
+# ======================================================================
+# Zero-LLM router for route-mode Teams
+#  • compiles "kw/kw → Member; kw → Member" rules from the team instructions
+#  • plus a small embedding index over member names / roles / rule keywords
+#  • confident → call the member directly; ambiguous → the team's LLM router
+#  • only teams a bypass loses nothing on: no tools, no instructions beyond
+#    routing rules ("Post #sales" is work), not running as a member of
+#    another team (the parent files the team's own run_response);
+#    attach_router(team, bypass=False) opts a team out
+#  • counters: direct dispatches, LLM fallbacks, routing latency
+# ======================================================================
+
+import logging, re, threading, time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from agency_kit.embedding import HashingEmbedder, cosine, words
+from agency_kit.hooks import wrap_method
+
+log = logging.getLogger("agency.router")
+
+_ARROW = re.compile(r"\s*(?:→|->)\s*")
+_CLAUSE = re.compile(r";|\.\s+|\n")
+_FILLER = {"keyword", "route", "route:", "keywords", "else"}
+# words a pure routing instruction is made of ("Route tasks", "Decide which …")
+_ROUTING = _FILLER | set(
+    "by to the a each task tasks request requests member members specialist "
+    "decide which who handle handles pick choose one otherwise delegate forward".split()
+)
+
+
+def _norm(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "", name.lower())
+
+
+def resolve_member(target: str, names: Sequence[str]) -> Optional[str]:
+    """Map a rule target ("Lead-Gen", "team") onto a real member name."""
+    t = _norm(target.rstrip("…. "))
+    if not t:
+        return None
+    exact = [n for n in names if _norm(n) == t]
+    if exact:
+        return exact[0]
+    # leading whole words only: "Lead-Gen" → "Lead-Gen Team", "Gen" → nothing
+    head = _parts(target)
+    prefix = [n for n in names if _parts(n)[: len(head)] == head]
+    if len(prefix) == 1:
+        return prefix[0]
+    if t == "team" and len(names) == 1:
+        return names[0]
+    return None
+
+
+def _parts(name: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", name.lower())
+
+
+def _text(instructions: Any) -> str:
+    if isinstance(instructions, list):
+        return " ".join(str(i) for i in instructions)
+    return str(instructions or "")
+
+
+def own_work(instructions: Any, names: Sequence[str]) -> List[str]:
+    """Instruction clauses that are not routing ('Post #sales', 'Run QA …')."""
+    work = []
+    for clause in _CLAUSE.split(_text(instructions)):
+        clause = clause.strip(" .…")
+        if not clause or len(_ARROW.split(clause)) == 2:
+            continue
+        rest = [
+            w
+            for w in re.split(r"[\s/,]+", clause)
+            if w.strip("'\"").lower() not in _ROUTING
+        ]
+        if any(resolve_member(w, names) is None for w in rest):
+            work.append(clause)
+    return work
+
+
+def _stem(keyword: str) -> str:
+    """Trim the last word so 'price' also hits 'pricing', 'competitor' 'competitive'."""
+    head, _, last = keyword.rpartition(" ")
+    if len(last) > 5:
+        last = last[:-2]
+    elif len(last) == 5 and last.endswith("e"):
+        last = last[:-1]
+    return f"{head} {last}".strip()
+
+
+def parse_rules(instructions: Any, names: Sequence[str]) -> List[Tuple[List[str], str]]:
+    """[(keywords, member)] from 'lead/prospect → Lead-Gen; competitor → ...'."""
+    rules = []
+    for clause in _CLAUSE.split(_text(instructions)):
+        parts = _ARROW.split(clause.strip())
+        if len(parts) != 2:
+            continue
+        lhs, rhs = parts
+        member = resolve_member(rhs, names)
+        if member is None:
+            continue
+        kws = []
+        for raw in re.split(r"[/,]| or ", lhs):
+            toks = [w for w in words(raw.strip(" '\"")) if w not in _FILLER]
+            if toks:
+                kws.append(_stem(" ".join(toks)))
+        if kws:
+            rules.append((kws, member))
+    return rules
+
+
+@dataclass
+class Decision:
+    member: Optional[str]
+    confidence: float
+    method: str
+    scores: Dict[str, float] = field(default_factory=dict)
+
+
+class LocalRouter:
+    """Keyword rules first, embedding similarity second, else defer to the LLM."""
+
+    def __init__(
+        self,
+        members: Dict[str, str],
+        rules: List[Tuple[List[str], str]],
+        threshold: float = 0.6,
+        embedder: Optional[HashingEmbedder] = None,
+    ):
+        self.names = list(members)
+        self.rules = rules
+        self.threshold = threshold
+        self.embed = embedder or HashingEmbedder()
+        keywords: Dict[str, List[str]] = {n: [] for n in self.names}
+        for kws, member in rules:
+            keywords[member].extend(kws)
+        self.index = {
+            n: self.embed(
+                " ".join([n.replace("-", " "), members[n] or ""] + keywords[n])
+            )
+            for n in self.names
+        }
+        self._lock = threading.Lock()
+        self.counters = {"direct": 0, "llm": 0, "route_s": 0.0}
+
+    @classmethod
+    def for_team(cls, team: Any, threshold: float = 0.6) -> "LocalRouter":
+        members = {
+            m.name: getattr(m, "role", None) or getattr(m, "description", None) or ""
+            for m in team.members
+        }
+        return cls(members, parse_rules(team.instructions, list(members)), threshold)
+
+    def route(self, message: str) -> Decision:
+        t0 = time.perf_counter()
+        try:
+            return self._route(message)
+        finally:
+            with self._lock:
+                self.counters["route_s"] += time.perf_counter() - t0
+
+    def _route(self, message: str) -> Decision:
+        if len(self.names) == 1:
+            return Decision(self.names[0], 1.0, "single")
+
+        toks = " " + " ".join(words(message)) + " "
+        hits: Dict[str, int] = {}
+        for kws, member in self.rules:
+            # multi-word keywords ("api doc") are more specific than "doc"
+            n = sum(kw.count(" ") + 1 for kw in kws if f" {kw}" in toks)
+            if n:
+                hits[member] = hits.get(member, 0) + n
+        if hits:
+            ranked = sorted(hits.items(), key=lambda kv: -kv[1])
+            best, n = ranked[0]
+            runner_up = ranked[1][1] if len(ranked) > 1 else 0
+            conf = 0.95 if runner_up == 0 else 0.5 * (1 + (n - runner_up) / n)
+            return Decision(best, conf, "keyword", dict(hits))
+
+        q = self.embed(message)
+        scores = {n: cosine(q, v) for n, v in self.index.items()}
+        ranked = sorted(scores.items(), key=lambda kv: -kv[1])
+        (best, s1), (_, s2) = ranked[0], ranked[1]
+        # confidence: how clearly the best member beats the runner-up
+        conf = 0.0 if s1 <= 0 else min(1.0, (s1 - s2) / s1 + 0.3 * s1)
+        return Decision(best, conf, "embedding", scores)
+
+    def decide(self, message: str) -> Optional[str]:
+        d = self.route(message)
+        return d.member if d.confidence >= self.threshold else None
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.counters["direct"] + self.counters["llm"]
+            return {
+                **self.counters,
+                "llm_calls_saved": self.counters["direct"],
+                "direct_rate": self.counters["direct"] / total if total else 0.0,
+                "avg_route_us": (
+                    1e6 * self.counters["route_s"] / total if total else 0.0
+                ),
+            }
+
+
+ROUTERS: Dict[str, LocalRouter] = {}
+
+
+def skip_reason(team: Any) -> Optional[str]:
+    """Why calling a member directly would drop part of the team's run, if it would."""
+    if team.tools:
+        return "has tools"
+    work = own_work(team.instructions, [m.name for m in team.members])
+    return f"own instructions: {work[0]!r}" if work else None
+
+
+def attach_router(team: Any, threshold: float = 0.6, bypass: bool = True) -> Any:
+    """Let a route-mode team skip its LLM routing call when the answer is obvious
+    and the team itself has nothing else to do."""
+    reason = skip_reason(team) if bypass else "opted out"
+    if reason:
+        log.info("local router off for %s (%s)", team.name, reason)
+        return team
+    router = LocalRouter.for_team(team, threshold)
+    ROUTERS[team.name] = router
+    members = {m.name: m for m in team.members}
+
+    def pick(message) -> Optional[str]:
+        if getattr(team, "parent_team_id", None):
+            return None  # a parent reads team.run_response: run as a team
+        member = router.decide(message) if isinstance(message, str) else None
+        with router._lock:
+            router.counters["direct" if member else "llm"] += 1
+        if member is not None:
+            log.debug("%s → %s (local router)", team.name, member)
+        return member
+
+    def make(run):
+        def routed_run(message=None, *, stream: bool = False, **kwargs):
+            member = pick(message)
+            if member is None:
+                return run(message, stream=stream, **kwargs)
+            return members[member].run(message, stream=stream, **kwargs)
+
+        return routed_run
+
+    def amake(arun):
+        async def routed_arun(message=None, *, stream: bool = False, **kwargs):
+            member = pick(message)
+            if member is None:
+                return await arun(message, stream=stream, **kwargs)
+            return await members[member].arun(message, stream=stream, **kwargs)
+
+        return routed_arun
+
+    wrap_method(team, "run", make)
+    return wrap_method(team, "arun", amake)
+
+
+def routed(factory, threshold: float = 0.6, bypass: bool = True):
+    """Factory wrapper: routed(Team)(...) builds the team, then attaches a router."""
+
+    def build(*args, **kwargs):
+        return attach_router(factory(*args, **kwargs), threshold, bypass)
+
+    return build
+
+
+def router_stats() -> Dict[str, Dict[str, float]]:
+    return {name: r.stats() for name, r in ROUTERS.items()}
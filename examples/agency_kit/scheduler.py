@@ -0,0 +1,512 @@
+# agency_kit/scheduler.py
+# ======================================================================
+# Cron / interval triggers for agents, teams and plain functions
+#  • Scheduler(path).add(name, target, message, cron="0 23 * * *", tz="UTC")
+#    or every="15m"; target: agent / team (target.run(message)) or fn(at).
+#    The message may name the fire time: "Nightly run for {at:%Y-%m-%d}"
+#  • one warm process runs every schedule on a small thread pool, instead
+#    of an external cron starting a process for one json_response()
+#  • no overlap: a fire that comes while the previous run is still going is
+#    skipped; across processes a SQLite lease lets one of them run it
+#  • missed fires (process down, machine asleep): misfire="skip" drops the
+#    ones older than grace_s, "catch_up" runs the newest max_catch_up of
+#    them, oldest first, each with its own `at`
+#  • jitter_s: a fixed offset in [0, jitter_s) per fire (hash of name and
+#    fire time), so schedules on the same minute don't all call at once
+#  • next fire, lease, last run and counters live in SQLite: a restart goes
+#    on where the last process stopped
+#  • test mode: Scheduler(path, clock=FakeClock(...)); advance(seconds)
+#    runs every fire inline, in order, at its fake time
+# ======================================================================
+
+import hashlib, logging, math, os, re, socket, sqlite3, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Union
+from zoneinfo import ZoneInfo
+
+log = logging.getLogger("agency.scheduler")
+
+SCHEDULERS: List["Scheduler"] = []
+_MAX_SCAN = 10_000  # missed fires counted one by one, beyond that in bulk
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedules (
+    name        TEXT PRIMARY KEY,
+    spec        TEXT NOT NULL,        -- 'cron 0 23 * * * UTC' | 'every 900s'
+    next_at     REAL NOT NULL,        -- next fire, before jitter
+    lease_until REAL,                 -- a run is in progress until then
+    owner       TEXT,                 -- host:pid:scheduler holding the lease
+    last_at     REAL,
+    last_status TEXT,                 -- ok | error
+    last_error  TEXT,
+    last_s      REAL,
+    runs        INTEGER NOT NULL DEFAULT 0,
+    failures    INTEGER NOT NULL DEFAULT 0,
+    missed      INTEGER NOT NULL DEFAULT 0,
+    caught_up   INTEGER NOT NULL DEFAULT 0,
+    overlapped  INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+# ---------- triggers ---------------------------------------------------
+def _field(spec: str, lo: int, hi: int) -> frozenset:
+    values = set()
+    for part in spec.split(","):
+        span, _, step = part.partition("/")
+        if span == "*":
+            a, b = lo, hi
+        elif "-" in span:
+            a, b = (int(x) for x in span.split("-", 1))
+        else:
+            a = int(span)
+            b = hi if step else a
+        if not lo <= a <= b <= hi or (step and int(step) < 1):
+            raise ValueError(f"cron field {spec!r} outside {lo}-{hi}")
+        values.update(range(a, b + 1, int(step or 1)))
+    return frozenset(values)
+
+
+class Cron:
+    """minute hour day month weekday (0/7 = Sunday), in a time zone.
+
+    Wall-clock times: a time skipped by a DST change runs an hour later on
+    that day, a time that happens twice runs once."""
+
+    def __init__(self, expr: str, tz: str = "UTC"):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron needs 5 fields, got {expr!r}")
+        self.minutes = _field(fields[0], 0, 59)
+        self.hours = _field(fields[1], 0, 23)
+        self.days = _field(fields[2], 1, 31)
+        self.months = _field(fields[3], 1, 12)
+        self.weekdays = frozenset(d % 7 for d in _field(fields[4], 0, 7))
+        # both day fields restricted: either may match (classic cron)
+        self.either_day = fields[2] != "*" and fields[4] != "*"
+        self.tz = ZoneInfo(tz)
+        self.spec = f"cron {' '.join(fields)} {tz}"
+
+    def _day_ok(self, d: datetime) -> bool:
+        dom = d.day in self.days
+        dow = d.isoweekday() % 7 in self.weekdays
+        return dom or dow if self.either_day else dom and dow
+
+    def next_after(self, t: float) -> float:
+        start = datetime.fromtimestamp(t, self.tz).replace(tzinfo=None)
+        d = start.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        while d.year <= start.year + 8:  # "0 0 30 2 *" never fires
+            if d.month not in self.months:
+                d = (d.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(
+                    day=1
+                )
+            elif not self._day_ok(d):
+                d = d.replace(hour=0, minute=0) + timedelta(days=1)
+            elif d.hour not in self.hours:
+                d = d.replace(minute=0) + timedelta(hours=1)
+            elif d.minute not in self.minutes:
+                d += timedelta(minutes=1)
+            else:
+                at = d.replace(tzinfo=self.tz).timestamp()
+                if at > t:
+                    return at
+                d += timedelta(minutes=1)  # the repeated hour after a DST change
+        raise ValueError(f"{self.spec} never fires")
+
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+class Every:
+    """Fixed interval, aligned to the epoch: every="15m" fires at :00, :15 …"""
+
+    def __init__(self, every: Union[float, str]):
+        m = re.fullmatch(r"\s*([\d.]+)\s*([smhd]?)\s*", str(every))
+        if not m or float(m[1]) <= 0:
+            raise ValueError(f"bad interval {every!r}")
+        self.seconds = float(m[1]) * _UNITS[m[2] or "s"]
+        self.tz = timezone.utc
+        self.spec = f"every {self.seconds:g}s"
+
+    def next_after(self, t: float) -> float:
+        return (math.floor(t / self.seconds) + 1) * self.seconds
+
+
+# ---------- clocks -----------------------------------------------------
+class SystemClock:
+    def now(self) -> float:
+        return time.time()
+
+
+class FakeClock:
+    """Test clock: stands still until Scheduler.advance() moves it."""
+
+    def __init__(self, start: Union[datetime, float] = 0.0):
+        self.t = start.timestamp() if isinstance(start, datetime) else float(start)
+
+    def now(self) -> float:
+        return self.t
+
+
+# ---------- scheduler --------------------------------------------------
+@dataclass
+class Job:
+    name: str
+    target: Any
+    message: Optional[str]
+    trigger: Any  # Cron | Every
+    misfire: str = "skip"
+    grace_s: float = 300.0
+    max_catch_up: int = 3
+    jitter_s: float = 0.0
+    next_at: float = 0.0
+
+    def jitter(self, at: float) -> float:
+        if not self.jitter_s:
+            return 0.0
+        h = hashlib.sha256(f"{self.name}@{at}".encode()).digest()
+        return int.from_bytes(h[:4], "big") / 2**32 * self.jitter_s
+
+    def due_at(self) -> float:
+        return self.next_at + self.jitter(self.next_at)
+
+    def call(self, at: float) -> Any:
+        when = datetime.fromtimestamp(at, self.trigger.tz)
+        if not hasattr(self.target, "run"):
+            return self.target(when)
+        message = (self.message or f"Scheduled run: {self.name}").format(at=when)
+        return self.target.run(
+            message, stream=False, session_id=f"schedule:{self.name}"
+        )
+
+
+def _alive(owner: str) -> bool:
+    """False only for a lease holder on this host whose process is gone."""
+    host, pid, _ = owner.split(":")
+    if host != socket.gethostname():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Scheduler:
+    """Schedules in one SQLite file; start() runs them on a thread pool."""
+
+    def __init__(
+        self,
+        path: str,
+        clock: Optional[Any] = None,
+        workers: int = 4,
+        lease_s: float = 3600.0,
+    ):
+        self.clock = clock or SystemClock()
+        self.inline = isinstance(self.clock, FakeClock)
+        self.workers = max(1, workers)
+        self.lease_s = lease_s
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self.jobs: Dict[str, Job] = {}
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._running: set = set()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # a crash mid-run leaves its lease behind: free it if the holder is gone
+        with self._lock:
+            for row in self._db.execute(
+                "SELECT name, owner FROM schedules WHERE lease_until IS NOT NULL"
+            ).fetchall():
+                if not _alive(row["owner"]):
+                    self._db.execute(
+                        "UPDATE schedules SET lease_until=NULL, owner=NULL "
+                        "WHERE name=? AND owner=?",
+                        (row["name"], row["owner"]),
+                    )
+        SCHEDULERS.append(self)
+
+    def add(
+        self,
+        name: str,
+        target: Any,
+        message: Optional[str] = None,
+        *,
+        cron: Optional[str] = None,
+        every: Union[float, str, None] = None,
+        tz: str = "UTC",
+        misfire: str = "skip",
+        grace_s: float = 300.0,
+        max_catch_up: int = 3,
+        jitter_s: float = 0.0,
+    ) -> Job:
+        """Attach a trigger to target; a stored schedule keeps its next fire
+        unless its cron / interval changed."""
+        if (cron is None) == (every is None):
+            raise ValueError("give exactly one of cron= or every=")
+        if misfire not in ("skip", "catch_up"):
+            raise ValueError(f"misfire must be 'skip' or 'catch_up', not {misfire!r}")
+        trigger = Cron(cron, tz) if cron is not None else Every(every)
+        job = Job(
+            name,
+            target,
+            message,
+            trigger,
+            misfire,
+            grace_s,
+            max(1, max_catch_up),
+            jitter_s,
+        )
+        now = self.clock.now()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT spec, next_at FROM schedules WHERE name=?", (name,)
+            ).fetchone()
+            if row is not None and row["spec"] == trigger.spec:
+                job.next_at = row["next_at"]
+            else:
+                job.next_at = trigger.next_after(now)
+                self._db.execute(
+                    "INSERT INTO schedules (name, spec, next_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE "
+                    "SET spec=excluded.spec, next_at=excluded.next_at",
+                    (name, trigger.spec, job.next_at),
+                )
+            self.jobs[name] = job
+        self._wake.set()
+        return job
+
+    # ---------- firing --------------------------------------------------
+    def run_pending(self) -> int:
+        """Start every fire that is due; returns how many runs started."""
+        now = self.clock.now()
+        return sum(self._fire(job, now) for job in list(self.jobs.values()))
+
+    def _fire(self, job: Job, now: float) -> int:
+        if job.due_at() > now:
+            return 0
+        fires, at = [], job.next_at
+        while at + job.jitter(at) <= now and len(fires) < _MAX_SCAN:
+            fires.append(at)
+            at = job.trigger.next_after(at)
+        extra = 0
+        if at + job.jitter(at) <= now:  # down for a long time: count the rest
+            skip_to = job.trigger.next_after(now)
+            if isinstance(job.trigger, Every):
+                extra = round((skip_to - at) / job.trigger.seconds)
+            at = skip_to
+        if job.misfire == "catch_up":
+            runs = fires[-job.max_catch_up :]
+        else:
+            runs = [f for f in fires if now - f <= job.grace_s][-1:]
+        missed = len(fires) - len(runs) + extra
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT next_at, lease_until FROM schedules WHERE name=?",
+                    (job.name,),
+                ).fetchone()
+                if row["next_at"] != job.next_at:  # another process took it
+                    job.next_at = row["next_at"]
+                    self._db.execute("COMMIT")
+                    return 0
+                busy = job.name in self._running or (
+                    row["lease_until"] is not None and row["lease_until"] > now
+                )
+                if busy or not runs:
+                    self._db.execute(
+                        "UPDATE schedules SET next_at=?, missed=missed+?, "
+                        "overlapped=overlapped+? WHERE name=?",
+                        (at, missed, len(runs) if busy else 0, job.name),
+                    )
+                else:
+                    late = sum(now - f > job.grace_s for f in runs)
+                    self._db.execute(
+                        "UPDATE schedules SET next_at=?, lease_until=?, owner=?, "
+                        "missed=missed+?, caught_up=caught_up+? WHERE name=?",
+                        (at, now + self.lease_s, self.owner, missed, late, job.name),
+                    )
+                    self._running.add(job.name)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            job.next_at = at
+        if busy or not runs:
+            if busy and runs:
+                log.info("schedule %s: previous run still going, skipped", job.name)
+            return 0
+        if missed:
+            log.info("schedule %s: %d missed fire(s) dropped", job.name, missed)
+        self._submit(job, runs)
+        return len(runs)
+
+    def _execute(self, job: Job, fires: List[float]) -> None:
+        try:
+            for at in fires:
+                t0, error = time.perf_counter(), None
+                try:
+                    job.call(at)
+                except Exception as e:  # a failed run must not stop the schedule
+                    log.exception("schedule %s failed", job.name)
+                    error = f"{type(e).__name__}: {e}"
+                with self._lock:
+                    self._db.execute(
+                        "UPDATE schedules SET last_at=?, last_status=?, last_error=?, "
+                        "last_s=?, runs=runs+1, failures=failures+? WHERE name=?",
+                        (
+                            at,
+                            "error" if error else "ok",
+                            error,
+                            round(time.perf_counter() - t0, 3),
+                            error is not None,
+                            job.name,
+                        ),
+                    )
+        finally:
+            with self._lock:
+                self._db.execute(
+                    "UPDATE schedules SET lease_until=NULL, owner=NULL "
+                    "WHERE name=? AND owner=?",
+                    (job.name, self.owner),
+                )
+                self._running.discard(job.name)
+
+    def _submit(self, job: Job, fires: List[float]) -> None:
+        if self.inline:
+            return self._execute(job, fires)
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="schedule"
+                )
+        self._pool.submit(self._execute, job, fires)
+
+    # ---------- running -------------------------------------------------
+    def start(self) -> "Scheduler":
+        """Fire schedules from a background thread until stop()."""
+        if self.inline:
+            raise RuntimeError("a FakeClock scheduler runs through advance()")
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._loop, name="scheduler", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def serve(self) -> None:
+        """Scheduler-only process: fire schedules until Ctrl-C."""
+        self.start()
+        try:
+            while self._thread.is_alive():
+                self._thread.join(1.0)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self, wait: bool = True) -> None:
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    def _loop(self) -> None:
+        while not self._stopping:
+            self._wake.clear()
+            try:
+                self.run_pending()
+            except Exception:  # e.g. a locked database: try again shortly
+                log.exception("scheduler tick failed")
+            wait = self._next_due() - self.clock.now()
+            self._wake.wait(min(max(wait, 0.01), 60.0))
+
+    def _next_due(self) -> float:
+        return min((j.due_at() for j in list(self.jobs.values())), default=math.inf)
+
+    def advance(self, seconds: float) -> int:
+        """Test mode: move the fake clock on, firing each run at its time."""
+        end = self.clock.t + seconds
+        started = 0
+        while True:
+            started += self.run_pending()
+            due = self._next_due()
+            if due > end:
+                self.clock.t = end
+                return started
+            self.clock.t = max(due, self.clock.t)
+
+    def trigger(self, name: str) -> int:
+        """Run a schedule now, once, outside its timetable; 0 if it is running."""
+        job = self.jobs[name]
+        now = self.clock.now()
+        with self._lock:
+            if name in self._running:
+                return 0
+            taken = self._db.execute(
+                "UPDATE schedules SET lease_until=?, owner=? WHERE name=? "
+                "AND (lease_until IS NULL OR lease_until <= ?)",
+                (now + self.lease_s, self.owner, name, now),
+            ).rowcount
+            if not taken:
+                return 0
+            self._running.add(name)
+        self._submit(job, [now])
+        return 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            rows = {
+                r["name"]: r
+                for r in self._db.execute("SELECT * FROM schedules").fetchall()
+            }
+
+        def iso(t):
+            return (
+                None
+                if t is None
+                else datetime.fromtimestamp(t, timezone.utc).isoformat()
+            )
+
+        out = {}
+        for name, job in self.jobs.items():
+            r = rows[name]
+            out[name] = {
+                "trigger": r["spec"],
+                "misfire": job.misfire,
+                "next": iso(job.due_at()),
+                "running": r["lease_until"] is not None,
+                "last": iso(r["last_at"]),
+                "last_status": r["last_status"],
+                "last_error": r["last_error"],
+                "last_s": r["last_s"],
+                **{
+                    k: r[k]
+                    for k in ("runs", "failures", "missed", "caught_up", "overlapped")
+                },
+            }
+        return out
+
+
+def schedule_stats() -> Dict[str, Dict[str, Any]]:
+    """Every schedule of every Scheduler in this process, by name."""
+    out: Dict[str, Dict[str, Any]] = {}
+    for s in SCHEDULERS:
+        out.update(s.stats())
+    return out
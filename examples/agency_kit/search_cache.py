@@ -0,0 +1,249 @@
+# agency_kit/search_cache.py
+# ======================================================================
+# Shared TTL cache for web-search tool calls, with request coalescing
+#  • an agno tool hook: duckduckgo_search / _news, google_search and
+#    search_wikipedia go through it, every other tool passes straight on
+#  • key = source + normalised query (case, spaces, quotes) + the other
+#    arguments, so every agent's toolkit instance shares one entry
+#  • TTL per source (news 30 min, web 6 h, Wikipedia 7 d; SEARCH_CACHE_TTL
+#    overrides); in-memory LRU in front of a SQLite file that survives
+#    restarts
+#  • single flight: identical queries already in flight wait for the first
+#    one (threads and event loops alike) instead of calling out again
+#  • errors are never cached; stats() = hits / coalesced / calls per source
+# ======================================================================
+
+import asyncio, json, os, re, sqlite3, threading, time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Tuple
+
+from agency_kit.hooks import add_tool_hooks
+
+# tool function → (source, default TTL in seconds)
+SOURCES: Dict[str, Tuple[str, float]] = {
+    "duckduckgo_search": ("duckduckgo", 6 * 3600),
+    "duckduckgo_news": ("duckduckgo_news", 1800),
+    "google_search": ("google", 6 * 3600),
+    "search_wikipedia": ("wikipedia", 7 * 86400),
+}
+QUERY_ARGS = ("query", "topic", "q")
+_SPACE = re.compile(r"\s+")
+_MISSING = object()
+
+
+def normalise(query: Any) -> str:
+    return _SPACE.sub(" ", str(query)).strip().strip("\"'“”").strip().lower()
+
+
+def search_key(source: str, arguments: Dict[str, Any]) -> str:
+    args = dict(arguments)
+    query = next((args.pop(k) for k in QUERY_ARGS if k in args), "")
+    rest = json.dumps(args, sort_keys=True, default=str)
+    return f"{source}\x1f{normalise(query)}\x1f{rest}"
+
+
+class SearchCache:
+    """Search results by (source, query, args): LRU + SQLite, single flight."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_s: Optional[Dict[str, float]] = None,
+        max_entries: int = 2048,
+    ):
+        self.path = path
+        self.ttl_s = {source: ttl for source, ttl in SOURCES.values()}
+        self.ttl_s.update(json.loads(os.getenv("SEARCH_CACHE_TTL", "{}")))
+        self.ttl_s.update(ttl_s or {})
+        self.max_entries = max_entries
+        self._mem: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: dict.fromkeys(
+                "hits_memory hits_disk coalesced calls errors".split(), 0
+            )
+        )
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS searches (key TEXT PRIMARY KEY, "
+                "source TEXT, result TEXT, created REAL, expires REAL)"
+            )
+            self._db.execute("DELETE FROM searches WHERE expires <= ?", (time.time(),))
+            self._db.commit()
+
+    # ---------- tiers --------------------------------------------------
+    def _memory(self, key: str, source: str) -> Any:
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None and hit[0] > time.time():
+                self._mem.move_to_end(key)
+                self.counters[source]["hits_memory"] += 1
+                return hit[1]
+            self._mem.pop(key, None)
+            return _MISSING
+
+    def _disk(self, key: str, source: str) -> Any:
+        if self._db is None:
+            return _MISSING
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result, expires FROM searches WHERE key = ? AND expires > ?",
+                (key, time.time()),
+            ).fetchone()
+            if row is None:
+                return _MISSING
+            value = json.loads(row[0])
+            self._remember(key, row[1], value)
+            self.counters[source]["hits_disk"] += 1
+            return value
+
+    def _store(self, key: str, source: str, value: Any) -> None:
+        now = time.time()
+        expires = now + self.ttl_s.get(source, 3600)
+        with self._lock:
+            self._remember(key, expires, value)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO searches VALUES (?, ?, ?, ?, ?)",
+                    (key, source, json.dumps(value, default=str), now, expires),
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, expires: float, value: Any) -> None:
+        self._mem[key] = (expires, value)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    # ---------- single flight --------------------------------------------
+    def _join(self, key: str, source: str) -> Tuple[Future, bool]:
+        """→ (future for this query, True if the caller has to run it)."""
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is not None:
+                self.counters[source]["coalesced"] += 1
+                return fut, False
+            fut = self._inflight[key] = Future()
+            return fut, True
+
+    def _settle(self, key: str, source: str, fut: Future, value, error) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+            if error is not None:
+                self.counters[source]["errors"] += 1
+        if error is not None:
+            fut.set_exception(error)
+        else:
+            fut.set_result(value)
+
+    def _begin(self, function_name: str, arguments: Dict[str, Any]):
+        """→ (source, key, cached value or _MISSING, future, leader)."""
+        source = SOURCES[function_name][0]
+        key = search_key(source, arguments)
+        value = self._memory(key, source)
+        if value is not _MISSING:
+            return source, key, value, None, False
+        fut, leader = self._join(key, source)
+        if leader:
+            value = self._disk(key, source)
+            if value is not _MISSING:
+                self._settle(key, source, fut, value, None)
+        return source, key, value, fut, leader
+
+    # ---------- agno tool hooks ------------------------------------------
+    def tool_hook(self, function_name: str, function_call, arguments: Dict[str, Any]):
+        if function_name not in SOURCES:
+            return function_call(**arguments)
+        source, key, value, fut, leader = self._begin(function_name, arguments)
+        if value is not _MISSING:
+            return value
+        if not leader:
+            return fut.result()
+        with self._lock:
+            self.counters[source]["calls"] += 1
+        try:
+            value = function_call(**arguments)
+        except BaseException as e:  # cancelled leaders release waiters too
+            self._settle(key, source, fut, None, e)
+            raise
+        self._store(key, source, value)
+        self._settle(key, source, fut, value, None)
+        return value
+
+    async def atool_hook(
+        self, function_name: str, function_call, arguments: Dict[str, Any]
+    ):
+        if function_name not in SOURCES:
+            return await function_call(**arguments)
+        source, key, value, fut, leader = self._begin(function_name, arguments)
+        if value is not _MISSING:
+            return value
+        if not leader:
+            return await asyncio.wrap_future(fut)
+        with self._lock:
+            self.counters[source]["calls"] += 1
+        try:
+            value = await function_call(**arguments)
+        except BaseException as e:  # cancelled leaders release waiters too
+            self._settle(key, source, fut, None, e)
+            raise
+        self._store(key, source, value)
+        self._settle(key, source, fut, value, None)
+        return value
+
+    # ---------- report ---------------------------------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            per_source = {}
+            for source, c in self.counters.items():
+                lookups = sum(c[k] for k in ("hits_memory", "hits_disk", "coalesced"))
+                lookups += c["calls"]
+                saved = lookups - c["calls"]
+                per_source[source] = {
+                    **c,
+                    "hit_rate": round(saved / lookups, 3) if lookups else 0.0,
+                }
+            disk = (
+                self._db.execute("SELECT COUNT(*) FROM searches").fetchone()[0]
+                if self._db is not None
+                else 0
+            )
+            return {
+                "path": self.path,
+                "memory_entries": len(self._mem),
+                "disk_entries": disk,
+                "in_flight": len(self._inflight),
+                "ttl_s": dict(self.ttl_s),
+                "sources": per_source,
+            }
+
+
+def instrument(obj, cache: SearchCache):
+    """Serve obj's search tool calls from the cache (idempotent)."""
+    if getattr(obj, "_search_cache", None) is cache:
+        return obj
+    object.__setattr__(obj, "_search_cache", cache)
+    return add_tool_hooks(obj, cache.tool_hook, cache.atool_hook)
+
+
+def instrument_tree(root, cache: SearchCache):
+    """instrument() a team and every member below it."""
+    instrument(root, cache)
+    for member in getattr(root, "members", None) or []:
+        instrument_tree(member, cache)
+    return root
+
+
+def searched(factory, cache: SearchCache):
+    """Factory wrapper: searched(Agent, cache)(...) builds, then instruments."""
+
+    def build(*args, **kwargs):
+        return instrument(factory(*args, **kwargs), cache)
+
+    return build
@@ -0,0 +1,120 @@
+# agency_kit/sse.py
+# ======================================================================
+# Server-sent events for streaming agent / team / pipeline runs
+#  • team_events(): agno stream chunks → (event, data) pairs
+#      member_started / member_finished  (transfer / forward / delegate tools)
+#      tool_started / tool_finished      (every other tool call)
+#      content                           (partial text, tagged with the member)
+#  • sse_stream(): framing + `run_started` before any model call (TTFB),
+#    `error` instead of a dropped connection, `done` with timings
+# ======================================================================
+
+import json, time
+from contextlib import nullcontext
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+
+Event = Tuple[str, Dict[str, Any]]
+
+# team tools that hand work to members → {tool name: arg holding the member}
+MEMBER_TOOLS = {
+    "transfer_task_to_member": "member_id",
+    "forward_task_to_member": "member_id",
+    "run_member_agents": None,  # collaborate mode: every member
+    "delegate_in_parallel": "tasks",
+}
+PREVIEW_CHARS = 500
+
+
+def format_sse(event: str, data: Any) -> str:
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def _members(tool_name: str, args: Dict[str, Any]) -> Any:
+    key = MEMBER_TOOLS[tool_name]
+    if key is None:
+        return "all"
+    if key == "tasks":
+        return [t.get("member") for t in args.get("tasks") or [] if isinstance(t, dict)]
+    return args.get(key)
+
+
+async def team_events(chunks: AsyncIterator[Any]) -> AsyncIterator[Event]:
+    """Map an agno arun(stream=True, stream_intermediate_steps=True) stream."""
+    started: Dict[str, float] = {}
+    finished = set()
+    open_members: Dict[str, Any] = {}
+    async for chunk in chunks:
+        kind = getattr(chunk, "event", "RunResponse")
+        if kind in ("ToolCallStarted", "ToolCallCompleted"):
+            for tool in getattr(chunk, "tools", None) or []:
+                call_id = tool.tool_call_id or f"{tool.tool_name}:{id(tool)}"
+                name = tool.tool_name or ""
+                args = tool.tool_args or {}
+                if call_id not in started:
+                    started[call_id] = time.perf_counter()
+                    if name in MEMBER_TOOLS:
+                        open_members[call_id] = _members(name, args)
+                        yield "member_started", {
+                            "member": open_members[call_id],
+                            "task": args.get("task_description") or args.get("task"),
+                        }
+                    else:
+                        yield "tool_started", {"tool": name, "args": args}
+                if kind == "ToolCallCompleted" and tool.result is not None:
+                    if call_id in finished:
+                        continue
+                    finished.add(call_id)
+                    seconds = round(time.perf_counter() - started[call_id], 3)
+                    if call_id in open_members:
+                        yield "member_finished", {
+                            "member": open_members.pop(call_id),
+                            "seconds": seconds,
+                            "error": bool(tool.tool_call_error),
+                        }
+                    else:
+                        yield "tool_finished", {
+                            "tool": name,
+                            "seconds": seconds,
+                            "error": bool(tool.tool_call_error),
+                            "result": str(tool.result)[:PREVIEW_CHARS],
+                        }
+        elif kind == "RunError":
+            yield "error", {"message": str(getattr(chunk, "content", ""))}
+        elif kind == "RunResponse":
+            content = getattr(chunk, "content", None)
+            if isinstance(content, str) and content:
+                # while exactly one member is working the text is theirs
+                members = list(open_members.values())
+                member = members[0] if len(members) == 1 else None
+                yield "content", {"delta": content, "member": member}
+
+
+async def sse_stream(
+    open_events: Callable[[], AsyncIterator[Event]],
+    limiter: Optional[Any] = None,
+) -> AsyncIterator[str]:
+    """SSE text frames; `run_started` goes out before waiting on the limiter."""
+    t0 = time.perf_counter()
+    yield format_sse("run_started", {"ts": time.time()})
+    first_content: Optional[float] = None
+    ok = True
+    try:
+        async with limiter or nullcontext():
+            async for event, data in open_events():
+                if event == "content" and first_content is None:
+                    first_content = time.perf_counter() - t0
+                yield format_sse(event, data)
+    except Exception as e:  # the status line is already sent: report in-band
+        ok = False
+        yield format_sse("error", {"message": f"{type(e).__name__}: {e}"})
+    yield format_sse(
+        "done",
+        {
+            "ok": ok,
+            "seconds": round(time.perf_counter() - t0, 3),
+            "first_content_s": (
+                None if first_content is None else round(first_content, 3)
+            ),
+        },
+    )
@@ -0,0 +1,394 @@
+# agency_kit/stream_bus.py
+# ======================================================================
+# Live output from every level of a nested team run
+#  • agno streams only the top team's own tokens: transfer_task_to_member
+#    and run_member_agents keep what a member says until it is done
+#  • instrument(agent_or_team) / streamed(factory): inside stream() a run
+#    publishes its text deltas to one bus as they are produced, tagged with
+#    the member path ["Executive-Director", "Sales-Manager", …]
+#  • under a bus, a leaf agent asked for stream=False streams anyway
+#    (parallel delegation, DAG stages, routed calls) and still returns its
+#    full RunResponse – the run's own RunCompleted, not the agent's shared
+#    run_response; agents with a response_model are left alone
+#  • forward_task_to_member re-yields the member's text as the team's own:
+#    the copy is dropped, so every delta is published once
+#  • stream() / astream(root, message): (event, data) pairs as they happen –
+#    member_started, content, member_finished … then result; threads
+#    (parallel tools, delegation) publish to the same bus via contextvars
+#  • print_stream(): CLI rendering, a header line whenever the speaker changes
+#  • instrument agents before wrappers that treat streams differently
+#    (response cache, tiered memory): forced streaming stays inside them
+# ======================================================================
+
+import asyncio, contextvars, copy, queue, sys, threading, time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from agency_kit.hooks import wrap_method
+from agency_kit.tiered_memory import _FinalAnswer
+
+Event = Tuple[str, Dict[str, Any]]
+_DONE = object()
+_lock = threading.Lock()
+COUNTERS = dict(streams=0, events=0, forced=0, echoes_dropped=0)
+RECENT: deque = deque(maxlen=64)  # finished streams, newest last
+
+
+class _Bus:
+    """Events of one stream(): a thread-safe queue, or the consumer's loop."""
+
+    def __init__(self, root: str, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.root = root
+        self.loop = loop
+        self.queue = asyncio.Queue() if loop is not None else queue.Queue()
+        self.t0 = time.perf_counter()
+        self.first_content: Optional[float] = None
+        self.events = 0
+        self.depth = 0
+
+    def put(self, item: Any) -> None:
+        if self.loop is None:
+            self.queue.put(item)
+        else:  # FIFO from any thread, the loop's own included
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, item)
+
+    def emit(self, event: str, data: Dict[str, Any]) -> None:
+        self.events += 1
+        if event == "content" and self.first_content is None:
+            self.first_content = time.perf_counter() - self.t0
+        self.put((event, data))
+
+    def close(self) -> None:
+        record = {
+            "root": self.root,
+            "seconds": round(time.perf_counter() - self.t0, 3),
+            "first_content_s": (
+                None if self.first_content is None else round(self.first_content, 3)
+            ),
+            "events": self.events,
+            "depth": self.depth,
+        }
+        with _lock:
+            COUNTERS["events"] += self.events
+            RECENT.append(record)
+        self.put(_DONE)
+
+
+class _Scope:
+    """One run inside a bus: its path and the member text it may re-yield."""
+
+    __slots__ = ("bus", "path", "parent", "echo")
+
+    def __init__(self, bus: _Bus, path: Tuple[str, ...], parent: Optional["_Scope"]):
+        self.bus, self.path, self.parent = bus, path, parent
+        self.echo: deque = deque()  # member deltas a forwarding team repeats
+        bus.depth = max(bus.depth, len(path))
+
+    def publish(self, delta: str) -> None:
+        if self.parent is not None:  # the parent may repeat it, own or forwarded
+            self.parent.echo.append(delta)
+        if self.echo and self.echo[0] == delta:
+            self.echo.popleft()
+            with _lock:
+                COUNTERS["echoes_dropped"] += 1
+            return
+        self.bus.emit(
+            "content",
+            {"path": list(self.path), "member": self.path[-1], "delta": delta},
+        )
+
+
+# the innermost run inside a stream(); None = no bus, runs pass straight on
+_SCOPE: contextvars.ContextVar = contextvars.ContextVar(
+    "agency_stream_bus", default=None
+)
+
+
+def _publish_chunk(scope: _Scope, chunk: Any) -> None:
+    content = getattr(chunk, "content", None)
+    if getattr(chunk, "event", "RunResponse") == "RunResponse" and content:
+        if isinstance(content, str):
+            scope.publish(content)
+
+
+def _finish(scope: _Scope, t0: float, error: bool) -> None:
+    if scope.parent is not None:
+        scope.parent.echo.clear()  # a forwarding parent has repeated it all by now
+    scope.bus.emit(
+        "member_finished",
+        {
+            "path": list(scope.path),
+            "member": scope.path[-1],
+            "seconds": round(time.perf_counter() - t0, 3),
+            "error": error,
+        },
+    )
+
+
+def _published(chunks: Iterator, scope: _Scope, t0: float) -> Iterator:
+    """Stream with `scope` active while each chunk is produced, and published."""
+    error = True
+    try:
+        it = iter(chunks)
+        while True:
+            token = _SCOPE.set(scope)
+            try:
+                chunk = next(it)
+            except StopIteration:
+                break
+            finally:
+                _SCOPE.reset(token)
+            _publish_chunk(scope, chunk)
+            yield chunk
+        error = False
+    finally:
+        _finish(scope, t0, error)
+
+
+async def _apublished(chunks: AsyncIterator, scope: _Scope, t0: float) -> AsyncIterator:
+    error = True
+    try:
+        it = chunks.__aiter__()
+        while True:
+            token = _SCOPE.set(scope)
+            try:
+                chunk = await it.__anext__()
+            except StopAsyncIteration:
+                break
+            finally:
+                _SCOPE.reset(token)
+            _publish_chunk(scope, chunk)
+            yield chunk
+        error = False
+    finally:
+        _finish(scope, t0, error)
+
+
+class _Kept:
+    """A forced stream's own response: its RunCompleted chunk, else its last
+    chunk carrying the joined deltas (run_response is shared by every run)."""
+
+    def __init__(self):
+        self.answer = _FinalAnswer()
+        self.completed: Any = None
+        self.last: Any = None
+
+    def see(self, chunk: Any) -> None:
+        self.answer.see(chunk)
+        if getattr(chunk, "event", None) == "RunCompleted":
+            self.completed = chunk
+        else:
+            self.last = chunk
+
+    @property
+    def response(self) -> Any:
+        if self.completed is not None or self.last is None:
+            return self.completed
+        out = copy.copy(self.last)
+        out.content = self.answer.content
+        return out
+
+
+# ---------- agno wiring ------------------------------------------------
+def instrument(obj):
+    """Publish obj's output to the enclosing stream() bus (idempotent)."""
+    if getattr(obj, "_stream_bus", False):
+        return obj
+    object.__setattr__(obj, "_stream_bus", True)
+    # leaf agents can stream where they were asked not to; teams can't (a
+    # routed team hands its run to a member, its own run_response is stale)
+    forceable = (
+        not hasattr(obj, "members") and getattr(obj, "response_model", None) is None
+    )
+
+    def enter() -> Optional[_Scope]:
+        outer = _SCOPE.get()
+        if outer is None:
+            return None
+        scope = _Scope(
+            outer.bus, outer.path + (obj.name,), outer if outer.path else None
+        )
+        scope.bus.emit("member_started", {"path": list(scope.path), "member": obj.name})
+        return scope
+
+    def result_of(scope: _Scope, result: Any, t0: float) -> Any:
+        content = getattr(result, "content", None)
+        if isinstance(content, str) and content:
+            scope.publish(content)  # a team asked not to stream: all at once
+        _finish(scope, t0, False)
+        return result
+
+    def make(run):
+        def bus_run(message=None, *, stream: bool = False, **kwargs):
+            scope = enter()
+            if scope is None:
+                return run(message, stream=stream, **kwargs)
+            t0 = time.perf_counter()
+            forced = not stream and forceable
+            if forced:
+                kwargs.setdefault("stream_intermediate_steps", True)
+            token = _SCOPE.set(scope)
+            try:
+                result = run(message, stream=stream or forced, **kwargs)
+                if not (stream or forced):
+                    return result_of(scope, result, t0)
+            except BaseException:
+                _finish(scope, t0, True)
+                raise
+            finally:
+                _SCOPE.reset(token)
+            if stream:
+                return _published(result, scope, t0)
+            with _lock:
+                COUNTERS["forced"] += 1
+            kept = _Kept()
+            for chunk in _published(result, scope, t0):
+                kept.see(chunk)
+            return kept.response
+
+        return bus_run
+
+    def amake(arun):
+        async def bus_arun(message=None, *, stream: bool = False, **kwargs):
+            scope = enter()
+            if scope is None:
+                return await arun(message, stream=stream, **kwargs)
+            t0 = time.perf_counter()
+            forced = not stream and forceable
+            if forced:
+                kwargs.setdefault("stream_intermediate_steps", True)
+            token = _SCOPE.set(scope)
+            try:
+                result = await arun(message, stream=stream or forced, **kwargs)
+                if not (stream or forced):
+                    return result_of(scope, result, t0)
+            except BaseException:
+                _finish(scope, t0, True)
+                raise
+            finally:
+                _SCOPE.reset(token)
+            if stream:
+                return _apublished(result, scope, t0)
+            with _lock:
+                COUNTERS["forced"] += 1
+            kept = _Kept()
+            async for chunk in _apublished(result, scope, t0):
+                kept.see(chunk)
+            return kept.response
+
+        return bus_arun
+
+    wrap_method(obj, "run", make)
+    return wrap_method(obj, "arun", amake)
+
+
+def instrument_tree(root):
+    """instrument() a team and every member below it."""
+    instrument(root)
+    for member in getattr(root, "members", None) or []:
+        instrument_tree(member)
+    return root
+
+
+def streamed(factory):
+    """Factory wrapper: streamed(Agent)(...) builds, then instruments."""
+
+    def build(*args, **kwargs):
+        return instrument(factory(*args, **kwargs))
+
+    return build
+
+
+# ---------- consumers --------------------------------------------------
+def _result(root) -> Event:
+    response = getattr(root, "run_response", None)
+    return "result", {"content": getattr(response, "content", None)}
+
+
+def stream(root, message, **kwargs) -> Iterator[Event]:
+    """Run root and yield every instrumented level's events as they happen;
+    the run itself goes on a producer thread. An uninstrumented root still
+    streams its own text, as print_response(stream=True) would."""
+    bus = _Bus(root.name)
+    with _lock:
+        COUNTERS["streams"] += 1
+    ctx = contextvars.copy_context()
+    ctx.run(_SCOPE.set, _Scope(bus, (), None))
+    own = (
+        None if getattr(root, "_stream_bus", False) else _Scope(bus, (root.name,), None)
+    )
+
+    def produce():
+        try:
+            for chunk in root.run(message, stream=True, **kwargs):
+                if own is not None:
+                    _publish_chunk(own, chunk)
+            bus.put(_result(root))
+        except BaseException as e:  # re-raised in the consumer
+            bus.put(e)
+        finally:
+            bus.close()
+
+    threading.Thread(
+        target=ctx.run, args=(produce,), name="stream-bus", daemon=True
+    ).start()
+    while True:
+        item = bus.queue.get()
+        if item is _DONE:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+
+async def astream(root, message, **kwargs) -> AsyncIterator[Event]:
+    """stream() for arun(): the run is a task on the running loop."""
+    bus = _Bus(root.name, asyncio.get_running_loop())
+    with _lock:
+        COUNTERS["streams"] += 1
+
+    async def produce():
+        try:
+            async for _ in await root.arun(message, stream=True, **kwargs):
+                pass
+            bus.put(_result(root))
+        except BaseException as e:
+            bus.put(e)
+        finally:
+            bus.close()
+
+    token = _SCOPE.set(_Scope(bus, (), None))
+    try:
+        task = asyncio.create_task(produce())  # takes the bus with its context
+    finally:
+        _SCOPE.reset(token)
+    try:
+        while True:
+            item = await bus.queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+def print_stream(root, message, out=None, **kwargs) -> None:
+    """CLI: every level's text as it arrives, a header when the speaker changes."""
+    out = out or sys.stdout
+    speaker: Optional[List[str]] = None
+    for event, data in stream(root, message, **kwargs):
+        if event == "content":
+            if data["path"] != speaker:
+                speaker = data["path"]
+                out.write(f"\n── {' › '.join(speaker)} ──\n")
+            out.write(data["delta"])
+            out.flush()
+    out.write("\n")
+
+
+def stream_stats() -> Dict[str, Any]:
+    with _lock:
+        return {**COUNTERS, "recent": list(RECENT)}
@@ -0,0 +1,218 @@
+# agency_kit/stub_openai.py
+# ======================================================================
+# Local OpenAI-compatible stub server for benchmarks
+#  • POST /v1/chat/completions → canned completion (+ usage block);
+#    "stream": true → the same completion as SSE chunks (content and
+#    tool-call deltas, then a usage chunk, then [DONE])
+#  • reply() raising → OpenAI-style error body (404 for LookupError)
+#  • HTTP/1.1 keep-alive, injected latency per call and per new connection
+#  • counts accepted TCP connections and requests
+#  • limits={"gpt-4o": (rpm, tpm)}: enforced like the provider does, as
+#    token buckets (tokens = body bytes / 4 + max_tokens); over the limit →
+#    429 rate_limit_exceeded with Retry-After; period_s shrinks "a minute"
+#
+#   with StubOpenAI(latency_s=0.02) as stub:
+#       POOL.chat("gpt-4o-mini", base_url=stub.base_url)
+# ======================================================================
+
+import json, sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def completion(model: str, content: str, prompt_tokens: int = 0) -> dict:
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": max(len(content) // 4, 1),
+            "total_tokens": prompt_tokens + max(len(content) // 4, 1),
+        },
+    }
+
+
+def stream_chunks(payload: dict, piece: int = 24) -> List[dict]:
+    """A chat.completion re-cut as chat.completion.chunk deltas."""
+    base = {k: payload[k] for k in ("id", "created", "model") if k in payload}
+    base["object"] = "chat.completion.chunk"
+    choice = payload["choices"][0]
+    message = choice["message"]
+
+    def chunk(delta: dict, finish: Optional[str] = None) -> dict:
+        return {
+            **base,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+        }
+
+    out = [chunk({"role": "assistant", "content": ""})]
+    content = message.get("content") or ""
+    out += [
+        chunk({"content": content[i : i + piece]})
+        for i in range(0, len(content), piece)
+    ]
+    for i, call in enumerate(message.get("tool_calls") or []):
+        out.append(chunk({"tool_calls": [{"index": i, **call}]}))
+    out.append(chunk({}, choice.get("finish_reason", "stop")))
+    if "usage" in payload:  # stream_options.include_usage
+        out.append({**base, "choices": [], "usage": payload["usage"]})
+    return out
+
+
+def sse_body(payload: dict) -> bytes:
+    """The completion as a text/event-stream body, [DONE] included."""
+    data = b"".join(
+        b"data: " + json.dumps(c).encode() + b"\n\n" for c in stream_chunks(payload)
+    )
+    return data + b"data: [DONE]\n\n"
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # load tests open hundreds of connections at once
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):  # client hung up
+            super().handle_error(request, client_address)
+
+
+class StubOpenAI:
+    """Threaded stub; `reply(body) -> dict` can replace the canned completion."""
+
+    def __init__(
+        self,
+        latency_s: float = 0.0,
+        connect_latency_s: float = 0.0,
+        reply: Optional[Callable[[dict], dict]] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        limits: Optional[Dict[str, Tuple[int, int]]] = None,
+        period_s: float = 60.0,
+    ):
+        self.latency_s = latency_s
+        self.connect_latency_s = connect_latency_s
+        self.reply = reply
+        self.limits = limits or {}
+        self.period_s = period_s
+        self._buckets: Dict[str, List[float]] = {}  # model → [requests, tokens, t]
+        self.connections = 0
+        self.requests = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _admit(self, model: str, tokens: int) -> Optional[float]:
+        """Take one request + `tokens` from the model's buckets; when they
+        don't fit, seconds until they would."""
+        if model not in self.limits:
+            return None
+        rpm, tpm = self.limits[model]
+        now = time.monotonic()
+        with self._lock:
+            b = self._buckets.setdefault(model, [rpm, tpm, now])
+            dt, b[2] = now - b[2], now
+            b[0] = min(rpm, b[0] + dt * rpm / self.period_s)
+            b[1] = min(tpm, b[1] + dt * tpm / self.period_s)
+            tokens = min(tokens, tpm)
+            if b[0] >= 1 and b[1] >= tokens:
+                b[0] -= 1
+                b[1] -= tokens
+                return None
+            self.rejected += 1
+            return max(
+                (1 - b[0]) * self.period_s / rpm, (tokens - b[1]) * self.period_s / tpm
+            )
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+                if stub.connect_latency_s:  # stands in for TCP+TLS handshake
+                    time.sleep(stub.connect_latency_s)
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers["Content-Length"]))
+                body = json.loads(raw)
+                with stub._lock:
+                    stub.requests += 1
+                model = body.get("model", "stub")
+                out = body.get("max_tokens") or body.get("max_completion_tokens") or 0
+                retry_s = stub._admit(model, len(raw) // 4 + out)
+                if retry_s is not None:
+                    message = f"Rate limit reached for {model}"
+                    error = {"message": message, "code": "rate_limit_exceeded"}
+                    return self.send(
+                        429,
+                        "application/json",
+                        json.dumps({"error": error}).encode(),
+                        {"retry-after-ms": str(round(1000 * retry_s))},
+                    )
+                if stub.latency_s:
+                    time.sleep(stub.latency_s)
+                status = 200
+                try:
+                    if stub.reply is not None:
+                        payload = stub.reply(body)
+                    else:
+                        payload = completion(model, "ok")
+                except Exception as e:  # LookupError: nothing to answer with
+                    status = 404 if isinstance(e, LookupError) else 500
+                    payload = {"error": {"message": str(e), "type": type(e).__name__}}
+                if body.get("stream") and status == 200:
+                    kind = "text/event-stream"
+                    data = sse_body(payload)
+                else:
+                    kind = "application/json"
+                    data = json.dumps(payload).encode()
+                self.send(status, kind, data)
+
+            def send(self, status: int, kind: str, data: bytes, headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", kind)
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "StubOpenAI":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubOpenAI":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
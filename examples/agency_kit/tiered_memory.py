@@ -0,0 +1,384 @@
+# agency_kit/tiered_memory.py
+# ======================================================================
+# Tiered conversation memory: hot events, rolling summary, retention
+#  • hot tier : the last `recent_events` events of a session, verbatim,
+#               trimmed to `recent_tokens`
+#  • warm tier: one rolling summary per session; a background compactor
+#               folds events that aged out of the hot tier into it
+#  • cold tier: every new summary is also archived to the vector memory
+#               (archive.add) for recall – never injected wholesale
+#  • TierPolicy per team: token budgets + retention_days / max_bytes,
+#    enforced by pruning whole segments of that team's own EventLog
+#  • context(team, session) reads only the hot tail + latest summary, so
+#    the injected prompt stays flat however long the history gets
+#  • attach_tiered_memory(team_or_agent, memory) / tiered(factory, memory):
+#    the context is prepended to each run's own message (never written to
+#    the shared instance) and only the run's final answer is remembered
+# ======================================================================
+
+import logging, os, re, threading, time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from agency_kit.event_log import EventLog
+from agency_kit.hooks import wrap_method
+from agency_kit.tokens import count_tokens, truncate_tokens
+
+log = logging.getLogger("agency.tiered_memory")
+
+SUMMARY = "#summary"  # session key suffix of the rolling summary records
+COMPACT_READ = 2000  # most events one compaction folds in
+
+
+@dataclass
+class TierPolicy:
+    recent_events: int = 12
+    recent_tokens: int = 1500
+    summary_tokens: int = 400
+    compact_after: int = 12  # aged-out events that trigger a compaction
+    retention_days: float = 90.0
+    max_bytes: int = 32 * 2**20
+
+
+# (previous summary, events that aged out) → new summary
+Summariser = Callable[[str, List[Any]], str]
+
+
+def event_text(event: Any) -> str:
+    if isinstance(event, dict):
+        who = event.get("agent") or event.get("role") or "event"
+        return f"{who}: {event.get('content', '')}"
+    return str(event)
+
+
+def extractive_summary(previous: str, events: List[Any]) -> str:
+    """Local summariser: previous summary + first sentence of each event."""
+    lines = previous.splitlines() if previous else []
+    for e in events:
+        text = " ".join(event_text(e).split())
+        lines.append("- " + re.split(r"(?<=[.!?])\s", text, 1)[0][:200])
+    return "\n".join(lines)
+
+
+def _fit(summary: str, budget: int) -> str:
+    """Keep the newest lines of a rolling summary within `budget` tokens."""
+    lines = summary.strip().splitlines()
+    while len(lines) > 1 and count_tokens("\n".join(lines)) > budget:
+        lines.pop(0)
+    return truncate_tokens("\n".join(lines), budget)
+
+
+def _slug(team: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", team) or "_"
+
+
+class TieredMemory:
+    """Per-team EventLogs plus summaries, budgets and a compactor thread."""
+
+    def __init__(
+        self,
+        path: str,
+        policies: Optional[Dict[str, TierPolicy]] = None,
+        default: Optional[TierPolicy] = None,
+        summarise: Optional[Summariser] = None,
+        archive: Optional[Any] = None,
+        interval_s: float = 30.0,
+        segment_bytes: int = 2**20,
+    ):
+        self.path = path
+        self.policies = policies or {}
+        self.default = default or TierPolicy()
+        self.summarise = summarise or extractive_summary
+        self.archive = archive
+        self.interval_s = interval_s
+        self.segment_bytes = segment_bytes
+        self._logs: Dict[str, EventLog] = {}
+        self._dirty: set = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def policy(self, team: str) -> TierPolicy:
+        return self.policies.get(team, self.default)
+
+    def log(self, team: str) -> EventLog:
+        with self._lock:
+            if team not in self._logs:
+                self._logs[team] = EventLog(
+                    os.path.join(self.path, _slug(team)),
+                    segment_bytes=self.segment_bytes,
+                )
+                self._stats[team] = {
+                    "calls": 0,
+                    "tokens_injected": 0,
+                    "max_tokens": 0,
+                    "compactions": 0,
+                    "compacted_events": 0,
+                }
+            return self._logs[team]
+
+    def _count(self, team: str, key: str, n: float = 1) -> None:
+        with self._lock:
+            self._stats[team][key] += n
+
+    # ---------- write / read -------------------------------------------
+    def append(self, team: str, session: str, *events: Any) -> None:
+        self.log(team).append_many([(session, e) for e in events])
+        with self._lock:
+            self._dirty.add((team, session))
+        self._ensure_compactor()
+
+    def _summary(self, team: str, session: str) -> Dict[str, Any]:
+        last = self.log(team).read(session + SUMMARY, limit=1)
+        return last[0] if last else {"text": "", "upto": 0.0, "at_upto": 0}
+
+    def _unsummarised(self, team: str, session: str, summary, limit: int):
+        rows = self.log(team).read(session, limit=limit, with_ts=True)
+        skip, out = summary["at_upto"], []
+        for t, e in rows:
+            if t < summary["upto"]:
+                continue
+            if t == summary["upto"] and skip:
+                skip -= 1
+                continue
+            out.append((t, e))
+        return out
+
+    def context(self, team: str, session: str) -> str:
+        """Summary + recent events for the prompt, within the team budget."""
+        policy = self.policy(team)
+        summary = self._summary(team, session)
+        hot = self._unsummarised(team, session, summary, policy.recent_events)
+        lines, budget = [], policy.recent_tokens
+        for _, e in reversed(hot):  # newest first until the budget runs out
+            line = event_text(e)
+            n = count_tokens(line)
+            if n > budget:
+                if not lines:
+                    lines.append(truncate_tokens(line, budget))
+                break
+            lines.append(line)
+            budget -= n
+        parts = []
+        if summary["text"]:
+            parts.append("Summary of earlier conversation:\n" + summary["text"])
+        if lines:
+            parts.append("Recent conversation:\n" + "\n".join(reversed(lines)))
+        text = "\n\n".join(parts)
+        tokens = count_tokens(text)
+        with self._lock:
+            s = self._stats[team]
+            s["calls"] += 1
+            s["tokens_injected"] += tokens
+            s["max_tokens"] = max(s["max_tokens"], tokens)
+        return text
+
+    # ---------- compaction / retention ---------------------------------
+    def compact(self, team: str, session: str) -> bool:
+        """Fold events past the hot tier into the rolling summary."""
+        policy = self.policy(team)
+        summary = self._summary(team, session)
+        rows = self._unsummarised(team, session, summary, COMPACT_READ)
+        aged = rows[: max(len(rows) - policy.recent_events, 0)]
+        if len(aged) < policy.compact_after:
+            return False
+        text = _fit(
+            self.summarise(summary["text"], [e for _, e in aged]),
+            policy.summary_tokens,
+        )
+        upto = aged[-1][0]
+        at_upto = sum(1 for t, _ in aged if t == upto)
+        if upto == summary["upto"]:
+            at_upto += summary["at_upto"]
+        self.log(team).append(
+            session + SUMMARY,
+            {
+                "text": text,
+                "upto": upto,
+                "at_upto": at_upto,
+                "events": summary.get("events", 0) + len(aged),
+            },
+        )
+        if self.archive is not None:
+            self.archive.add(text, {"team": team, "session": session, "upto": upto})
+        self._count(team, "compactions")
+        self._count(team, "compacted_events", len(aged))
+        return True
+
+    def enforce(self, team: str) -> int:
+        """Retention: drop segments past retention_days, then past max_bytes.
+
+        Age-based pruning forgets idle sessions entirely; size-based pruning
+        re-appends the latest summaries it would otherwise delete.
+        """
+        policy, events = self.policy(team), self.log(team)
+        removed = events.prune(max_age_s=policy.retention_days * 86400)
+        if events.stats()["disk_mb"] * 2**20 <= policy.max_bytes:
+            return removed
+        summaries = {
+            s: events.read(s, limit=1)[0]
+            for s in events.sessions()
+            if s.endswith(SUMMARY)
+        }
+        dropped = events.prune(max_bytes=policy.max_bytes)
+        if dropped:
+            lost = [(s, v) for s, v in summaries.items() if not events.read(s, limit=1)]
+            if lost:
+                events.append_many(lost)
+        return removed + dropped
+
+    def run_once(self) -> None:
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            teams = list(self._logs)
+        for team, session in dirty:
+            try:
+                self.compact(team, session)
+            except Exception:  # keep the event; retry on the next pass
+                log.exception("memory compaction failed for %s/%s", team, session)
+                with self._lock:
+                    self._dirty.add((team, session))
+        for team in teams:
+            self.enforce(team)
+
+    def _ensure_compactor(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._loop, name="memory-compactor", daemon=True
+                )
+                self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            time.sleep(self.interval_s)
+            self.run_once()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            teams = dict(self._logs)
+            counters = {t: dict(s) for t, s in self._stats.items()}
+        out = {}
+        for team, events in teams.items():
+            s = counters[team]
+            out[team] = {
+                **s,
+                "avg_tokens": round(s["tokens_injected"] / max(s["calls"], 1), 1),
+                "disk_mb": events.stats()["disk_mb"],
+                "segments": events.stats()["segments"],
+            }
+        return out
+
+
+# ---------- agno wiring ------------------------------------------------
+def _message_text(message: Any) -> str:
+    return message if isinstance(message, str) else str(message)
+
+
+def _with_context(message: Any, context: str) -> Any:
+    """This run's message with the memory context in front of it."""
+    if not context:
+        return message
+    block = f"<memory>\n{context}\n</memory>"
+    if message is None:
+        return block
+    if isinstance(message, str):
+        return f"{block}\n\n{message}"
+    if isinstance(message, dict) and isinstance(message.get("content"), str):
+        return {**message, "content": f"{block}\n\n{message['content']}"}
+    if isinstance(getattr(message, "content", None), str):  # agno Message
+        return message.model_copy(update={"content": f"{block}\n\n{message.content}"})
+    return message  # multimodal list: left as is
+
+
+def attach_tiered_memory(obj, memory: TieredMemory, team: Optional[str] = None):
+    """Prepend context to each run's message; remember the exchange."""
+    team = team or obj.name
+
+    def prepare(message: Any, kwargs) -> Tuple[str, Any]:
+        session = kwargs.get("session_id") or obj.session_id or "default"
+        return session, _with_context(message, memory.context(team, session))
+
+    def remember(session: str, message: Any, content: Any) -> None:
+        memory.append(
+            team,
+            session,
+            {"role": "user", "content": _message_text(message)},
+            {"role": "assistant", "agent": team, "content": str(content or "")},
+        )
+
+    def make(run):
+        def tiered_run(message=None, *, stream: bool = False, **kwargs):
+            session, prompt = prepare(message, kwargs)
+            result = run(prompt, stream=stream, **kwargs)
+            if not stream:
+                remember(session, message, result.content)
+                return result
+            return _remember_when_done(result, lambda c: remember(session, message, c))
+
+        return tiered_run
+
+    def amake(arun):
+        async def tiered_arun(message=None, *, stream: bool = False, **kwargs):
+            session, prompt = prepare(message, kwargs)
+            result = await arun(prompt, stream=stream, **kwargs)
+            if not stream:
+                remember(session, message, result.content)
+                return result
+            return _aremember_when_done(result, lambda c: remember(session, message, c))
+
+        return tiered_arun
+
+    wrap_method(obj, "run", make)
+    return wrap_method(obj, "arun", amake)
+
+
+class _FinalAnswer:
+    """The run's answer from its stream: RunCompleted content if there is one
+    (stream_intermediate_steps), else the RunResponse text deltas – never tool
+    or reasoning event text."""
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self.completed: Any = None
+
+    def see(self, chunk: Any) -> None:
+        kind = getattr(chunk, "event", "RunResponse")
+        content = getattr(chunk, "content", None)
+        if kind == "RunCompleted" and content is not None:
+            self.completed = content
+        elif kind == "RunResponse" and isinstance(content, str):
+            self.parts.append(content)
+
+    @property
+    def content(self) -> Any:
+        return self.completed if self.completed is not None else "".join(self.parts)
+
+
+def _remember_when_done(chunks: Iterator, done: Callable[[Any], None]) -> Iterator:
+    answer = _FinalAnswer()
+    for chunk in chunks:
+        answer.see(chunk)
+        yield chunk
+    done(answer.content)
+
+
+async def _aremember_when_done(
+    chunks: AsyncIterator, done: Callable[[Any], None]
+) -> AsyncIterator:
+    answer = _FinalAnswer()
+    async for chunk in chunks:
+        answer.see(chunk)
+        yield chunk
+    done(answer.content)
+
+
+def tiered(factory, memory: TieredMemory):
+    """Factory wrapper: tiered(Team, memory)(...) builds, then attaches memory."""
+
+    def build(*args, **kwargs):
+        return attach_tiered_memory(factory(*args, **kwargs), memory)
+
+    return build
@@ -0,0 +1,57 @@
+# agency_kit/tokens.py
+# ======================================================================
+# Fast local token counting (no network)
+#  • tiktoken's o200k_base / cl100k_base when installed and cached
+#  • else a regex estimate: words cut into ≤4-char pieces, every other
+#    non-space char is one token – within ~10% of BPE on English prose
+#  • count_tokens(text), truncate_tokens(text, n)
+# ======================================================================
+
+import re
+from functools import lru_cache
+from typing import Optional
+
+_PIECE = re.compile(r"[A-Za-z]{1,4}|\d{1,3}|[^\sA-Za-z\d]")
+
+
+@lru_cache(maxsize=1)
+def _encoder():
+    try:
+        import tiktoken
+
+        for name in ("o200k_base", "cl100k_base"):
+            try:
+                return tiktoken.get_encoding(name)
+            except Exception:  # encoding file not cached and no network
+                continue
+    except ImportError:
+        pass
+    return None
+
+
+def backend() -> str:
+    enc = _encoder()
+    return f"tiktoken:{enc.name}" if enc is not None else "regex"
+
+
+def count_tokens(text: Optional[str]) -> int:
+    if not text:
+        return 0
+    enc = _encoder()
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    return len(_PIECE.findall(text))
+
+
+def truncate_tokens(text: str, n: int) -> str:
+    """Longest prefix of `text` with at most `n` tokens."""
+    if n <= 0:
+        return ""
+    enc = _encoder()
+    if enc is not None:
+        ids = enc.encode(text, disallowed_special=())
+        return text if len(ids) <= n else enc.decode(ids[:n])
+    for i, m in enumerate(_PIECE.finditer(text)):
+        if i == n:
+            return text[: m.start()].rstrip()
+    return text
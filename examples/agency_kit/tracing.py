@@ -0,0 +1,483 @@
+# agency_kit/tracing.py
+# ======================================================================
+# Span tracing across the delegation tree: Team → Team → Agent → tool
+#  • instrument(agent_or_team) opens a span per run()/arun() (streams stay
+#    open until the last chunk); the current span lives in a contextvar,
+#    so nested teams, delegate threads and asyncio tasks parent correctly
+#  • tool spans come from an agno tool hook, with arguments redacted
+#    (key / token / secret / password / email … → "[redacted]") and cut
+#    to `max_arg_chars`; record_args=False drops them
+#  • model spans come from ModelPool.observe(): timing + usage tokens,
+#    added up into every ancestor span
+#  • finished spans → JSONL (one line each), last `max_traces` traces in
+#    memory → speedscope JSON or folded stacks (flamegraph.pl, speedscope)
+#  • sample < 1 keeps whole traces or none; unsampled runs cost one
+#    contextvar lookup per span
+# ======================================================================
+
+import contextvars, itertools, json, os, random, re, threading, time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from agency_kit.hooks import add_tool_hooks, wrap_method
+
+REDACT = re.compile(r"key|token|secret|passw|auth|cookie|credential|email|phone", re.I)
+_UNSAMPLED = object()
+_CURRENT: contextvars.ContextVar = contextvars.ContextVar(
+    "agency_trace_span", default=None
+)
+_ids = itertools.count(1)
+_PID = os.getpid()
+
+
+class Span:
+    __slots__ = "trace_id span_id parent kind name start end attrs".split()
+
+    def __init__(self, trace_id: str, parent: Optional["Span"], kind: str, name: str):
+        self.trace_id = trace_id
+        self.span_id = f"{_PID:x}-{next(_ids):x}"
+        self.parent = parent
+        self.kind = kind
+        self.name = name
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.attrs: Dict[str, Any] = {}
+
+    @property
+    def parent_id(self) -> Optional[str]:
+        return self.parent.span_id if self.parent is not None else None
+
+    @property
+    def ms(self) -> float:
+        return 1000 * ((self.end or time.time()) - self.start)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "kind": self.kind,
+            "name": self.name,
+            "start": self.start,
+            "end": self.end,
+            "ms": round(self.ms, 3),
+            "attrs": self.attrs,
+        }
+
+
+def redact(value: Any, max_chars: int = 200, key: str = "") -> Any:
+    """Copy of tool arguments with secrets masked and long strings cut."""
+    if key and REDACT.search(key):
+        return "[redacted]"
+    if isinstance(value, dict):
+        return {k: redact(v, max_chars, str(k)) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(v, max_chars) for v in value[:20]]
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    text = str(value)
+    return text if len(text) <= max_chars else text[:max_chars] + "…"
+
+
+class Tracer:
+    """Span factory + exporters; one per process is enough (TRACER)."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        sample: float = 1.0,
+        max_traces: int = 200,
+        record_args: bool = True,
+        max_arg_chars: int = 200,
+    ):
+        self.path = None
+        if path is not None:
+            self.write_to(path)
+        self.sample = sample
+        self.max_traces = max_traces
+        self.record_args = record_args
+        self.max_arg_chars = max_arg_chars
+        self._traces: "OrderedDict[str, List[Span]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._file = None
+        self._flushed = 0.0
+        self.counters = {"traces": 0, "spans": 0, "unsampled": 0}
+
+    def write_to(self, path: str) -> "Tracer":
+        """Append every finished span to the JSONL file at `path`."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        return self
+
+    # ---------- spans --------------------------------------------------
+    def start(self, kind: str, name: str, **attrs) -> Any:
+        """Child of the current span (or a new trace); becomes current."""
+        parent = _CURRENT.get()
+        if parent is _UNSAMPLED:
+            return _UNSAMPLED, _CURRENT.set(_UNSAMPLED)
+        if parent is None:
+            if self.sample < 1.0 and random.random() >= self.sample:
+                with self._lock:
+                    self.counters["unsampled"] += 1
+                return _UNSAMPLED, _CURRENT.set(_UNSAMPLED)
+            trace_id = f"{_PID:x}-{time.time_ns():x}"
+        else:
+            trace_id = parent.trace_id
+        span = Span(trace_id, parent, kind, name)
+        span.attrs.update(attrs)
+        return span, _CURRENT.set(span)
+
+    def finish(self, span: Any, token=None, error: Optional[BaseException] = None):
+        if token is not None:
+            _CURRENT.reset(token)
+        if span is _UNSAMPLED:
+            return
+        span.end = time.time()
+        if error is not None:
+            span.attrs["error"] = f"{type(error).__name__}: {error}"
+        self._finished(span)
+
+    def _finished(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) if self.path else None
+        with self._lock:
+            self.counters["spans"] += 1
+            spans = self._traces.get(span.trace_id)
+            if spans is None:
+                spans = self._traces[span.trace_id] = []
+                self.counters["traces"] += 1
+                while len(self._traces) > self.max_traces:
+                    self._traces.popitem(last=False)
+            spans.append(span)
+            if line is not None:
+                if self._file is None:
+                    self._file = open(self.path, "a", buffering=1 << 16)
+                self._file.write(line + "\n")
+                if span.parent is None and span.end - self._flushed > 1.0:
+                    self._file.flush()  # whole traces reach disk, ≤ 1 flush/s
+                    self._flushed = span.end
+
+    def span(self, kind: str, name: str, **attrs) -> "_SpanContext":
+        return _SpanContext(self, kind, name, attrs)
+
+    # ---------- model calls (ModelPool observer) -----------------------
+    def on_model_call(
+        self, model: str, usage: Dict[str, int], seconds: float, status: int
+    ) -> None:
+        parent = _CURRENT.get()
+        if parent is _UNSAMPLED or parent is None:
+            return
+        span = Span(parent.trace_id, parent, "model", model)
+        span.end = time.time()
+        span.start = span.end - seconds
+        prompt = usage.get("prompt_tokens", 0)
+        completion = usage.get("completion_tokens", 0)
+        span.attrs.update(
+            prompt_tokens=prompt, completion_tokens=completion, status=status
+        )
+        node = parent
+        with self._lock:  # ancestors carry the tokens of their subtree
+            while node is not None:
+                a = node.attrs
+                a["prompt_tokens"] = a.get("prompt_tokens", 0) + prompt
+                a["completion_tokens"] = a.get("completion_tokens", 0) + completion
+                node = node.parent
+        self._finished(span)
+
+    def observe(self, pool) -> "Tracer":
+        pool.observe(self.on_model_call)
+        return self
+
+    # ---------- tool calls (agno tool_hooks signature) -----------------
+    def _tool_attrs(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.record_args:
+            return {}
+        return {"args": redact(arguments, self.max_arg_chars)}
+
+    def tool_hook(self, function_name: str, function_call, arguments: Dict[str, Any]):
+        span, token = self.start("tool", function_name, **self._tool_attrs(arguments))
+        try:
+            result = function_call(**arguments)
+        except BaseException as e:
+            self.finish(span, token, e)
+            raise
+        self.finish(span, token)
+        return result
+
+    async def atool_hook(
+        self, function_name: str, function_call, arguments: Dict[str, Any]
+    ):
+        span, token = self.start("tool", function_name, **self._tool_attrs(arguments))
+        try:
+            result = await function_call(**arguments)
+        except BaseException as e:
+            self.finish(span, token, e)
+            raise
+        self.finish(span, token)
+        return result
+
+    # ---------- reading / export ---------------------------------------
+    def trace(self, trace_id: str) -> List[Span]:
+        with self._lock:
+            return sorted(self._traces.get(trace_id, []), key=lambda s: s.start)
+
+    def recent(self, n: int = 20) -> List[Dict[str, Any]]:
+        """Newest traces first: root name, duration, span count, tokens."""
+        with self._lock:
+            traces = list(self._traces.items())[-n:]
+        out = []
+        for trace_id, spans in reversed(traces):
+            roots = [s for s in spans if s.parent is None]
+            root = roots[0] if roots else min(spans, key=lambda s: s.start)
+            out.append(
+                {
+                    "trace_id": trace_id,
+                    "root": f"{root.kind}:{root.name}",
+                    "ms": round(root.ms, 1),
+                    "spans": len(spans),
+                    "prompt_tokens": root.attrs.get("prompt_tokens", 0),
+                    "completion_tokens": root.attrs.get("completion_tokens", 0),
+                    "done": bool(roots),
+                }
+            )
+        return out
+
+    def to_folded(self, trace_ids: Optional[List[str]] = None) -> str:
+        """Folded stacks ("a;b;c <self µs>") for flamegraph.pl / speedscope."""
+        with self._lock:
+            ids = trace_ids or list(self._traces)
+            spans = [s for t in ids for s in self._traces.get(t, [])]
+        child_ms: Dict[str, float] = {}
+        for s in spans:
+            if s.parent is not None and s.end is not None:
+                child_ms[s.parent.span_id] = child_ms.get(s.parent.span_id, 0) + s.ms
+        weights: Dict[str, float] = {}
+        for s in spans:
+            if s.end is None:
+                continue
+            frames, node = [], s
+            while node is not None:
+                frames.append(f"{node.kind}:{node.name}".replace(";", ","))
+                node = node.parent
+            stack = ";".join(reversed(frames))
+            self_ms = max(s.ms - child_ms.get(s.span_id, 0.0), 0.0)
+            weights[stack] = weights.get(stack, 0.0) + self_ms
+        return "\n".join(f"{k} {round(v * 1000)}" for k, v in weights.items() if v)
+
+    def to_speedscope(self, trace_id: str) -> Dict[str, Any]:
+        """Evented speedscope profile; concurrent siblings go to extra lanes
+        that re-open their ancestors, so every lane stays well nested."""
+        spans = [s for s in self.trace(trace_id) if s.end is not None]
+        if not spans:
+            return {}
+        t0 = min(s.start for s in spans)
+        frames: Dict[str, int] = {}
+
+        def frame(s: Span) -> int:
+            return frames.setdefault(f"{s.kind}:{s.name}", len(frames))
+
+        lanes: List[Dict[str, Any]] = []  # {"stack": [(span_id, end, frame)], ...}
+
+        def close_until(lane, at: float) -> None:
+            stack = lane["stack"]
+            while stack and stack[-1][1] <= at:
+                _, end, f = stack.pop()
+                lane["events"].append({"type": "C", "frame": f, "at": end})
+
+        def push(lane, s: Span, at: float) -> None:
+            stack = lane["stack"]
+            end = (s.end - t0) * 1000
+            if stack:
+                end = min(end, stack[-1][1])
+            stack.append((s.span_id, end, frame(s)))
+            lane["events"].append({"type": "O", "frame": frame(s), "at": at})
+
+        for s in sorted(spans, key=lambda s: (s.start, -s.ms)):
+            at = (s.start - t0) * 1000
+            for lane in lanes:
+                close_until(lane, at)
+                top = lane["stack"][-1][0] if lane["stack"] else None
+                if top == s.parent_id or (top is None and s.parent is None):
+                    push(lane, s, at)
+                    break
+            else:
+                lane = {"stack": [], "events": []}
+                lanes.append(lane)
+                chain, node = [], s.parent
+                while node is not None:
+                    chain.append(node)
+                    node = node.parent
+                for ancestor in reversed(chain):
+                    push(lane, ancestor, at)
+                push(lane, s, at)
+        for lane in lanes:
+            close_until(lane, float("inf"))
+        end = max((s.end - t0) * 1000 for s in spans)
+        names = sorted(frames, key=frames.get)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"trace {trace_id}",
+            "exporter": "agency_kit.tracing",
+            "shared": {"frames": [{"name": n} for n in names]},
+            "profiles": [
+                {
+                    "type": "evented",
+                    "name": f"lane {i}",
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": end,
+                    "events": lane["events"],
+                }
+                for i, lane in enumerate(lanes)
+            ],
+        }
+
+    def export_speedscope(self, trace_id: str, path: str) -> str:
+        with open(path, "w") as f:
+            json.dump(self.to_speedscope(trace_id), f)
+        return path
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            c = dict(self.counters)
+            kept = len(self._traces)
+        return {**c, "kept_traces": kept, "sample": self.sample, "path": self.path}
+
+
+class _SpanContext:
+    __slots__ = ("tracer", "kind", "name", "attrs", "span", "token")
+
+    def __init__(self, tracer: Tracer, kind: str, name: str, attrs: Dict[str, Any]):
+        self.tracer, self.kind, self.name, self.attrs = tracer, kind, name, attrs
+
+    def __enter__(self) -> Any:
+        self.span, self.token = self.tracer.start(self.kind, self.name, **self.attrs)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.tracer.finish(self.span, self.token, exc)
+
+
+# ---------- agno wiring ------------------------------------------------
+def _traced_iter(tracer: Tracer, chunks: Iterator, span: Any) -> Iterator:
+    """Stream with `span` current while each chunk is produced; the span
+    ends with the stream."""
+    it, error = iter(chunks), None
+    try:
+        while True:
+            token = _CURRENT.set(span)
+            try:
+                chunk = next(it)
+            except StopIteration:
+                return
+            finally:
+                _CURRENT.reset(token)
+            yield chunk
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        tracer.finish(span, None, error)
+
+
+async def _atraced_iter(tracer: Tracer, chunks: AsyncIterator, span: Any):
+    it, error = chunks.__aiter__(), None
+    try:
+        while True:
+            token = _CURRENT.set(span)
+            try:
+                chunk = await it.__anext__()
+            except StopAsyncIteration:
+                return
+            finally:
+                _CURRENT.reset(token)
+            yield chunk
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        tracer.finish(span, None, error)
+
+
+def instrument(obj, tracer: Optional[Tracer] = None):
+    """A span per run()/arun() of obj, tool spans for its tools (idempotent)."""
+    tracer = tracer or TRACER
+    if getattr(obj, "_traced", False):
+        return obj
+    object.__setattr__(obj, "_traced", True)
+    kind = "team" if hasattr(obj, "members") else "agent"
+    add_tool_hooks(obj, tracer.tool_hook, tracer.atool_hook)
+
+    def begin(kwargs):
+        span, token = tracer.start(kind, obj.name)
+        if span is not _UNSAMPLED:
+            span.attrs["session"] = kwargs.get("session_id") or obj.session_id
+        return span, token
+
+    def make(run):
+        def traced_run(message=None, *, stream: bool = False, **kwargs):
+            span, token = begin(kwargs)
+            try:
+                result = run(message, stream=stream, **kwargs)
+            except BaseException as e:
+                tracer.finish(span, token, e)
+                raise
+            if not stream:
+                tracer.finish(span, token)
+                return result
+            _CURRENT.reset(token)
+            return _traced_iter(tracer, result, span)
+
+        return traced_run
+
+    def amake(arun):
+        async def traced_arun(message=None, *, stream: bool = False, **kwargs):
+            span, token = begin(kwargs)
+            try:
+                result = await arun(message, stream=stream, **kwargs)
+            except BaseException as e:
+                tracer.finish(span, token, e)
+                raise
+            if not stream:
+                tracer.finish(span, token)
+                return result
+            _CURRENT.reset(token)
+            return _atraced_iter(tracer, result, span)
+
+        return traced_arun
+
+    wrap_method(obj, "run", make)
+    return wrap_method(obj, "arun", amake)
+
+
+def instrument_tree(root, tracer: Optional[Tracer] = None):
+    """instrument() a team and every member below it."""
+    instrument(root, tracer)
+    for member in getattr(root, "members", None) or []:
+        instrument_tree(member, tracer)
+    return root
+
+
+def traced(factory, tracer: Optional[Tracer] = None):
+    """Factory wrapper: traced(Team)(...) builds, then instruments."""
+
+    def build(*args, **kwargs):
+        return instrument(factory(*args, **kwargs), tracer)
+
+    return build
+
+
+# process-wide default; TRACE_FILE enables JSONL, TRACE_SAMPLE / TRACE_ARGS
+TRACER = Tracer(
+    os.getenv("TRACE_FILE") or None,
+    sample=float(os.getenv("TRACE_SAMPLE", "1")),
+    record_args=os.getenv("TRACE_ARGS", "1") != "0",
+)
+
+
+def trace_stats() -> Dict[str, Any]:
+    return {**TRACER.stats(), "recent": TRACER.recent()}
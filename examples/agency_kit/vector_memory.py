@@ -0,0 +1,132 @@
+# agency_kit/vector_memory.py
+# ======================================================================
+# Vector memory on the IVF index (drop-in for VectorFileMemory(path=...))
+#  • add(text, meta) embeds with the local HashingEmbedder and appends to
+#    agency_kit.ivf.IVFIndex – no rebuild, nothing held in RAM but lists
+#  • texts live in docs.jsonl, byte offsets in offsets.u64 (memmapped)
+#  • the index is flushed at most every `flush_s` seconds (and by flush());
+#    on open, docs / offsets past the flushed index.count are cut back, so
+#    a crash loses at most that window, never the id → doc mapping
+#  • vector_memory(path, flat_cls): VECTOR_BACKEND=ann (default) | flat
+# ======================================================================
+
+import json, logging, os, threading, time
+from typing import Any, Dict, Iterable, List, Optional
+
+from agency_kit.embedding import HashingEmbedder
+
+log = logging.getLogger("agency.vector_memory")
+
+
+class AnnVectorMemory:
+    """Append-only text memory with approximate top-k recall."""
+
+    def __init__(
+        self,
+        path: str,
+        dim: int = 256,
+        nprobe: int = 8,
+        embedder: Optional[Any] = None,
+        flush_s: float = 1.0,
+    ):
+        import numpy as np
+        from agency_kit.ivf import IVFIndex
+
+        self._np = np
+        self.path = path
+        self.embedder = embedder or HashingEmbedder(dim)
+        self.index = IVFIndex(os.path.join(path, "ivf"), dim, nprobe=nprobe)
+        self._lock = threading.Lock()
+        self.flush_s = flush_s
+        self._flushed = time.monotonic()
+        self._docs = open(os.path.join(path, "docs.jsonl"), "ab+")
+        self._offsets_path = os.path.join(path, "offsets.u64")
+        open(self._offsets_path, "ab").close()
+        self._recover()
+        self._offsets = self._load_offsets()
+
+    def _recover(self) -> None:
+        """A crash between the appends leaves extra docs / offsets: index wins."""
+        n = self.index.count
+        if os.path.getsize(self._offsets_path) > n * 8:
+            os.truncate(self._offsets_path, n * 8)
+        end = 0
+        if n:
+            self._docs.seek(int(self._load_offsets()[n - 1]))
+            self._docs.readline()
+            end = self._docs.tell()
+        if os.path.getsize(self._docs.name) > end:
+            log.warning("vector memory: dropping %s orphan bytes", self._docs.name)
+            self._docs.truncate(end)
+
+    def _load_offsets(self):
+        if not os.path.getsize(self._offsets_path):
+            return self._np.zeros(0, self._np.uint64)
+        return self._np.memmap(self._offsets_path, dtype=self._np.uint64, mode="r")
+
+    def _embed(self, texts: List[str]):
+        return self._np.asarray([self.embedder(t) for t in texts], self._np.float32)
+
+    def add_many(
+        self, texts: Iterable[str], metas: Optional[Iterable[Dict]] = None
+    ) -> List[int]:
+        texts = list(texts)
+        metas = list(metas) if metas is not None else [None] * len(texts)
+        vecs = self._embed(texts)
+        with self._lock:
+            self._docs.seek(0, os.SEEK_END)
+            offsets = []
+            for text, meta in zip(texts, metas):
+                offsets.append(self._docs.tell())
+                line = {"text": text, "meta": meta}
+                self._docs.write((json.dumps(line, default=str) + "\n").encode())
+            self._docs.flush()
+            with open(self._offsets_path, "ab") as f:
+                f.write(self._np.asarray(offsets, self._np.uint64).tobytes())
+            ids = self.index.add(vecs)
+            if time.monotonic() - self._flushed >= self.flush_s:
+                self._flush()
+            self._offsets = self._load_offsets()
+        return ids.tolist()
+
+    def _flush(self) -> None:
+        self.index.flush()
+        self._flushed = time.monotonic()
+
+    def flush(self) -> None:
+        """Persist the index now (otherwise at most every `flush_s`)."""
+        with self._lock:
+            self._flush()
+
+    def add(self, text: str, meta: Optional[Dict] = None) -> int:
+        return self.add_many([text], [meta])[0]
+
+    def _doc(self, i: int) -> Dict[str, Any]:
+        self._docs.seek(int(self._offsets[i]))
+        return json.loads(self._docs.readline())
+
+    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Top-k {id, score, text, meta}, most similar first."""
+        ids, scores = self.index.search(self._embed([query])[0], k)
+        with self._lock:
+            return [
+                {"id": int(i), "score": round(float(s), 4), **self._doc(int(i))}
+                for i, s in zip(ids, scores)
+            ]
+
+    def __len__(self) -> int:
+        return self.index.count
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "ann", **self.index.stats()}
+
+
+def vector_memory(path: str, flat_cls: Any, backend: Optional[str] = None):
+    """VECTOR_BACKEND=ann → AnnVectorMemory, flat → flat_cls(path=path)."""
+    backend = (backend or os.getenv("VECTOR_BACKEND", "ann")).lower()
+    if backend == "ann":
+        try:
+            return AnnVectorMemory(path)
+        except ImportError:
+            log.warning("vector memory: numpy missing, using the flat store")
+    return flat_cls(path=path)
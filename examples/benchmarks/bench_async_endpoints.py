@@ -0,0 +1,113 @@
+# bench_async_endpoints.py
+# ======================================================================
+# Endpoint load test: asyncio.to_thread(run) vs native arun()
+#  • "thread" – handler awaits asyncio.to_thread(agent.run) (old endpoints)
+#  • "async"  – handler does `async with LIMIT: await agent.arun()`
+#  • stub agent = 3 sequential model calls to a local stub server, which
+#    runs in its own process so its threads don't compete for our GIL
+#  • probe: a trivial to_thread call made while the load runs, i.e. what
+#    every other endpoint on the server feels
+#
+#   python examples/benchmarks/bench_async_endpoints.py [requests] [latency_s]
+# ======================================================================
+
+import asyncio, json, multiprocessing, os, statistics, sys, time, pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from agency_kit.limits import EndpointLimiter
+from agency_kit.model_pool import ModelPool
+from agency_kit.stub_openai import StubOpenAI
+
+BODY = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "hi"}]}
+CALLS_PER_RUN = 3
+DEFAULT_THREADS = min(32, (os.cpu_count() or 1) + 4)  # asyncio default executor
+
+
+class StubAgent:
+    """run()/arun() = CALLS_PER_RUN model round trips through the pool."""
+
+    def __init__(self, pool: ModelPool, base_url: str):
+        self.pool = pool
+        self.base_url = base_url
+        self.url = base_url + "/chat/completions"
+
+    def run(self, message: str, stream: bool = False):
+        client = self.pool.client("gpt-4o-mini", "sk-x", self.base_url)
+        for _ in range(CALLS_PER_RUN):
+            client.post(self.url, content=json.dumps(BODY)).raise_for_status()
+        return message
+
+    async def arun(self, message: str, stream: bool = False):
+        client = self.pool.async_client("gpt-4o-mini", "sk-x", self.base_url)
+        for _ in range(CALLS_PER_RUN):
+            (await client.post(self.url, content=json.dumps(BODY))).raise_for_status()
+        return message
+
+
+def serve(latency: float, conn) -> None:
+    with StubOpenAI(latency_s=latency) as stub:
+        conn.send(stub.base_url)
+        conn.recv()  # block until the parent is done
+
+
+async def load(mode: str, requests: int, base_url: str, limit: int) -> dict:
+    pool = ModelPool(max_in_flight=256, max_keepalive=256)
+    agent = StubAgent(pool, base_url)
+    limiter = EndpointLimiter(mode, limit)
+
+    async def handler(i: int) -> float:
+        t0 = time.perf_counter()
+        if mode == "thread":
+            await asyncio.to_thread(agent.run, f"req {i}")
+        else:
+            async with limiter:
+                await agent.arun(f"req {i}")
+        return time.perf_counter() - t0
+
+    async def probe() -> float:
+        await asyncio.sleep(0.05)  # let the load pile up first
+        t0 = time.perf_counter()
+        await asyncio.to_thread(lambda: None)
+        return time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    probe_task = asyncio.ensure_future(probe())
+    lat = await asyncio.gather(*(handler(i) for i in range(requests)))
+    wall = time.perf_counter() - t0
+    return {
+        "mode": mode,
+        "wall_s": wall,
+        "rps": requests / wall,
+        "p50_ms": 1000 * statistics.median(lat),
+        "p95_ms": 1000 * sorted(lat)[int(0.95 * (len(lat) - 1))],
+        "probe_ms": 1000 * await probe_task,
+        "peak_in_flight": max(s["peak_in_flight"] for s in pool.stats().values()),
+    }
+
+
+def main(requests: int = 256, latency: float = 0.1):
+    print(
+        f"{requests} concurrent requests x {CALLS_PER_RUN} model calls x "
+        f"{latency * 1000:.0f}ms; default thread pool = {DEFAULT_THREADS}"
+    )
+    parent, child = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=serve, args=(latency, child), daemon=True)
+    server.start()
+    base_url = parent.recv()
+    try:
+        for mode, limit in (("thread", 0), ("async", 64), ("async", 256)):
+            r = asyncio.run(load(mode, requests, base_url, limit))
+            label = mode if mode == "thread" else f"async limit={limit}"
+            print(
+                f"{label:<16}: {r['wall_s']:5.2f}s  {r['rps']:6.1f} req/s  "
+                f"p50 {r['p50_ms']:6.0f}ms  p95 {r['p95_ms']:6.0f}ms  "
+                f"in-flight {r['peak_in_flight']:3}  probe {r['probe_ms']:6.0f}ms"
+            )
+    finally:
+        parent.send("stop")
+        server.join(5)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 256, float(args[1]) if len(args) > 1 else 0.1)
@@ -0,0 +1,188 @@
+# bench_batching.py
+# ======================================================================
+# Batched multi-item calls (agency_kit.batching) vs one call per lead
+#  • stub model behind StubOpenAI: 250 ms to first token + 80 tokens/s
+#    (× latency_scale); a ~400-token system prompt per stage
+#  • leads walk Enricher → Scorer → Emailer → FollowUp, the four per-lead
+#    stages of the consulting lead-gen DAG; Emailer answers are ~5× longer
+#  • per setup: model calls, prompt tokens, wall time and mean lead latency
+#    per 100 leads; batch sizes come from max_items and the token budget
+#  • the answers hold the same tokens either way, so decode time does not
+#    shrink – batching saves calls, repeated prompt tokens and one
+#    time-to-first-token per item, and trades per-lead latency for it
+#  • "fail" rows drop the keys for a share of the leads on their first try
+#    – only those are split off and retried
+#
+#   python examples/benchmarks/bench_batching.py [leads] [latency_scale]
+# ======================================================================
+
+import asyncio, json, statistics, sys, threading, time, pathlib
+from types import SimpleNamespace
+
+import httpx
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from agency_kit.batching import batch_stage, batch_stats
+from agency_kit.pipeline import ItemDag, agent_stage
+from agency_kit.stub_openai import StubOpenAI, completion
+from agency_kit.tokens import count_tokens
+
+PHI = 0.6180339887
+POLICY = " ".join(["Follow the BlueRail lead-handling policy and tone guide."] * 40)
+# stage → (instructions, keys, words per answer)
+STAGES = {
+    "Enricher": (
+        "Add company_size,website,email",
+        ("company_size", "website", "email"),
+        6,
+    ),
+    "Scorer": ("Add score", ("score",), 2),
+    "Emailer": ("Add outreach_email", ("outreach_email",), 90),
+    "FollowUp": ("Add followup_d3 & followup_d8", ("followup_d3", "followup_d8"), 30),
+}
+STATE = {"scale": 1.0, "fail": 0.0, "calls": 0, "prompt": 0, "seen": set()}
+LOCK = threading.Lock()
+
+
+def reply(body: dict) -> dict:
+    system, user = body["messages"][0]["content"], body["messages"][-1]["content"]
+    stage = next(n for n, (instr, _, _) in STAGES.items() if instr in system)
+    _, keys, words = STAGES[stage]
+    batched = "ITEMS:" in user
+    rows = json.loads(user.split("ITEMS:\n", 1)[1]) if batched else [json.loads(user)]
+    out, tokens = [], 0
+    for row in rows:
+        lead = row["lead"]
+        with LOCK:
+            first = (stage, lead) not in STATE["seen"]
+            STATE["seen"].add((stage, lead))
+        if first and (lead * PHI) % 1 < STATE["fail"]:
+            answer = {"note": "skipped"}
+        else:
+            answer = {k: f"{lead} " + "lorem " * words for k in keys}
+        if batched:
+            answer = {"_id": row["_id"], **answer}
+        tokens += count_tokens(json.dumps(answer))
+        out.append(answer)
+    prompt = count_tokens(system) + count_tokens(user)
+    with LOCK:
+        STATE["calls"] += 1
+        STATE["prompt"] += prompt
+    time.sleep((0.25 + tokens / 80) * STATE["scale"])
+    return completion(body["model"], json.dumps(out if batched else out[0]), prompt)
+
+
+class HttpAgent:
+    """Minimal Agent: instructions as system prompt, run()/arun() → content."""
+
+    def __init__(self, base_url: str, instructions: str):
+        self.instructions = [POLICY, instructions]
+        self.system = "\n".join(self.instructions)
+        self.base_url = base_url
+        self.client = httpx.Client(base_url=base_url, timeout=60)
+        self.aclients = {}
+
+    def deep_copy(self):
+        return self
+
+    def body(self, message: str) -> dict:
+        return {
+            "model": "gpt-4o-mini",
+            "messages": [
+                {"role": "system", "content": self.system},
+                {"role": "user", "content": message},
+            ],
+        }
+
+    def run(self, message: str, stream: bool = False):
+        r = self.client.post("/chat/completions", json=self.body(message))
+        r.raise_for_status()
+        return SimpleNamespace(content=r.json()["choices"][0]["message"]["content"])
+
+    async def arun(self, message: str, stream: bool = False):
+        loop = asyncio.get_running_loop()
+        if loop not in self.aclients:
+            self.aclients[loop] = httpx.AsyncClient(base_url=self.base_url, timeout=60)
+        r = await self.aclients[loop].post("/chat/completions", json=self.body(message))
+        r.raise_for_status()
+        return SimpleNamespace(content=r.json()["choices"][0]["message"]["content"])
+
+
+def build(base_url: str, batching):
+    stages, after = [], ()
+    for name, (instr, keys, _) in STAGES.items():
+        agent = HttpAgent(base_url, instr)
+        if batching is None:
+            stages.append(agent_stage(name, agent, after, 4))
+        else:
+            stages.append(batch_stage(name, agent, keys, after, 4, **batching))
+        after = (name,)
+    return ItemDag(stages)
+
+
+def run(dag: ItemDag, leads: int, use_async: bool):
+    latencies = []
+
+    async def one(i):
+        t0 = time.perf_counter()
+        item = await dag.asubmit({"lead": i})
+        latencies.append(time.perf_counter() - t0)
+        return item
+
+    async def all_async():
+        return await asyncio.gather(*(one(i) for i in range(leads)))
+
+    t0 = time.perf_counter()
+    if use_async:
+        items = asyncio.run(all_async())
+    else:
+        futures = []
+        for i in range(leads):
+            started = time.perf_counter()
+            f = dag.submit({"lead": i})
+            f.add_done_callback(
+                lambda _, s=started: latencies.append(time.perf_counter() - s)
+            )
+            futures.append(f)
+        items = [f.result() for f in futures]
+    wall = time.perf_counter() - t0
+    dag.shutdown()
+    done = sum("followup_d8" in it for it in items)
+    return wall, statistics.mean(latencies), done
+
+
+def main(leads: int = 100, latency_scale: float = 0.1):
+    STATE["scale"] = latency_scale
+    setups = [
+        ("per lead", None, 0.0, False),
+        ("max 5", {"max_items": 5}, 0.0, False),
+        ("max 10", {"max_items": 10}, 0.0, False),
+        ("max 20", {"max_items": 20}, 0.0, False),
+        ("max 20, 3k budget", {"max_items": 20, "token_budget": 3000}, 0.0, False),
+        ("max 10, 10% fail", {"max_items": 10}, 0.1, False),
+        ("max 10, arun", {"max_items": 10}, 0.0, True),
+    ]
+    per = 100 / leads
+    with StubOpenAI(reply=reply) as stub:
+        print(f"{leads} leads × {len(STAGES)} stages, latency ×{latency_scale}")
+        print(
+            f"{'setup':<20} {'calls/100':>9} {'prompt tok/100':>14} {'wall s':>7} "
+            f"{'lead ms':>8} {'done':>5} {'retried':>7} {'failed':>6}  items/call E/S/M/F"
+        )
+        for label, batching, fail, use_async in setups:
+            STATE.update(fail=fail, calls=0, prompt=0, seen=set())
+            dag = build(stub.base_url, batching)
+            wall, latency, done = run(dag, leads, use_async)
+            stats = list(batch_stats().values()) if batching else []
+            retried = sum(s["retried"] for s in stats)
+            failed = sum(s["failed"] for s in stats)
+            sizes = "/".join(f"{s['items_per_call']:g}" for s in stats) or "1"
+            print(
+                f"{label:<20} {STATE['calls'] * per:9.0f} {STATE['prompt'] * per:14.0f} "
+                f"{wall:7.2f} {1000 * latency:8.0f} {done:5d} {retried:7d} {failed:6d}  {sizes}"
+            )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 100, float(args[1]) if args[1:] else 0.1)
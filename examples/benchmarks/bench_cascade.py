@@ -0,0 +1,128 @@
+# bench_cascade.py
+# ======================================================================
+# gpt-4o-mini → gpt-4o cascade (agency_kit.cascade) vs gpt-4o for all
+#  • stub models: mini answers in 20 ms, 4o in 50 ms (× latency_scale);
+#    1500 prompt / 300 completion tokens, priced from metrics.PRICES
+#  • escalation rate is set exactly: request i fails the cheap check when
+#    frac(i·φ) < rate – a low self-reported confidence ("text") or prose
+#    where the instructions want JSON {score, reason} ("json")
+#  • per rate: escalations seen, $ per 1k requests, mean latency, savings;
+#    the break-even rate is where the cascade stops paying
+#  • one streamed request each way checks the SSE path
+#
+#   python examples/benchmarks/bench_cascade.py [requests] [latency_scale]
+# ======================================================================
+
+import json, re, statistics, sys, time, pathlib
+
+import httpx
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from agency_kit.cascade import Cascade, CascadePolicy
+from agency_kit.metrics import cost
+from agency_kit.model_pool import ModelPool
+from agency_kit.stub_openai import StubOpenAI, completion
+
+PHI = 0.6180339887
+PROMPT, COMPLETION = 1500, 300
+LATENCY = {"gpt-4o-mini": 0.020, "gpt-4o": 0.050}
+SYSTEMS = {
+    "text": "<instructions>\n- Summarise the account plan\n</instructions>",
+    "json": "<instructions>\n- Return JSON {score, reason}\n</instructions>",
+}
+STATE = {"rate": 0.0, "scale": 1.0}
+
+
+def reply(body: dict) -> dict:
+    model = body["model"]
+    time.sleep(LATENCY[model] * STATE["scale"])
+    i = int(re.search(r"#(\d+)", body["messages"][-1]["content"]).group(1))
+    bad = model == "gpt-4o-mini" and (i * PHI) % 1 < STATE["rate"]
+    system = body["messages"][0]["content"]
+    if "JSON" in system:
+        text = (
+            "The account looks promising."
+            if bad
+            else json.dumps({"score": 72, "reason": "fit"})
+        )
+    else:
+        text = "Plan: " + "expand seats, " * 40 + f"\nconfidence: {0.3 if bad else 0.9}"
+    out = completion(model, text, PROMPT)
+    out["usage"].update(completion_tokens=COMPLETION, total_tokens=PROMPT + COMPLETION)
+    return out
+
+
+def body(kind: str, i: int, stream: bool = False) -> dict:
+    return {
+        "model": "gpt-4o",
+        "messages": [
+            {"role": "system", "content": SYSTEMS[kind]},
+            {"role": "user", "content": f"Account #{i}"},
+        ],
+        "stream": stream,
+    }
+
+
+def run(client: httpx.Client, url: str, kind: str, n: int) -> float:
+    walls = []
+    for i in range(n):
+        t0 = time.perf_counter()
+        client.post(url, json=body(kind, i)).raise_for_status()
+        walls.append(time.perf_counter() - t0)
+    return statistics.mean(walls)
+
+
+def main(requests: int = 100, latency_scale: float = 1.0):
+    STATE["scale"] = latency_scale
+    strong_usd = cost("gpt-4o", PROMPT, COMPLETION)
+    with StubOpenAI(reply=reply) as stub:
+        pool = ModelPool()
+        url = f"{stub.base_url}/chat/completions"
+        base = run(pool.client("gpt-4o", None, stub.base_url), url, "text", requests)
+        print(
+            f"all gpt-4o: ${1000 * strong_usd:.2f} / 1k requests, {1000 * base:.1f} ms mean"
+        )
+        for kind in ("text", "json"):
+            print(
+                f"\ncheap check: {'self-reported confidence' if kind == 'text' else 'JSON keys'}"
+            )
+            print(
+                f"{'rate':>6} {'escalated':>9} {'$/1k':>8} {'saved':>7} {'mean ms':>8} {'vs 4o':>7}"
+            )
+            for rate in (0.0, 0.1, 0.2, 0.3, 0.5, 0.8, 1.0):
+                STATE["rate"] = rate
+                cascade = Cascade(
+                    "bench", CascadePolicy(), pool, base_url=stub.base_url
+                )
+                mean = run(cascade.client(), url, kind, requests)
+                s = cascade.stats()
+                per_1k = 1000 * s["cost_usd"] / requests
+                print(
+                    f"{rate:6.0%} {s['escalated']:9d} {per_1k:8.2f} "
+                    f"{1 - per_1k / (1000 * strong_usd):7.0%} {1000 * mean:8.1f} {mean / base - 1:+7.0%}"
+                )
+        # streamed: a passing answer comes back as SSE, an escalation streams 4o
+        STATE["rate"] = 0.5
+        cascade = Cascade("stream", CascadePolicy(), pool, base_url=stub.base_url)
+        client = cascade.client()
+        for i in (1, 0):  # frac(1·φ) = 0.62 passes, frac(0) = 0 escalates
+            with client.stream("POST", url, json=body("text", i, stream=True)) as r:
+                lines = [l for l in r.iter_lines() if l.startswith("data: ")]
+            events = [json.loads(l[6:]) for l in lines[:-1]]
+            content = "".join(
+                e["choices"][0]["delta"].get("content") or ""
+                for e in events
+                if e["choices"]
+            )
+            print(
+                f"streamed #{i}: {len(lines)} SSE events from {events[0]['model']}, "
+                f"{len(content)} chars"
+            )
+        print(
+            f"streamed: {json.dumps({k: cascade.stats()[k] for k in ('calls', 'escalated', 'reasons')})}"
+        )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 100, float(args[1]) if args[1:] else 1.0)
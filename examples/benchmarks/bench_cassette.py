@@ -0,0 +1,147 @@
+# bench_cassette.py
+# ======================================================================
+# Record / replay of a lead-gen session (agency_kit.cassette)
+#  • "production": FakeModel with its latency profile behind StubOpenAI,
+#    a google_search tool that takes 150 ms
+#  • session: Parser → Searcher (tool loop) → Enricher → Scorer, each stage
+#    fed the previous answer – the BlueRail demo's lead-gen leg
+#  • record N sessions through the cassette proxy, then replay them with
+#    original timings and compressed (time_scale 0): wall time, calls/s,
+#    identical answers, cassette size vs raw JSON
+#  • replay with two sessions swapped (order change detected) and with an
+#    edited prompt (misses)
+#
+#   python examples/benchmarks/bench_cassette.py [sessions] [latency_scale]
+# ======================================================================
+
+import gzip, hashlib, json, os, sys, tempfile, time, pathlib
+
+import httpx
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from agency_kit.cassette import Cassette
+from agency_kit.fake_model import FakeModel, serve
+
+SEARCH = {
+    "type": "function",
+    "function": {
+        "name": "google_search",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string"},
+                "max_results": {"type": "integer"},
+            },
+            "required": ["query"],
+        },
+    },
+}
+STAGES = [
+    (
+        "Parser",
+        "<instructions>\n- Return JSON {role,location,count}\n</instructions>",
+        [],
+    ),
+    (
+        "Searcher",
+        "<instructions>\n- Find leads with google_search\n</instructions>",
+        [SEARCH],
+    ),
+    (
+        "Enricher",
+        "<instructions>\n- Add company_size,website,email\n</instructions>",
+        [],
+    ),
+    ("Scorer", "<instructions>\n- Add score\n</instructions>", []),
+]
+
+
+def google_search(query: str, max_results: int = 5) -> str:
+    time.sleep(0.15)
+    return json.dumps([{"company": f"Lead {i}", "query": query[:40]} for i in range(3)])
+
+
+def session(client: httpx.Client, hook, prompt: str) -> str:
+    """agno-style loop per stage: model → tool calls → model, max 3 rounds."""
+    text = prompt
+    for name, system, tools in STAGES:
+        messages = [
+            {"role": "system", "content": system},
+            {"role": "user", "content": text},
+        ]
+        for _ in range(3):
+            body = {
+                "model": "gpt-4o-mini",
+                "messages": messages,
+                "tools": tools or None,
+            }
+            r = client.post("/chat/completions", json=body)
+            r.raise_for_status()
+            msg = r.json()["choices"][0]["message"]
+            messages.append(msg)
+            if not msg.get("tool_calls"):
+                break
+            for call in msg["tool_calls"]:
+                args = json.loads(call["function"]["arguments"])
+                out = hook(call["function"]["name"], google_search, args)
+                messages.append(
+                    {"role": "tool", "tool_call_id": call["id"], "content": out}
+                )
+        text = msg["content"] or ""
+    return text
+
+
+def run(cassette: Cassette, prompts) -> tuple:
+    server = cassette.serve()
+    client = httpx.Client(base_url=server.base_url, timeout=60)
+    t0 = time.perf_counter()
+    answers = []
+    for p in prompts:
+        try:
+            answers.append(session(client, cassette.tool_hook, p))
+        except httpx.HTTPStatusError:
+            answers.append(None)
+    wall = time.perf_counter() - t0
+    server.stop()
+    digest = hashlib.sha256(json.dumps(answers).encode()).hexdigest()[:12]
+    return wall, digest, cassette.stats()
+
+
+def main(sessions: int = 6, latency_scale: float = 0.3):
+    cities = "Germany Austria Poland Spain Italy France Sweden Norway".split()
+    prompts = [f"{i + 3} CFO leads in {c}" for i, c in enumerate(cities[:sessions])]
+    with tempfile.TemporaryDirectory() as tmp, serve(
+        FakeModel(time_scale=latency_scale)
+    ) as prod:
+        path = os.path.join(tmp, "leadgen.cassette.gz")
+        rec = Cassette(path, "record", upstream=prod.base_url)
+        wall, digest, s = run(rec, prompts)
+        rec.save()
+        raw = len(json.dumps({"calls": rec.calls, "blobs": rec.blobs}))
+        print(
+            f"record   {wall:6.2f}s  {s['calls']} calls ({s['unique_responses']} unique responses)  "
+            f"answers {digest}  cassette {os.path.getsize(path) / 1024:.1f} KiB "
+            f"(raw JSON {raw / 1024:.1f} KiB)"
+        )
+        for scale in (1.0, 0.0):
+            w, d, s = run(Cassette(path, "replay", time_scale=scale), prompts)
+            print(
+                f"replay ×{scale:<3} {w:6.2f}s  {s['replayed'] / w:8.0f} calls/s  answers {d}  "
+                f"same={d == digest}  misses={s['misses']} order_changes={s['order_changes']}"
+            )
+        swapped = prompts[1:2] + prompts[:1] + prompts[2:]
+        _, _, s = run(Cassette(path, "replay", time_scale=0), swapped)
+        print(
+            f"swapped sessions 1↔2: order_changes={s['order_changes']} misses={s['misses']} "
+            f"first divergence {s['first_divergence']}"
+        )
+        edited = prompts[:-1] + [prompts[-1] + " (edited)"]
+        _, _, s = run(Cassette(path, "replay", time_scale=0), edited)
+        print(f"edited last prompt: misses={s['misses']} unplayed={s['unplayed']}")
+        with gzip.open(path, "rt") as f:
+            assert json.load(f)["version"] == 1
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 6, float(args[1]) if args[1:] else 0.3)
@@ -0,0 +1,142 @@
+# bench_context.py
+# ======================================================================
+# Prompt tokens per call: raw concatenation vs ContextAssembler budget
+#  • replays sessions down the deep chain Executive-Director →
+#    Sales-Manager → Lead-Gen Team → Scorer: agno-shaped system message
+#    (role, instructions, reasoning instructions, additional info +
+#    context) + full session history + vector-memory hits per call
+#  • raw      = everything concatenated (no limit)
+#  • budgeted = agency_kit.context.ContextAssembler.apply() on the same
+#    RunMessages
+#  • reports avg / p95 prompt tokens, assembly p50 / p95 ms, what got
+#    dropped, and that re-assembling the same input gives the same prompt
+#
+#   python examples/benchmarks/bench_context.py [budget] [turns]
+# ======================================================================
+
+import random, sys, tempfile, time, pathlib
+from collections import Counter
+from copy import deepcopy
+from types import SimpleNamespace
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from agency_kit.context import ContextAssembler
+from agency_kit.tokens import backend, count_tokens
+from agency_kit.vector_memory import AnnVectorMemory
+
+CHAIN = ["Executive-Director", "Sales-Manager", "Lead-Gen Team", "Scorer"]
+TOPICS = (
+    "CFO leads Germany, pricing tiers for BlueRail, churn cohort Q3, "
+    "React PoC for the calculator, outbound email copy, intent scores, "
+    "competitor battle card, onboarding checklist, Slack digest"
+).split(", ")
+FILLER = (
+    "pipeline forecast enrich score email pricing tier churn campaign budget "
+    "roadmap launch retention cohort margin vendor contract renewal"
+).split()
+
+
+def text(rng: random.Random, topic: str, n: int) -> str:
+    return f"{topic}: " + " ".join(rng.choice(FILLER) for _ in range(n)) + "."
+
+
+def message(role: str, content: str, history: bool = False):
+    return SimpleNamespace(role=role, content=content, from_history=history)
+
+
+def system_message(rng: random.Random, agent: str) -> str:
+    # toolkit instructions are the same on every call; memory text is not
+    fixed = random.Random(agent)
+    reasoning = " ".join(fixed.choice(FILLER) for _ in range(380))
+    return (
+        f"<your_role>\n{agent}\n</your_role>\n\n"
+        "<instructions>\n- Route tasks, post summary\n- Return JSON where asked\n"
+        "</instructions>\n\n"
+        "<additional_information>\n- Use markdown to format your answers.\n"
+        "- The current time is 2026-10-18 09:00.\n</additional_information>\n\n"
+        f"<reasoning_instructions>\n{reasoning}\n</reasoning_instructions>\n\n"
+        "Summary of earlier conversation:\n"
+        + "\n".join(f"- {text(rng, rng.choice(TOPICS), 14)}" for _ in range(10))
+        + "\n\nRecent conversation:\n"
+        + "\n".join(text(rng, rng.choice(TOPICS), 40) for _ in range(6))
+    )
+
+
+def replay(turns: int, seed: int = 3):
+    """Per agent: the RunMessages of every call in a session, history growing."""
+    rng = random.Random(seed)
+    for agent in CHAIN:
+        history = []
+        for i in range(turns):
+            topic = rng.choice(TOPICS)
+            query = f"{topic} – step {i}: " + text(rng, topic, 20)
+            run = SimpleNamespace(
+                system_message=message("system", system_message(rng, agent)),
+                user_message=message("user", query),
+            )
+            run.messages = [run.system_message, *history, run.user_message]
+            yield agent, run
+            history += [
+                message("user", query, True),
+                message("assistant", text(rng, topic, 160), True),
+            ]
+
+
+def raw_tokens(run) -> int:
+    return sum(count_tokens(m.content) for m in run.messages)
+
+
+def pct(values, q):
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+def main(budget: int = 6000, turns: int = 30):
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = AnnVectorMemory(tmp)
+        rng = random.Random(1)
+        memory.add_many(text(rng, rng.choice(TOPICS), 30) for _ in range(3000))
+        recall = lambda q: memory.search(q, 5)
+        print(
+            f"budget {budget} tokens, {turns} turns x {len(CHAIN)} agents, "
+            f"tokens via {backend()}"
+        )
+        print(
+            f"{'agent':<20} {'raw avg':>8} {'raw p95':>8} {'sent avg':>9} "
+            f"{'sent p95':>9} {'ms p50':>7} {'ms p95':>7}"
+        )
+        totals = Counter()
+        deterministic = True
+        by_agent = {}
+        for agent, run in replay(turns):
+            a = by_agent.setdefault(agent, ContextAssembler(agent, budget, recall))
+            raw = raw_tokens(run) + sum(
+                count_tokens(h["text"]) for h in recall(run.user_message.content)
+            )
+            copy = deepcopy(run)
+            t0 = time.perf_counter()
+            result = a.apply(None, run)
+            ms = 1000 * (time.perf_counter() - t0)
+            again = ContextAssembler(agent, budget, recall).apply(None, copy)
+            deterministic &= again.system == result.system and len(
+                copy.messages
+            ) == len(run.messages)
+            stats = a.__dict__.setdefault("_bench", {"raw": [], "sent": [], "ms": []})
+            stats["raw"].append(raw)
+            stats["sent"].append(result.tokens)
+            stats["ms"].append(ms)
+            totals.update(p.kind for p in result.dropped)
+        for agent, a in by_agent.items():
+            s = a._bench
+            print(
+                f"{agent:<20} {sum(s['raw']) / len(s['raw']):>8.0f} {pct(s['raw'], .95):>8} "
+                f"{sum(s['sent']) / len(s['sent']):>9.0f} {pct(s['sent'], .95):>9} "
+                f"{pct(s['ms'], .5):>7.2f} {pct(s['ms'], .95):>7.2f}"
+            )
+        print(f"dropped pieces by kind: {dict(totals)}")
+        print(f"same input → same prompt: {deterministic}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*args)
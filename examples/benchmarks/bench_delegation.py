@@ -0,0 +1,58 @@
+# bench_delegation.py
+# ======================================================================
+# Sequential vs parallel delegation for a coordinate-mode director
+#  • five stub managers, one per part of the consulting CLI demo request
+#  • each stub sleeps for its injected latency (± jitter), like a slow LLM
+#  • wall time should follow the slowest branch, not the sum
+#
+#   python examples/benchmarks/bench_delegation.py
+# ======================================================================
+
+import random, sys, time, pathlib
+from types import SimpleNamespace
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from agency_kit.delegation import ParallelDelegation
+
+
+class StubManager:
+    def __init__(self, name: str, latency_s: float, jitter: float = 0.1):
+        self.name = name
+        self.latency_s = latency_s
+        self.jitter = jitter
+
+    def run(self, task: str, stream: bool = False):
+        time.sleep(self.latency_s * random.uniform(1 - self.jitter, 1 + self.jitter))
+        return SimpleNamespace(content=f"{self.name} done: {task}")
+
+
+DEMO = [
+    ("Onboarding-Team", "Onboard client BlueRail", 1.2),
+    ("Project-Manager", "Outline documentation", 0.8),
+    ("Project-Manager", "API docs for the pricing calculator", 1.0),
+    ("Developer-Manager", "Build React PoC", 1.5),
+    ("Sales-Manager", "Pull 5 CFO leads in Germany", 2.0),
+]
+
+
+def main():
+    random.seed(7)
+    managers = {}
+    for name, _, latency in DEMO:
+        managers.setdefault(name, StubManager(name, latency))
+    tasks = [{"member": name, "task": task} for name, task, _ in DEMO]
+    total = sum(latency for *_, latency in DEMO)
+    slowest = max(latency for *_, latency in DEMO)
+    print(f"sum of branches {total:.2f}s, slowest branch {slowest:.2f}s")
+
+    for limit in (1, 2, 4, 8):
+        fanout = ParallelDelegation(list(managers.values()), max_concurrency=limit)
+        t0 = time.perf_counter()
+        out = fanout.run(tasks)
+        wall = time.perf_counter() - t0
+        ordered = [r["member"] for r in out] == [t["member"] for t in tasks]
+        print(f"concurrency={limit}: wall {wall:.2f}s  ordered={ordered}")
+
+
+if __name__ == "__main__":
+    main()
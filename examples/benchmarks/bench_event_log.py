@@ -0,0 +1,147 @@
+# bench_event_log.py
+# ======================================================================
+# Session/event memory under a coordinate-team fan-out: 50 writers
+#  • flat  = one JSONL file, flock + append + fsync per event, read(session)
+#            scans the whole file (how a plain file memory behaves)
+#  • log   = agency_kit.event_log.EventLog (segments, sparse index, group
+#            commit)
+#  • writers are threads, or --procs P processes x threads (same total)
+#  • reports appends/sec, fsyncs, then read(session) p50/p95 on the result
+#
+#   python examples/benchmarks/bench_event_log.py [--writers 50]
+#          [--events 200] [--procs 1] [--no-fsync]
+# ======================================================================
+
+import argparse, fcntl, json, multiprocessing, os, sys, tempfile, threading, time
+import pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from agency_kit.event_log import EventLog
+
+SESSIONS = 200
+
+
+class FlatLog:
+    def __init__(self, path: str, fsync: bool = True):
+        os.makedirs(path, exist_ok=True)
+        self.file = os.path.join(path, "events.jsonl")
+        self.fsync = fsync
+        self.counters = {"fsyncs": 0}
+
+    def append(self, session, event):
+        line = json.dumps({"s": session, "t": time.time(), "e": event}) + "\n"
+        with open(self.file, "ab") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.write(line.encode())
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+                self.counters["fsyncs"] += 1
+
+    def read(self, session, limit=None):
+        with open(self.file, "rb") as f:
+            out = [r["e"] for r in map(json.loads, f) if r["s"] == session]
+        return out[-limit:] if limit else out
+
+    def close(self):
+        pass
+
+
+def event(w: int, i: int) -> dict:
+    return {"agent": f"worker-{w}", "role": "assistant", "content": "x" * 200, "i": i}
+
+
+def write(store, writer_ids, events):
+    def one(w):
+        for i in range(events):
+            store.append(f"session-{(w * events + i) % SESSIONS}", event(w, i))
+
+    threads = [threading.Thread(target=one, args=(w,)) for w in writer_ids]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def proc_main(kind, path, writer_ids, events, fsync, conn):
+    store = make(kind, path, fsync)
+    conn.recv()  # start together
+    write(store, writer_ids, events)
+    store.close()
+    conn.send(store.counters["fsyncs"])
+
+
+def make(kind, path, fsync):
+    return EventLog(path, fsync=fsync) if kind == "log" else FlatLog(path, fsync)
+
+
+def run(kind, args, path):
+    ids = list(range(args.writers))
+    t0 = time.perf_counter()
+    if args.procs == 1:
+        store = make(kind, path, not args.no_fsync)
+        write(store, ids, args.events)
+        fsyncs = store.counters["fsyncs"]
+        store.close()
+        wall = time.perf_counter() - t0
+    else:
+        ctx = multiprocessing.get_context("fork")
+        pipes, procs = [], []
+        for p in range(args.procs):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(
+                target=proc_main,
+                args=(
+                    kind,
+                    path,
+                    ids[p :: args.procs],
+                    args.events,
+                    not args.no_fsync,
+                    child,
+                ),
+            )
+            proc.start()
+            pipes.append(parent)
+            procs.append(proc)
+        t0 = time.perf_counter()
+        for parent in pipes:
+            parent.send("go")
+        fsyncs = sum(parent.recv() for parent in pipes)
+        wall = time.perf_counter() - t0
+        for proc in procs:
+            proc.join()
+    total = args.writers * args.events
+    reader = make(kind, path, True)
+    lat = []
+    for s in range(0, SESSIONS, 4):
+        t = time.perf_counter()
+        got = reader.read(f"session-{s}")
+        lat.append(time.perf_counter() - t)
+    expected = total // SESSIONS
+    assert len(got) == expected, (kind, len(got), expected)
+    lat.sort()
+    reader.close()
+    print(
+        f"{kind:<5} {total / wall:9.0f} appends/s  {fsyncs:6} fsyncs  "
+        f"read p50 {1000 * lat[len(lat) // 2]:6.2f}ms  p95 {1000 * lat[int(len(lat) * .95)]:6.2f}ms"
+    )
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--writers", type=int, default=50)
+    ap.add_argument("--events", type=int, default=200)
+    ap.add_argument("--procs", type=int, default=1)
+    ap.add_argument("--no-fsync", action="store_true")
+    args = ap.parse_args()
+    print(
+        f"{args.writers} writers x {args.events} events, {args.procs} process(es), "
+        f"{SESSIONS} sessions, fsync={'off' if args.no_fsync else 'on'}"
+    )
+    for kind in ("flat", "log"):
+        with tempfile.TemporaryDirectory(dir=os.getcwd()) as tmp:
+            run(kind, args, tmp)
+
+
+if __name__ == "__main__":
+    main()
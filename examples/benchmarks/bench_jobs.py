@@ -0,0 +1,102 @@
+# bench_jobs.py
+# ======================================================================
+# Job queue single-flight: CRM-style duplicate lead requests
+#  • N users send "5 CFO leads in Germany" (case/spacing varies) + a few
+#    distinct requests, all at once; stub pipeline = 8 stages x latency
+#  • "direct" = every request runs the pipeline (old endpoint)
+#  • "jobs"   = submit → wait through agency_kit.jobs.JobQueue
+#  • then a fresh JobQueue on the same SQLite file (= process restart)
+#    re-serves the finished results without running anything
+#
+#   python examples/benchmarks/bench_jobs.py [duplicates] [stage_latency_s]
+# ======================================================================
+
+import asyncio, os, sys, tempfile, time, pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from agency_kit.jobs import JobQueue
+
+STAGES = 8
+DISTINCT = ["3 CTO leads in Austria", "10 HR directors in Berlin"]
+
+
+def variants(n: int):
+    forms = [
+        "5 CFO leads in Germany",
+        "5 cfo leads in germany",
+        " 5 CFO  leads in Germany ",
+    ]
+    return [forms[i % len(forms)] for i in range(n)]
+
+
+class Pipeline:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.runs = 0
+
+    async def events(self, message: str):
+        self.runs += 1
+        for i in range(STAGES):
+            await asyncio.sleep(self.latency)
+            yield "member_finished", {"member": f"stage-{i}"}
+        yield "content", {"delta": f"| leads for {message.strip()} |", "member": None}
+
+
+async def direct(messages, latency):
+    pipe = Pipeline(latency)
+
+    async def one(m):
+        return "".join([d["delta"] async for e, d in pipe.events(m) if e == "content"])
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(m) for m in messages))
+    return pipe.runs, time.perf_counter() - t0
+
+
+async def queued(messages, latency, db):
+    pipe = Pipeline(latency)
+    jobs = JobQueue(db, {"leads": lambda p: pipe.events(p["message"])}, workers=4)
+
+    async def one(m):
+        job_id, _ = jobs.submit("leads", {"message": m})
+        return (await jobs.wait(job_id, poll_s=0.02))["result"]
+
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(one(m) for m in messages))
+    wall = time.perf_counter() - t0
+    return pipe.runs, wall, len(set(results)), jobs.stats()
+
+
+async def restarted(messages, db):
+    pipe = Pipeline(0.0)
+    jobs = JobQueue(db, {"leads": lambda p: pipe.events(p["message"])}, workers=4)
+    t0 = time.perf_counter()
+    for m in messages:
+        job_id, dedup = jobs.submit("leads", {"message": m})
+        assert dedup and (await jobs.wait(job_id))["status"] == "done"
+    return pipe.runs, time.perf_counter() - t0
+
+
+def main(duplicates: int = 20, latency: float = 0.05):
+    messages = variants(duplicates) + DISTINCT
+    print(
+        f"{len(messages)} requests ({duplicates} duplicates), {STAGES} stages x {latency * 1000:.0f}ms"
+    )
+    runs, wall = asyncio.run(direct(messages, latency))
+    print(f"direct          : {runs:3} pipeline runs  {wall:5.2f}s")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "jobs.sqlite")
+        runs, wall, distinct, stats = asyncio.run(queued(messages, latency, db))
+        print(
+            f"jobs            : {runs:3} pipeline runs  {wall:5.2f}s  {distinct} distinct results"
+        )
+        print(f"                  {stats}")
+        runs, wall = asyncio.run(restarted(messages, db))
+        print(
+            f"after restart   : {runs:3} pipeline runs  {wall:5.2f}s  (served from SQLite)"
+        )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 20, float(args[1]) if len(args) > 1 else 0.05)
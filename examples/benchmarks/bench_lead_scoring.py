@@ -0,0 +1,145 @@
+# bench_lead_scoring.py
+# ======================================================================
+# Local lead scoring (agency_kit.lead_scoring) at lead-gen scale
+#  • synthetic leads shaped like outputs/leads.json: company_size ranges
+#    ("51-200", "1k-5k"), sentiment -1..1, deliverable, titles vs a role
+#  • score 1k / 10k / 100k leads in one call: features + NumPy model,
+#    µs per lead; one lead at a time (the DAG stage) for comparison
+#  • train on a leads.json written by a hidden "true" model (0/1 outcomes)
+#    and on LLM-style 0-100 scores; AUC / correlation on held-out leads
+#  • sentiment -1 … 1 on one lead: the score must rise with it
+#
+#   python examples/benchmarks/bench_lead_scoring.py [leads]
+# ======================================================================
+
+import json, os, sys, tempfile, time, pathlib
+
+import numpy as np
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from agency_kit.lead_scoring import LeadScorer, features, load_leads, train
+
+SIZES = [
+    "1-10",
+    "11-50",
+    "51-200",
+    "201-500",
+    "501-1000",
+    "1k-5k",
+    "5k-10k",
+    12000,
+    None,
+]
+TITLES = [
+    "CFO",
+    "Chief Financial Officer",
+    "VP Finance",
+    "Finance Manager",
+    "Head of Sales",
+    "Software Engineer",
+    "Controller",
+    "",
+]
+
+
+def synthetic(n: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    sizes, titles = rng.integers(len(SIZES), size=n), rng.integers(len(TITLES), size=n)
+    sentiment = (rng.random(n) * 2 - 1).round(2)  # the Sentiment agent's -1..1
+    deliverable = rng.random(n) < 0.8
+    return [
+        {
+            "first_name": f"Lead{i}",
+            "title": TITLES[titles[i]],
+            "company_size": SIZES[sizes[i]],
+            "sentiment_score": float(sentiment[i]),
+            "deliverable": bool(deliverable[i]),
+            "query": {"role": "CFO", "location": "Germany"},
+        }
+        for i in range(n)
+    ]
+
+
+def auc(y: np.ndarray, s: np.ndarray) -> float:
+    ranks = np.argsort(np.argsort(s)) + 1
+    pos = y.sum()
+    return float((ranks[y == 1].sum() - pos * (pos + 1) / 2) / (pos * (len(y) - pos)))
+
+
+def main(leads: int = 100_000):
+    scorer = LeadScorer()
+    all_leads = synthetic(leads)
+    for n in (1_000, 10_000, leads):
+        batch = all_leads[:n]
+        t0 = time.perf_counter()
+        X = features(batch)
+        t1 = time.perf_counter()
+        scores, _ = scorer.score_matrix(X)
+        t2 = time.perf_counter()
+        print(
+            f"{n:>7} leads: {1000 * (t2 - t0):7.1f} ms  (features {1000 * (t1 - t0):.1f}, "
+            f"model {1000 * (t2 - t1):.2f})  {1e6 * (t2 - t0) / n:.2f} µs/lead"
+        )
+    t0 = time.perf_counter()
+    for lead in all_leads[:2000]:
+        scorer.score([lead])
+    print(
+        f"one at a time (DAG stage): {1e6 * (time.perf_counter() - t0) / 2000:.1f} µs/lead"
+    )
+
+    # a hidden model decides who converted; train on leads.json, test on new leads
+    truth = LeadScorer(
+        {"company_size": 3, "sentiment_score": 2, "deliverable": 1.5, "role_match": 4},
+        -6,
+    )
+    rng = np.random.default_rng(1)
+    history, fresh = synthetic(20_000, 2), synthetic(20_000, 3)
+    p_hist = truth.score_matrix(features(history))[0] / 100
+    for lead, p in zip(history, p_hist):
+        lead["converted"] = bool(rng.random() < p)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "leads.json")
+        with open(path, "w") as f:
+            json.dump(history, f)
+        t0 = time.perf_counter()
+        trained = train(load_leads([path]))
+        fit_s = time.perf_counter() - t0
+        trained.save(os.path.join(tmp, "lead_model.json"))
+        reloaded = LeadScorer.load(os.path.join(tmp, "lead_model.json"))
+    p_fresh = truth.score_matrix(features(fresh))[0] / 100
+    y = (np.random.default_rng(4).random(len(fresh)) < p_fresh).astype(int)
+    print(
+        f"\ntrained on {trained.trained_on} outcomes in {1000 * fit_s:.0f} ms: "
+        f"{json.dumps(trained.to_dict()['weights'])} bias {trained.bias:.2f}"
+    )
+    for label, model in (
+        ("hand-set default", scorer),
+        ("trained", reloaded),
+        ("true model", truth),
+    ):
+        print(
+            f"  AUC on fresh leads, {label:<16}: {auc(y, model.score_matrix(features(fresh))[0]):.3f}"
+        )
+
+    # distil LLM scores: the Scorer's 0-100 answers as soft labels
+    for lead, p in zip(history, p_hist):
+        del lead["converted"]
+        lead["score"] = round(100 * p + rng.normal(0, 5))
+    distilled = train(history)
+    r = np.corrcoef(distilled.score_matrix(features(fresh))[0], 100 * p_fresh)[0, 1]
+    print(f"distilled from LLM-style scores: correlation with the true scores {r:.3f}")
+
+    lead = {"title": "CFO", "company_size": 500, "deliverable": True}
+    sweep = [-1, -0.5, -0.1, 0, 0.1, 0.5, 1]
+    scores = scorer.score([{**lead, "sentiment_score": x} for x in sweep], "CFO")[0]
+    rising = bool(np.all(np.diff(scores) > 0))
+    print(
+        "\nCFO, 500 staff, deliverable, sentiment "
+        + "  ".join(f"{x:g}: {s:.1f}" for x, s in zip(sweep, scores))
+        + f"  → {'monotonic' if rising else 'NOT monotonic'}"
+    )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 100_000)
@@ -0,0 +1,141 @@
+# bench_leadgen_dag.py
+# ======================================================================
+# Lead-Gen throughput: coordinator-style sequential vs per-lead DAG
+#  • stub stage agents sleep for an injected latency (no network)
+#  • "sequential" = every lead through every stage one after another
+#  • "dag"        = per-lead DAG, Sentiment/Bounce/Geo fan out, bounded pools
+#  • copies: stage agents registered like the stack's (metered + traced);
+#    every per-stage copy must still attribute its model calls and spans
+#
+#   python examples/benchmarks/bench_leadgen_dag.py [leads] [stage_latency_s]
+# ======================================================================
+
+import json, sys, time, pathlib
+from collections import Counter
+from types import SimpleNamespace
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from agency_kit.metrics import MetricsCollector, metered
+from agency_kit.pipeline import DagPipeline, ItemDag, agent_stage
+from agency_kit.registry import LazyRegistry
+from agency_kit.tracing import Tracer, traced
+
+
+class StubAgent:
+    """Returns {field: ...} after `latency_s`; deep_copy() like agno Agent."""
+
+    def __init__(self, field: str, latency_s: float):
+        self.field = field
+        self.latency_s = latency_s
+
+    def deep_copy(self):
+        return StubAgent(self.field, self.latency_s)
+
+    def run(self, message: str, stream: bool = False):
+        time.sleep(self.latency_s)
+        return SimpleNamespace(content=json.dumps({self.field: "ok"}))
+
+
+class ModelStub(StubAgent):
+    """agno-shaped enough for metered()/traced(); each run is one model call."""
+
+    def __init__(self, field: str, latency_s: float, metrics, name: str):
+        super().__init__(field, latency_s)
+        self.name, self.session_id, self.tool_hooks = name, None, None
+        self.metrics = metrics
+
+    def run(self, message: str, stream: bool = False, **kwargs):
+        out = super().run(message, stream)
+        self.metrics.record("model", "stub-model", self.latency_s * 1000, 100, 20)
+        return out
+
+    async def arun(self, message: str, stream: bool = False, **kwargs):
+        return self.run(message, stream)
+
+
+# stage → (field it adds, deps)
+LEAD_STAGES = {
+    "Extractor": ("first_name", ()),
+    "Enricher": ("company_size", ("Extractor",)),
+    "Sentiment": ("sentiment_score", ("Enricher",)),
+    "Bounce": ("deliverable", ("Enricher",)),
+    "Geo": ("latitude", ("Enricher",)),
+    "Scorer": ("score", ("Enricher", "Sentiment", "Bounce")),
+    "Emailer": ("outreach_email", ("Scorer",)),
+    "FollowUp": ("followup_d3", ("Emailer",)),
+}
+
+
+def sequential(leads: int, latency: float) -> float:
+    agents = [StubAgent(f, latency) for f, _ in LEAD_STAGES.values()]
+    t0 = time.perf_counter()
+    for i in range(leads):
+        for a in agents:
+            a.run(json.dumps({"lead": i}))
+    return time.perf_counter() - t0
+
+
+def dag(leads: int, latency: float, concurrency: int):
+    stages = [
+        agent_stage(name, StubAgent(f, latency), deps, concurrency)
+        for name, (f, deps) in LEAD_STAGES.items()
+    ]
+    first_done = []
+
+    def reduce(items):
+        return items
+
+    item_dag = ItemDag(stages)
+    pipe = DagPipeline(
+        lambda msg: ({"lead": i} for i in range(leads)), item_dag, reduce
+    )
+    t0 = time.perf_counter()
+    futures = [item_dag.submit(item) for item in pipe.head("")]
+    futures[0].add_done_callback(lambda f: first_done.append(time.perf_counter()))
+    items = [f.result() for f in futures]
+    wall = time.perf_counter() - t0
+    item_dag.shutdown()
+    assert all("followup_d3" in it for it in items)
+    return wall, first_done[0] - t0
+
+
+def copies(leads: int, latency: float, concurrency: int = 4) -> bool:
+    metrics, tracer = MetricsCollector(), Tracer(max_traces=100_000)
+    reg = LazyRegistry()
+    factory = traced(metered(ModelStub, metrics), tracer)
+    stages = [
+        agent_stage(
+            name, reg.add(name, factory, f, latency, metrics, name), deps, concurrency
+        )
+        for name, (f, deps) in LEAD_STAGES.items()
+    ]
+    item_dag = ItemDag(stages)
+    for f in [item_dag.submit({"lead": i}) for i in range(leads)]:
+        f.result()
+    item_dag.shutdown()
+    calls = {k: v["calls"] for k, v in metrics.summary(top=50)["by_agent"].items()}
+    spans = Counter(t["root"] for t in tracer.recent(100_000))
+    ok = all(
+        calls.get(name) == leads and spans[f"agent:{name}"] == leads
+        for name in LEAD_STAGES
+    )
+    print(
+        f"copies (concurrency={concurrency}): model calls by agent {calls}; "
+        f"{'every copy metered + traced' if ok else 'copies LOST their wrappers'}"
+    )
+    return ok
+
+
+def main(leads: int = 50, latency: float = 0.02):
+    n = len(LEAD_STAGES)
+    print(f"{leads} leads x {n} stages x {latency*1000:.0f}ms")
+    print(f"sequential       : {sequential(leads, latency):6.2f}s")
+    for c in (1, 4, 8, 16):
+        wall, first = dag(leads, latency, c)
+        print(f"dag concurrency={c:<2}: {wall:6.2f}s   first lead ready {first:.2f}s")
+    copies(8, latency)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 50, float(args[1]) if len(args) > 1 else 0.02)
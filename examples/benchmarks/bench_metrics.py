@@ -0,0 +1,144 @@
+# bench_metrics.py
+# ======================================================================
+# Cost of leaving agency_kit.metrics on
+#  • record(): µs per call, single thread and 8 threads
+#  • model calls through ModelPool against the local stub, observer off vs
+#    on (usage parsed from the response tail, attributed to the caller)
+#  • nested Team → Team → Agent stand-ins: calls land on the right
+#    agent / team / session
+#  • summary() / report() / CSV rollup of every call recorded
+#
+#   python examples/benchmarks/bench_metrics.py [model_calls] [records]
+# ======================================================================
+
+import json, statistics, sys, tempfile, time, pathlib
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from agency_kit.metrics import MetricsCollector, instrument
+from agency_kit.model_pool import ModelPool, _Tail
+from agency_kit.stub_openai import StubOpenAI, completion
+
+BODY = json.dumps(
+    {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "hi"}]}
+)
+
+
+class FakeAgent:
+    """Just enough of agno's Agent / Team surface for instrument()."""
+
+    def __init__(self, name, client, members=None):
+        self.name, self.client, self.session_id = name, client, None
+        self.tool_hooks = None
+        if members is not None:
+            self.members = members
+
+    def run(self, message=None, *, stream=False, **kwargs):
+        self.client.post("/chat/completions", content=BODY).raise_for_status()
+        for m in getattr(self, "members", []):
+            m.run(message, **kwargs)
+        return message
+
+    async def arun(self, message=None, *, stream=False, **kwargs):
+        return self.run(message, **kwargs)
+
+
+def record_cost(n: int, threads: int) -> float:
+    m = MetricsCollector()
+    per = n // threads
+
+    def work(_):
+        for i in range(per):
+            m.record("model", "gpt-4o-mini", 120.0 + i % 50, 900, 120)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(threads) as ex:
+        list(ex.map(work, range(threads)))
+    return 1e6 * (time.perf_counter() - t0) / (per * threads)
+
+
+def observer_cost(n: int) -> float:
+    """Per-call work metrics adds to a pooled call: tail buffer, parse, record."""
+    body = json.dumps(completion("gpt-4o-mini", "ok " * 200, 850)).encode()
+    m = MetricsCollector()
+    t0 = time.perf_counter()
+    for _ in range(n):
+        tail = _Tail()
+        tail.feed(body)
+        m.on_model_call("gpt-4o-mini", tail.usage(), 0.12, 200)
+    return 1e6 * (time.perf_counter() - t0) / n
+
+
+def model_calls(n: int, rounds: int = 5) -> dict:
+    """Sequential calls, observer off / on alternating per round."""
+    reply = lambda body: completion(body["model"], "ok " * 40, prompt_tokens=850)
+    out = {False: [], True: []}
+    with StubOpenAI(reply=reply) as stub:
+        for observed in [False, True] * rounds:
+            pool, metrics = ModelPool(), MetricsCollector()
+            if observed:
+                metrics.observe(pool)
+            client = pool.client("gpt-4o-mini", "sk-x", stub.base_url)
+            client.base_url = stub.base_url
+            client.post("/chat/completions", content=BODY)  # warm connection
+            t0 = time.perf_counter()
+            for _ in range(n // rounds):
+                client.post("/chat/completions", content=BODY).raise_for_status()
+            out[observed].append(1e6 * (time.perf_counter() - t0) / (n // rounds))
+            if observed:
+                out["recorded"] = metrics.summary()["all_time"]
+            pool.close()
+    return out
+
+
+def attribution() -> dict:
+    with StubOpenAI(reply=lambda b: completion(b["model"], "ok", 500)) as stub:
+        pool, metrics = ModelPool(), MetricsCollector()
+        metrics.observe(pool)
+        client = pool.client("gpt-4o", "sk-x", stub.base_url)
+        client.base_url = stub.base_url
+        leaf = instrument(FakeAgent("Scorer", client), metrics)
+        leadgen = instrument(FakeAgent("Lead-Gen Team", client, [leaf]), metrics)
+        sales = instrument(FakeAgent("Sales-Manager", client, [leadgen]), metrics)
+        sales.run("5 CFO leads", session_id="s-1")
+        return {c.agent: c.team for c in metrics.recent}
+
+
+def main(calls: int = 4000, records: int = 200_000):
+    print(f"record(): {record_cost(records, 1):.2f} µs/call (1 thread)")
+    print(f"record(): {record_cost(records, 8):.2f} µs/call (8 threads)")
+    print(f"observer path: {observer_cost(records // 10):.2f} µs/model call")
+    r = model_calls(calls)
+    off, on = statistics.median(r[False]), statistics.median(r[True])
+    print(
+        f"pooled stub call: {off:.0f} µs off, {on:.0f} µs on "
+        f"(median of {len(r[True])} rounds, {on - off:+.0f} µs; "
+        f"last round recorded {r['recorded']['calls']} calls, "
+        f"{r['recorded']['prompt_tokens']} prompt tokens)"
+    )
+    print(f"attribution agent → team: {attribution()}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        m = MetricsCollector(tmp, fmt="csv")
+        m._ensure_rollup = lambda: None  # time the rollup explicitly
+        for i in range(records):
+            m.record("model", ("gpt-4o", "gpt-4o-mini")[i % 2], 100.0, 800, 100)
+        t0 = time.perf_counter()
+        m.summary()
+        t_summary = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        report = m.report()
+        t_report = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        rows = m.rollup()
+        t_rollup = time.perf_counter() - t0
+        print(
+            f"summary {1000 * t_summary:.2f} ms, report (cached) {1000 * t_report:.2f} ms, "
+            f"rollup {rows} rows → CSV {1000 * t_rollup:.0f} ms"
+        )
+        print(report.splitlines()[0])
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*args)
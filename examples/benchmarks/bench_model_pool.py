@@ -0,0 +1,80 @@
+# bench_model_pool.py
+# ======================================================================
+# Pooled vs per-agent model clients against a local stub server
+#  • "fresh"  – one httpx.Client per agent, as `OpenAIChat(...)` per worker
+#  • "pooled" – ModelPool client shared by every agent of that model
+#  • stub adds a fixed cost per new connection (TCP/TLS stand-in)
+#
+#   python examples/benchmarks/bench_model_pool.py [agents] [calls_per_agent]
+# ======================================================================
+
+import json, statistics, sys, time, pathlib
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+import httpx
+
+from agency_kit.model_pool import ModelPool
+from agency_kit.stub_openai import StubOpenAI
+
+BODY = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "hi"}]}
+
+
+def call(client: httpx.Client, url: str) -> float:
+    t0 = time.perf_counter()
+    r = client.post(url, content=json.dumps(BODY))
+    r.raise_for_status()
+    return time.perf_counter() - t0
+
+
+def run(mode: str, agents: int, calls: int, concurrency: int = 8) -> dict:
+    with StubOpenAI(latency_s=0.005, connect_latency_s=0.03) as stub:
+        url = stub.base_url + "/chat/completions"
+        pool = ModelPool(max_in_flight=concurrency)
+        if mode == "pooled":
+            clients = [pool.client("gpt-4o-mini", "sk-x", stub.base_url)] * agents
+        else:
+            # every agent owns a client; a new agent run = a new client
+            clients = None
+
+        def agent_calls(i: int):
+            out = []
+            for _ in range(calls):
+                if clients is None:
+                    with httpx.Client() as c:
+                        out.append(call(c, url))
+                else:
+                    out.append(call(clients[i], url))
+            return out
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as ex:
+            lat = [x for xs in ex.map(agent_calls, range(agents)) for x in xs]
+        wall = time.perf_counter() - t0
+        result = {
+            "mode": mode,
+            "calls": len(lat),
+            "connections": stub.connections,
+            "p50_ms": 1000 * statistics.median(lat),
+            "mean_ms": 1000 * statistics.fmean(lat),
+            "wall_s": wall,
+            "pool": pool.stats(),
+        }
+        pool.close()
+        return result
+
+
+def main(agents: int = 40, calls: int = 5):
+    for mode in ("fresh", "pooled"):
+        r = run(mode, agents, calls)
+        print(
+            f"{r['mode']:<7} calls={r['calls']:<5} tcp_conns={r['connections']:<5}"
+            f" p50={r['p50_ms']:.1f}ms mean={r['mean_ms']:.1f}ms wall={r['wall_s']:.2f}s"
+        )
+        for label, s in r["pool"].items():
+            print(f"        {label}: {s}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,153 @@
+# bench_parallel_tools.py
+# ======================================================================
+# One model turn with several tool calls: agno's sequential loop vs
+# agency_kit.parallel_tools
+#  • StubModel / StubCall follow agno 1.5's run_function_call protocol
+#    (tool_call_started → execute → tool_call_completed, result appended)
+#  • turns from the stacks: Sentiment (Google + YFinance news), Eco-Route
+#    Optimizer (Maps route matrix + a declared route solver), Traffic-Intel (Maps + DDG),
+#    and one with an unsafe Slack post between two lookups
+#  • per turn: sequential ms, parallel ms, slowest call ms, result order
+#
+#   python examples/benchmarks/bench_parallel_tools.py [repeats] [scale]
+# ======================================================================
+
+import sys, time, pathlib
+from types import SimpleNamespace
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from agency_kit.parallel_tools import ToolPool, concurrency_safe, instrument
+
+STATE = {"scale": 1.0}
+
+
+def _sleep(ms: float) -> None:
+    time.sleep(ms / 1000 * STATE["scale"])
+
+
+class GoogleSearchTools:
+    def google_search(self, query: str) -> str:
+        _sleep(300)
+        return f"google:{query}"
+
+
+class YFinanceTools:
+    def get_company_news(self, symbol: str) -> str:
+        _sleep(500)
+        return f"news:{symbol}"
+
+
+class GoogleMapsTools:
+    def route_matrix(self, origins: str) -> str:
+        _sleep(400)
+        return f"matrix:{origins}"
+
+
+class DuckDuckGoTools:
+    def duckduckgo_search(self, query: str) -> str:
+        _sleep(300)
+        return f"ddg:{query}"
+
+
+@concurrency_safe  # not in SAFE_TOOLKITS: declared
+class RouteSolver:
+    def solve_vrp(self, stops: str) -> str:
+        _sleep(250)
+        return f"vrp:{stops}"
+
+
+class SlackTools:
+    def send_message(self, channel: str) -> str:
+        _sleep(100)
+        return f"posted:{channel}"
+
+
+class StubCall:
+    def __init__(self, method, **arguments):
+        self.function = SimpleNamespace(name=method.__name__, entrypoint=method)
+        self.arguments = arguments
+        self.call_id = f"call_{method.__name__}"
+        self.result = None
+
+    def execute(self):
+        self.result = self.function.entrypoint(**self.arguments)
+        return SimpleNamespace(status="success")
+
+
+class StubModel:
+    """agno.models.base.Model's sequential tool loop, trimmed."""
+
+    def run_function_call(self, fc, function_call_results, additional_messages=None):
+        yield ("tool_call_started", fc.function.name)
+        fc.execute()
+        yield ("tool_call_completed", fc.function.name)
+        function_call_results.append(fc.result)
+
+    def run_function_calls(self, function_calls, function_call_results, *_):
+        for fc in function_calls:
+            yield from self.run_function_call(fc, function_call_results)
+
+    async def arun_function_call(self, fc):
+        return fc.execute(), None, fc
+
+    def create_tool_call_limit_error_result(self, fc):
+        return f"limit:{fc.function.name}"
+
+
+TURNS = {
+    "Sentiment": lambda: [
+        StubCall(GoogleSearchTools().google_search, query="Acme news"),
+        StubCall(YFinanceTools().get_company_news, symbol="ACME"),
+    ],
+    "Eco-Route Optimizer": lambda: [
+        StubCall(GoogleMapsTools().route_matrix, origins="Rotterdam|Duisburg"),
+        StubCall(RouteSolver().solve_vrp, stops="12"),
+    ],
+    "Traffic-Intel": lambda: [
+        StubCall(GoogleMapsTools().route_matrix, origins="A3"),
+        StubCall(DuckDuckGoTools().duckduckgo_search, query="A3 roadworks"),
+        StubCall(DuckDuckGoTools().duckduckgo_search, query="Rhine ferry"),
+    ],
+    "lookups + Slack post": lambda: [
+        StubCall(GoogleSearchTools().google_search, query="Acme"),
+        StubCall(DuckDuckGoTools().duckduckgo_search, query="Acme"),
+        StubCall(SlackTools().send_message, channel="#sales"),
+        StubCall(YFinanceTools().get_company_news, symbol="ACME"),
+        StubCall(GoogleMapsTools().route_matrix, origins="HQ"),
+    ],
+}
+
+
+def turn(model, calls):
+    results = []
+    t0 = time.perf_counter()
+    events = list(model.run_function_calls(calls, results))
+    return 1000 * (time.perf_counter() - t0), results, events
+
+
+def main(repeats: int = 3, scale: float = 1.0):
+    STATE["scale"] = scale
+    pool = ToolPool(max_workers=8)
+    parallel = instrument(SimpleNamespace(model=StubModel()), pool).model
+    print(
+        f"{'turn':<22} {'calls':>5} {'sequential':>10} {'parallel':>9} {'slowest':>8}  order"
+    )
+    for name, make in TURNS.items():
+        seq = par = 0.0
+        for _ in range(repeats):
+            ms, expected, _ = turn(StubModel(), make())
+            seq += ms / repeats
+            ms, got, events = turn(parallel, make())
+            par += ms / repeats
+        calls = make()
+        slowest = max(turn(StubModel(), [c])[0] for c in calls)
+        print(
+            f"{name:<22} {len(calls):5d} {seq:8.0f}ms {par:7.0f}ms {slowest:6.0f}ms  "
+            f"{'same' if got == expected else 'DIFFERENT'}"
+        )
+    print(f"pool: {pool.stats()}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 3, float(args[1]) if args[1:] else 1.0)
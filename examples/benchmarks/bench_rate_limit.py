@@ -0,0 +1,125 @@
+# bench_rate_limit.py
+# ======================================================================
+# Mesh-wide rate scheduler vs clients that only retry on 429
+#  • stub enforces gpt-4o limits as token buckets; "a minute" is scaled to
+#    period_s so the run takes seconds
+#  • traffic: a background sentinel sweep bursts first, executive sessions
+#    fan out beside it, interactive API calls trickle in shortly after
+#  • callers retry like the OpenAI SDK (2 retries, honouring Retry-After)
+#  • none     – no scheduler: bursts hit the provider, 429s, retry storms
+#  • fifo     – scheduler, every call in one class: backpressure, no 429s
+#  • priority – scheduler with classes + per-session turns
+#
+#   python examples/benchmarks/bench_rate_limit.py [rpm] [period_s]
+# ======================================================================
+
+import json, statistics, sys, threading, time, pathlib
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+import httpx
+
+from agency_kit import rate_limit
+from agency_kit.model_pool import ModelPool
+from agency_kit.rate_limit import RateScheduler
+from agency_kit.stub_openai import StubOpenAI
+
+MODEL = "gpt-4o"
+PROMPT = "Summarise the account status for the weekly digest. " * 8
+# (class, sessions, calls per session, first arrival s, gap between arrivals s)
+TRAFFIC = [
+    ("background", 1, 120, 0.0, 0.0),
+    ("executive", 3, 20, 0.0, 0.0),
+    ("interactive", 20, 2, 0.3, 0.05),
+]
+BODY = json.dumps(
+    {
+        "model": MODEL,
+        "max_tokens": 50,
+        "messages": [{"role": "user", "content": PROMPT}],
+    }
+)
+CALL_TOKENS = len(BODY) // 4 + 50  # what the stub charges per call
+
+
+def call(client: httpx.Client, retries: int = 2) -> tuple:
+    """→ (ok, 429s seen): one completion, retried like the OpenAI SDK."""
+    throttled = 0
+    for attempt in range(retries + 1):
+        r = client.post("/chat/completions", content=BODY)
+        if r.status_code != 429:
+            return r.status_code == 200, throttled
+        throttled += 1
+        if attempt < retries:
+            time.sleep(int(r.headers["retry-after-ms"]) / 1000)
+    return False, throttled
+
+
+def run(mode: str, rpm: int, period_s: float) -> dict:
+    limits = {MODEL: (rpm, rpm * 100)}
+    with StubOpenAI(latency_s=0.02, limits=limits, period_s=period_s) as stub:
+        pool = ModelPool(max_in_flight=256)
+        if mode != "none":
+            RateScheduler(limits, period_s).govern(pool)
+        client = pool.client(MODEL, "sk-x", stub.base_url)
+        client.base_url = stub.base_url
+        results = {cls: [] for cls, *_ in TRAFFIC}
+        lock = threading.Lock()
+        t_start = time.perf_counter()
+
+        def caller(cls: str, session: str, at: float):
+            time.sleep(max(0.0, at - (time.perf_counter() - t_start)))
+            t0 = time.perf_counter()
+            with rate_limit.priority(
+                cls if mode == "priority" else "executive", session
+            ):
+                ok, throttled = call(client)
+            with lock:
+                results[cls].append((ok, throttled, time.perf_counter() - t0))
+
+        jobs = [
+            (cls, f"{cls}-{s}", first + gap * (s * calls + i))
+            for cls, sessions, calls, first, gap in TRAFFIC
+            for s in range(sessions)
+            for i in range(calls)
+        ]
+        with ThreadPoolExecutor(len(jobs)) as ex:
+            for job in jobs:
+                ex.submit(caller, *job)
+        wall = time.perf_counter() - t_start
+        pool.close()
+        return {"wall": wall, "rejected": stub.rejected, "results": results}
+
+
+def main(rpm: int = 60, period_s: float = 1.0):
+    per_s = min(rpm, rpm * 100 / CALL_TOKENS) / period_s
+    calls = sum(n * k for _, n, k, *_ in TRAFFIC)
+    limit = f"{rpm} req / {rpm * 100} tok per {period_s:g}s"
+    print(f"{calls} calls of {CALL_TOKENS} tok, limit {limit}")
+    print(f"(≈{per_s:.0f} calls/s sustained, after the initial burst)")
+    print(
+        f"{'mode':<9} {'wall s':>6} {'429s':>5} {'failed':>6}  "
+        + "  ".join(f"{cls:>22}" for cls, *_ in TRAFFIC)
+    )
+    print(
+        f"{'':<9} {'':>6} {'':>5} {'':>6}  "
+        + "  ".join(f"{'p50 / p95 ms':>22}" for _ in TRAFFIC)
+    )
+    for mode in ("none", "fifo", "priority"):
+        r = run(mode, rpm, period_s)
+        cols, failed = [], 0
+        for cls, *_ in TRAFFIC:
+            rows = r["results"][cls]
+            failed += sum(not ok for ok, _, _ in rows)
+            lat = sorted(s for ok, _, s in rows if ok) or [float("nan")]
+            p95 = lat[int(0.95 * (len(lat) - 1))]
+            cols.append(f"{1000 * statistics.median(lat):10.0f} / {1000 * p95:7.0f}")
+        print(
+            f"{mode:<9} {r['wall']:6.2f} {r['rejected']:5d} {failed:6d}  "
+            + "  ".join(f"{c:>22}" for c in cols)
+        )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 60, float(args[1]) if args[1:] else 1.0)
@@ -0,0 +1,186 @@
+# bench_router.py
+# ======================================================================
+# Local router vs LLM routing on a labelled request set
+#  • team definitions mirror consulting_ai_agency.py / marketing-agency.py
+#  • reports accuracy of direct dispatches, LLM calls saved, routing latency
+#  • "llm" cost is an assumed gpt-4o routing round trip (ROUTE_LLM_MS)
+#
+#   python examples/benchmarks/bench_router.py [threshold]
+# ======================================================================
+
+import os, sys, time, pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from agency_kit.router import LocalRouter, parse_rules
+
+ROUTE_LLM_MS = float(os.getenv("ROUTE_LLM_MS", "900"))
+
+TEAMS = {
+    "Sales-Manager": (
+        {
+            "Lead-Gen Team": "",
+            "Pre-Call-Assistant": "Discovery brief",
+            "Post-Call-Assistant": "Recap email",
+            "Lead-Researcher": "Manual lookup",
+            "CRM-Assistant": "Update CRM",
+            "Competitive-Intel": "Battle card",
+            "Pricing-Strategist": "Price table",
+            "Offer-Packager": "Good/Better/Best",
+            "Sales-Enablement": "Deck",
+            "Pipeline-Forecaster": "Bookings forecast",
+        },
+        [
+            "lead/prospect → Lead-Gen; competitor → Competitive-Intel; "
+            "price/margin/bundle → Pricing-Strategist; package → Offer-Packager; "
+            "deck/demo → Sales-Enablement; forecast → Pipeline-Forecaster. "
+            "Else Pre/Post/Lookup/CRM. Post #sales."
+        ],
+    ),
+    "Project-Manager": (
+        {
+            "Notion-Assistant": "Update Notion",
+            "GDrive-Assistant": "Handle GDrive",
+            "Doc-Architect": "Outline docs",
+            "API-Doc-Writer": "OpenAPI & snippets",
+            "Changelog-Agent": "Release notes",
+            "Tutorial-Writer": "Step-by-step guides",
+        },
+        [
+            "Route: outline/docs → Doc-Architect; API docs → API-Doc-Writer; "
+            "changelog → Changelog-Agent; tutorial/how-to → Tutorial-Writer; "
+            "else Notion/GDrive. Post #projects."
+        ],
+    ),
+    "Developer-Manager": (
+        {
+            "Frontend-Dev": "React/TS PoC",
+            "Backend-Dev": "FastAPI PoC",
+            "Fullstack-Integrator": "Wire stack",
+        },
+        [
+            "Keywords React/UI → Frontend-Dev; FastAPI/backend → Backend-Dev; "
+            "integrate/deploy → Fullstack-Integrator. Post #dev"
+        ],
+    ),
+    "Comms-Manager": (  # marketing-agency.py manager(): no rules, roles only
+        {
+            "Slack-Assistant": "Draft Slack replies",
+            "LinkedIn-DM-Assistant": "Draft LinkedIn DMs",
+            "WhatsApp-Assistant": "Write WhatsApp msgs",
+            "Calendar-Assistant": "Schedule meetings",
+            "Gmail-Assistant": "Draft emails",
+        },
+        ["Decide which specialist handles the task."],
+    ),
+}
+
+LABELLED = [
+    ("Sales-Manager", "Pull 5 CFO leads in Germany", "Lead-Gen Team"),
+    (
+        "Sales-Manager",
+        "Find prospects for our data platform in Austria",
+        "Lead-Gen Team",
+    ),
+    (
+        "Sales-Manager",
+        "Build a battle card against our main competitor",
+        "Competitive-Intel",
+    ),
+    (
+        "Sales-Manager",
+        "What margin do we make on the premium bundle?",
+        "Pricing-Strategist",
+    ),
+    (
+        "Sales-Manager",
+        "Draft a pricing table for the audit offer",
+        "Pricing-Strategist",
+    ),
+    ("Sales-Manager", "Package the AI audit as good/better/best", "Offer-Packager"),
+    ("Sales-Manager", "Prepare a demo deck for BlueRail", "Sales-Enablement"),
+    ("Sales-Manager", "Forecast Q3 bookings", "Pipeline-Forecaster"),
+    (
+        "Sales-Manager",
+        "Write a discovery brief before tomorrow's call",
+        "Pre-Call-Assistant",
+    ),
+    (
+        "Sales-Manager",
+        "Send a recap email after the call with Acme",
+        "Post-Call-Assistant",
+    ),
+    ("Sales-Manager", "Update the CRM with the Acme deal stage", "CRM-Assistant"),
+    ("Sales-Manager", "Compare competitor pricing to ours", None),  # ambiguous
+    ("Project-Manager", "Outline the docs for the SDK", "Doc-Architect"),
+    ("Project-Manager", "Write API docs for the pricing calculator", "API-Doc-Writer"),
+    ("Project-Manager", "Create the changelog for v2.3.0", "Changelog-Agent"),
+    ("Project-Manager", "Write a how-to for onboarding new clients", "Tutorial-Writer"),
+    ("Project-Manager", "Update the Notion roadmap page", "Notion-Assistant"),
+    ("Project-Manager", "Upload the contract to GDrive", "GDrive-Assistant"),
+    ("Developer-Manager", "Build React PoC for the pricing calculator", "Frontend-Dev"),
+    ("Developer-Manager", "Scaffold a FastAPI backend for leads", "Backend-Dev"),
+    ("Developer-Manager", "Deploy the stack to Azure", "Fullstack-Integrator"),
+    (
+        "Developer-Manager",
+        "Integrate the frontend with the API",
+        "Fullstack-Integrator",
+    ),
+    ("Developer-Manager", "Add a settings page to the UI", "Frontend-Dev"),
+    ("Comms-Manager", "Draft a Slack reply to the design channel", "Slack-Assistant"),
+    (
+        "Comms-Manager",
+        "Schedule meetings with the BlueRail team next week",
+        "Calendar-Assistant",
+    ),
+    (
+        "Comms-Manager",
+        "Write WhatsApp msgs to confirm the workshop",
+        "WhatsApp-Assistant",
+    ),
+    ("Comms-Manager", "Draft emails to the three finalists", "Gmail-Assistant"),
+    (
+        "Comms-Manager",
+        "Reply to the LinkedIn DMs from recruiters",
+        "LinkedIn-DM-Assistant",
+    ),
+    ("Comms-Manager", "Let everyone know we moved the launch", None),  # ambiguous
+]
+
+
+def main(threshold: float = 0.6):
+    routers = {
+        name: LocalRouter(members, parse_rules(instr, list(members)), threshold)
+        for name, (members, instr) in TEAMS.items()
+    }
+    direct = correct = 0
+    t_local = 0.0
+    for team, message, label in LABELLED:
+        t0 = time.perf_counter()
+        d = routers[team].route(message)
+        t_local += time.perf_counter() - t0
+        if d.confidence >= threshold:
+            direct += 1
+            ok = d.member == label
+            correct += ok
+            mark = "ok " if ok else "BAD"
+        else:
+            mark = "llm"
+        print(
+            f"[{mark}] {team:<18} {d.method:<9} {d.confidence:4.2f} {message[:46]:<46} → {d.member}"
+        )
+
+    n = len(LABELLED)
+    print()
+    print(f"requests            : {n}")
+    print(
+        f"dispatched locally  : {direct} ({direct / n:.0%}); accuracy {correct}/{direct}"
+    )
+    print(f"LLM routing calls   : {n - direct} (saved {direct})")
+    print(f"local routing       : {1e6 * t_local / n:.0f} µs / request")
+    llm_only = n * ROUTE_LLM_MS / 1000
+    hybrid = (n - direct) * ROUTE_LLM_MS / 1000 + t_local
+    print(f"routing time        : {llm_only:.1f}s LLM-only → {hybrid:.1f}s hybrid")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 0.6)
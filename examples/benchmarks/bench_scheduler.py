@@ -0,0 +1,158 @@
+# bench_scheduler.py
+# ======================================================================
+# Scheduler checks on a fake clock, plus overlap / lease runs on real time
+#  • week: the three schedules the stacks used to keep in their prompts
+#    (Cost-Sentinel 23:00 UTC, rail ops 02:00 Berlin across the DST change,
+#    Thames Water every 15 min with 60 s jitter) – fires and their times
+#  • restart: the process is down for 3 days; skip vs catch_up on restart
+#  • overlap: every 0.1 s, each run takes 0.35 s – one run at a time
+#  • lease: two schedulers on one SQLite file – every fire runs once
+#  • tick: cost of run_pending() with 200 schedules, none due
+#
+#   python examples/benchmarks/bench_scheduler.py
+# ======================================================================
+
+import os, sys, tempfile, threading, time, pathlib
+from collections import Counter
+from datetime import datetime, timezone
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from agency_kit.scheduler import FakeClock, Scheduler
+
+START = datetime(2025, 3, 27, tzinfo=timezone.utc)  # DST starts on the 30th
+DAY = 86400
+
+
+class Recorder:
+    """Agent look-alike: remembers each message it was run with."""
+
+    def __init__(self, name: str):
+        self.name, self.messages = name, []
+
+    def run(self, message, stream=False, **kwargs):
+        self.messages.append(message)
+
+
+def week(path: str) -> None:
+    sched = Scheduler(path, clock=FakeClock(START))
+    cost, rail = Recorder("Cost-Sentinel"), Recorder("Rail Ops Orchestrator")
+    water = []  # (fire time, fake time it ran at)
+    sched.add("cost-digest", cost, "Digest for {at:%a %H:%M %Z}", cron="0 23 * * *")
+    sched.add(
+        "rail-nightly",
+        rail,
+        "Rail run {at:%a %H:%M %Z}",
+        cron="0 2 * * *",
+        tz="Europe/Berlin",
+    )
+    sched.add(
+        "water-cycle",
+        lambda at: water.append((at.timestamp(), sched.clock.now())),
+        every="15m",
+        jitter_s=60,
+    )
+    sched.advance(7 * DAY)
+    print(f"{'week':<9} cost-digest  {len(cost.messages)} runs: {cost.messages[:2]} …")
+    print(f"{'':<9} rail-nightly {len(rail.messages)} runs: {rail.messages[2:5]} …")
+    quarter = all(at % 900 == 0 for at, _ in water)
+    delays = [ran - at for at, ran in water]
+    print(
+        f"{'':<9} water-cycle  {len(water)} runs, fires on the quarter hour: "
+        f"{quarter}, jitter {min(delays):.0f}–{max(delays):.0f} s"
+    )
+
+
+def restart(path: str, misfire: str) -> None:
+    clock = FakeClock(START)
+    rail = Recorder("Rail Ops Orchestrator")
+    sched = Scheduler(path, clock=clock)
+    kw = dict(cron="0 2 * * *", tz="Europe/Berlin", misfire=misfire)
+    sched.add("rail-nightly", rail, "Rail run for {at:%Y-%m-%d}", **kw)
+    sched.advance(DAY)
+    # down for three days; a new process picks the schedule up from SQLite
+    clock = FakeClock(clock.t + 3 * DAY)
+    sched = Scheduler(path, clock=clock)
+    sched.add("rail-nightly", rail, "Rail run for {at:%Y-%m-%d}", **kw)
+    before = len(rail.messages)
+    sched.advance(1)
+    after_restart = rail.messages[before:]
+    sched.advance(DAY)
+    s = sched.stats()["rail-nightly"]
+    print(
+        f"{'restart':<9} {misfire:<9} on restart: {after_restart or '(none)'}; "
+        f"runs {s['runs']}, missed {s['missed']}, caught up {s['caught_up']}"
+    )
+
+
+def overlap(path: str) -> None:
+    sched = Scheduler(path)
+    active, peak, runs = 0, 0, 0
+    lock = threading.Lock()
+
+    def slow(at):
+        nonlocal active, peak, runs
+        with lock:
+            active, runs = active + 1, runs + 1
+            peak = max(peak, active)
+        time.sleep(0.35)
+        with lock:
+            active -= 1
+
+    sched.add("slow", slow, every=0.1)
+    sched.start()
+    time.sleep(2.0)
+    sched.stop()
+    s = sched.stats()["slow"]
+    print(
+        f"{'overlap':<9} ~20 fires in 2 s: {runs} runs, "
+        f"{s['overlapped']} skipped while running, peak concurrency {peak}"
+    )
+
+
+def lease(path: str) -> None:
+    seen = Counter()
+    lock = threading.Lock()
+
+    def job(at):
+        with lock:
+            seen[at.timestamp()] += 1
+        time.sleep(0.02)
+
+    a, b = Scheduler(path), Scheduler(path)
+    for sched in (a, b):
+        sched.add("shared", job, every=0.05)
+        sched.start()
+    time.sleep(1.5)
+    a.stop(), b.stop()
+    twice = sum(n > 1 for n in seen.values())
+    print(
+        f"{'lease':<9} two schedulers, one file: {len(seen)} fires, {twice} ran twice"
+    )
+
+
+def tick(path: str) -> None:
+    sched = Scheduler(path, clock=FakeClock(START))
+    for i in range(200):
+        sched.add(f"job-{i}", print, cron=f"{i % 60} {i % 24} * * *")
+    n = 2000
+    t0 = time.perf_counter()
+    for _ in range(n):
+        sched.run_pending()
+    us = (time.perf_counter() - t0) / n * 1e6
+    print(f"{'tick':<9} run_pending() with 200 schedules, none due: {us:.0f} µs")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = lambda name: os.path.join(tmp, f"{name}.sqlite")
+        week(db("week"))
+        restart(db("skip"), "skip")
+        restart(db("catch_up"), "catch_up")
+        overlap(db("overlap"))
+        lease(db("lease"))
+        tick(db("tick"))
+
+
+if __name__ == "__main__":
+    main()
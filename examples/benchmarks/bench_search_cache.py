@@ -0,0 +1,132 @@
+# bench_search_cache.py
+# ======================================================================
+# Shared search cache (agency_kit.search_cache) on an executive-style run
+#  • 8 search-heavy agents (Content-Ideator, General-Researcher,
+#    Competitive-Intel, Intent-Signal-Analyst, Trend-Scout, …) run at once,
+#    each making `searches` calls over a small pool of companies / trends
+#    with different casing and spacing; half the agents are async
+#  • fake DuckDuckGo / Google / Wikipedia calls take 200 ms (× scale)
+#  • no cache vs cold cache (single flight in the same run) vs a restart
+#    on the same SQLite file: outbound calls, wall time, hit rate per source
+#
+#   python examples/benchmarks/bench_search_cache.py [searches] [scale]
+# ======================================================================
+
+import asyncio, os, random, sys, tempfile, threading, time, pathlib
+from collections import Counter
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from agency_kit.search_cache import SearchCache
+
+AGENTS = [
+    "Content-Ideator",
+    "General-Researcher",
+    "Competitive-Intel",
+    "Intent-Signal-Analyst",
+    "Trend-Scout",
+    "Climate-Alert",
+    "Geo-Political Alert",
+    "Lead-Researcher",
+]
+TOPICS = [
+    "Acme Logistics",
+    "BlueRail GmbH",
+    "Rhine water levels",
+    "EU CBAM",
+    "cold chain trends 2025",
+    "Northwind Foods",
+    "Red Sea shipping",
+    "AI SDR tools",
+]
+TOOLS = ["duckduckgo_search", "google_search", "search_wikipedia", "duckduckgo_news"]
+STATE = {"scale": 1.0}
+OUTBOUND: Counter = Counter()
+LOCK = threading.Lock()
+
+
+def fake_search(name: str):
+    def call(query: str, max_results: int = 5) -> str:
+        with LOCK:
+            OUTBOUND[name] += 1
+        time.sleep(0.2 * STATE["scale"])
+        return f"[{name}] results for {query.lower()}"
+
+    async def acall(query: str, max_results: int = 5) -> str:
+        with LOCK:
+            OUTBOUND[name] += 1
+        await asyncio.sleep(0.2 * STATE["scale"])
+        return f"[{name}] results for {query.lower()}"
+
+    return call, acall
+
+
+def plan(searches: int, seed: int = 0):
+    """Per agent: (tool, query) – a few hot topics, spelled differently."""
+    rng = random.Random(seed)
+    out = {}
+    for agent in AGENTS:
+        calls = []
+        for _ in range(searches):
+            topic = rng.choice(TOPICS[: rng.choice((3, 8))])
+            spelled = rng.choice((topic, topic.upper(), f"  {topic} ", f'"{topic}"'))
+            calls.append((rng.choice(TOOLS), spelled))
+        out[agent] = calls
+    return out
+
+
+def run(cache, calls) -> float:
+    def sync_agent(agent):
+        for tool, query in calls[agent]:
+            fn = fake_search(tool)[0]
+            args = {"query": query}
+            cache.tool_hook(tool, fn, args) if cache else fn(**args)
+
+    async def async_agent(agent):
+        for tool, query in calls[agent]:
+            fn = fake_search(tool)[1]
+            args = {"query": query}
+            await (cache.atool_hook(tool, fn, args) if cache else fn(**args))
+
+    async def async_half():
+        await asyncio.gather(*(async_agent(a) for a in AGENTS[1::2]))
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=sync_agent, args=(a,)) for a in AGENTS[::2]]
+    threads.append(threading.Thread(target=asyncio.run, args=(async_half(),)))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - t0
+
+
+def main(searches: int = 12, scale: float = 1.0):
+    STATE["scale"] = scale
+    calls = plan(searches)
+    total = sum(len(c) for c in calls.values())
+    print(
+        f"{len(AGENTS)} agents × {searches} searches = {total}, 200 ms × {scale} each"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "search_cache.sqlite")
+        for label, cache in (
+            ("no cache", None),
+            ("cold cache", SearchCache(db)),
+            ("restart, same file", SearchCache(db)),
+        ):
+            OUTBOUND.clear()
+            wall = run(cache, calls)
+            print(
+                f"{label:<20} outbound {sum(OUTBOUND.values()):4d}  wall {wall:5.2f}s"
+            )
+            if cache is not None:
+                for source, s in sorted(cache.stats()["sources"].items()):
+                    print(
+                        f"    {source:<16} hit rate {s['hit_rate']:5.0%}  memory {s['hits_memory']:3d} "
+                        f"disk {s['hits_disk']:3d} coalesced {s['coalesced']:3d} calls {s['calls']:3d}"
+                    )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 12, float(args[1]) if args[1:] else 1.0)
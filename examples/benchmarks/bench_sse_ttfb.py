@@ -0,0 +1,226 @@
+# bench_sse_ttfb.py
+# ======================================================================
+# Time-to-first-byte: blocking JSON endpoint vs SSE stream
+#  • stub coordinate team: 4 members in turn, each 2 model calls to a stub
+#    OpenAI server (own process) through the pooled async client
+#  • served by a bare asyncio HTTP server (same framing as StreamingResponse)
+#  • reports first byte, first content event, total – per endpoint
+#  • also streams the Lead-Gen style DAG (agency_kit.pipeline.astream):
+#    each stage agent streams, so its text reaches the client as it's made
+#
+#   python examples/benchmarks/bench_sse_ttfb.py [latency_s]
+# ======================================================================
+
+import asyncio, json, multiprocessing, sys, time, pathlib
+from types import SimpleNamespace
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+import httpx
+
+from agency_kit.model_pool import ModelPool
+from agency_kit.pipeline import DagPipeline, ItemDag, agent_stage
+from agency_kit.sse import sse_stream, team_events
+from agency_kit.stub_openai import StubOpenAI
+
+MEMBERS = ["Demand-Sensing", "Baseline-Forecaster", "Causal-Modeler", "Reconciler"]
+CALLS_PER_MEMBER = 2
+BODY = json.dumps({"model": "gpt-4o-mini", "messages": []})
+
+
+def serve(latency: float, conn) -> None:
+    with StubOpenAI(latency_s=latency) as stub:
+        conn.send(stub.base_url)
+        conn.recv()
+
+
+class StubTeam:
+    """Coordinate-mode team look-alike; streams agno-shaped chunks."""
+
+    def __init__(self, pool: ModelPool, base_url: str):
+        self.pool, self.base_url = pool, base_url
+
+    async def _model_call(self) -> None:
+        client = self.pool.async_client("gpt-4o-mini", "sk-x", self.base_url)
+        r = await client.post(self.base_url + "/chat/completions", content=BODY)
+        r.raise_for_status()
+
+    async def _stream(self, message: str):
+        for i, member in enumerate(MEMBERS):
+            tool = SimpleNamespace(
+                tool_call_id=f"call_{i}",
+                tool_name="transfer_task_to_member",
+                tool_args={"member_id": member, "task_description": message},
+                tool_call_error=False,
+                result=None,
+            )
+            yield SimpleNamespace(event="ToolCallStarted", tools=[tool])
+            for _ in range(CALLS_PER_MEMBER):
+                await self._model_call()
+                yield SimpleNamespace(event="RunResponse", content=f"{member} … ")
+            tool.result = f"{member} done"
+            yield SimpleNamespace(event="ToolCallCompleted", tools=[tool])
+        yield SimpleNamespace(event="RunResponse", content="forecast table")
+
+    async def arun(self, message: str, stream: bool = False, **kwargs):
+        if stream:
+            return self._stream(message)
+        parts = [
+            c.content async for c in self._stream(message) if c.event == "RunResponse"
+        ]
+        return SimpleNamespace(content="".join(parts))
+
+
+class StubAgent:
+    def __init__(self, field: str, pool: ModelPool, base_url: str):
+        self.field, self.pool, self.base_url = field, pool, base_url
+        self.name = field
+
+    def deep_copy(self):
+        return StubAgent(self.field, self.pool, self.base_url)
+
+    async def _answer(self) -> str:
+        client = self.pool.async_client("gpt-4o-mini", "sk-x", self.base_url)
+        (
+            await client.post(self.base_url + "/chat/completions", content=BODY)
+        ).raise_for_status()
+        return json.dumps({self.field: "ok"})
+
+    async def _stream(self):
+        yield SimpleNamespace(event="RunStarted", content=None)
+        answer = await self._answer()
+        for part in (answer[:6], answer[6:]):
+            yield SimpleNamespace(event="RunResponse", content=part)
+        yield SimpleNamespace(event="RunCompleted", content=answer)
+
+    async def arun(self, message: str, stream: bool = False, **kwargs):
+        if stream:
+            return self._stream()
+        return SimpleNamespace(content=await self._answer())
+
+
+async def http_server(routes):
+    """routes: path → async iterator factory of str chunks (HTTP/1.1, close)."""
+
+    async def handle(reader, writer):
+        head = await reader.readuntil(b"\r\n\r\n")
+        path = head.split(b" ")[1].decode()
+        length = [
+            l for l in head.split(b"\r\n") if l.lower().startswith(b"content-length")
+        ]
+        if length:
+            await reader.readexactly(int(length[0].split(b":")[1]))
+        body, media = routes[path]
+        writer.write(
+            f"HTTP/1.1 200 OK\r\nContent-Type: {media}\r\nConnection: close\r\n\r\n".encode()
+        )
+        await writer.drain()
+        async for chunk in body():
+            writer.write(chunk.encode())
+            await writer.drain()
+        writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+def has_content(chunk: str, sse: bool) -> bool:
+    """JSON: the body is the content. SSE: the first text delta."""
+    return not sse or "event: content" in chunk
+
+
+async def measure(url: str) -> dict:
+    first_byte = first_content = None
+    async with httpx.AsyncClient(timeout=None) as c:
+        t0 = time.perf_counter()
+        async with c.stream("POST", url, content="{}") as r:
+            sse = r.headers["content-type"] == "text/event-stream"
+            async for chunk in r.aiter_text():
+                now = time.perf_counter() - t0
+                first_byte = first_byte if first_byte is not None else now
+                if first_content is None and has_content(chunk, sse):
+                    first_content = now
+    return {
+        "ttfb": first_byte,
+        "first_content": first_content,
+        "total": time.perf_counter() - t0,
+    }
+
+
+async def main_async(base_url: str) -> None:
+    pool = ModelPool(max_in_flight=64)
+    team = StubTeam(pool, base_url)
+    stages = [
+        agent_stage("Extractor", StubAgent("first_name", pool, base_url)),
+        agent_stage("Enricher", StubAgent("company", pool, base_url), ("Extractor",)),
+        agent_stage("Scorer", StubAgent("score", pool, base_url), ("Enricher",)),
+        agent_stage("Emailer", StubAgent("email", pool, base_url), ("Scorer",)),
+    ]
+
+    async def ahead(message):
+        for i in range(12):
+            yield {"lead": i}
+
+    async def areduce(items):
+        return f"| {len(items)} leads |"
+
+    dag = DagPipeline(None, ItemDag(stages), None, ahead, areduce)
+
+    async def blocking():
+        res = await team.arun("Forecast demand for DE")
+        yield json.dumps({"forecast_md": res.content})
+
+    async def team_stream():
+        async def events():
+            async for e in team_events(await team.arun("DE", stream=True)):
+                yield e
+
+        async for frame in sse_stream(events):
+            yield frame
+
+    async def dag_blocking():
+        yield json.dumps({"leads_markdown": await dag.arun("CFO leads")})
+
+    async def dag_stream():
+        async for frame in sse_stream(lambda: dag.astream("CFO leads")):
+            yield frame
+
+    server = await http_server(
+        {
+            "/forecast": (blocking, "application/json"),
+            "/forecast/stream": (team_stream, "text/event-stream"),
+            "/generate-leads": (dag_blocking, "application/json"),
+            "/generate-leads/stream": (dag_stream, "text/event-stream"),
+        }
+    )
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        for path in (
+            "/forecast",
+            "/forecast/stream",
+            "/generate-leads",
+            "/generate-leads/stream",
+        ):
+            r = await measure(f"http://127.0.0.1:{port}{path}")
+            print(
+                f"{path:<24} first byte {1000 * r['ttfb']:6.0f}ms   "
+                f"first content {1000 * r['first_content']:6.0f}ms   "
+                f"total {1000 * r['total']:6.0f}ms"
+            )
+
+
+def main(latency: float = 0.15):
+    print(
+        f"{len(MEMBERS)} members x {CALLS_PER_MEMBER} model calls x {latency * 1000:.0f}ms;"
+        " DAG: 12 leads x 4 stages"
+    )
+    parent, child = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=serve, args=(latency, child), daemon=True)
+    server.start()
+    try:
+        asyncio.run(main_async(parent.recv()))
+    finally:
+        parent.send("stop")
+        server.join(5)
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 0.15)
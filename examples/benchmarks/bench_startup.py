@@ -0,0 +1,76 @@
+# bench_startup.py
+# ======================================================================
+# Cold-start benchmark for consulting_ai_agency.py
+#  • imports the stack in a fresh interpreter with AGENCY_LAZY=0 / =1
+#  • reports import time, peak RSS, how many agents were built and how
+#    many agno.tools.* modules got imported
+#  • "+leads" also builds leadgen_team, i.e. what /api/generate-leads needs
+#  • offline, like bench_stacks.py: fake_tools.install() (toolkits import
+#    without their SDKs) and agno_compat.install() (agno 1.5 API) first
+#
+#   python examples/benchmarks/bench_startup.py [runs]
+# ======================================================================
+
+import json, os, statistics, subprocess, sys, tempfile, pathlib
+
+EXAMPLES = pathlib.Path(__file__).resolve().parents[1]
+STACK_DIR = EXAMPLES / "consulting_agency"
+
+CHILD = r"""
+import json, resource, sys, time
+sys.path[:0] = [{stack_dir!r}, {examples!r}]
+from agency_kit import agno_compat, fake_tools
+fake_tools.install()
+agno_compat.install()
+t0 = time.perf_counter()
+import consulting_ai_agency as m
+t_import = time.perf_counter() - t0
+if {touch_leads!r}:
+    m.reg.get("Lead-Gen Team")
+t_total = time.perf_counter() - t0
+print(json.dumps({{
+    "import_s": t_import,
+    "ready_s": t_total,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "tool_modules": sum(1 for k in sys.modules if k.startswith("agno.tools.")),
+    **m.reg.stats(),
+}}))
+"""
+
+
+def run_once(lazy: bool, touch_leads: bool) -> dict:
+    env = dict(os.environ, AGENCY_LAZY="1" if lazy else "0")
+    code = CHILD.format(
+        stack_dir=str(STACK_DIR), examples=str(EXAMPLES), touch_leads=touch_leads
+    )
+    with tempfile.TemporaryDirectory() as cwd:  # stack writes ./memory
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=cwd,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(runs: int = 5):
+    print(
+        f"{'mode':<14}{'import s':>10}{'ready s':>10}{'RSS MB':>9}{'built':>12}"
+        f"{'tool mods':>11}"
+    )
+    for lazy in (False, True):
+        for touch in (False, True):
+            rows = [run_once(lazy, touch) for _ in range(runs)]
+            label = ("lazy" if lazy else "eager") + ("+leads" if touch else "")
+            med = lambda k: statistics.median(r[k] for r in rows)
+            built = f"{rows[-1]['built']}/{rows[-1]['registered']}"
+            print(
+                f"{label:<14}{med('import_s'):>10.3f}{med('ready_s'):>10.3f}"
+                f"{med('rss_mb'):>9.1f}{built:>12}{rows[-1]['tool_modules']:>11}"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,256 @@
+# bench_stream_bus.py
+# ======================================================================
+# Time to first token through nested teams: agno's own stream vs the bus
+#  • stand-ins follow agno's streaming protocol: RunResponse chunks,
+#    run_response set once the stream ends; a coordinate team buffers
+#    what a member says (transfer_task_to_member), a route team re-yields
+#    it as its own (forward_task_to_member), delegate_in_parallel runs
+#    members with stream=False on threads
+#  • every model turn: time to first token, then tokens at a fixed rate
+#  • trees shaped like the consulting and content-agency demos
+#  • agno   – root.run(stream=True): the first text is the root's own answer
+#  • bus    – stream_bus.stream(root): the first text is the first leaf's
+#  • checks: every level's text is published once (forwarded copies
+#    dropped), tagged with its member path
+#
+#   python examples/benchmarks/bench_stream_bus.py [time_scale]
+# ======================================================================
+
+import asyncio, contextvars, sys, time, pathlib
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from agency_kit import stream_bus
+
+SCALE = 1.0
+TTFT = {"gpt-4o": 0.6, "gpt-4o-mini": 0.35}  # s to first token
+TOKEN_S = 0.01
+TOKENS = 20
+
+
+def chunk(content: str):
+    return SimpleNamespace(event="RunResponse", content=content)
+
+
+class StubAgent:
+    """agno Agent look-alike: run()/arun(), streamed or not."""
+
+    def __init__(self, name: str, model: str = "gpt-4o-mini"):
+        self.name, self.model = name, model
+        self.run_response = None
+
+    def _tokens(self, label: str):
+        time.sleep(TTFT[self.model] * SCALE)
+        for i in range(TOKENS):
+            yield f"{label}{i} "
+            time.sleep(TOKEN_S * SCALE)
+
+    async def _atokens(self, label: str):
+        await asyncio.sleep(TTFT[self.model] * SCALE)
+        for i in range(TOKENS):
+            yield f"{label}{i} "
+            await asyncio.sleep(TOKEN_S * SCALE)
+
+    def _stream(self, message, steps: bool = False):
+        text = ""
+        for t in self._tokens(self.name[:3]):
+            text += t
+            yield chunk(t)
+        self.run_response = SimpleNamespace(content=text)
+        if steps:
+            yield SimpleNamespace(event="RunCompleted", content=text)
+
+    async def _astream(self, message, steps: bool = False):
+        text = ""
+        async for t in self._atokens(self.name[:3]):
+            text += t
+            yield chunk(t)
+        self.run_response = SimpleNamespace(content=text)
+        if steps:
+            yield SimpleNamespace(event="RunCompleted", content=text)
+
+    def run(self, message=None, *, stream: bool = False, **kwargs):
+        if stream:
+            return self._stream(message, kwargs.get("stream_intermediate_steps"))
+        for _ in self._stream(message):
+            pass
+        return self.run_response
+
+    async def arun(self, message=None, *, stream: bool = False, **kwargs):
+        if stream:
+            return self._astream(message, kwargs.get("stream_intermediate_steps"))
+        async for _ in self._astream(message):
+            pass
+        return self.run_response
+
+
+class StubTeam(StubAgent):
+    """Team look-alike: a routing turn, members, then its own answer."""
+
+    def __init__(self, name: str, mode: str, members, model: str = "gpt-4o"):
+        super().__init__(name, model)
+        self.mode, self.members = mode, members
+
+    def _member_chunks(self, member, message):
+        """What the team's member tool passes up while the member streams:
+        forward_task_to_member (show_result) its text, transfer nothing."""
+        for c in member.run(message, stream=True):
+            if self.mode == "route":
+                yield chunk(c.content)
+
+    def _stream(self, message, steps: bool = False):
+        time.sleep(TTFT[self.model] * SCALE)  # routing turn: a tool call, no text
+        if self.mode == "parallel":  # delegate_in_parallel: threads, stream=False
+            with ThreadPoolExecutor(len(self.members)) as ex:
+                runs = [
+                    ex.submit(
+                        contextvars.copy_context().run,
+                        m.run,
+                        message,
+                        stream=False,
+                    )
+                    for m in self.members
+                ]
+                self.answers = [f.result().content for f in runs]
+        else:
+            for member in self.members[:1] if self.mode == "route" else self.members:
+                yield from self._member_chunks(member, message)
+        if self.mode == "route":
+            self.run_response = SimpleNamespace(content="(forwarded)")
+            return
+        yield from super()._stream(message)
+
+    async def _astream(self, message, steps: bool = False):
+        await asyncio.sleep(TTFT[self.model] * SCALE)
+        if self.mode == "parallel":
+            runs = await asyncio.gather(*(m.arun(message) for m in self.members))
+            self.answers = [r.content for r in runs]
+        else:
+            for member in self.members[:1] if self.mode == "route" else self.members:
+                async for c in await member.arun(message, stream=True):
+                    if self.mode == "route":
+                        yield chunk(c.content)
+        if self.mode == "route":
+            self.run_response = SimpleNamespace(content="(forwarded)")
+            return
+        async for c in super()._astream(message):
+            yield c
+
+
+def consulting():
+    lead_gen = StubTeam(
+        "Lead-Gen Team",
+        "coordinate",
+        [StubAgent("Parser"), StubAgent("Searcher"), StubAgent("Summariser")],
+        "gpt-4o-mini",
+    )
+    sales = StubTeam("Sales-Manager", "route", [lead_gen])
+    return StubTeam("Executive-Director", "coordinate", [sales])
+
+
+def content():
+    ideation = StubTeam(
+        "Ideation-Team",
+        "coordinate",
+        [StubAgent("Trend-Scout"), StubAgent("Idea-Generator")],
+        "gpt-4o-mini",
+    )
+    mgr = StubTeam("Ideation-Mgr", "route", [ideation])
+    return StubTeam("Exec-Director", "coordinate", [mgr])
+
+
+def fanout():
+    workers = [StubAgent(n) for n in ("Pricing", "Forecast", "Competitive", "Deck")]
+    return StubTeam("Executive-Director", "parallel", workers)
+
+
+def first_leaf_s(root) -> float:
+    """Routing turns down to the first leaf + that leaf's first token."""
+    s, node = 0.0, root
+    while hasattr(node, "members"):
+        s += TTFT[node.model]
+        node = node.members[0]
+    return (s + TTFT[node.model]) * SCALE
+
+
+def agno_ttft(root) -> tuple:
+    t0 = time.perf_counter()
+    first = None
+    for c in root.run("go", stream=True):
+        if c.content and first is None:
+            first = time.perf_counter() - t0
+    return first, time.perf_counter() - t0
+
+
+def bus_run(root, use_async: bool) -> tuple:
+    t0 = time.perf_counter()
+    first, who, by_path = None, None, {}
+
+    def take(event, data):
+        nonlocal first, who
+        if event == "content":
+            if first is None:
+                first, who = time.perf_counter() - t0, "/".join(data["path"])
+            key = "/".join(data["path"])
+            by_path[key] = by_path.get(key, "") + data["delta"]
+
+    if use_async:
+
+        async def consume():
+            async for event, data in stream_bus.astream(root, "go"):
+                take(event, data)
+
+        asyncio.run(consume())
+    else:
+        for event, data in stream_bus.stream(root, "go"):
+            take(event, data)
+    return first, time.perf_counter() - t0, who, by_path
+
+
+def own_text(name: str, text: str) -> bool:
+    words = text.split()
+    return len(words) == TOKENS and all(w.startswith(name[:3]) for w in words)
+
+
+def check(root, by_path: dict) -> str:
+    """Each level published its own words exactly once; a forced leaf
+    returned its own full answer."""
+    for path, text in by_path.items():
+        if not own_text(path.rsplit("/", 1)[-1], text):
+            return f"FAIL {path}"
+    for member, answer in zip(root.members, getattr(root, "answers", [])):
+        if not own_text(member.name, answer or ""):
+            return f"FAIL {member.name} result"
+    return f"ok ({len(by_path)} speakers)"
+
+
+def main(time_scale: float = 1.0):
+    global SCALE
+    SCALE = time_scale
+    print(
+        f"{'tree':<11} {'mode':<10} {'first text s':>12} {'total s':>8}  first speaker / check"
+    )
+    for label, build in (
+        ("consulting", consulting),
+        ("content", content),
+        ("fan-out", fanout),
+    ):
+        first, total = agno_ttft(build())
+        print(
+            f"{label:<11} {'agno':<10} {first:12.2f} {total:8.2f}  (root's own answer)"
+        )
+        for use_async in (False, True):
+            root = stream_bus.instrument_tree(build())
+            first, total, who, by_path = bus_run(root, use_async)
+            mode = "bus async" if use_async else "bus"
+            print(
+                f"{label:<11} {mode:<10} {first:12.2f} {total:8.2f}  {who}  {check(root, by_path)}"
+            )
+        print(f"{'':<11} {'first leaf':<10} {first_leaf_s(build()):12.2f}")
+    print(stream_bus.stream_stats()["recent"][-1])
+
+
+if __name__ == "__main__":
+    main(*[float(a) for a in sys.argv[1:2]])
@@ -0,0 +1,91 @@
+# bench_tiered_memory.py
+# ======================================================================
+# Prompt size over "months" of operation: full history vs tiered memory
+#  • 6 teams x 4 sessions each, `per_day` exchanges per session per day
+#  • full   = every past event of the session is injected (what a plain
+#             shared history does)
+#  • tiered = agency_kit.tiered_memory (hot events + rolling summary),
+#             compactor + retention run once per simulated day
+#  • per simulated month: tokens injected per call, context() latency,
+#    memory on disk (max_bytes budget 1MB per team to show pruning)
+#
+#   python examples/benchmarks/bench_tiered_memory.py [months] [per_day]
+# ======================================================================
+
+import random, sys, tempfile, time, pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from agency_kit.tiered_memory import TierPolicy, TieredMemory, event_text
+from agency_kit.tokens import backend, count_tokens
+
+TEAMS = ["Executive-Director", "Sales-Manager", "Lead-Gen Team", "Content-Manager"]
+TEAMS += ["Research-Manager", "Developer-Manager"]
+SESSIONS = 4
+WORDS = (
+    "pipeline forecast lead enrich score email pricing tier churn campaign "
+    "budget roadmap launch retention cohort margin vendor contract renewal"
+).split()
+
+
+def utterance(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def main(months: int = 6, per_day: int = 4):
+    rng = random.Random(7)
+    print(
+        f"{len(TEAMS)} teams x {SESSIONS} sessions, {per_day} exchanges/session/day, "
+        f"tokens via {backend()}"
+    )
+    print(
+        f"{'month':>5} {'full tok/call':>14} {'tiered tok/call':>16} "
+        f"{'tiered max':>11} {'context ms':>11} {'disk MB':>8}"
+    )
+    policy = TierPolicy(max_bytes=2**20)
+    with tempfile.TemporaryDirectory() as tmp:
+        mem = TieredMemory(tmp, default=policy, interval_s=1e9)
+        full_tokens = {}  # (team, session) → tokens of the whole history
+        for month in range(1, months + 1):
+            full, tiered, worst, spent, calls = 0, 0, 0, 0.0, 0
+            for day in range(30):
+                for team in TEAMS:
+                    for s in range(SESSIONS):
+                        session = f"s{s}"
+                        for _ in range(per_day):
+                            t0 = time.perf_counter()
+                            ctx = mem.context(team, session)
+                            spent += time.perf_counter() - t0
+                            n = count_tokens(ctx)
+                            tiered += n
+                            worst = max(worst, n)
+                            full += full_tokens.get((team, session), 0)
+                            calls += 1
+                            user = {"role": "user", "content": utterance(rng, 12)}
+                            reply = {
+                                "role": "assistant",
+                                "agent": team,
+                                "content": utterance(rng, 60),
+                            }
+                            mem.append(team, session, user, reply)
+                            full_tokens[(team, session)] = (
+                                full_tokens.get((team, session), 0)
+                                + count_tokens(event_text(user))
+                                + count_tokens(event_text(reply))
+                            )
+                mem.run_once()  # nightly compaction + retention
+            disk = sum(v["disk_mb"] for v in mem.stats().values())
+            print(
+                f"{month:>5} {full / calls:>14.0f} {tiered / calls:>16.0f} "
+                f"{worst:>11} {1000 * spent / calls:>11.2f} {disk:>8.1f}"
+            )
+        stats = mem.stats()["Sales-Manager"]
+        print(
+            f"Sales-Manager: {stats['compactions']} compactions, "
+            f"{stats['compacted_events']} events summarised, "
+            f"{stats['segments']} segments kept"
+        )
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*args)
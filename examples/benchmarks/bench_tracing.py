@@ -0,0 +1,195 @@
+# bench_tracing.py
+# ======================================================================
+# What agency_kit.tracing costs, and what a trace shows
+#  • stand-in tree: Executive-Director → {Sales-Manager → Lead-Gen Team →
+#    Searcher / Scorer / Emailer, Content-Manager → Writer}; every run makes
+#    one model call, Searcher calls a search tool through agno-style tool
+#    hooks, the director fans its managers out on threads (stub runs)
+#  • per request: untraced vs traced (JSONL on) vs sampled 10 %, with a
+#    no-I/O model (pure overhead per span) and with the local stub server
+#  • prints one trace as a tree, writes it as speedscope JSON + folded
+#    stacks and checks every speedscope lane is well nested
+#
+#   python examples/benchmarks/bench_tracing.py [requests]
+# ======================================================================
+
+import contextvars, json, statistics, sys, tempfile, time, pathlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from agency_kit.model_pool import ModelPool
+from agency_kit.stub_openai import StubOpenAI, completion
+from agency_kit.tracing import Tracer, instrument_tree
+
+BODY = json.dumps({"model": "gpt-4o", "messages": [{"role": "user", "content": "hi"}]})
+
+
+def google_search(query: str, api_key: str, max_results: int = 5) -> list:
+    return [f"{query} #{i}" for i in range(max_results)]
+
+
+class FakeAgent:
+    """agno Agent / Team stand-in: one model call, tools via tool_hooks."""
+
+    def __init__(self, name, model, members=None, tools=(), parallel=False):
+        self.name, self.model, self.session_id = name, model, None
+        self.tools, self.parallel, self.tool_hooks = list(tools), parallel, None
+        if members is not None:
+            self.members = members
+
+    def _tool(self, fn, **args):
+        # agno: hooks nest outermost-first around the entrypoint
+        chain = reduce(
+            lambda inner, hook: lambda **a: hook(fn.__name__, inner, a),
+            reversed(self.tool_hooks or []),
+            lambda **a: fn(**a),
+        )
+        return chain(**args)
+
+    def run(self, message=None, *, stream=False, **kwargs):
+        self.model()
+        for fn in self.tools:
+            self._tool(fn, query=message, api_key="sk-live-123", max_results=5)
+        members = getattr(self, "members", [])
+        if self.parallel:
+            with ThreadPoolExecutor(len(members)) as ex:
+                futures = [
+                    ex.submit(contextvars.copy_context().run, m.run, message, **kwargs)
+                    for m in members
+                ]
+                [f.result() for f in futures]
+        else:
+            for m in members:
+                m.run(message, **kwargs)
+        return message
+
+    async def arun(self, message=None, *, stream=False, **kwargs):
+        return self.run(message, **kwargs)
+
+
+def org(model, parallel: bool = True):
+    leads = FakeAgent(
+        "Lead-Gen Team",
+        model,
+        [
+            FakeAgent("Searcher", model, tools=[google_search]),
+            FakeAgent("Scorer", model),
+            FakeAgent("Emailer", model),
+        ],
+    )
+    sales = FakeAgent("Sales-Manager", model, [leads])
+    content = FakeAgent("Content-Manager", model, [FakeAgent("Writer", model)])
+    return FakeAgent("Executive-Director", model, [sales, content], parallel=parallel)
+
+
+def per_request(root, n: int) -> float:
+    t0 = time.perf_counter()
+    for i in range(n):
+        root.run("5 CFO leads in Germany", session_id=f"s-{i % 4}")
+    return 1e6 * (time.perf_counter() - t0) / n
+
+
+def compare(model, n: int, tmp: str, parallel: bool, rounds: int = 5) -> dict:
+    """µs per request; modes alternate per round to share machine noise."""
+    modes = {
+        "untraced": None,
+        "traced": Tracer(f"{tmp}/spans.jsonl"),
+        "sampled 10%": Tracer(f"{tmp}/sampled.jsonl", sample=0.1),
+    }
+    roots = {}
+    for mode, tracer in modes.items():
+        roots[mode] = org(model, parallel)
+        if tracer is not None:
+            instrument_tree(roots[mode], tracer)
+    out = {mode: [] for mode in modes}
+    for _ in range(rounds):
+        for mode in modes:
+            out[mode].append(per_request(roots[mode], n // rounds))
+    return {mode: statistics.median(v) for mode, v in out.items()}, modes["traced"]
+
+
+def print_tree(tracer: Tracer, trace_id: str) -> None:
+    spans = tracer.trace(trace_id)
+    t0 = spans[0].start
+    children = {}
+    for s in spans:
+        children.setdefault(s.parent_id, []).append(s)
+
+    def show(s, depth):
+        tokens = s.attrs.get("prompt_tokens", 0) + s.attrs.get("completion_tokens", 0)
+        extra = f" args={s.attrs['args']}" if "args" in s.attrs else ""
+        print(
+            f"  {'  ' * depth}{s.kind}:{s.name:<22} +{1000 * (s.start - t0):6.1f}ms "
+            f"{s.ms:7.1f}ms {tokens:>6} tok{extra}"
+        )
+        for c in children.get(s.span_id, []):
+            show(c, depth + 1)
+
+    for root in children.get(None, []):
+        show(root, 0)
+
+
+def well_nested(profile: dict) -> bool:
+    stack, last = [], 0.0
+    for e in profile["events"]:
+        if e["at"] < last:
+            return False
+        last = e["at"]
+        if e["type"] == "O":
+            stack.append(e["frame"])
+        elif not stack or stack.pop() != e["frame"]:
+            return False
+    return not stack
+
+
+def main(requests: int = 500):
+    with tempfile.TemporaryDirectory() as tmp:
+        spans = 9 + 1  # runs + one tool call per request
+        print(f"{spans} spans per request (+ model spans when using the pool)")
+        # sequential: the thread fan-out would dominate a no-I/O run
+        local, _ = compare(lambda: None, requests * 10, tmp, parallel=False)
+        base = local["untraced"]
+        for mode, us in local.items():
+            print(
+                f"no-I/O model  {mode:<12} {us:8.1f} µs/request  "
+                f"(+{(us - base) / spans:5.1f} µs/span)"
+            )
+
+        reply = lambda b: completion(b["model"], "ok " * 30, prompt_tokens=700)
+        with StubOpenAI(latency_s=0.002, reply=reply) as stub:
+            pool = ModelPool()
+            client = pool.client("gpt-4o", "sk-x", stub.base_url)
+            client.base_url = stub.base_url
+            model = lambda: client.post("/chat/completions", content=BODY)
+            stubbed, tracer = compare(model, requests, tmp, parallel=True)
+            tracer.observe(pool)
+            base = stubbed["untraced"]
+            for mode, us in stubbed.items():
+                print(
+                    f"stub model    {mode:<12} {us / 1000:8.2f} ms/request  "
+                    f"({100 * (us - base) / base:+.1f} %)"
+                )
+            root = org(model)
+            instrument_tree(root, tracer)
+            root.run("5 CFO leads in Germany", session_id="demo")
+            trace_id = tracer.recent(1)[0]["trace_id"]
+
+        print(f"\ntrace {trace_id}:")
+        print_tree(tracer, trace_id)
+        tracer.flush()
+        speedscope = tracer.export_speedscope(trace_id, f"{tmp}/trace.speedscope.json")
+        profile = json.load(open(speedscope))
+        folded = tracer.to_folded([trace_id])
+        lines = sum(1 for _ in open(f"{tmp}/spans.jsonl"))
+        print(
+            f"\nspeedscope: {len(profile['profiles'])} lanes, "
+            f"well nested: {all(well_nested(p) for p in profile['profiles'])}; "
+            f"folded: {len(folded.splitlines())} stacks; JSONL: {lines} spans"
+        )
+        print(f"stats: {tracer.stats()}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*args)
@@ -0,0 +1,133 @@
+# bench_vector_memory.py
+# ======================================================================
+# Vector memory at scale: IVF (agency_kit.ivf) vs flat brute-force store
+#  • synthetic clustered unit vectors (dim 128), inserted in batches into
+#    one growing IVFIndex – the build never retrains
+#  • each backend is queried in a fresh process (spawn) so RSS is its own:
+#      flat = load the whole matrix, scan it per query (what a flat file
+#             store does); ann = open the memmaps, probe nprobe lists
+#  • reports p50 / p95 query latency, peak RSS, recall@10 vs exact
+#
+#   python examples/benchmarks/bench_vector_memory.py [n ...] [--nprobe 8]
+# ======================================================================
+
+import argparse, multiprocessing, resource, sys, tempfile, time, pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+import numpy as np
+
+from agency_kit.ivf import IVFIndex
+
+DIM = 128
+QUERIES = 200
+RECALL_QUERIES = 50
+BATCH = 10_000
+
+
+def unit(x: np.ndarray) -> np.ndarray:
+    return (x / np.linalg.norm(x, axis=1, keepdims=True)).astype(np.float32)
+
+
+def batches(n: int, seed: int = 1):
+    # topics → sub-topics → items, roughly how text embeddings cluster
+    rng = np.random.default_rng(seed)
+    topics = unit(rng.standard_normal((max(8, n // 10_000), DIM)))
+    subs = unit(
+        topics[rng.integers(len(topics), size=max(64, n // 200))]
+        + 0.08 * rng.standard_normal((max(64, n // 200), DIM))
+    )
+    for i in range(0, n, BATCH):
+        m = min(BATCH, n - i)
+        pick = subs[rng.integers(len(subs), size=m)]
+        yield unit(pick + 0.05 * rng.standard_normal((m, DIM)))
+
+
+def queries(n: int, seed: int = 2) -> np.ndarray:
+    # near-duplicates of stored items, like a recall lookup for a known topic
+    return next(batches(n))[:QUERIES] * 0.9 + 0.1 * unit(
+        np.random.default_rng(seed).standard_normal((QUERIES, DIM))
+    )
+
+
+def rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def timed(fn, qs):
+    lat = []
+    for q in qs:
+        t0 = time.perf_counter()
+        fn(q)
+        lat.append(time.perf_counter() - t0)
+    return np.percentile(lat, 50) * 1000, np.percentile(lat, 95) * 1000
+
+
+def child(backend: str, path: str, nprobe: int, conn) -> None:
+    t0 = time.perf_counter()
+    if backend == "flat":
+        index = IVFIndex(path, DIM)
+        data = np.array(index.vectors)  # the flat store keeps everything in RAM
+        open_s = time.perf_counter() - t0
+        del index
+        qs = unit(queries(len(data)))
+
+        def search(q):
+            s = data @ q
+            return np.argsort(-s[np.argpartition(-s, 10)[:10]])
+
+        p50, p95 = timed(search, qs)
+        conn.send((open_s, p50, p95, rss_mb(), 1.0))
+        return
+    index = IVFIndex(path, DIM, nprobe=nprobe)
+    open_s = time.perf_counter() - t0
+    qs = unit(queries(index.count))
+    p50, p95 = timed(lambda q: index.search(q, 10), qs)
+    rss = rss_mb()  # before the exact scans below page the whole file in
+    recall = index.recall_at_k(qs[:RECALL_QUERIES], 10)
+    conn.send((open_s, p50, p95, rss, recall))
+
+
+def measure(backend: str, path: str, nprobe: int):
+    ctx = multiprocessing.get_context("spawn")
+    parent, conn = ctx.Pipe()
+    p = ctx.Process(target=child, args=(backend, path, nprobe, conn))
+    p.start()
+    out = parent.recv()
+    p.join()
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("sizes", nargs="*", type=int, default=[10_000, 100_000])
+    ap.add_argument("--nprobe", type=int, default=8)
+    args = ap.parse_args()
+    print(f"dim={DIM}, {QUERIES} queries, recall@10 over {RECALL_QUERIES}")
+    print(
+        f"{'n':>9} {'backend':<6} {'build s':>8} {'open s':>7} "
+        f"{'p50 ms':>7} {'p95 ms':>7} {'RSS MB':>7} {'recall':>7}"
+    )
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            index = IVFIndex(tmp, DIM, nprobe=args.nprobe)
+            t0 = time.perf_counter()
+            for b in batches(n):
+                index.add(b)
+            index.flush()
+            build = time.perf_counter() - t0
+            stats = index.stats()
+            del index
+            for backend in ("flat", "ann"):
+                open_s, p50, p95, rss, recall = measure(backend, tmp, args.nprobe)
+                print(
+                    f"{n:>9} {backend:<6} {build if backend == 'ann' else 0:>8.1f} "
+                    f"{open_s:>7.2f} {p50:>7.2f} {p95:>7.2f} {rss:>7.0f} {recall:>7.3f}"
+                )
+            print(
+                f"{'':>9} lists={stats['lists']} avg={stats['avg_list']:.0f} "
+                f"max={stats['max_list']} disk={stats['disk_mb']}MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,50 +4,223 @@
 #  • Developer PoC team, Lead-Gen pipeline, QA, SecOps, Experiments, Onboarding
 #  • NEW: Documentation squad inside Project-Management
 #  • Vector + File memory
-#  • FastAPI endpoint /api/generate-leads
+#  • FastAPI endpoint /api/generate-leads (per-lead DAG pipeline by default,
+#    native arun() path, GENERATE_LEADS_CONCURRENCY caps in-flight requests)
+#    and /api/generate-leads/stream (SSE: member start/finish, tools, text)
+#  • LEADGEN_BATCH=n: Enricher/Scorer/Emailer/FollowUp take n leads per
+#    call, only leads with missing fields are retried (/api/batching)
+#  • Leads are scored by a local NumPy model (LEADGEN_SCORER=llm: agent)
+#  • /api/jobs: persistent job queue; identical lead requests share one run
+#  • Pooled model clients (agency_kit.model_pool); route managers try
+#    gpt-4o-mini first and escalate to gpt-4o on failed checks (/api/cascade)
+#  • Token / latency / cost metrics per agent, team, session (/api/metrics)
+#  • Span tracing Team → Team → Agent → tool → model (/api/traces)
+#  • Shared search cache: TTL per source, SQLite, single flight (/api/search-cache)
+#  • Independent tool calls of one model turn run concurrently (/api/tool-pool)
+#  • print_stream(): nested teams' text streams live, tagged with the member
+#    path (Executive-Director › Sales-Manager › Lead-Gen Team › Parser)
+#  • Cost-Sentinel's 23:00 UTC digest is a real schedule in the API process
+#    (agency_kit.scheduler, /api/schedules)
+#  • Record / replay cassettes of model + tool calls (CASSETTE=path)
+#  • Lazy registry: agents/toolkits are built on first use (AGENCY_LAZY=0
+#    restores eager construction)
 # ======================================================================
 
-import os, json, logging, asyncio, pathlib
+import os, sys, json, itertools, logging, pathlib
+from contextlib import asynccontextmanager
 from typing import List, Optional
 
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from agno.agent import Agent, RunResponse
+from agno.agent import Agent
 from agno.team import Team
 from agno.memory import FileMemory, VectorFileMemory
-from agno.models.openai import OpenAIChat
-from agno.tools.reasoning import ReasoningTools as RT
-
-# toolkits --------------------------------------------------------------
-from agno.tools.slack import SlackTools
-from agno.tools.twilio import TwilioTools
-from agno.tools.gmail import GmailTools
-from agno.tools.googlecalendar import GoogleCalendarTools
-from agno.tools.googlesearch import GoogleSearchTools
-from agno.tools.google_maps import GoogleMapsTools
-from agno.tools.duckduckgo import DuckDuckGoTools
-from agno.tools.wikipedia import WikipediaTools
-from agno.tools.yfinance import YFinanceTools
-from agno.tools.pandas import PandasTools
-from agno.tools.csv import CsvTools
-from agno.tools.email import EmailTools
-from agno.tools.replicate import ReplicateTools
-from agno.tools.notion import NotionTools
-from agno.tools.googledrive import GoogleDriveTools
-from agno.tools.file import FileTools
-from agno.tools.python import PythonTools
-from agno.tools.shell import ShellTools
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from agency_kit.registry import LazyRegistry, importable
+from agency_kit.model_pool import POOL
+from agency_kit.response_cache import ResponseCache, cached
+from agency_kit.delegation import PARALLEL_HINT, ParallelDelegation
+from agency_kit.pipeline import DagPipeline, ItemDag, agent_stage, run_json, arun_json
+from agency_kit.batching import batch_stage, batch_stats
+from agency_kit.lead_scoring import score_leads, scoring_stage, scoring_stats
+from agency_kit.limits import endpoint_limit, limiter_stats
+from agency_kit.sse import sse_stream, team_events
+from agency_kit.jobs import JobQueue
+from agency_kit.router import routed, router_stats
+from agency_kit.vector_memory import vector_memory
+from agency_kit.event_log import event_memory
+from agency_kit.context import budgeted, context_stats
+from agency_kit.tiered_memory import TierPolicy, TieredMemory, event_text, tiered
+from agency_kit.metrics import METRICS, metered, metrics_stats, spend_report
+from agency_kit.tracing import TRACER, trace_stats, traced
+from agency_kit.cassette import cassette_stats, recorded, use as use_cassette
+from agency_kit.cascade import cascade_chat, cascade_stats
+from agency_kit.search_cache import SearchCache, searched
+from agency_kit.parallel_tools import parallel_tools, tool_pool_stats
+from agency_kit.rate_limit import SCHEDULER, prioritised, rate_limit_stats, scoped
+from agency_kit.stream_bus import print_stream, stream_stats, streamed
+from agency_kit.scheduler import Scheduler, schedule_stats
+
+# toolkits: imported the first time an agent builds one -------------------
+RT = importable("agno.tools.reasoning:ReasoningTools")
+SlackTools = importable("agno.tools.slack:SlackTools")
+TwilioTools = importable("agno.tools.twilio:TwilioTools")
+GmailTools = importable("agno.tools.gmail:GmailTools")
+GoogleCalendarTools = importable("agno.tools.googlecalendar:GoogleCalendarTools")
+GoogleSearchTools = importable("agno.tools.googlesearch:GoogleSearchTools")
+GoogleMapsTools = importable("agno.tools.google_maps:GoogleMapsTools")
+DuckDuckGoTools = importable("agno.tools.duckduckgo:DuckDuckGoTools")
+WikipediaTools = importable("agno.tools.wikipedia:WikipediaTools")
+YFinanceTools = importable("agno.tools.yfinance:YFinanceTools")
+PandasTools = importable("agno.tools.pandas:PandasTools")
+CsvTools = importable("agno.tools.csv:CsvTools")
+EmailTools = importable("agno.tools.email:EmailTools")
+ReplicateTools = importable("agno.tools.replicate:ReplicateTools")
+NotionTools = importable("agno.tools.notion:NotionTools")
+GoogleDriveTools = importable("agno.tools.googledrive:GoogleDriveTools")
+FileTools = importable("agno.tools.file:FileTools")
+PythonTools = importable("agno.tools.python:PythonTools")
+ShellTools = importable("agno.tools.shell:ShellTools")
 
 OPENAI = os.getenv("OPENAI_API_KEY", "sk-replace-me")
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger("agency")
 
+# ========== LAZY REGISTRY ==============================================
+LAZY = os.getenv("AGENCY_LAZY", "1") != "0"
+reg = LazyRegistry(enabled=LAZY)
+# coordinate teams fan independent member tasks out this wide (1 = sequential)
+DELEGATION_CONCURRENCY = int(os.getenv("DELEGATION_CONCURRENCY", "4"))
+# route-mode managers try keyword/embedding routing before their LLM call
+LOCAL_ROUTER = os.getenv("LOCAL_ROUTER", "1") != "0"
+lazy = reg.defer  # toolkits / models: lazy(SlackTools), llm("gpt-4o")
+
+
+# route-mode managers answer through a gpt-4o-mini → gpt-4o cascade
+# (CASCADE=0: plain gpt-4o; CASCADE_POLICIES tunes it per manager)
+CASCADE = os.getenv("CASCADE", "1") != "0"
+
+
+def llm(model_id: str, cascade: Optional[str] = None):
+    """Model bound to the process-wide client pool (shared keep-alive conns);
+    cascade=<agent name> tries the cheap model first."""
+    if cascade and CASCADE:
+        return lazy(cascade_chat, cascade, api_key=OPENAI)
+    return lazy(POOL.chat, model_id, api_key=OPENAI)
+
+
 # ========== MEMORY =====================================================
 MEM_DIR = pathlib.Path("./memory")
 MEM_DIR.mkdir(parents=True, exist_ok=True)
-brain_mem = VectorFileMemory(path=str(MEM_DIR / "vector"))
-history_mem = FileMemory(path=str(MEM_DIR / "events"))
+# VECTOR_BACKEND=ann (IVF on memmaps, default) | flat
+brain_mem = vector_memory(str(MEM_DIR / "vector"), VectorFileMemory)
+# EVENT_BACKEND=log (segmented log, group commit, default) | file
+history_mem = event_memory(str(MEM_DIR / "events"), FileMemory)
+# opt-in cache for pure-transform workers (worker(..., cache=True))
+responses = ResponseCache(str(MEM_DIR / "responses"))
+# one search cache for every agent's DuckDuckGo / Google / Wikipedia calls
+SEARCH_CACHE = os.getenv("SEARCH_CACHE", "1") != "0"
+# a turn's read-only tool calls (search, finance, maps) run concurrently
+PARALLEL_TOOLS = os.getenv("PARALLEL_TOOLS", "1") != "0"
+searches = SearchCache(str(MEM_DIR / "search_cache.sqlite"))
+
+# every model + tool call: tokens, latency, cost per agent / team / session,
+# rolled up to ./memory/metrics/*.csv (METRICS=0: off)
+METRICS_ON = os.getenv("METRICS", "1") != "0"
+if METRICS_ON:
+    METRICS.observe(POOL).rollup_to(os.getenv("METRICS_DIR", str(MEM_DIR / "metrics")))
+
+# a span per team / agent run, tool and model call → ./memory/traces.jsonl;
+# TRACE_SAMPLE=0.1 keeps one request in ten, 0 turns tracing off
+TRACING = TRACER.sample > 0
+if TRACING:
+    TRACER.observe(POOL).write_to(
+        os.getenv("TRACE_FILE", str(MEM_DIR / "traces.jsonl"))
+    )
+
+
+# CASSETTE=path records every model + tool call, or replays them when the
+# file exists (CASSETTE_MODE=record|replay forces one); model clients reach
+# the cassette through OPENAI_BASE_URL. CASSETTE_TIME_SCALE=0: no waits
+CASSETTE = use_cassette(
+    os.getenv("CASSETTE"),
+    os.getenv("CASSETTE_MODE") or None,
+    float(os.getenv("CASSETTE_TIME_SCALE", "1")),
+)
+
+# model calls wait for per-model rpm / tpm budget instead of hitting 429s:
+# interactive API > executive > background sentinels, sessions take turns
+# (RATE_LIMITS=0: off; MODEL_RATE_LIMITS='{"gpt-4o": [rpm, tpm]}' sets them;
+# cassette replays never reach the provider and run unthrottled)
+RATE_LIMITS = os.getenv("RATE_LIMITS", "1") != "0"
+if RATE_LIMITS and not (CASSETTE and CASSETTE.mode == "replay"):
+    SCHEDULER.govern(POOL)
+
+
+# under print_stream() / stream_bus.stream() every agent and team publishes
+# its text as it is produced, not when its parent is done (STREAM_BUS=0: off)
+STREAM_BUS = os.getenv("STREAM_BUS", "1") != "0"
+
+
+def live(factory):
+    """Innermost, so forced leaf streams stay below the cache and budgets."""
+    return streamed(factory) if STREAM_BUS else factory
+
+
+def observed(factory):
+    """Metrics + tracing (+ cassette) + search cache wrappers, as enabled."""
+    if PARALLEL_TOOLS:
+        factory = parallel_tools(factory)
+    if METRICS_ON:
+        factory = metered(factory)
+    if TRACING:
+        factory = traced(factory)
+    if CASSETTE:
+        factory = recorded(factory, CASSETTE)
+    # innermost: metrics, spans and cassettes still see every search
+    return searched(factory, searches) if SEARCH_CACHE else factory
+
+
+# teams see recent turns verbatim + a rolling summary (TIERED_MEMORY=0: off)
+TIERED_MEMORY = os.getenv("TIERED_MEMORY", "1") != "0"
+MEMORY_DEFAULT = TierPolicy(
+    retention_days=float(os.getenv("MEMORY_RETENTION_DAYS", "90")),
+    max_bytes=int(os.getenv("MEMORY_MAX_MB", "32")) * 2**20,
+)
+
+
+def summarise_history(previous: str, events: list) -> str:
+    transcript = "\n".join(event_text(e) for e in events)
+    return memory_summariser.run(
+        f"Current summary:\n{previous or '(none)'}\n\nNew turns:\n{transcript}"
+    ).content
+
+
+tiers = TieredMemory(
+    str(MEM_DIR / "tiers"),
+    policies={
+        "Executive-Director": TierPolicy(
+            recent_events=16, summary_tokens=800, max_bytes=MEMORY_DEFAULT.max_bytes
+        ),
+        "Lead-Gen Team": TierPolicy(recent_events=4, retention_days=14),
+    },
+    default=MEMORY_DEFAULT,
+    summarise=summarise_history,
+    archive=brain_mem if hasattr(brain_mem, "add") else None,
+)
+
+
+# every prompt is assembled within a token budget (CONTEXT_BUDGET=0: off);
+# brain_mem hits compete for the same budget as history and tool notes
+CONTEXT_BUDGET = int(os.getenv("CONTEXT_BUDGET", "6000"))
+recall = (lambda q: brain_mem.search(q, 5)) if hasattr(brain_mem, "search") else None
+
+
+def with_budget(factory):
+    return budgeted(factory, CONTEXT_BUDGET, recall) if CONTEXT_BUDGET else factory
 
 
 # ========== WORKER FACTORY =============================================
@@ -56,12 +229,18 @@ def worker(
     role: str,
     tools: Optional[List] = None,
     instr: Optional[List[str]] = None,
+    cache: bool = False,
+    rate_class: Optional[str] = None,
 ):
-    return Agent(
+    base = live(Agent)
+    factory = observed(with_budget(cached(base, responses) if cache else base))
+    return reg.add(
+        name,
+        prioritised(factory, rate_class) if rate_class else factory,
         name=name,
         role=role,
-        model=OpenAIChat("gpt-4o-mini", api_key=OPENAI),
-        tools=(tools or []) + [RT()],
+        model=llm("gpt-4o-mini"),
+        tools=(tools or []) + [lazy(RT)],
         instructions=instr or [],
         markdown=True,
         memory=brain_mem,
@@ -70,73 +249,105 @@ def worker(
     )
 
 
+memory_summariser = reg.add(
+    "Memory-Summariser",
+    prioritised(observed(Agent), "background"),
+    name="Memory-Summariser",
+    model=llm("gpt-4o-mini"),
+    instructions=[
+        "Merge the new turns into the current summary.",
+        "Keep decisions, open tasks, names and numbers; drop chit-chat.",
+        "Return at most 12 short bullet lines.",
+    ],
+)
+
+
+def team(name: str, mode: str, *args, local_router: bool = True, **kwargs):
+    if mode == "route" and LOCAL_ROUTER:
+        factory = routed(live(Team), bypass=local_router)
+    else:
+        factory = live(Team)
+    if TIERED_MEMORY:
+        factory = tiered(factory, tiers)
+    return reg.add(name, observed(with_budget(factory)), name, mode, *args, **kwargs)
+
+
 # ========== FUNCTIONAL WORKERS =========================================
 content_workers = [
     worker(
         "Content-Ideator",
         "Generate hooks",
-        [DuckDuckGoTools(), WikipediaTools()],
+        [lazy(DuckDuckGoTools), lazy(WikipediaTools)],
         ["Return 5 angles & hooks JSON"],
     ),
     worker("LinkedIn-Post-Writer", "Write LinkedIn post"),
     worker("YouTube→Blog", "YT → blog"),
     worker("LinkedIn→Newsletter", "Post → newsletter"),
-    worker("YouTube→LinkedIn", "YT highlights → LinkedIn"),
-    worker("LinkedIn→X", "Shorten LinkedIn to X"),
+    worker("YouTube→LinkedIn", "YT highlights → LinkedIn", cache=True),
+    worker("LinkedIn→X", "Shorten LinkedIn to X", cache=True),
 ]
 
 comms_workers = [
-    worker("Slack-Assistant", "Slack replies", [SlackTools()]),
+    worker("Slack-Assistant", "Slack replies", [lazy(SlackTools)]),
     worker("LinkedIn-DM-Assistant", "LinkedIn DM"),
-    worker("WhatsApp-Assistant", "WhatsApp", [TwilioTools()]),
-    worker("Calendar-Assistant", "Calendar", [GoogleCalendarTools()]),
-    worker("Gmail-Assistant", "Gmail drafts", [GmailTools()]),
+    worker("WhatsApp-Assistant", "WhatsApp", [lazy(TwilioTools)]),
+    worker("Calendar-Assistant", "Calendar", [lazy(GoogleCalendarTools)]),
+    worker("Gmail-Assistant", "Gmail drafts", [lazy(GmailTools)]),
 ]
 
 marketing_workers = [
-    worker("Ad-Designer", "Ad creative", [ReplicateTools()]),
+    worker("Ad-Designer", "Ad creative", [lazy(ReplicateTools)]),
+    worker(
+        "Social-Performance-Analyst",
+        "Social KPIs",
+        [lazy(GoogleDriveTools), lazy(PandasTools)],
+    ),
     worker(
-        "Social-Performance-Analyst", "Social KPIs", [GoogleDriveTools(), PandasTools()]
+        "Ad-Performance-Analyst", "ROAS", [lazy(GoogleDriveTools), lazy(PandasTools)]
     ),
-    worker("Ad-Performance-Analyst", "ROAS", [GoogleDriveTools(), PandasTools()]),
 ]
 
 research_workers = [
-    worker("General-Researcher", "Web research", [DuckDuckGoTools()]),
-    worker("GTM-Strategist", "GTM brief", [PandasTools()]),
+    worker("General-Researcher", "Web research", [lazy(DuckDuckGoTools)]),
+    worker("GTM-Strategist", "GTM brief", [lazy(PandasTools)]),
 ]
 
 outbound_workers = [
-    worker("Intent-Signal-Analyst", "Score intent", [DuckDuckGoTools(), PandasTools()]),
-    worker("Outbound-Copywriter", "Cold email", [GmailTools()]),
+    worker(
+        "Intent-Signal-Analyst",
+        "Score intent",
+        [score_leads, lazy(DuckDuckGoTools), lazy(PandasTools)],
+        ["Scores come from score_leads; research signals and explain its factors"],
+    ),
+    worker("Outbound-Copywriter", "Cold email", [lazy(GmailTools)]),
 ]
 
 # ========== DEVELOPER TEAM =============================================
 frontend_dev = worker(
     "Frontend-Dev",
     "React/TS PoC",
-    [FileTools(), ShellTools()],
+    [lazy(FileTools), lazy(ShellTools)],
     ["Scaffold Vite+TS; return file list"],
 )
 backend_dev = worker(
     "Backend-Dev",
     "FastAPI PoC",
-    [PythonTools(), FileTools(), ShellTools()],
+    [lazy(PythonTools), lazy(FileTools), lazy(ShellTools)],
     ["Scaffold FastAPI; return file list"],
 )
 integrator = worker(
     "Fullstack-Integrator",
     "Wire stack",
-    [FileTools(), ShellTools()],
+    [lazy(FileTools), lazy(ShellTools)],
     ["Add CORS/env; return deploy cmd"],
 )
 
-developer_manager = Team(
+developer_manager = team(
     "Developer-Manager",
     "route",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
+    llm("gpt-4o", cascade="Developer-Manager"),
     members=[frontend_dev, backend_dev, integrator],
-    tools=[SlackTools()],
+    tools=[lazy(SlackTools)],
     memory=history_mem,
     instructions=[
         "Keywords React/UI → Frontend-Dev; FastAPI/backend → Backend-Dev; "
@@ -148,11 +359,13 @@ developer_manager = Team(
 
 # ========== LEAD-GEN PIPELINE ===========================================
 def la(name, role, instr, tools=None):
-    return Agent(
+    return reg.add(
+        name,
+        observed(live(Agent)),
         name=name,
         role=role,
-        model=OpenAIChat("gpt-4o-mini", api_key=OPENAI),
-        tools=(tools or []) + [RT()],
+        model=llm("gpt-4o-mini"),
+        tools=(tools or []) + [lazy(RT)],
         instructions=instr,
         markdown=False,
         session_memory=history_mem,
@@ -161,34 +374,47 @@ def la(name, role, instr, tools=None):
 
 parser = la("Parser", "Extract params", ["Return JSON {role,location,count}"])
 searcher = la(
-    "Searcher", "Google LinkedIn", ["Build query & return list"], [GoogleSearchTools()]
+    "Searcher",
+    "Google LinkedIn",
+    ["Build query & return list"],
+    [lazy(GoogleSearchTools)],
 )
 extract = la("Extractor", "Result → lead", ["Return lead JSON first_name…"])
 enrich = la("Enricher", "Firmographic", ["Add company_size,website,email"])
-score = la("Scorer", "Score 0-100", ["Add score"])
+score = la(
+    "Scorer",
+    "Score 0-100",
+    ["Call score_leads with the leads & role; add score & a one-line reason"],
+    [score_leads],
+)
 emailer = la("Emailer", "Outreach email", ["Add outreach_email"])
 sent = la(
     "Sentiment",
     "Company sentiment",
-    ["Add sentiment_summary & sentiment_score"],
-    [GoogleSearchTools(fixed_max_results=5), YFinanceTools(company_news=True)],
+    ["Add sentiment_summary & sentiment_score (-1 negative … 1 positive)"],
+    [
+        lazy(GoogleSearchTools, fixed_max_results=5),
+        lazy(YFinanceTools, company_news=True),
+    ],
 )
 follow = la("FollowUp", "Follow-ups", ["Add followup_d3 & followup_d8"])
-bounce = la("Bounce", "MX check", ["Add deliverable"], [EmailTools()])
-geo = la("Geo", "Lat/Lng", ["Add latitude,longitude,map_url"], [GoogleMapsTools()])
-summar = Agent(
+bounce = la("Bounce", "MX check", ["Add deliverable"], [lazy(EmailTools)])
+geo = la("Geo", "Lat/Lng", ["Add latitude,longitude,map_url"], [lazy(GoogleMapsTools)])
+summar = reg.add(
+    "Summariser",
+    observed(live(Agent)),
     "Summariser",
     "Markdown table",
-    OpenAIChat("gpt-4o-mini", api_key=OPENAI),
-    tools=[PandasTools(), RT()],
+    llm("gpt-4o-mini"),
+    tools=[lazy(PandasTools), lazy(RT)],
     instructions=["Return markdown table sorted by score"],
     markdown=True,
 )
 
-leadgen_team = Team(
+leadgen_team = team(
     "Lead-Gen Team",
     "coordinate",
-    OpenAIChat("gpt-4o-mini", api_key=OPENAI),
+    llm("gpt-4o-mini"),
     members=[
         parser,
         searcher,
@@ -207,25 +433,124 @@ leadgen_team = Team(
     markdown=True,
 )
 
+# ---------- DAG mode: each lead flows on as soon as it is extracted ------
+# Parser → Searcher yield search hits; per lead: Extractor → Enricher →
+# {Scorer, Sentiment, Bounce, Geo} → Emailer → FollowUp; Summariser reduces.
+LEADGEN_MODE = os.getenv("LEADGEN_MODE", "dag")  # "team" = coordinator LLM
+STAGE_CONCURRENCY = int(os.getenv("LEADGEN_STAGE_CONCURRENCY", "4"))
+# LEADGEN_BATCH=10: per-lead agents get up to 10 leads per call (0/1 = off)
+LEADGEN_BATCH = int(os.getenv("LEADGEN_BATCH", "0"))
+LEADGEN_BATCH_TOKENS = int(os.getenv("LEADGEN_BATCH_TOKENS", "6000"))
+# "local": Scorer stage = NumPy model (agency_kit.lead_scoring); "llm" = agent
+LEADGEN_SCORER = os.getenv("LEADGEN_SCORER", "local")
+BATCH_KEYS = {
+    "Enricher": ("company_size", "website", "email"),
+    "Scorer": ("score",),
+    "Emailer": ("outreach_email",),
+    "FollowUp": ("followup_d3", "followup_d8"),
+}
+OUTPUTS = pathlib.Path("./outputs")
+
+
+def search_items(params, hits):
+    if isinstance(hits, dict):
+        hits = hits.get("results") or hits.get("leads") or [hits]
+    for hit in hits:
+        yield {"query": params, "search_result": hit}
+
+
+def write_leads(leads: List[dict]) -> str:
+    """outputs/leads.json; returns the compact JSON the summariser reads."""
+    OUTPUTS.mkdir(exist_ok=True)
+    (OUTPUTS / "leads.json").write_text(json.dumps(leads, indent=2, default=str))
+    return json.dumps(leads, default=str)
+
+
+def write_table(table: str) -> str:
+    (OUTPUTS / "leads.md").write_text(table)
+    return table
+
+
+# sync / async pairs: only run vs arun differs
+def leadgen_source(message: str):
+    params = run_json(parser, message)
+    yield from search_items(params, run_json(searcher, params))
+
+
+async def aleadgen_source(message: str):
+    params = await arun_json(parser, message)
+    for item in search_items(params, await arun_json(searcher, params)):
+        yield item
+
+
+def leadgen_reduce(leads: List[dict]) -> str:
+    return write_table(summar.run(write_leads(leads), stream=False).content)
+
+
+async def aleadgen_reduce(leads: List[dict]) -> str:
+    return write_table((await summar.arun(write_leads(leads), stream=False)).content)
+
+
+def lead_stage(name, agent, *after):
+    if name == "Scorer" and LEADGEN_SCORER == "local":
+        return scoring_stage(name, after)
+    if LEADGEN_BATCH > 1 and name in BATCH_KEYS:
+        return batch_stage(
+            name,
+            agent,
+            BATCH_KEYS[name],
+            after,
+            STAGE_CONCURRENCY,
+            max_items=LEADGEN_BATCH,
+            token_budget=LEADGEN_BATCH_TOKENS,
+        )
+    return agent_stage(name, agent, after, STAGE_CONCURRENCY)
+
+
+leadgen_pipeline = reg.add(
+    "Lead-Gen Pipeline",
+    DagPipeline,
+    leadgen_source,
+    lazy(
+        ItemDag,
+        [
+            lead_stage("Extractor", extract),
+            lead_stage("Enricher", enrich, "Extractor"),
+            lead_stage("Sentiment", sent, "Enricher"),
+            lead_stage("Bounce", bounce, "Enricher"),
+            lead_stage("Geo", geo, "Enricher"),
+            # scores from sentiment_score + deliverable, so after both
+            lead_stage("Scorer", score, "Enricher", "Sentiment", "Bounce"),
+            lead_stage("Emailer", emailer, "Scorer"),
+            lead_stage("FollowUp", follow, "Emailer"),
+        ],
+    ),
+    leadgen_reduce,
+    aleadgen_source,
+    aleadgen_reduce,
+)
+
 # ========== SALES SPECIALISTS ==========================================
 competitive = worker(
-    "Competitive-Intel", "Battle card", [DuckDuckGoTools(), WikipediaTools()]
+    "Competitive-Intel", "Battle card", [lazy(DuckDuckGoTools), lazy(WikipediaTools)]
 )
-pricing = worker("Pricing-Strategist", "Price table", [PandasTools()])
+pricing = worker("Pricing-Strategist", "Price table", [lazy(PandasTools)])
 packager = worker("Offer-Packager", "Good/Better/Best")
-enablement = worker("Sales-Enablement", "Deck", [GoogleDriveTools(), FileTools()])
+enablement = worker(
+    "Sales-Enablement", "Deck", [lazy(GoogleDriveTools), lazy(FileTools)]
+)
 forecast = worker(
-    "Pipeline-Forecaster", "Bookings forecast", [CsvTools(), PandasTools()]
+    "Pipeline-Forecaster", "Bookings forecast", [lazy(CsvTools), lazy(PandasTools)]
 )
 pre_call = worker("Pre-Call-Assistant", "Discovery brief")
 post_call = worker("Post-Call-Assistant", "Recap email")
 lead_lookup = worker("Lead-Researcher", "Manual lookup")
-crm_update = worker("CRM-Assistant", "Update CRM", [CsvTools()])
+crm_update = worker("CRM-Assistant", "Update CRM", [lazy(CsvTools)])
 
-sales_manager = Team(
+sales_manager = team(
     "Sales-Manager",
     "route",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
+    llm("gpt-4o", cascade="Sales-Manager"),
     members=[
         leadgen_team,
         pre_call,
@@ -238,7 +563,7 @@ sales_manager = Team(
         enablement,
         forecast,
     ],
-    tools=[SlackTools()],
+    tools=[lazy(SlackTools)],
     memory=history_mem,
     instructions=[
         "lead/prospect → Lead-Gen; competitor → Competitive-Intel; "
@@ -255,42 +580,42 @@ critique = worker(
     "Brand/style QA",
     instr=["Rewrite if off-brand; return final version"],
 )
-review_manager = Team(
+review_manager = team(
     "Review-Manager",
     "route",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
+    llm("gpt-4o", cascade="Review-Manager"),
     members=[critique],
-    tools=[SlackTools()],
+    tools=[lazy(SlackTools)],
     memory=history_mem,
     instructions=["Run QA on assets; post #qa"],
     markdown=True,
 )
 
-exp_plan = worker("Experiment-Planner", "Define A/B", [PandasTools()])
-exp_run = worker("Experiment-Runner", "Launch & monitor", [ShellTools()])
-exp_rep = worker("Experiment-Reporter", "Summarise", [PandasTools()])
+exp_plan = worker("Experiment-Planner", "Define A/B", [lazy(PandasTools)])
+exp_run = worker("Experiment-Runner", "Launch & monitor", [lazy(ShellTools)])
+exp_rep = worker("Experiment-Reporter", "Summarise", [lazy(PandasTools)])
 
-experiments_team = Team(
+experiments_team = team(
     "Experiments",
     "coordinate",
-    OpenAIChat("gpt-4o-mini", api_key=OPENAI),
+    llm("gpt-4o-mini"),
     members=[exp_plan, exp_run, exp_rep],
-    tools=[SlackTools()],
+    tools=[lazy(SlackTools)],
     memory=history_mem,
     instructions=["Plan→Run→Report. Stop losers. Post #growth"],
     markdown=True,
 )
 
-chan_bot = worker("Slack-Channel-Bot", "Create Slack", [SlackTools()])
-drive_bot = worker("Drive-Space-Bot", "Create Drive", [GoogleDriveTools()])
-crm_bot = worker("CRM-Deal-Bot", "Init CRM", [CsvTools()])
+chan_bot = worker("Slack-Channel-Bot", "Create Slack", [lazy(SlackTools)])
+drive_bot = worker("Drive-Space-Bot", "Create Drive", [lazy(GoogleDriveTools)])
+crm_bot = worker("CRM-Deal-Bot", "Init CRM", [lazy(CsvTools)])
 
-onboarding_team = Team(
+onboarding_team = team(
     "Onboarding-Team",
     "coordinate",
-    OpenAIChat("gpt-4o-mini", api_key=OPENAI),
+    llm("gpt-4o-mini"),
     members=[chan_bot, drive_bot, crm_bot],
-    tools=[SlackTools()],
+    tools=[lazy(SlackTools)],
     memory=history_mem,
     instructions=["Spin Slack+Drive+CRM for new client; post #ops"],
     markdown=True,
@@ -299,25 +624,27 @@ onboarding_team = Team(
 seclint = worker(
     "SecOps-Linter",
     "Scan code",
-    [PythonTools()],
+    [lazy(PythonTools)],
     ["Scan for keys, PII, open CORS; output risk level"],
 )
-sec_manager = Team(
+sec_manager = team(
     "Security-Manager",
     "route",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
+    llm("gpt-4o", cascade="Security-Manager"),
     members=[seclint],
-    tools=[SlackTools()],
+    tools=[lazy(SlackTools)],
     memory=history_mem,
     instructions=["Run on every code artefact; post #security"],
     markdown=True,
 )
 
+# spend is metered in-process; the sentinel only posts the precomputed digest
 cost_agent = worker(
     "Cost-Sentinel",
-    "Aggregate spend",
-    [PandasTools()],
-    ["Collect mcp-tags {cost}, post daily chart #finops"],
+    "Report spend",
+    [spend_report],
+    ["Call spend_report once, post its digest to #finops; don't recompute it"],
+    rate_class="background",
 )
 
 # ========== DOCUMENTATION WORKERS (NEW) ================================
@@ -329,13 +656,14 @@ doc_architect = worker(
 api_doc_writer = worker(
     "API-Doc-Writer",
     "OpenAPI & snippets",
-    tools=[PythonTools()],
+    tools=[lazy(PythonTools)],
     instr=["Generate Markdown API section with curl & Python examples"],
 )
 changelog_agent = worker(
     "Changelog-Agent",
     "Release notes",
     instr=["Format changelog in Markdown ## [x.y.z] – YYYY-MM-DD"],
+    cache=True,
 )
 tutorial_writer = worker(
     "Tutorial-Writer",
@@ -345,20 +673,20 @@ tutorial_writer = worker(
 
 # ========== PROJECT MANAGER (updated) ===================================
 project_workers = [
-    worker("Notion-Assistant", "Update Notion", [NotionTools()]),
-    worker("GDrive-Assistant", "Handle GDrive", [GoogleDriveTools()]),
+    worker("Notion-Assistant", "Update Notion", [lazy(NotionTools)]),
+    worker("GDrive-Assistant", "Handle GDrive", [lazy(GoogleDriveTools)]),
     doc_architect,
     api_doc_writer,
     changelog_agent,
     tutorial_writer,
 ]
 
-project_manager = Team(
+project_manager = team(
     "Project-Manager",
     "route",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
+    llm("gpt-4o", cascade="Project-Manager"),
     members=project_workers,
-    tools=[SlackTools()],
+    tools=[lazy(SlackTools)],
     memory=history_mem,
     instructions=[
         "Route: outline/docs → Doc-Architect; API docs → API-Doc-Writer; "
@@ -371,12 +699,12 @@ project_manager = Team(
 
 # ========== MANAGER FACTORY ============================================
 def mk_mgr(name, crew, chan):
-    return Team(
+    return team(
         name,
         "route",
-        OpenAIChat("gpt-4o", api_key=OPENAI),
+        llm("gpt-4o", cascade=name),
         members=crew,
-        tools=[SlackTools()],
+        tools=[lazy(SlackTools)],
         memory=history_mem,
         instructions=[f"Route tasks, post summary to #{chan}"],
         markdown=True,
@@ -390,60 +718,322 @@ research_manager = mk_mgr("Research-Manager", research_workers, "research")
 outbound_manager = mk_mgr("Outbound-Manager", outbound_workers, "outbound")
 
 # ========== EXECUTIVE DIRECTOR =========================================
-exec_director = Team(
+exec_members = [
+    content_manager,
+    comms_manager,
+    sales_manager,
+    marketing_manager,
+    outbound_manager,
+    research_manager,
+    project_manager,
+    developer_manager,
+    review_manager,
+    experiments_team,
+    onboarding_team,
+    sec_manager,
+    cost_agent,
+]
+exec_fanout = ParallelDelegation(exec_members, DELEGATION_CONCURRENCY)
+
+exec_director = team(
     "Executive-Director",
     "coordinate",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
-    members=[
-        content_manager,
-        comms_manager,
-        sales_manager,
-        marketing_manager,
-        outbound_manager,
-        research_manager,
-        project_manager,
-        developer_manager,
-        review_manager,
-        experiments_team,
-        onboarding_team,
-        sec_manager,
-        cost_agent,
-    ],
-    tools=[SlackTools(), TwilioTools()],
+    llm("gpt-4o"),
+    members=exec_members,
+    tools=[lazy(SlackTools), lazy(TwilioTools), exec_fanout.tool],
     memory=brain_mem,
     instructions=[
         "Delegate to managers, wait for Slack summaries.",
-        "Run Cost-Sentinel daily 23:00 UTC.",
+        PARALLEL_HINT,
         "Compose digest → post #executive_updates and WhatsApp.",
         "Echo digest to requester.",
     ],
     markdown=True,
 )
 
+# ========== SCHEDULES ===================================================
+# recurring runs fire inside the API process (SCHEDULES=0: off); next fire,
+# last run and leases live in SQLite, so a restart after 23:00 still posts
+# the missed digest once
+SCHEDULES = os.getenv("SCHEDULES", "1") != "0"
+schedules = Scheduler(str(MEM_DIR / "schedules.sqlite"))
+schedules.add(
+    "cost-digest",
+    cost_agent,
+    "Post the spend digest for {at:%Y-%m-%d} to #finops.",
+    cron="0 23 * * *",
+    tz="UTC",
+    misfire="catch_up",
+    max_catch_up=1,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if SCHEDULES:
+        schedules.start()
+    yield
+    schedules.stop(wait=False)
+
+
 # ========== FASTAPI LEAD ENDPOINT ======================================
-app = FastAPI(title="Agency AI Service")
+app = FastAPI(title="Agency AI Service", lifespan=lifespan)
 router = APIRouter(prefix="/api")
 
 
+# requests beyond the limit queue on the event loop, not on worker threads
+LEADS_LIMIT = endpoint_limit("generate-leads", "GENERATE_LEADS_CONCURRENCY", 16)
+
+
 class LeadRequest(BaseModel):
     message: str
 
 
+# each API request is its own session in the rate scheduler's round robin
+LEAD_SESSIONS = itertools.count(1)
+
+
+def leadgen_events(message: str):
+    """One lead-gen run as (event, data) pairs; its model calls queue as
+    interactive."""
+    session = f"generate-leads-{next(LEAD_SESSIONS)}"
+    return scoped(leadgen_run(message), "interactive", session)
+
+
+async def leadgen_run(message: str):
+    if LEADGEN_MODE == "dag":
+        async for event in leadgen_pipeline.astream(message):
+            yield event
+        return
+    chunks = await leadgen_team.arun(
+        message, stream=True, stream_intermediate_steps=True
+    )
+    # streamed text includes member output; the job result is the final
+    # answer, taken from this run's own stream (run_response is shared
+    # by every job running on the team)
+    final = {}
+
+    async def keep_final(stream):
+        async for chunk in stream:
+            if getattr(chunk, "event", None) == "RunCompleted":
+                final["content"] = chunk.content
+            yield chunk
+
+    async for event in team_events(keep_final(chunks)):
+        yield event
+    if "content" in final:
+        yield "result", final
+
+
+async def leadgen_job(payload: dict):
+    async with LEADS_LIMIT:
+        async for event in leadgen_events(payload["message"]):
+            yield event
+
+
+# identical lead requests (case/whitespace-insensitive) share one run;
+# results are re-served for JOB_RESULT_TTL_S seconds
+jobs = JobQueue(
+    str(MEM_DIR / "jobs.sqlite"),
+    {"generate-leads": leadgen_job},
+    workers=int(os.getenv("JOB_WORKERS", "4")),
+    result_ttl_s=float(os.getenv("JOB_RESULT_TTL_S", "900")),
+)
+
+
 @router.post("/generate-leads")
 async def generate_leads(req: LeadRequest):
-    res: RunResponse = await asyncio.to_thread(
-        leadgen_team.run, req.message, stream=False
+    job_id, _ = jobs.submit("generate-leads", {"message": req.message})
+    job = await jobs.wait(job_id)
+    if job["status"] == "error":
+        raise HTTPException(502, job["error"])
+    return {"leads_markdown": job["result"]}
+
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+@router.post("/generate-leads/stream")
+async def generate_leads_stream(req: LeadRequest):
+    """Same run as /generate-leads, as server-sent events."""
+    return StreamingResponse(
+        sse_stream(lambda: leadgen_events(req.message), LEADS_LIMIT),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+# ---------- job API: submit → id → poll / stream -------------------------
+@router.post("/jobs/generate-leads", status_code=202)
+async def submit_leads_job(req: LeadRequest):
+    job_id, dedup = jobs.submit("generate-leads", {"message": req.message})
+    return {
+        "job_id": job_id,
+        "deduplicated": dedup,
+        "status": jobs.get(job_id)["status"],
+        "poll": f"/api/jobs/{job_id}",
+        "stream": f"/api/jobs/{job_id}/stream",
+    }
+
+
+@router.get("/jobs")
+def job_stats():
+    return jobs.stats()
+
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(404, "unknown or expired job")
+    return job
+
+
+@router.get("/jobs/{job_id}/stream")
+def stream_job(job_id: str):
+    if jobs.get(job_id) is None:
+        raise HTTPException(404, "unknown or expired job")
+    return StreamingResponse(
+        sse_stream(lambda: jobs.stream(job_id)),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
     )
-    return {"leads_markdown": res.content}
+
+
+@router.get("/limits")
+def endpoint_limits():
+    """Per-endpoint concurrency: active, queued, peak."""
+    return limiter_stats()
+
+
+@router.get("/rate-limits")
+def model_rate_limits():
+    """Model-call scheduler: queue depth and waits per class, budget left, 429s."""
+    return rate_limit_stats()
+
+
+@router.get("/schedules")
+def schedule_status():
+    """Recurring runs: next fire, last run and status, missed / overlapped."""
+    return schedule_stats()
+
+
+@router.post("/schedules/{name}/run", status_code=202)
+def run_schedule(name: str):
+    """Run a schedule now, outside its timetable (not while it is running)."""
+    if name not in schedules.jobs:
+        raise HTTPException(404, f"no schedule {name!r}")
+    return {"started": bool(schedules.trigger(name))}
+
+
+@router.get("/stream-bus")
+def stream_bus_stats():
+    """Nested streams: events, forced leaf streams, dropped forwarded copies."""
+    return stream_stats()
+
+
+@router.get("/model-pool")
+def model_pool_stats():
+    """Shared model-client pool: requests, connections reused, waits."""
+    return POOL.stats()
+
+
+@router.get("/routers")
+def local_router_stats():
+    """Per-manager local routing: direct dispatches vs LLM fallbacks."""
+    return router_stats()
+
+
+@router.get("/memory")
+def memory_stats():
+    """Tiered memory per team: tokens injected per call, compactions, disk."""
+    return tiers.stats()
+
+
+@router.get("/context")
+def context_assembly_stats():
+    """Prompt budgets: tokens offered vs sent per agent, recent drops."""
+    return context_stats()
+
+
+@router.get("/metrics")
+def call_metrics():
+    """Tokens, cost and latency p50/p95/p99 per agent, team, session, model, tool."""
+    return metrics_stats()
+
+
+@router.get("/traces")
+def recent_traces():
+    """Recent request traces: root span, duration, span count, tokens."""
+    return trace_stats()
+
+
+@router.get("/traces/{trace_id}")
+def get_trace(trace_id: str):
+    spans = TRACER.trace(trace_id)
+    if not spans:
+        raise HTTPException(404, "unknown or evicted trace")
+    return [s.to_dict() for s in spans]
+
+
+@router.get("/traces/{trace_id}/speedscope")
+def get_trace_speedscope(trace_id: str):
+    """The trace as a speedscope profile (open at speedscope.app)."""
+    profile = TRACER.to_speedscope(trace_id)
+    if not profile:
+        raise HTTPException(404, "unknown or evicted trace")
+    return profile
+
+
+@router.get("/cascade")
+def model_cascade_stats():
+    """Cascade per manager: escalation rate and reasons, cost vs all-gpt-4o."""
+    return cascade_stats()
+
+
+@router.get("/batching")
+def leadgen_batching_stats():
+    """Batched lead-gen stages: items per call, retried / failed items."""
+    return batch_stats()
+
+
+@router.get("/lead-scoring")
+def lead_scoring_stats():
+    """Local lead-scoring model: weights, leads scored, time spent."""
+    return scoring_stats()
+
+
+@router.get("/cassette")
+def cassette_replay_stats():
+    """Cassette: calls recorded / replayed, misses, order changes."""
+    return cassette_stats()
+
+
+@router.get("/search-cache")
+def search_cache_stats():
+    """Shared search cache: hit rate, coalesced and outbound calls per source."""
+    return searches.stats()
+
+
+@router.get("/tool-pool")
+def parallel_tool_stats():
+    """Tool calls run side by side per turn: turns, calls, seconds saved."""
+    return tool_pool_stats()
+
+
+@router.get("/response-cache")
+def response_cache_stats():
+    """Leaf-worker response cache: hits per tier, misses, evictions."""
+    return responses.stats()
 
 
 app.include_router(router)
 
 # ========== CLI DEMO ====================================================
 if __name__ == "__main__":
-    exec_director.print_response(
+    print_stream(
+        exec_director,
         "Onboard client BlueRail, outline documentation, "
         "generate API docs for the pricing calculator, "
         "build React PoC, and pull 5 CFO leads in Germany.",
-        stream=True,
     )
@@ -6,15 +6,19 @@
 #   Analytics, Ads, QA, Finance
 # • Collaborate sentinels for Brand-Tone and Token/Spend
 # • Long-term vector + event memory
+# • Shared, pooled model clients (agency_kit.model_pool)
+# • In-process token / latency / cost metrics (agency_kit.metrics)
+# • Span tracing of the delegation tree (agency_kit.tracing)
+# • Shared search cache with single flight (agency_kit.search_cache)
+# • Nested teams stream live, tagged with the member path (agency_kit.stream_bus)
 # ======================================================================
 
-import os, pathlib, logging, asyncio
+import os, sys, pathlib, logging, asyncio
 from typing import List, Optional
 
 from agno.agent import Agent, RunResponse
 from agno.team import Team
 from agno.memory import VectorFileMemory, FileMemory
-from agno.models.openai import OpenAIChat
 from agno.tools.reasoning import ReasoningTools as RT
 
 # comms / search
@@ -30,20 +34,54 @@ from agno.tools.shell import ShellTools
 from agno.tools.replicate import ReplicateTools
 from agno.tools.gmail import GmailTools
 
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from agency_kit.model_pool import POOL
+from agency_kit.response_cache import ResponseCache, cache_agent
+from agency_kit.router import attach_router
+from agency_kit.vector_memory import vector_memory
+from agency_kit.event_log import event_memory
+from agency_kit.metrics import METRICS, instrument_tree, spend_report
+from agency_kit import tracing
+from agency_kit import search_cache
+from agency_kit import stream_bus
+
 OPENAI = os.getenv("OPENAI_API_KEY", "sk-…")
 logging.basicConfig(level=logging.INFO)
 
 MEM = pathlib.Path("./mem")
 MEM.mkdir(exist_ok=True, parents=True)
-vec_mem = VectorFileMemory(path=str(MEM / "vector"))
-evt_mem = FileMemory(path=str(MEM / "events"))
+vec_mem = vector_memory(str(MEM / "vector"), VectorFileMemory)
+evt_mem = event_memory(str(MEM / "events"), FileMemory)
+responses = ResponseCache(str(MEM / "responses"))
+# Trend-Scout, Idea-Generator, Blog-Writer … share search results (SEARCH_CACHE=0: off)
+SEARCH_CACHE = os.getenv("SEARCH_CACHE", "1") != "0"
+searches = search_cache.SearchCache(str(MEM / "search_cache.sqlite"))
+
+# model + tool calls are metered in-process (METRICS=0: off)
+METRICS_ON = os.getenv("METRICS", "1") != "0"
+if METRICS_ON:
+    METRICS.observe(POOL).rollup_to(os.getenv("METRICS_DIR", str(MEM / "metrics")))
+# span per run / tool / model call → ./mem/traces.jsonl (TRACE_SAMPLE=0: off)
+TRACING = tracing.TRACER.sample > 0
+if TRACING:
+    tracing.TRACER.observe(POOL).write_to(
+        os.getenv("TRACE_FILE", str(MEM / "traces.jsonl"))
+    )
+# every level's text reaches the CLI as it is produced (STREAM_BUS=0: off)
+STREAM_BUS = os.getenv("STREAM_BUS", "1") != "0"
 
 
-def w(name, role, tools: Optional[List] = None, instr: Optional[List[str]] = None):
-    return Agent(
+def w(
+    name,
+    role,
+    tools: Optional[List] = None,
+    instr: Optional[List[str]] = None,
+    cache: bool = False,
+):
+    agent = Agent(
         name=name,
         role=role,
-        model=OpenAIChat("gpt-4o-mini", api_key=OPENAI),
+        model=POOL.chat("gpt-4o-mini", api_key=OPENAI),
         tools=(tools or []) + [RT()],
         instructions=instr or [],
         memory=vec_mem,
@@ -51,6 +89,9 @@ def w(name, role, tools: Optional[List] = None, instr: Optional[List[str]] = Non
         markdown=True,
         show_tool_calls=False,
     )
+    if STREAM_BUS:  # before the cache: forced streams stay inside it
+        stream_bus.instrument(agent)
+    return cache_agent(agent, responses) if cache else agent
 
 
 # ───── Ideation Team ───────────────────────────────────────────────
@@ -62,7 +103,7 @@ calendar = w("Content-Calendar Planner", "30-day schedule", [PandasTools()])
 ideation_team = Team(
     "Ideation-Team",
     "coordinate",
-    OpenAIChat("gpt-4o-mini", api_key=OPENAI),
+    POOL.chat("gpt-4o-mini", api_key=OPENAI),
     [trend, idea, seo, calendar],
     memory=evt_mem,
     instructions=["Output 30-day idea board"],
@@ -71,7 +112,7 @@ ideation_team = Team(
 ideation_mgr = Team(
     "Ideation-Mgr",
     "route",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
+    POOL.chat("gpt-4o", api_key=OPENAI),
     [ideation_team],
     tools=[SlackTools()],
     memory=evt_mem,
@@ -88,7 +129,7 @@ graphic = w("Graphic-Designer", "Carousels", [ReplicateTools()])
 multi_team = Team(
     "Production-Team",
     "coordinate",
-    OpenAIChat("gpt-4o-mini", api_key=OPENAI),
+    POOL.chat("gpt-4o-mini", api_key=OPENAI),
     [script, blog, video, thumb, graphic],
     memory=evt_mem,
     instructions=["Create all media assets"],
@@ -96,7 +137,7 @@ multi_team = Team(
 prod_mgr = Team(
     "Content-Prod-Mgr",
     "route",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
+    POOL.chat("gpt-4o", api_key=OPENAI),
     [multi_team],
     tools=[SlackTools()],
     memory=evt_mem,
@@ -111,7 +152,7 @@ hashtag = w("Hashtag-Optimizer", "Hashtags", [PandasTools()])
 dist_team = Team(
     "Distribution-Team",
     "coordinate",
-    OpenAIChat("gpt-4o-mini", api_key=OPENAI),
+    POOL.chat("gpt-4o-mini", api_key=OPENAI),
     [scheduler, crosspost, hashtag],
     memory=evt_mem,
     instructions=["Schedule & post across channels"],
@@ -119,7 +160,7 @@ dist_team = Team(
 dist_mgr = Team(
     "Distribution-Mgr",
     "route",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
+    POOL.chat("gpt-4o", api_key=OPENAI),
     [dist_team],
     tools=[SlackTools()],
     memory=evt_mem,
@@ -133,7 +174,7 @@ trend_alert = w("Micro-Trend Alert", "Daily microtrend", [DuckDuckGoTools()])
 community_team = Team(
     "Community-Team",
     "coordinate",
-    OpenAIChat("gpt-4o-mini", api_key=OPENAI),
+    POOL.chat("gpt-4o-mini", api_key=OPENAI),
     [engage, trend_alert],
     memory=evt_mem,
     instructions=["Manage replies, surface trends"],
@@ -141,7 +182,7 @@ community_team = Team(
 comm_mgr = Team(
     "Community-Mgr",
     "route",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
+    POOL.chat("gpt-4o", api_key=OPENAI),
     [community_team],
     tools=[SlackTools()],
     memory=evt_mem,
@@ -155,7 +196,7 @@ ab = w("A/B Tester", "Variant test", [PandasTools()])
 analytics_team = Team(
     "Analytics-Team",
     "coordinate",
-    OpenAIChat("gpt-4o-mini", api_key=OPENAI),
+    POOL.chat("gpt-4o-mini", api_key=OPENAI),
     [perf, ab],
     memory=evt_mem,
     instructions=["Weekly performance pack"],
@@ -163,7 +204,7 @@ analytics_team = Team(
 analytics_mgr = Team(
     "Analytics-Mgr",
     "route",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
+    POOL.chat("gpt-4o", api_key=OPENAI),
     [analytics_team],
     tools=[SlackTools()],
     memory=evt_mem,
@@ -177,7 +218,7 @@ segment = w("Audience-Segmenter", "Segment lookalike", [PandasTools()])
 ads_team = Team(
     "Ads-Team",
     "coordinate",
-    OpenAIChat("gpt-4o-mini", api_key=OPENAI),
+    POOL.chat("gpt-4o-mini", api_key=OPENAI),
     [copy, segment],
     memory=evt_mem,
     instructions=["Create and measure paid ads"],
@@ -185,7 +226,7 @@ ads_team = Team(
 ads_mgr = Team(
     "Ads-Mgr",
     "route",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
+    POOL.chat("gpt-4o", api_key=OPENAI),
     [ads_team],
     tools=[SlackTools()],
     memory=evt_mem,
@@ -194,11 +235,11 @@ ads_mgr = Team(
 )
 
 # ───── QA / Brand Governance ───────────────────────────────────────
-brand_tone = w("Brand-Tone Reviewer", "On-brand check")
+brand_tone = w("Brand-Tone Reviewer", "On-brand check", cache=True)
 qa_mgr = Team(
     "QA-Mgr",
     "route",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
+    POOL.chat("gpt-4o", api_key=OPENAI),
     [brand_tone],
     tools=[SlackTools()],
     memory=evt_mem,
@@ -208,11 +249,16 @@ qa_mgr = Team(
 
 # ───── Finance / Cost Sentinel ─────────────────────────────────────
 finance = w("Finance-Tracker", "Cost + ROI", [PandasTools()])
-cost_sent = w("Token-Spend Sentinel", "OpenAI spend", [PandasTools()])
+cost_sent = w(
+    "Token-Spend Sentinel",
+    "OpenAI spend",
+    [spend_report],
+    ["Call spend_report once and report its digest; don't recompute it"],
+)
 fin_mgr = Team(
     "Finance-Mgr",
     "route",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
+    POOL.chat("gpt-4o", api_key=OPENAI),
     [finance, cost_sent],
     tools=[SlackTools()],
     memory=evt_mem,
@@ -220,11 +266,27 @@ fin_mgr = Team(
     markdown=True,
 )
 
+# ───── Local routing for the route-mode managers ─────────────────────
+# single-member managers dispatch without an LLM call; the rest use
+# keyword/embedding routing and only fall back to gpt-4o when unsure
+if os.getenv("LOCAL_ROUTER", "1") != "0":
+    for mgr in (
+        ideation_mgr,
+        prod_mgr,
+        dist_mgr,
+        comm_mgr,
+        analytics_mgr,
+        ads_mgr,
+        qa_mgr,
+        fin_mgr,
+    ):
+        attach_router(mgr)
+
 # ───── EXECUTIVE DIRECTOR ──────────────────────────────────────────
 exec_dir = Team(
     "Exec-Director",
     "coordinate",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
+    POOL.chat("gpt-4o", api_key=OPENAI),
     members=[
         ideation_mgr,
         prod_mgr,
@@ -244,10 +306,20 @@ exec_dir = Team(
     markdown=True,
 )
 
+# every agent and team attributes its model / tool calls to itself
+if STREAM_BUS:
+    stream_bus.instrument_tree(exec_dir)
+if METRICS_ON:
+    instrument_tree(exec_dir)
+if TRACING:
+    tracing.instrument_tree(exec_dir)
+if SEARCH_CACHE:
+    search_cache.instrument_tree(exec_dir, searches)
+
 # ------------------ CLI DEMO --------------------------------------
 if __name__ == "__main__":
-    exec_dir.print_response(
+    stream_bus.print_stream(
+        exec_dir,
         "I need next month’s content calendar for TikTok and LinkedIn, "
         "five hook ideas per week, and a video script for the best hook.",
-        stream=True,
     )
@@ -9,19 +9,24 @@
 #   Procurement-Ops, Risk-Sentinel) + Scenario-Simulator + Onboarding (ops)
 # • 2 collaborate sentinels (Cost-Sentinel, Exception-Resolver)
 # • Long-term vector + event memory
-# • FastAPI stub for /api/forecast (optional)
+# • Shared, pooled model clients (agency_kit.model_pool)
+# • FastAPI stub for /api/forecast (native arun(), FORECAST_CONCURRENCY)
+#   and /api/forecast/stream (server-sent events)
+# • Record / replay cassettes of model + tool calls (CASSETTE=path)
+# • Shared search cache, single flight (/api/search-cache, SEARCH_CACHE=0: off)
+# • A turn's independent tool calls run concurrently (/api/tool-pool)
 # ======================================================================
 
-import os, pathlib, logging, asyncio
+import os, sys, pathlib, logging
 from typing import List, Optional
 
 from fastapi import FastAPI, APIRouter
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from agno.agent import Agent, RunResponse
 from agno.team import Team
 from agno.memory import VectorFileMemory, FileMemory
-from agno.models.openai import OpenAIChat
 from agno.tools.reasoning import ReasoningTools as RT
 
 # ---------- TOOL STUBS (replace with real SDK wrappers) ---------------
@@ -36,10 +41,24 @@ from agno.tools.file import FileTools
 from agno.tools.shell import ShellTools
 from agno.tools.python import PythonTools
 
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from agency_kit.model_pool import POOL
+from agency_kit.response_cache import ResponseCache, cache_agent
+from agency_kit.delegation import PARALLEL_HINT, ParallelDelegation
+from agency_kit.router import attach_router, router_stats
+from agency_kit.limits import endpoint_limit, limiter_stats
+from agency_kit.sse import sse_stream, team_events
+from agency_kit.vector_memory import vector_memory
+from agency_kit.event_log import event_memory
+from agency_kit.cassette import cassette_stats, instrument_tree, use as use_cassette
+from agency_kit import search_cache
+from agency_kit import parallel_tools
+
 # ⇣ create thin “CustomAPITools” if you haven’t written them yet
 from types import SimpleNamespace as _S
 
 
+@parallel_tools.concurrency_safe  # read-only API lookups: safe to overlap
 class CustomAPITools(_S):
     pass
 
@@ -52,20 +71,39 @@ SAPTools = CustomAPITools
 
 # ----------------------------------------------------------------------
 OPENAI = os.getenv("OPENAI_API_KEY", "sk-…")
+DELEGATION_CONCURRENCY = int(os.getenv("DELEGATION_CONCURRENCY", "4"))
 logging.basicConfig(level=logging.INFO)
+# CASSETTE=path records every model + tool call, or replays them when the
+# file exists (CASSETTE_MODE forces one; CASSETTE_TIME_SCALE=0: no waits) –
+# before any POOL.chat(), which reads OPENAI_BASE_URL
+CASSETTE = use_cassette(
+    os.getenv("CASSETTE"),
+    os.getenv("CASSETTE_MODE") or None,
+    float(os.getenv("CASSETTE_TIME_SCALE", "1")),
+)
 
 MEM_BASE = pathlib.Path("./mem")
 MEM_BASE.mkdir(exist_ok=True, parents=True)
-vector_mem = VectorFileMemory(path=str(MEM_BASE / "vector"))
-event_mem = FileMemory(path=str(MEM_BASE / "events"))
+vector_mem = vector_memory(str(MEM_BASE / "vector"), VectorFileMemory)
+event_mem = event_memory(str(MEM_BASE / "events"), FileMemory)
+responses = ResponseCache(str(MEM_BASE / "responses"))
+# Climate-Alert, Geo-Political Alert … share search results (SEARCH_CACHE=0: off)
+SEARCH_CACHE = os.getenv("SEARCH_CACHE", "1") != "0"
+searches = search_cache.SearchCache(str(MEM_BASE / "search_cache.sqlite"))
 
 
 # ------------------------ worker factory ------------------------------
-def w(name, role, tools: Optional[List] = None, instr: Optional[List[str]] = None):
-    return Agent(
+def w(
+    name,
+    role,
+    tools: Optional[List] = None,
+    instr: Optional[List[str]] = None,
+    cache: bool = False,
+):
+    agent = Agent(
         name=name,
         role=role,
-        model=OpenAIChat("gpt-4o-mini", api_key=OPENAI),
+        model=POOL.chat("gpt-4o-mini", api_key=OPENAI),
         tools=(tools or []) + [RT()],
         instructions=instr or [],
         memory=vector_mem,
@@ -73,6 +111,7 @@ def w(name, role, tools: Optional[List] = None, instr: Optional[List[str]] = Non
         markdown=True,
         show_tool_calls=False,
     )
+    return cache_agent(agent, responses) if cache else agent
 
 
 # ========= DEMAND-FORECAST TEAM  ======================================
@@ -89,7 +128,7 @@ sop_sync = w("Demand-S&OP Synth", "Reconcile demand/capacity")
 demand_team = Team(
     "Demand-Forecast Team",
     "coordinate",
-    OpenAIChat("gpt-4o-mini", api_key=OPENAI),
+    POOL.chat("gpt-4o-mini", api_key=OPENAI),
     members=[stat_fc, promo_lift, social, sop_sync],
     memory=event_mem,
     instructions=["Generate 18-mo unconstrained forecast"],
@@ -98,7 +137,7 @@ demand_team = Team(
 demand_mgr = Team(
     "Demand-Mgr",
     "route",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
+    POOL.chat("gpt-4o", api_key=OPENAI),
     [demand_team],
     memory=event_mem,
     instructions=["'forecast' → team; 'promo' → Promo-Lift …"],
@@ -116,7 +155,7 @@ talent = w("Talent-Scheduler", "Labour roster", [SAPTools(), SlackTools()])
 prod_team = Team(
     "Production-Plan Team",
     "coordinate",
-    OpenAIChat("gpt-4o-mini", api_key=OPENAI),
+    POOL.chat("gpt-4o-mini", api_key=OPENAI),
     [mat_avail, capacity, shift_seq, inv_doc, talent],
     memory=event_mem,
     instructions=["Create feasible weekly prod plan"],
@@ -125,7 +164,7 @@ prod_team = Team(
 prod_mgr = Team(
     "Production-Mgr",
     "route",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
+    POOL.chat("gpt-4o", api_key=OPENAI),
     [prod_team],
     tools=[SlackTools()],
     memory=event_mem,
@@ -156,7 +195,7 @@ reverse = w("Reverse-Logistics Agent", "Pickup & back-haul", [ORTools()])
 log_team = Team(
     "Green-Logistics Team",
     "coordinate",
-    OpenAIChat("gpt-4o-mini", api_key=OPENAI),
+    POOL.chat("gpt-4o-mini", api_key=OPENAI),
     [eco_route, traffic, roadworks, fuel_trk, charge_pl, reverse],
     memory=event_mem,
     instructions=["Optimise daily transport plan; CO₂ & cost KPI"],
@@ -165,7 +204,7 @@ log_team = Team(
 log_mgr = Team(
     "Logistics-Mgr",
     "route",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
+    POOL.chat("gpt-4o", api_key=OPENAI),
     [log_team],
     tools=[SlackTools()],
     memory=event_mem,
@@ -182,7 +221,7 @@ div_tracker = w("Supplier-Diversity Tracker", "D&I metrics", [GoogleSearchTools(
 proc_team = Team(
     "Procurement-Ops",
     "coordinate",
-    OpenAIChat("gpt-4o-mini", api_key=OPENAI),
+    POOL.chat("gpt-4o-mini", api_key=OPENAI),
     [should_cost, sup_score, rfx, div_tracker],
     memory=event_mem,
     instructions=["End-to-end sourcing pipeline"],
@@ -191,7 +230,7 @@ proc_team = Team(
 proc_mgr = Team(
     "Procurement-Mgr",
     "route",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
+    POOL.chat("gpt-4o", api_key=OPENAI),
     [proc_team],
     tools=[SlackTools()],
     memory=event_mem,
@@ -207,7 +246,7 @@ pack = w("Packaging-Optimizer", "Mono mat swap", [DuckDuckGoTools()])
 sus_team = Team(
     "Sustainability Team",
     "coordinate",
-    OpenAIChat("gpt-4o-mini", api_key=OPENAI),
+    POOL.chat("gpt-4o-mini", api_key=OPENAI),
     [regen, scope3, pack],
     memory=event_mem,
     instructions=["Generate monthly CSR dataset"],
@@ -216,7 +255,7 @@ sus_team = Team(
 sus_mgr = Team(
     "Sustainability-Mgr",
     "route",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
+    POOL.chat("gpt-4o", api_key=OPENAI),
     [sus_team],
     tools=[SlackTools()],
     memory=event_mem,
@@ -233,7 +272,7 @@ iot = w("IoT Anomaly Sentinel", "Cold-chain", [AzureIoTTools()])
 risk_team = Team(
     "Risk-Sentinel",
     "coordinate",
-    OpenAIChat("gpt-4o-mini", api_key=OPENAI),
+    POOL.chat("gpt-4o-mini", api_key=OPENAI),
     [clim, geo, cyber, iot],
     memory=event_mem,
     instructions=["Broadcast high-risk events"],
@@ -242,7 +281,7 @@ risk_team = Team(
 risk_mgr = Team(
     "Risk-Mgr",
     "route",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
+    POOL.chat("gpt-4o", api_key=OPENAI),
     [risk_team],
     tools=[SlackTools()],
     memory=event_mem,
@@ -251,11 +290,11 @@ risk_mgr = Team(
 )
 
 # ========= QA / GOVERNANCE ============================================
-qa_reviewer = w("Compliance-Reviewer", "Check docs & tone")
+qa_reviewer = w("Compliance-Reviewer", "Check docs & tone", cache=True)
 qa_mgr = Team(
     "QA-Mgr",
     "route",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
+    POOL.chat("gpt-4o", api_key=OPENAI),
     [qa_reviewer],
     tools=[SlackTools()],
     memory=event_mem,
@@ -269,7 +308,7 @@ carbon_oracle = w("Carbon-Cost Oracle", "EUA pricing")
 fin_mgr = Team(
     "Finance-Mgr",
     "route",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
+    POOL.chat("gpt-4o", api_key=OPENAI),
     [lane_cost, carbon_oracle],
     tools=[SlackTools()],
     memory=event_mem,
@@ -285,7 +324,7 @@ whatif_rep = w("Scenario-Reporter", "Write PPTX", [FileTools()])
 scenario_team = Team(
     "Scenario-Simulator",
     "coordinate",
-    OpenAIChat("gpt-4o-mini", api_key=OPENAI),
+    POOL.chat("gpt-4o-mini", api_key=OPENAI),
     [whatif_gen, whatif_run, whatif_rep],
     memory=event_mem,
     instructions=["Run what-ifs; post to #supply-board"],
@@ -300,12 +339,10 @@ ex_resolv = w(
     instr=["Open war-room on exception"],
 )
 
-# ========= CONTROL-TOWER DIRECTOR =====================================
-exec_dir = Team(
-    "Control-Tower Director",
-    "coordinate",
-    OpenAIChat("gpt-4o", api_key=OPENAI),
-    members=[
+# ========= LOCAL ROUTING ===============================================
+# route-mode managers skip their gpt-4o routing call when the match is clear
+if os.getenv("LOCAL_ROUTER", "1") != "0":
+    for mgr in (
         demand_mgr,
         prod_mgr,
         log_mgr,
@@ -314,25 +351,57 @@ exec_dir = Team(
         risk_mgr,
         qa_mgr,
         fin_mgr,
-        scenario_team,
-        cost_sent,
-        ex_resolv,
-    ],
-    tools=[SlackTools()],
+    ):
+        attach_router(mgr)
+
+# ========= CONTROL-TOWER DIRECTOR =====================================
+tower_members = [
+    demand_mgr,
+    prod_mgr,
+    log_mgr,
+    proc_mgr,
+    sus_mgr,
+    risk_mgr,
+    qa_mgr,
+    fin_mgr,
+    scenario_team,
+    cost_sent,
+    ex_resolv,
+]
+tower_fanout = ParallelDelegation(tower_members, DELEGATION_CONCURRENCY)
+
+exec_dir = Team(
+    "Control-Tower Director",
+    "coordinate",
+    POOL.chat("gpt-4o", api_key=OPENAI),
+    members=tower_members,
+    tools=[SlackTools(), tower_fanout.tool],
     memory=vector_mem,
     instructions=[
         "Delegate requests to managers/teams.",
+        PARALLEL_HINT,
         "Listen for sentinel events and surface daily KPI deck.",
         "Post digest to #ctl_tower and echo to requester.",
     ],
     markdown=True,
 )
+if CASSETTE:
+    instrument_tree(exec_dir, CASSETTE)
+if SEARCH_CACHE:
+    search_cache.instrument_tree(exec_dir, searches)
+# Eco-Route's Maps + ORTools, Traffic-Intel's Maps + DDG calls overlap
+if os.getenv("PARALLEL_TOOLS", "1") != "0":
+    parallel_tools.instrument_tree(exec_dir)
 
 # ========= FASTAPI (optional) ==========================================
 app = FastAPI(title="Supply-Chain AI")
 router = APIRouter(prefix="/api")
 
 
+# forecasts beyond the limit queue on the event loop, not on worker threads
+FORECAST_LIMIT = endpoint_limit("forecast", "FORECAST_CONCURRENCY", 16)
+
+
 class ForecastRequest(BaseModel):
     market: str
 
@@ -340,12 +409,69 @@ class ForecastRequest(BaseModel):
 @router.post("/forecast")
 async def forecast(req: ForecastRequest):
     """Return 18-mo unconstrained forecast markdown."""
-    res: RunResponse = await asyncio.to_thread(
-        demand_team.run, f"Forecast demand for {req.market}", stream=False
-    )
+    async with FORECAST_LIMIT:
+        res: RunResponse = await demand_team.arun(
+            f"Forecast demand for {req.market}", stream=False
+        )
     return {"forecast_md": res.content}
 
 
+@router.post("/forecast/stream")
+async def forecast_stream(req: ForecastRequest):
+    """/forecast as server-sent events: members, tool calls, partial text."""
+
+    async def events():
+        chunks = await demand_team.arun(
+            f"Forecast demand for {req.market}",
+            stream=True,
+            stream_intermediate_steps=True,
+        )
+        async for event in team_events(chunks):
+            yield event
+
+    return StreamingResponse(
+        sse_stream(events, FORECAST_LIMIT),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/limits")
+def endpoint_limits():
+    return limiter_stats()
+
+
+@router.get("/model-pool")
+def model_pool_stats():
+    """Shared model-client pool: requests, connections reused, waits."""
+    return POOL.stats()
+
+
+@router.get("/routers")
+def local_router_stats():
+    return router_stats()
+
+
+@router.get("/response-cache")
+def response_cache_stats():
+    return responses.stats()
+
+
+@router.get("/cassette")
+def cassette_replay_stats():
+    return cassette_stats()
+
+
+@router.get("/search-cache")
+def search_cache_stats():
+    return searches.stats()
+
+
+@router.get("/tool-pool")
+def parallel_tool_stats():
+    return parallel_tools.tool_pool_stats()
+
+
 app.include_router(router)
 
 # ========= CLI DEMO ====================================================
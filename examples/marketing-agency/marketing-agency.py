@@ -1,6 +1,7 @@
+import os, sys, pathlib
+
 from agno.agent import Agent
 from agno.team import Team
-from agno.models.openai import OpenAIChat
 from agno.tools import (
     # Comms
     SlackTools, GmailTools, TwilioTools, XTools, GoogleCalendarTools,
@@ -14,12 +15,26 @@ from agno.tools import (
     ReasoningTools
 )
 
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from agency_kit.model_pool import POOL      # one keep-alive client per model
+from agency_kit.router import attach_router  # keyword/embedding routing first
+from agency_kit.cascade import cascade_chat  # gpt-4o-mini first, 4o on failed checks
+
+# CASCADE=0: every worker and manager straight on gpt-4o
+CASCADE = os.getenv("CASCADE", "1") != "0"
+
+
+def model_for(name):
+    """Per-agent cascade (CASCADE_POLICIES tunes or disables it by name)."""
+    return cascade_chat(name) if CASCADE else POOL.chat("gpt-4o")
+
+
 # ─────────────────────── 1)  WORKER AGENT FACTORIES ────────────────────── #
 def worker(name, role, tools, extra_instr=None):
     return Agent(
         name=name,
         role=role,
-        model=OpenAIChat("gpt-4o"),
+        model=model_for(name),
         tools=tools + [ReasoningTools()],
         instructions=(extra_instr or []),
         markdown=True,
@@ -111,10 +126,10 @@ project_workers = [
 # ───────────────────── 2)  MANAGER AGENTS  (one per sub-team) ───────────── #
 def manager(name, child_agents, inbound_channel):
     """Return a manager Agent that decides which child to invoke."""
-    return Team(
+    team = Team(
         name=name,
         mode="route",            # manager chooses exactly one child
-        model=OpenAIChat("gpt-4o"),
+        model=model_for(name),
         members=child_agents,
         instructions=[
             f"You are the {name}. Decide which specialist handles the task.",
@@ -124,6 +139,7 @@ def manager(name, child_agents, inbound_channel):
         markdown=True,
         show_members_responses=False,
     )
+    return attach_router(team)   # LLM routing only when the match is unclear
 
 content_manager  = manager("Content-Manager",  content_workers, "content")
 comms_manager    = manager("Comms-Manager",    comms_workers,   "comms")
@@ -137,7 +153,7 @@ project_manager  = manager("Project-Manager",  project_workers, "projects")
 exec_director = Team(
     name="Executive-Director",
     mode="coordinate",                  # may call several managers
-    model=OpenAIChat("gpt-4o"),
+    model=POOL.chat("gpt-4o"),
     members=[
         content_manager, comms_manager, sales_manager,
         outbound_manager, research_manager, marketing_manager,
@@ -8,6 +8,9 @@ from agno.tools import (
     CognitiveSearchTools, ReasoningTools,
     BlobStorageTools
 )
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from agency_kit.scheduler import Scheduler
 
 # 1. Ingest
 ingest = Agent(
@@ -80,13 +83,25 @@ water_ops = Team(
     model=OpenAIChat("gpt-4o"),
     members=[ingest, predict, schedule, concierge, ofwat],
     instructions=[
-        "Run every 15 min; pass JSON downstream",
+        "Pass JSON downstream",
         "After each cycle, push KPI row to Power BI dataset"
     ],
     success_criteria="Leaks prioritised, crews dispatched, customers informed",
     markdown=True
 )
 
-# one‑shot trigger (cron/Azure Function in prod)
-response = water_ops.json_response("Run cycle 2025‑05‑06‑12:00")
-print("Embed Power BI KPI tile:", response["powerbi_url"])
+# every 15 min from one warm process; a cycle still running when the next
+# is due is not started twice, cycles missed while down are skipped
+def cycle(at):
+    response = water_ops.json_response(f"Run cycle {at:%Y‑%m‑%d‑%H:%M}")
+    print("Embed Power BI KPI tile:", response["powerbi_url"])
+
+schedules = Scheduler("./water_ops_schedules.sqlite")
+schedules.add("water-ops-cycle", cycle, every="15m", jitter_s=30)
+
+if __name__ == "__main__":
+    if "--once" in sys.argv:          # python thameswater.py --once
+        schedules.trigger("water-ops-cycle")
+        schedules.stop()
+    else:
+        schedules.serve()
@@ -8,6 +8,9 @@ from agno.tools import (
     AzureCommTools, MonitorWorkbookTools,
     ReasoningTools
 )
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from agency_kit.scheduler import Scheduler
 
 # 1. Ingest Agent ────────────────────────
 ingest = Agent(
@@ -89,7 +92,6 @@ orchestrator = Team(
     members=[ingest, predict, planner, alert],
     tools=[MonitorWorkbookTools(write=True)],
     instructions=[
-        "Run pipeline nightly 02:00 CET",
         "Pass outputs downstream as described",
         "After alerts, write KPI rows to Monitor Workbook ‘Rail‑KPIs’",
         "Return iframe URL of workbook for embedding in chat"
@@ -99,9 +101,22 @@ orchestrator = Team(
     add_datetime_to_instructions=True
 )
 
-# ▶ Kick off once (cron or Azure Function in prod)
-iframe = orchestrator.json_response(
-    "Run nightly rail‑ops pipeline for 2025‑05‑05",
-    show_intermediate_steps=False
-)
-print("Embed this in React:", iframe["link"])
+# ▶ Nightly 02:00 CET from one warm process (no cron, no cold start);
+#   a night missed while the process was down runs once on restart
+def nightly(at):
+    iframe = orchestrator.json_response(
+        f"Run nightly rail‑ops pipeline for {at:%Y‑%m‑%d}",
+        show_intermediate_steps=False
+    )
+    print("Embed this in React:", iframe["link"])
+
+schedules = Scheduler("./rail_ops_schedules.sqlite")
+schedules.add("rail-ops-nightly", nightly, cron="0 2 * * *",
+              tz="Europe/Berlin", misfire="catch_up", max_catch_up=1)
+
+if __name__ == "__main__":
+    if "--once" in sys.argv:          # python db.py --once: run it now
+        schedules.trigger("rail-ops-nightly")
+        schedules.stop()
+    else:
+        schedules.serve()